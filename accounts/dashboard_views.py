@@ -3,17 +3,23 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+from activities.feed import feed_queryset, get_feed_page
 from contacts.models import Contact, Company
+from interactions import rollups
 from interactions.models import Interaction
+from mini_crm.timewindows import month_days
 from tasks.models import Task
 from opportunities.models import Opportunity
 
+RECENT_ACTIVITIES_LIMIT = 8
+
 
 @login_required
 def dashboard_view(request):
     """Ulepszone dashboard ze statystykami"""
     user = request.user
     now = timezone.now()
+    today = timezone.localdate(now)
 
     # Statystyki kontaktów
     total_contacts = Contact.objects.filter(owner=user).count()
@@ -21,34 +27,26 @@ def dashboard_view(request):
 
     # Statystyki firm
     total_companies = Company.objects.filter(owner=user).count()
-    companies_with_contacts = Company.objects.filter(owner=user).annotate(
-        contact_count=Count('contacts')
-    ).filter(contact_count__gt=0).count()
+    companies_with_contacts = Company.objects.filter(owner=user, contacts_count__gt=0).count()
 
-    # Statystyki interakcji
-    total_interactions = Interaction.objects.filter(owner=user).count()
-    interactions_this_month = Interaction.objects.filter(
-        owner=user,
-        interaction_date__gte=now - timedelta(days=30)
-    ).count()
-    interactions_by_type = Interaction.objects.filter(owner=user).values('interaction_type').annotate(count=Count('id'))
-    recent_interactions = Interaction.objects.filter(owner=user).select_related('contact', 'company').order_by('-interaction_date')[:5]
+    # Statystyki interakcji - z dziennych podsumowań (interactions/rollups.py), nie COUNT(*) po interakcjach
+    interaction_type_data = rollups.counts_by_type(user)
+    total_interactions = sum(interaction_type_data.values())
+    # Bieżący miesiąc kalendarzowy w strefie projektu (dni lokalne, jak w podsumowaniach)
+    interactions_this_month = rollups.totals(user, *month_days(now))
 
     # Statystyki zadań
     total_tasks = Task.objects.filter(owner=user).count()
     tasks_by_status = Task.objects.filter(owner=user).values('status').annotate(count=Count('id'))
 
-    # Zadania krytyczne
-    overdue_tasks = [task for task in Task.objects.filter(owner=user).exclude(status__in=['done', 'cancelled']) if task.is_overdue()]
-    urgent_tasks = Task.objects.filter(
-        owner=user,
-        priority='urgent',
-        status__in=['todo', 'in_progress']
-    ).select_related('contact', 'company').order_by('due_date')[:5]
-    due_soon_tasks = [task for task in Task.objects.filter(owner=user).exclude(status__in=['done', 'cancelled']) if task.is_due_soon()]
+    # Zadania krytyczne - filtry terminów w SQL (TaskQuerySet)
+    user_tasks = Task.objects.filter(owner=user)
+    overdue_tasks = user_tasks.overdue(now).order_by('due_date')
+    urgent_tasks = user_tasks.open().filter(priority='urgent').select_related('contact', 'company').order_by('due_date')[:5]
+    due_soon_tasks = user_tasks.due_soon(now=now).order_by('due_date')
 
-    # Ostatnie aktywności (interakcje i zadania razem)
-    recent_tasks = Task.objects.filter(owner=user).select_related('contact', 'company').order_by('-created_at')[:3]
+    # Ostatnie aktywności - strumień interakcji, zadań i szans sprzedaży jednym zapytaniem
+    recent_activities = get_feed_page(feed_queryset(user), page_size=RECENT_ACTIVITIES_LIMIT)
 
     # Statystyki opportunities (szans sprzedażowych)
     total_opportunities = Opportunity.objects.filter(owner=user).count()
@@ -75,19 +73,18 @@ def dashboard_view(request):
     )
 
     # Opportunities przekroczone (overdue)
-    overdue_opportunities = [
-        opp for opp in Opportunity.objects.filter(
-            owner=user,
-            stage__in=['qualification', 'proposal', 'negotiation']
-        ) if opp.is_overdue()
-    ]
+    overdue_opportunities = Opportunity.objects.filter(
+        owner=user,
+        stage__in=['qualification', 'proposal', 'negotiation'],
+        expected_close_date__lt=today
+    ).order_by('expected_close_date')
 
     # Najbliższe zamknięcia (następne 7 dni)
     upcoming_opportunities = Opportunity.objects.filter(
         owner=user,
         stage__in=['qualification', 'proposal', 'negotiation'],
-        expected_close_date__gte=now.date(),
-        expected_close_date__lte=now.date() + timedelta(days=7)
+        expected_close_date__gte=today,
+        expected_close_date__lte=today + timedelta(days=7)
     ).select_related('contact', 'company').order_by('expected_close_date')[:5]
 
     # Statystyki według stage
@@ -120,7 +117,6 @@ def dashboard_view(request):
             contact_status_values.append(contact_status_data[status_code])
 
     # Typy interakcji
-    interaction_type_data = {item['interaction_type']: item['count'] for item in interactions_by_type}
     interaction_type_labels = []
     interaction_type_values = []
     for type_code, type_name in Interaction.TYPE_CHOICES:
@@ -175,8 +171,8 @@ def dashboard_view(request):
         'opportunity_stage_colors': opportunity_stage_colors,
 
         # Listy dla widżetów
-        'recent_interactions': recent_interactions,
-        'recent_tasks': recent_tasks,
+        'recent_activities': recent_activities.object_list,
+        'more_activities': recent_activities.has_next,
         'overdue_tasks': overdue_tasks[:5],
         'urgent_tasks': urgent_tasks,
         'due_soon_tasks': due_soon_tasks[:5],
@@ -184,10 +180,10 @@ def dashboard_view(request):
         'upcoming_opportunities': upcoming_opportunities,
 
         # Liczniki dla widżetów
-        'overdue_count': len(overdue_tasks),
+        'overdue_count': overdue_tasks.count(),
         'urgent_count': urgent_tasks.count(),
-        'due_soon_count': len(due_soon_tasks),
-        'overdue_opportunities_count': len(overdue_opportunities),
+        'due_soon_count': due_soon_tasks.count(),
+        'overdue_opportunities_count': overdue_opportunities.count(),
     }
 
     return render(request, 'dashboard.html', context)
@@ -0,0 +1,285 @@
+"""
+Sprawdzenie planów zapytań list i dashboardu
+
+Użycie:
+    python manage.py check_query_plans --seed
+    python manage.py check_query_plans --seed --owners 10 --contacts 20000
+    python manage.py check_query_plans --user jan --repeat 5
+    python manage.py check_query_plans --clear
+
+Dla każdego zapytania z widoków list i dashboardu uruchamia EXPLAIN,
+wypisuje użyte indeksy i czas wykonania, a kończy się błędem, jeśli
+którekolwiek czyta tabelę w całości (mini_crm/query_plans.py).
+
+--seed tworzy użytkowników plan_bench_N z dużą liczbą kontaktów,
+interakcji, zadań i szans sprzedaży (bulk_create, bez sygnałów - indeks
+wyszukiwania i liczniki nie są dla nich liczone), a potem odświeża
+statystyki bazy (ANALYZE). Bez statystyk i przy kilku wierszach planista
+PostgreSQL / MySQL i tak wybiera pełne skanowanie, więc wynik na pustej
+bazie niczego nie dowodzi.
+"""
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from contacts.models import Company, Contact
+from interactions import rollups
+from interactions.models import Interaction, InteractionDailyRollup
+from mini_crm.query_plans import PlanCheck, best_time, explain
+from mini_crm.timewindows import month_days
+from opportunities.models import Opportunity
+from tasks.models import ReminderMessage, Task, TaskRecurrence
+
+BENCH_USER_PREFIX = 'plan_bench_'
+
+OPEN_STAGES = [code for code, _label in Opportunity.STAGE_CHOICES if code not in Opportunity.CLOSED_STAGES]
+
+
+def plan_checks(user, page_size=None):
+    """Zapytania widoków list i dashboardu dla użytkownika (te same filtry i sortowanie) i workera przypomnień"""
+    page_size = page_size or settings.CONTACT_LIST_PAGE_SIZE
+    now = timezone.now()
+    today = timezone.localdate()
+    contacts = Contact.objects.filter(owner=user)
+    interactions = Interaction.objects.filter(owner=user).select_related('contact', 'company')
+    tasks = Task.objects.filter(owner=user).select_related('contact', 'company')
+    opportunities = Opportunity.objects.filter(owner=user)
+    daily_rollups = InteractionDailyRollup.objects.filter(owner=user)
+
+    return [
+        PlanCheck('contacts.list', contacts.order_by('last_name', 'first_name', 'id')[:page_size]),
+        PlanCheck(
+            'contacts.list_by_status',
+            contacts.filter(status='customer').order_by('last_name', 'first_name', 'id')[:page_size],
+        ),
+        PlanCheck(
+            'contacts.inactive',
+            contacts.filter(
+                Q(last_contact_date__lt=today - timedelta(days=90)) | Q(last_contact_date__isnull=True)
+            ).order_by('last_name', 'first_name', 'id')[:page_size],
+        ),
+        PlanCheck('dashboard.contacts_by_status', contacts.values('status').annotate(count=Count('id'))),
+        PlanCheck(
+            'dashboard.companies_with_contacts',
+            Company.objects.filter(owner=user, contacts_count__gt=0),
+            count=True,
+        ),
+        PlanCheck('interactions.timeline', interactions.order_by('-interaction_date', '-id')[:page_size]),
+        PlanCheck(
+            'dashboard.interactions_this_month',
+            daily_rollups.filter(day__range=month_days(now)).values('count'),
+        ),
+        PlanCheck(
+            'dashboard.interactions_by_type',
+            daily_rollups.values('interaction_type').annotate(total=Sum('count')),
+        ),
+        PlanCheck('tasks.open', tasks.open().order_by('due_date')[:page_size]),
+        PlanCheck(
+            'tasks.overdue',
+            tasks.overdue(now).order_by('due_date')[:page_size],
+        ),
+        PlanCheck('dashboard.due_soon_tasks', tasks.due_soon(now=now).order_by('due_date')[:5]),
+        PlanCheck(
+            'dashboard.urgent_tasks',
+            tasks.open().filter(priority='urgent').order_by('due_date')[:5],
+        ),
+        PlanCheck('dashboard.tasks_by_status', Task.objects.filter(owner=user).values('status').annotate(count=Count('id'))),
+        PlanCheck(
+            'reminders.pending',
+            Task.objects.filter(
+                reminder_sent_at__isnull=True,
+                reminder_date__lte=now + timedelta(seconds=settings.TASK_REMINDER_POLL_SECONDS),
+            ).order_by('reminder_date').values_list('pk', 'reminder_date')[:settings.TASK_REMINDER_BATCH_SIZE],
+        ),
+        PlanCheck(
+            'reminders.outbox',
+            ReminderMessage.objects.filter(status=ReminderMessage.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at').values_list('pk', flat=True)[:settings.TASK_REMINDER_BATCH_SIZE],
+        ),
+        PlanCheck(
+            'recurrence.due',
+            TaskRecurrence.objects.filter(
+                next_occurrence_at__lte=now + timedelta(days=settings.TASK_RECURRENCE_HORIZON_DAYS)
+            ).order_by('next_occurrence_at')[:settings.TASK_RECURRENCE_BATCH_SIZE],
+        ),
+        PlanCheck('opportunities.list', opportunities.order_by('expected_close_date')[:page_size]),
+        PlanCheck('dashboard.pipeline', opportunities.filter(stage__in=OPEN_STAGES)),
+        PlanCheck(
+            'dashboard.upcoming_opportunities',
+            opportunities.filter(
+                stage__in=OPEN_STAGES,
+                expected_close_date__gte=today,
+                expected_close_date__lte=today + timedelta(days=7),
+            ).select_related('contact', 'company').order_by('expected_close_date')[:5],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Sprawdza plany zapytań list i dashboardu (EXPLAIN) - błąd przy pełnym skanowaniu tabeli'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Nazwa użytkownika, dla którego sprawdzamy zapytania')
+        parser.add_argument('--seed', action='store_true', help='Utwórz dane testowe plan_bench_N (jeśli ich nie ma)')
+        parser.add_argument('--clear', action='store_true', help='Usuń dane testowe plan_bench_N i zakończ')
+        parser.add_argument('--owners', type=int, default=5, help='Liczba użytkowników testowych (domyślnie: 5)')
+        parser.add_argument(
+            '--contacts',
+            type=int,
+            default=10000,
+            help='Liczba kontaktów na użytkownika testowego (domyślnie: 10000)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Liczba pomiarów czasu zapytania (domyślnie: 3)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rozmiar paczki bulk_create (domyślnie: 2000)')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _details = User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
+            self.stdout.write(self.style.SUCCESS(f'>> Usunieto {deleted} rekordow testowych'))
+            return
+
+        if options['seed']:
+            self.seed(options['owners'], options['contacts'], options['batch_size'])
+            self.analyze()
+
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+        else:
+            user = User.objects.filter(username__startswith=BENCH_USER_PREFIX).order_by('pk').first()
+            if user is None:
+                raise CommandError('Podaj --user albo utwórz dane testowe przez --seed')
+
+        failed = []
+        for check in plan_checks(user):
+            plan = explain(check.queryset)
+            elapsed = best_time(check, options['repeat'])
+            indexes = ', '.join(plan.indexes) or '-'
+            if plan.uses_index:
+                self.stdout.write(self.style.SUCCESS(f'>> [OK] {check.label}: {indexes} ({elapsed:.1f} ms)'))
+            else:
+                failed.append(check.label)
+                self.stdout.write(self.style.ERROR(
+                    f">> [SCAN] {check.label}: {', '.join(plan.full_scans)} ({elapsed:.1f} ms)"
+                ))
+                self.stdout.write(plan.text)
+
+        if failed:
+            raise CommandError(f"Pełne skanowanie tabeli w zapytaniach: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('>> Wszystkie zapytania korzystaja z indeksow'))
+
+    def seed(self, owners, contacts_per_owner, batch_size):
+        """Dane testowe: na użytkownika N kontaktów, 3N interakcji, N zadań i N/2 szans sprzedaży"""
+        rng = random.Random(42)
+        now = timezone.now()
+        today = timezone.localdate()
+        statuses = [code for code, _label in Contact.STATUS_CHOICES]
+        task_statuses = [code for code, _label in Task.STATUS_CHOICES]
+        priorities = [code for code, _label in Task.PRIORITY_CHOICES]
+        stages = [code for code, _label in Opportunity.STAGE_CHOICES]
+        interaction_types = [code for code, _label in Interaction.TYPE_CHOICES]
+
+        for number in range(1, owners + 1):
+            username = f'{BENCH_USER_PREFIX}{number}'
+            if User.objects.filter(username=username).exists():
+                self.stdout.write(self.style.WARNING(f'>> {username} juz istnieje - pomijam'))
+                continue
+
+            with transaction.atomic():
+                user = User.objects.create_user(username=username)
+                companies = Company.objects.bulk_create(
+                    [Company(name=f'Firma {i}', owner=user) for i in range(max(contacts_per_owner // 10, 1))],
+                    batch_size=batch_size,
+                )
+                company_ids = list(Company.objects.filter(owner=user).values_list('pk', flat=True))
+                Contact.objects.bulk_create(
+                    [
+                        Contact(
+                            first_name=f'Imie{rng.randrange(500)}',
+                            last_name=f'Nazwisko{rng.randrange(5000)}',
+                            email=f'{username}.{i}@example.com',
+                            status=rng.choice(statuses),
+                            company_id=rng.choice(company_ids),
+                            last_contact_date=today - timedelta(days=rng.randrange(365)) if rng.random() > 0.2 else None,
+                            owner=user,
+                        )
+                        for i in range(contacts_per_owner)
+                    ],
+                    batch_size=batch_size,
+                )
+                contact_ids = list(Contact.objects.filter(owner=user).values_list('pk', flat=True))
+
+                Interaction.objects.bulk_create(
+                    [
+                        Interaction(
+                            contact_id=rng.choice(contact_ids),
+                            interaction_type=rng.choice(interaction_types),
+                            subject='Rozmowa',
+                            description='Dane testowe planów zapytań',
+                            interaction_date=now - timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+                            owner=user,
+                        )
+                        for _ in range(contacts_per_owner * 3)
+                    ],
+                    batch_size=batch_size,
+                )
+                # Dashboard czyta liczby interakcji z dziennych podsumowań
+                rollups.rebuild(owner=user, batch_size=batch_size)
+                Task.objects.bulk_create(
+                    [
+                        Task(
+                            title='Oddzwonić',
+                            status=status,
+                            completed_at=now if status == 'done' else None,
+                            priority=rng.choice(priorities),
+                            due_date=now + timedelta(hours=rng.randrange(-60 * 24, 60 * 24)),
+                            reminder_date=now + timedelta(hours=rng.randrange(1, 60 * 24)) if rng.random() < 0.2 else None,
+                            contact_id=rng.choice(contact_ids),
+                            owner=user,
+                        )
+                        for status in (rng.choice(task_statuses) for _ in range(contacts_per_owner))
+                    ],
+                    batch_size=batch_size,
+                )
+                Opportunity.objects.bulk_create(
+                    [
+                        Opportunity(
+                            name='Wdrożenie',
+                            amount=Decimal(rng.randrange(1000, 100000)),
+                            stage=rng.choice(stages),
+                            expected_close_date=today + timedelta(days=rng.randrange(-90, 90)),
+                            contact_id=rng.choice(contact_ids),
+                            owner=user,
+                        )
+                        for _ in range(max(contacts_per_owner // 2, 1))
+                    ],
+                    batch_size=batch_size,
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'>> {username}: {len(companies)} firm, {len(contact_ids)} kontaktow'
+            ))
+
+    def analyze(self):
+        """Odświeża statystyki planisty - bez nich plan dla świeżych danych jest przypadkowy"""
+        tables = [
+            model._meta.db_table
+            for model in (
+                Company, Contact, Interaction, InteractionDailyRollup,
+                Task, TaskRecurrence, ReminderMessage, Opportunity,
+            )
+        ]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+                cursor.fetchall()
+            else:
+                cursor.execute('ANALYZE')
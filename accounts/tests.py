@@ -1,3 +1,66 @@
-from django.test import TestCase
+"""
+Testy weryfikacji planów zapytań (check_query_plans)
+"""
 
-# Create your tests here.
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from mini_crm.query_plans import parse_plan
+
+
+class TestParsePlan(SimpleTestCase):
+    """Rozpoznawanie pełnego skanowania w planach SQLite / PostgreSQL / MySQL"""
+
+    def test_sqlite(self):
+        plan = parse_plan(
+            '7 0 0 SEARCH tasks_task USING INDEX task_owner_status_due_idx (owner_id=? AND status=?)\n'
+            '16 0 0 SEARCH contacts_contact USING INTEGER PRIMARY KEY (rowid=?) LEFT-JOIN\n'
+            '20 0 0 SCAN contacts_company\n'
+            '30 0 0 SCAN CONSTANT ROW',
+            'sqlite',
+            {'tasks_task', 'contacts_contact', 'contacts_company'},
+        )
+        self.assertEqual(plan.full_scans, ['contacts_company'])
+        self.assertEqual(plan.indexes, ['task_owner_status_due_idx'])
+        self.assertFalse(plan.uses_index)
+
+    def test_sqlite_index_scan_is_not_full_scan(self):
+        plan = parse_plan('3 0 0 SCAN contacts_contact USING INDEX contact_owner_name_idx', 'sqlite', {'contacts_contact'})
+        self.assertTrue(plan.uses_index)
+
+    def test_postgresql(self):
+        plan = parse_plan(
+            'Limit\n  ->  Index Scan using interaction_owner_date_idx on interactions_interaction\n'
+            '        ->  Seq Scan on contacts_contact',
+            'postgresql',
+            set(),
+        )
+        self.assertEqual(plan.full_scans, ['contacts_contact'])
+        self.assertEqual(plan.indexes, ['interaction_owner_date_idx'])
+
+    def test_mysql(self):
+        text = json.dumps({'query_block': {'nested_loop': [
+            {'table': {'table_name': 'tasks_task', 'access_type': 'ref', 'key': 'task_owner_status_due_idx'}},
+            {'table': {'table_name': 'contacts_contact', 'access_type': 'ALL'}},
+        ]}})
+        plan = parse_plan(text, 'mysql', set())
+        self.assertEqual(plan.full_scans, ['contacts_contact'])
+        self.assertEqual(plan.indexes, ['task_owner_status_due_idx'])
+
+
+class TestCheckQueryPlansCommand(TestCase):
+    """Komenda na małym zbiorze danych testowych"""
+
+    def test_seed_check_and_clear(self):
+        out = io.StringIO()
+        call_command('check_query_plans', seed=True, owners=2, contacts=50, repeat=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('[OK] tasks.open', output)
+        self.assertNotIn('[SCAN]', output)
+
+        call_command('check_query_plans', clear=True, stdout=io.StringIO())
+        self.assertFalse(User.objects.filter(username__startswith='plan_bench_').exists())
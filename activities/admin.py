@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Activity
+
+
+@admin.register(Activity)
+class ActivityAdmin(admin.ModelAdmin):
+    """Podgląd strumienia aktywności (tylko do odczytu - wpisy dopisują sygnały)"""
+    list_display = ['occurred_at', 'verb', 'title', 'detail', 'owner']
+    list_filter = ['verb', 'target_type', 'occurred_at']
+    search_fields = ['title']
+    date_hierarchy = 'occurred_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
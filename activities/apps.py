@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ActivitiesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'activities'
+    verbose_name = 'Aktywności'
+
+    def ready(self):
+        # Zapis zdarzeń interakcji, zadań i szans sprzedaży do strumienia aktywności
+        from . import signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""
+Zapis i odczyt strumienia aktywności
+
+Zapis (z sygnałów):
+
+    record(Activity.TASK_CREATED, task)
+    record(Activity.TASK_STATUS_CHANGED, task, detail='Do zrobienia → Zrobione')
+
+Odczyt - paginacja kursorowa po (occurred_at, id) malejąco, jedno
+zapytanie na stronę:
+
+    page = get_feed_page(feed_queryset(request.user, contact=contact), cursor)
+"""
+
+from mini_crm.pagination import KeysetPaginator
+
+from .models import Activity
+
+FEED_ORDERING = ('-occurred_at', '-id')
+
+# Pole z tytułem obiektu dla rodzaju obiektu (Activity.target_type)
+_TITLE_FIELDS = {
+    'interaction': 'subject',
+    'task': 'title',
+    'opportunity': 'name',
+}
+
+
+def build_activity(verb, obj, detail=''):
+    """Niezapisany wpis dla obiektu (interakcji, zadania, szansy sprzedaży)"""
+    target_type = obj._meta.model_name
+    return Activity(
+        owner_id=obj.owner_id,
+        contact_id=obj.contact_id,
+        company_id=obj.company_id,
+        verb=verb,
+        target_type=target_type,
+        target_id=obj.pk,
+        title=(getattr(obj, _TITLE_FIELDS[target_type]) or '')[:200],
+        detail=detail[:200],
+    )
+
+
+def record(verb, obj, detail=''):
+    activity = build_activity(verb, obj, detail)
+    activity.save()
+    return activity
+
+
+def change_detail(choices, before, after):
+    """Opis zmiany pola z choices, np. 'Propozycja → Negocjacje'"""
+    labels = dict(choices)
+    return f'{labels.get(before, before)} → {labels.get(after, after)}'
+
+
+def feed_queryset(owner, contact=None, company=None):
+    """Aktywności użytkownika - wszystkie albo jednego kontaktu / firmy"""
+    queryset = Activity.objects.filter(owner=owner)
+    if contact is not None:
+        queryset = queryset.filter(contact=contact)
+    if company is not None:
+        queryset = queryset.filter(company=company)
+    return queryset.select_related('contact', 'company')
+
+
+def get_feed_page(queryset, cursor=None, page_size=20):
+    return KeysetPaginator(queryset, ordering=FEED_ORDERING, page_size=page_size).get_page(cursor)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.CharField(choices=[('interaction_logged', 'Nowa interakcja'), ('task_created', 'Nowe zadanie'), ('task_status_changed', 'Zmiana statusu zadania'), ('opportunity_created', 'Nowa szansa sprzedaży'), ('opportunity_stage_changed', 'Zmiana etapu szansy')], max_length=30, verbose_name='Zdarzenie')),
+                ('target_type', models.CharField(choices=[('interaction', 'Interakcja'), ('task', 'Zadanie'), ('opportunity', 'Szansa sprzedaży')], max_length=20, verbose_name='Rodzaj obiektu')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='ID obiektu')),
+                ('title', models.CharField(max_length=200, verbose_name='Tytuł')),
+                ('detail', models.CharField(blank=True, max_length=200, verbose_name='Szczegóły')),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Czas zdarzenia')),
+                ('company', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='contacts.company', verbose_name='Firma')),
+                ('contact', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='contacts.contact', verbose_name='Kontakt')),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Aktywność',
+                'verbose_name_plural': 'Aktywności',
+                'ordering': ['-occurred_at', '-id'],
+                'indexes': [models.Index(fields=['owner', 'occurred_at', 'id'], name='activity_owner_time_idx'), models.Index(fields=['contact', 'occurred_at', 'id'], name='activity_contact_time_idx'), models.Index(fields=['company', 'occurred_at', 'id'], name='activity_company_time_idx')],
+            },
+        ),
+    ]
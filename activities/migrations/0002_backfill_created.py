@@ -0,0 +1,48 @@
+# Strumień dla danych sprzed aplikacji activities: zdarzenia utworzenia
+# interakcji, zadań i szans sprzedaży (czas zdarzenia = created_at).
+# Wcześniejsze zmiany statusów / etapów nie były nigdzie zapisywane.
+
+from django.db import migrations
+
+# Migawka z activities/signals.py i feed.py w chwili tworzenia migracji
+SOURCES = [
+    # (aplikacja, model, zdarzenie, rodzaj obiektu, pole tytułu)
+    ('interactions', 'Interaction', 'interaction_logged', 'interaction', 'subject'),
+    ('tasks', 'Task', 'task_created', 'task', 'title'),
+    ('opportunities', 'Opportunity', 'opportunity_created', 'opportunity', 'name'),
+]
+
+
+def backfill(apps, schema_editor):
+    Activity = apps.get_model('activities', 'Activity')
+    for app_label, model_name, verb, target_type, title_field in SOURCES:
+        Model = apps.get_model(app_label, model_name)
+        rows = []
+        for obj in Model.objects.order_by('pk').iterator(chunk_size=1000):
+            rows.append(Activity(
+                owner_id=obj.owner_id, contact_id=obj.contact_id, company_id=obj.company_id,
+                verb=verb, target_type=target_type, target_id=obj.pk,
+                title=(getattr(obj, title_field) or '')[:200], occurred_at=obj.created_at,
+            ))
+            if len(rows) >= 1000:
+                Activity.objects.bulk_create(rows)
+                rows = []
+        Activity.objects.bulk_create(rows)
+
+
+def remove_backfill(apps, schema_editor):
+    apps.get_model('activities', 'Activity').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        ('interactions', '0005_archivedinteraction'),
+        ('tasks', '0002_owner_indexes'),
+        ('opportunities', '0002_owner_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, remove_backfill),
+    ]
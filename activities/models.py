@@ -0,0 +1,93 @@
+"""
+Strumień aktywności
+
+Jedna tabela, do której dopisujemy (nigdy nie zmieniamy) zdarzenia
+z interakcji, zadań i szans sprzedaży - patrz activities/signals.py.
+Dashboard, karta kontaktu i firmy czytają ostatnie zdarzenia jednym
+zapytaniem po indeksie (właściciel / kontakt / firma, occurred_at, id),
+zamiast łączyć w Pythonie osobne listy z trzech tabel.
+
+Tytuł i opis zmiany są kopią z chwili zdarzenia - wpis zostaje
+czytelny także po zmianie nazwy lub usunięciu obiektu.
+"""
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
+
+from contacts.models import Company, Contact
+
+
+class Activity(models.Model):
+    """Pojedyncze zdarzenie w strumieniu aktywności"""
+
+    INTERACTION_LOGGED = 'interaction_logged'
+    TASK_CREATED = 'task_created'
+    TASK_STATUS_CHANGED = 'task_status_changed'
+    OPPORTUNITY_CREATED = 'opportunity_created'
+    OPPORTUNITY_STAGE_CHANGED = 'opportunity_stage_changed'
+    VERB_CHOICES = [
+        (INTERACTION_LOGGED, 'Nowa interakcja'),
+        (TASK_CREATED, 'Nowe zadanie'),
+        (TASK_STATUS_CHANGED, 'Zmiana statusu zadania'),
+        (OPPORTUNITY_CREATED, 'Nowa szansa sprzedaży'),
+        (OPPORTUNITY_STAGE_CHANGED, 'Zmiana etapu szansy'),
+    ]
+
+    TARGET_CHOICES = [
+        ('interaction', 'Interakcja'),
+        ('task', 'Zadanie'),
+        ('opportunity', 'Szansa sprzedaży'),
+    ]
+    # Widok szczegółów i ikona dla rodzaju obiektu
+    TARGET_URLS = {
+        'interaction': 'interactions:interaction_detail',
+        'task': 'tasks:task_detail',
+        'opportunity': 'opportunities:opportunity_detail',
+    }
+    TARGET_ICONS = {
+        'interaction': 'bi-chat-dots text-info',
+        'task': 'bi-list-check text-warning',
+        'opportunity': 'bi-graph-up-arrow text-success',
+    }
+
+    # Indeksy złożone zaczynają się od owner / contact / company - osobne indeksy FK są zbędne
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='activities', verbose_name='Właściciel', db_index=False
+    )
+    contact = models.ForeignKey(
+        Contact, on_delete=models.CASCADE, related_name='activities', verbose_name='Kontakt',
+        null=True, blank=True, db_index=False
+    )
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, related_name='activities', verbose_name='Firma',
+        null=True, blank=True, db_index=False
+    )
+    verb = models.CharField('Zdarzenie', max_length=30, choices=VERB_CHOICES)
+    target_type = models.CharField('Rodzaj obiektu', max_length=20, choices=TARGET_CHOICES)
+    target_id = models.PositiveBigIntegerField('ID obiektu')
+    title = models.CharField('Tytuł', max_length=200)
+    detail = models.CharField('Szczegóły', max_length=200, blank=True)
+    occurred_at = models.DateTimeField('Czas zdarzenia', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Aktywność'
+        verbose_name_plural = 'Aktywności'
+        ordering = ['-occurred_at', '-id']
+        indexes = [
+            # Strumień: WHERE owner = ? / contact = ? / company = ? ORDER BY occurred_at DESC, id DESC
+            models.Index(fields=['owner', 'occurred_at', 'id'], name='activity_owner_time_idx'),
+            models.Index(fields=['contact', 'occurred_at', 'id'], name='activity_contact_time_idx'),
+            models.Index(fields=['company', 'occurred_at', 'id'], name='activity_company_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()}: {self.title}"
+
+    def get_target_url(self):
+        return reverse(self.TARGET_URLS[self.target_type], args=[self.target_id])
+
+    @property
+    def icon(self):
+        return self.TARGET_ICONS[self.target_type]
@@ -0,0 +1,80 @@
+"""
+Zapis zdarzeń do strumienia aktywności (activities/feed.py)
+
+- nowa interakcja, zadanie, szansa sprzedaży (także z bulk_create przez
+  mini_crm.signals.post_bulk_create),
+- zmiana statusu zadania i etapu szansy sprzedaży (także masowa - przez
+  mini_crm.signals.post_bulk_update).
+
+Poprzednią wartość statusu / etapu czytamy w pre_save tylko wtedy, gdy
+zapis może ją zmienić (save() bez update_fields albo z tym polem).
+"""
+
+from django.db.models.signals import post_save, pre_save
+
+from contacts import counters
+from interactions.models import Interaction
+from mini_crm.signals import post_bulk_create, post_bulk_update
+from opportunities.models import Opportunity
+from tasks.models import Task
+
+from . import feed
+from .models import Activity
+
+# Model -> (zdarzenie utworzenia, śledzone pole, zdarzenie zmiany pola)
+_EVENTS = {
+    Interaction: (Activity.INTERACTION_LOGGED, None, None),
+    Task: (Activity.TASK_CREATED, 'status', Activity.TASK_STATUS_CHANGED),
+    Opportunity: (Activity.OPPORTUNITY_CREATED, 'stage', Activity.OPPORTUNITY_STAGE_CHANGED),
+}
+
+
+def remember_tracked_value(sender, instance, raw=False, update_fields=None, **kwargs):
+    _created_verb, field, _changed_verb = _EVENTS[sender]
+    instance._activity_previous = None
+    if raw or (update_fields is not None and field not in update_fields):
+        return
+    previous = counters.previous_values(instance, [field])
+    instance._activity_previous = previous[field] if previous else None
+
+
+def record_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    created_verb, field, changed_verb = _EVENTS[sender]
+    if created:
+        feed.record(created_verb, instance)
+        return
+    if field is None:
+        return
+    previous = getattr(instance, '_activity_previous', None)
+    current = getattr(instance, field)
+    if previous is not None and previous != current:
+        choices = sender._meta.get_field(field).choices
+        feed.record(changed_verb, instance, detail=feed.change_detail(choices, previous, current))
+
+
+def record_on_bulk_create(sender, instances, **kwargs):
+    created_verb, _field, _changed_verb = _EVENTS[sender]
+    Activity.objects.bulk_create([feed.build_activity(created_verb, instance) for instance in instances])
+
+
+def record_on_bulk_update(sender, changes, **kwargs):
+    _created_verb, field, changed_verb = _EVENTS[sender]
+    choices = sender._meta.get_field(field).choices
+    Activity.objects.bulk_create([
+        feed.build_activity(
+            changed_verb, instance, detail=feed.change_detail(choices, previous[field], getattr(instance, field))
+        )
+        for instance, previous in changes if field in previous and previous[field] != getattr(instance, field)
+    ])
+
+
+for model, (_created_verb, field, _changed_verb) in _EVENTS.items():
+    if field is not None:
+        pre_save.connect(remember_tracked_value, sender=model, dispatch_uid=f'activity_previous_{model.__name__}')
+        post_bulk_update.connect(
+            record_on_bulk_update, sender=model, dispatch_uid=f'activity_bulk_update_{model.__name__}'
+        )
+    post_save.connect(record_on_save, sender=model, dispatch_uid=f'activity_save_{model.__name__}')
+    post_bulk_create.connect(record_on_bulk_create, sender=model, dispatch_uid=f'activity_bulk_{model.__name__}')
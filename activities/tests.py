@@ -0,0 +1,109 @@
+"""
+Testy strumienia aktywności
+"""
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from activities.models import Activity
+from contacts.models import Company, Contact
+from interactions.models import Interaction
+from mini_crm.signals import post_bulk_create
+from opportunities.models import Opportunity
+from tasks.models import Task
+
+
+class TestActivityFeed(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        self.company = Company.objects.create(name='Acme', owner=self.user)
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', company=self.company, owner=self.user
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def create_interaction(self, subject='Spotkanie', **kwargs):
+        return Interaction.objects.create(
+            interaction_type='meeting', subject=subject, description='Opis',
+            interaction_date=timezone.now(), owner=self.user, **kwargs
+        )
+
+    def test_records_creations_and_changes(self):
+        interaction = self.create_interaction(contact=self.contact)
+        task = Task.objects.create(title='Oddzwonić', due_date=timezone.now(), owner=self.user, contact=self.contact)
+        opportunity = Opportunity.objects.create(
+            name='Wdrożenie', amount=1000, stage='proposal', expected_close_date=date(2026, 12, 1),
+            owner=self.user, company=self.company,
+        )
+
+        task.status = 'done'
+        task.save()
+        opportunity.stage = 'negotiation'
+        opportunity.save()
+        # Zapis bez zmiany statusu / etapu nie dopisuje zdarzeń
+        task.title = 'Oddzwonić jutro'
+        task.save()
+        opportunity.save(update_fields=['name'])
+
+        verbs = list(Activity.objects.values_list('verb', 'target_id', 'detail'))
+        self.assertEqual(verbs, [
+            (Activity.OPPORTUNITY_STAGE_CHANGED, opportunity.pk, 'Propozycja → Negocjacje'),
+            (Activity.TASK_STATUS_CHANGED, task.pk, 'Do zrobienia → Wykonane'),
+            (Activity.OPPORTUNITY_CREATED, opportunity.pk, ''),
+            (Activity.TASK_CREATED, task.pk, ''),
+            (Activity.INTERACTION_LOGGED, interaction.pk, ''),
+        ])
+        self.assertEqual(Activity.objects.filter(contact=self.contact).count(), 3)
+        self.assertEqual(Activity.objects.filter(company=self.company).count(), 2)
+
+    def test_bulk_create_is_recorded(self):
+        interactions = Interaction.objects.bulk_create([
+            Interaction(interaction_type='email', subject=f'Mail {i}', interaction_date=timezone.now(), owner=self.user)
+            for i in range(3)
+        ])
+        post_bulk_create.send(sender=Interaction, instances=interactions)
+
+        self.assertEqual(
+            sorted(Activity.objects.values_list('title', flat=True)), ['Mail 0', 'Mail 1', 'Mail 2']
+        )
+
+    def test_feed_pages_and_owner_scope(self):
+        for i in range(35):
+            self.create_interaction(f'Spotkanie {i}', contact=self.contact)
+        Interaction.objects.create(
+            interaction_type='call', subject='Cudze', interaction_date=timezone.now(), owner=self.other_user
+        )
+
+        url = reverse('activities:activity_feed')
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['activities']), 30)
+        self.assertEqual(response.context['activities'][0].title, 'Spotkanie 34')
+        self.assertNotContains(response, 'Cudze')
+
+        response = self.client.get(url, {'contact': self.contact.pk, 'cursor': response.context['page'].next_cursor})
+        self.assertEqual([a.title for a in response.context['activities']], [f'Spotkanie {i}' for i in range(4, -1, -1)])
+
+        other_contact = Contact.objects.create(first_name='Obcy', last_name='X', email='x@example.com', owner=self.other_user)
+        self.assertEqual(self.client.get(url, {'contact': other_contact.pk}).status_code, 404)
+
+    def test_dashboard_and_detail_pages_show_feed(self):
+        self.create_interaction(contact=self.contact, company=self.company)
+        Task.objects.create(title='Oddzwonić', due_date=timezone.now(), owner=self.user, contact=self.contact)
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual([a.verb for a in response.context['recent_activities']],
+                         [Activity.TASK_CREATED, Activity.INTERACTION_LOGGED])
+        self.assertContains(response, reverse('tasks:task_detail', args=[Activity.objects.first().target_id]))
+
+        response = self.client.get(reverse('contacts:contact_detail', args=[self.contact.pk]))
+        self.assertEqual(len(response.context['recent_activities']), 2)
+        self.assertFalse(response.context['more_activities'])
+
+        response = self.client.get(reverse('contacts:company_detail', args=[self.company.pk]))
+        self.assertEqual(len(response.context['recent_activities']), 1)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'activities'
+
+urlpatterns = [
+    path('', views.activity_feed, name='activity_feed'),
+]
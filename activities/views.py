@@ -0,0 +1,40 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, render
+
+from contacts.models import Company, Contact
+
+from .feed import feed_queryset, get_feed_page
+
+FEED_PAGE_SIZE = 30
+
+
+@login_required
+def activity_feed(request):
+    """
+    Strumień aktywności użytkownika (?contact=<id> / ?company=<id> - jednego kontaktu / firmy)
+
+    Paginacja kursorowa - każda strona to jedno zapytanie po indeksie.
+    """
+    contact = company = None
+    if request.GET.get('contact'):
+        contact = get_object_or_404(Contact, pk=request.GET['contact'], owner=request.user)
+    elif request.GET.get('company'):
+        company = get_object_or_404(Company, pk=request.GET['company'], owner=request.user)
+
+    page = get_feed_page(
+        feed_queryset(request.user, contact=contact, company=company),
+        request.GET.get('cursor'),
+        FEED_PAGE_SIZE,
+    )
+
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+
+    context = {
+        'activities': page.object_list,
+        'page': page,
+        'contact': contact,
+        'company': company,
+        'query_string': query_params.urlencode(),
+    }
+    return render(request, 'activities/activity_feed.html', context)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    """Podgląd blobów załączników (tylko do odczytu - liczniki utrzymują sygnały)"""
+    list_display = ['digest', 'size', 'ref_count', 'thumbnail_status', 'created_at', 'last_stored_at']
+    list_filter = ['thumbnail_status', 'created_at']
+    search_fields = ['digest']
+    readonly_fields = [
+        'digest', 'size', 'ref_count', 'created_at', 'last_stored_at',
+        'thumbnail_status', 'thumbnail_width', 'thumbnail_height',
+    ]
+
+    def has_add_permission(self, request):
+        return False
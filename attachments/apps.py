@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class AttachmentsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'attachments'
+    verbose_name = 'Załączniki'
+
+    def ready(self):
+        # Rejestracja pól z załącznikami + liczniki referencji blobów
+        from . import signals  # noqa: F401
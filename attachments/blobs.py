@@ -0,0 +1,163 @@
+"""
+Liczniki odwołań i odśmiecanie blobów
+
+Pola plików korzystające z attachment_storage są rejestrowane przez
+`register()` (attachments/signals.py). Sygnały modeli aktualizują
+Blob.ref_count przyrostowo przy zapisie i usunięciu obiektu; recount()
+przelicza liczniki od nowa (po QuerySet.update() i innych zmianach
+z pominięciem sygnałów), a collect_garbage() usuwa bloby, do których nic
+się nie odwołuje.
+"""
+
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Blob
+from .storage import TEMP_DIR, blob_storage, digest_from_name
+from .thumbnails import delete_thumbnail
+
+_registry = []
+
+
+def register(model, field_name, name_field=None):
+    """
+    Rejestruje pole FileField modelu, którego pliki trzymamy jako bloby
+
+    name_field: pole CharField z oryginalną nazwą pliku (nazwa w storage to skrót)
+    """
+    _registry.append((model, field_name, name_field))
+
+
+def registered_fields():
+    return list(_registry)
+
+
+def get_blob(name):
+    """Blob dla nazwy pliku w storage albo None (brak pliku lub plik spoza blobs/)"""
+    digest = digest_from_name(name)
+    if digest is None:
+        return None
+    return Blob.objects.filter(digest=digest).first()
+
+
+def change_ref_count(name, delta):
+    """Zmienia licznik odwołań bloba o podanej nazwie (pliki spoza blobs/ są pomijane)"""
+    digest = digest_from_name(name)
+    if digest is None or not delta:
+        return
+    if delta > 0:
+        expression = F('ref_count') + delta
+    else:
+        expression = Greatest(F('ref_count') + delta, Value(0))
+    Blob.objects.filter(digest=digest).update(ref_count=expression)
+
+
+def recount():
+    """
+    Przelicza liczniki odwołań wszystkich blobów z zarejestrowanych pól
+
+    Returns:
+        Liczba blobów, których licznik się zmienił
+    """
+    counts = Counter()
+    for model, field_name, _name_field in _registry:
+        rows = (
+            model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            .order_by().values(field_name).annotate(total=Count('pk'))
+        )
+        for row in rows:
+            digest = digest_from_name(row[field_name])
+            if digest:
+                counts[digest] += row['total']
+
+    changed = 0
+    with transaction.atomic():
+        for blob in Blob.objects.select_for_update().only('pk', 'digest', 'ref_count'):
+            expected = counts.get(blob.digest, 0)
+            if blob.ref_count != expected:
+                Blob.objects.filter(pk=blob.pk).update(ref_count=expected)
+                changed += 1
+    return changed
+
+
+def collect_garbage(grace=timedelta(hours=24), dry_run=False):
+    """
+    Usuwa bloby bez odwołań zapisane po raz ostatni wcześniej niż `grace` temu
+
+    Okres karencji chroni pliki właśnie wgrane, których obiekt nie został
+    jeszcze zapisany (licznik rośnie dopiero w post_save). Każdy blob jest
+    usuwany w osobnej transakcji: wiersz jest blokowany i sprawdzany
+    ponownie (ref_count = 0, stary last_stored_at), a plik jest usuwany
+    przed wierszem, pod blokadą. Równoległy zapis tej samej zawartości
+    (ContentAddressedStorage._save) czeka na blokadę i zapisuje plik od nowa.
+
+    Returns:
+        (liczba blobów, zwolnione bajty)
+    """
+    cutoff = timezone.now() - grace
+    candidates = Blob.objects.filter(ref_count=0, last_stored_at__lt=cutoff).values_list('pk', 'digest', 'size')
+
+    removed = freed = 0
+    for pk, digest, size in candidates.iterator():
+        if not dry_run:
+            with transaction.atomic():
+                locked = Blob.objects.select_for_update().filter(pk=pk, ref_count=0, last_stored_at__lt=cutoff)
+                if not locked.exists():
+                    continue
+                blob_storage.delete_blob(digest)
+                delete_thumbnail(digest)
+                Blob.objects.filter(pk=pk).delete()
+        removed += 1
+        freed += size
+
+    if not dry_run:
+        _remove_stale_temp_files(cutoff)
+    return removed, freed
+
+
+def _remove_stale_temp_files(cutoff):
+    """Pliki tymczasowe po przerwanych zapisach"""
+    if not blob_storage.exists(TEMP_DIR):
+        return
+    _dirs, files = blob_storage.listdir(TEMP_DIR)
+    for file_name in files:
+        name = f'{TEMP_DIR}/{file_name}'
+        if blob_storage.get_modified_time(name) < cutoff:
+            blob_storage.delete(name)
+
+
+def adopt_legacy_files(model, field_name, name_field, source_storage):
+    """
+    Przenosi pliki zapisane przed wprowadzeniem blobów (np. interactions/2025/01/...)
+
+    Każdy plik jest zapisywany do storage blobów, a pole aktualizowane
+    przez update() razem z oryginalną nazwą pliku (name_field) - liczniki
+    trzeba potem przeliczyć przez recount().
+    Stary plik zostaje na miejscu (do ręcznego usunięcia po weryfikacji).
+
+    Returns:
+        Liczba przeniesionych plików
+    """
+    adopted = 0
+    legacy = (
+        model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+        .exclude(**{f'{field_name}__startswith': 'blobs/'}).values_list('pk', field_name)
+    )
+    for pk, name in legacy.iterator():
+        if not source_storage.exists(name):
+            continue
+        with source_storage.open(name, 'rb') as source:
+            new_name = blob_storage.save(name, File(source))
+        changes = {field_name: new_name}
+        if name_field:
+            changes[name_field] = os.path.basename(name)
+        model._default_manager.filter(pk=pk).update(**changes)
+        adopted += 1
+    return adopted
@@ -0,0 +1,166 @@
+"""
+Wysyłka załączników po sprawdzeniu uprawnień
+
+Widok sprawdza właściciela obiektu, a samo przesłanie bajtów może przejąć
+serwer proxy (ATTACHMENT_SENDFILE_BACKEND):
+
+    'nginx'   - nagłówek X-Accel-Redirect z adresem wewnętrznej lokalizacji
+                (ATTACHMENT_SENDFILE_PREFIX + nazwa pliku w storage,
+                w nginx oznaczonej jako `internal;`)
+    'apache'  - nagłówek X-Sendfile ze ścieżką pliku na dysku (mod_xsendfile)
+    ''        - Django wysyła plik sam (FileResponse), z obsługą nagłówka Range
+
+Przy proxy worker gunicorna kończy pracę zaraz po sprawdzeniu uprawnień,
+zamiast przez cały czas pobierania przepychać plik przez socket.
+Range (wznawianie pobierania, przewijanie wideo/PDF) obsługuje wtedy nginx.
+"""
+
+import mimetypes
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+
+from .storage import digest_from_name
+
+SENDFILE_HEADERS = {
+    'nginx': 'X-Accel-Redirect',
+    'apache': 'X-Sendfile',
+}
+
+
+class RangeFile:
+    """Widok fragmentu pliku [start, start + length) dla FileResponse"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Pojedynczy zakres z nagłówka Range jako (start, koniec włącznie)
+
+    Returns:
+        None - brak lub nieobsługiwany nagłówek (wysyłamy cały plik),
+        False - zakres poza plikiem (416),
+        (start, end) - zakres do wysłania (206)
+    """
+    if not header or not header.startswith('bytes=') or size == 0:
+        return None
+    spec = header[len('bytes='):].strip()
+    if ',' in spec:
+        # Wiele zakresów (multipart/byteranges) - RFC pozwala odpowiedzieć całością
+        return None
+    first, sep, last = spec.partition('-')
+    first, last = first.strip(), last.strip()
+    if not sep or not (first or last) or not (first or '0').isdigit() or not (last or '0').isdigit():
+        return None
+
+    if not first:
+        # bytes=-500: ostatnie 500 bajtów
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def serve_file(request, storage, name, filename, as_attachment=True, etag=None):
+    """
+    Odpowiedź z plikiem ze storage (uprawnienia sprawdza wywołujący)
+
+    Args:
+        storage: storage plików na dysku (FileSystemStorage)
+        name: nazwa pliku w storage (np. interaction.attachments.name)
+        filename: nazwa pliku dla przeglądarki (Content-Disposition)
+        as_attachment: False - wyświetl w przeglądarce (np. miniatura)
+        etag: domyślnie skrót zawartości z nazwy bloba
+    """
+    backend = settings.ATTACHMENT_SENDFILE_BACKEND
+    if backend and backend not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(
+            f'ATTACHMENT_SENDFILE_BACKEND: nieznana wartość {backend!r} '
+            f'(dozwolone: {", ".join(SENDFILE_HEADERS)} lub pusta)'
+        )
+
+    # Nazwa bloba to skrót zawartości - gotowy, silny ETag
+    if etag is None:
+        digest = digest_from_name(name)
+        etag = f'"{digest}"' if digest else None
+    if etag:
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+    if backend:
+        response = _sendfile_response(backend, storage, name, filename, as_attachment)
+    else:
+        response = _file_response(request, storage, name, filename, as_attachment, etag)
+
+    if etag:
+        response['ETag'] = etag
+    response['Cache-Control'] = 'private'
+    return response
+
+
+def _sendfile_response(backend, storage, name, filename, as_attachment):
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = HttpResponse(content_type=content_type)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    if backend == 'nginx':
+        response[SENDFILE_HEADERS[backend]] = settings.ATTACHMENT_SENDFILE_PREFIX + quote(name)
+    else:
+        response[SENDFILE_HEADERS[backend]] = storage.path(name)
+    return response
+
+
+def _file_response(request, storage, name, filename, as_attachment, etag):
+    size = storage.size(name)
+    byte_range = parse_range(request.headers.get('Range'), size)
+    # If-Range: zakres tylko wtedy, gdy klient ma tę samą wersję pliku
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, as_attachment=as_attachment, filename=filename)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeFile(file, start, length), status=206, as_attachment=as_attachment, filename=filename
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,58 @@
+"""
+Skalowanie obrazów dla procesów roboczych puli miniatur
+
+Moduł celowo nie importuje Django - funkcje są wywoływane w procesach
+ProcessPoolExecutor (attachments/thumbnails.py), które nie mają
+skonfigurowanych ustawień ani połączenia z bazą. Statusy odpowiadają
+wartościom Blob.THUMBNAIL_*.
+"""
+
+import os
+import tempfile
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+THUMBNAIL_READY = 'ready'
+THUMBNAIL_NONE = 'none'
+THUMBNAIL_FAILED = 'failed'
+
+
+def render_thumbnail(source_path, target_path, size, quality):
+    """
+    Skaluje obraz do miniatury mieszczącej się w kwadracie size x size
+
+    Returns:
+        (status, szerokość, wysokość) - status to jedna z wartości Blob.THUMBNAIL_*
+    """
+    if os.path.exists(target_path):
+        with Image.open(target_path) as existing:
+            return THUMBNAIL_READY, existing.width, existing.height
+
+    try:
+        with Image.open(source_path) as image:
+            # JPEG: dekodowanie od razu w zmniejszonej rozdzielczości (1/2, 1/4, 1/8)
+            image.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+                background = Image.new('RGB', image.size, 'white')
+                background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    image.save(temp_file, 'JPEG', quality=quality, optimize=True)
+                os.replace(temp_path, target_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return THUMBNAIL_READY, image.width, image.height
+    except UnidentifiedImageError:
+        return THUMBNAIL_NONE, None, None
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return THUMBNAIL_FAILED, None, None
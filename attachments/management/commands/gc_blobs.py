@@ -0,0 +1,59 @@
+"""
+Odśmiecanie blobów załączników
+
+Użycie:
+    python manage.py gc_blobs
+    python manage.py gc_blobs --recount --dry-run
+    python manage.py gc_blobs --adopt-legacy --recount
+    python manage.py gc_blobs --grace-hours 1
+
+Usuwa bloby (attachments/storage.py), do których nie odwołuje się żaden
+obiekt i które nie były zapisywane od --grace-hours godzin. --recount
+najpierw przelicza liczniki odwołań od nowa (po zmianach z pominięciem
+sygnałów, np. QuerySet.update()). --adopt-legacy przenosi załączniki
+zapisane przed wprowadzeniem blobów do storage blobów.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from attachments import blobs
+
+
+class Command(BaseCommand):
+    help = 'Usuwa nieużywane bloby załączników i przelicza liczniki odwołań'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help='Przelicz liczniki odwołań przed odśmiecaniem')
+        parser.add_argument(
+            '--adopt-legacy',
+            action='store_true',
+            help='Przenieś stare załączniki (spoza blobs/) do storage blobów',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=settings.ATTACHMENT_GC_GRACE_HOURS,
+            help=f'Nie usuwaj blobów zapisanych w ciągu ostatnich N godzin (domyślnie: {settings.ATTACHMENT_GC_GRACE_HOURS})',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Tylko policz, nic nie usuwaj')
+
+    def handle(self, *args, **options):
+        if options['adopt_legacy']:
+            for model, field_name, name_field in blobs.registered_fields():
+                adopted = blobs.adopt_legacy_files(model, field_name, name_field, default_storage)
+                self.stdout.write(self.style.SUCCESS(
+                    f'>> {model._meta.label}.{field_name}: przeniesiono {adopted} plikow'
+                ))
+
+        if options['recount'] or options['adopt_legacy']:
+            changed = blobs.recount()
+            self.stdout.write(self.style.SUCCESS(f'>> Poprawiono liczniki {changed} blobow'))
+
+        removed, freed = blobs.collect_garbage(timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        prefix = 'Do usuniecia' if options['dry_run'] else 'Usunieto'
+        self.stdout.write(self.style.SUCCESS(f'>> {prefix}: {removed} blobow ({filesizeformat(freed)})'))
@@ -0,0 +1,51 @@
+"""
+Generowanie miniatur załączników graficznych
+
+Użycie:
+    python manage.py generate_thumbnails
+    python manage.py generate_thumbnails --workers 4 --batch-size 200
+    python manage.py generate_thumbnails --regenerate
+
+Przetwarza bloby oczekujące na miniaturę (nowo wgrane załączniki) w puli
+procesów - patrz attachments/thumbnails.py. Uruchamiana z crona;
+ponowne uruchomienie jest bezpieczne (miniatury są kluczowane skrótem
+zawartości). --regenerate wraca do kolejki wszystkie bloby, np. po zmianie
+ATTACHMENT_THUMBNAIL_SIZE.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from attachments.models import Blob
+from attachments.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generuje miniatury załączników graficznych w puli procesów'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.ATTACHMENT_THUMBNAIL_WORKERS,
+            help=f'Liczba procesów roboczych, 0 = bez puli (domyślnie: {settings.ATTACHMENT_THUMBNAIL_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ATTACHMENT_THUMBNAIL_BATCH_SIZE,
+            help=f'Liczba blobów w jednej paczce (domyślnie: {settings.ATTACHMENT_THUMBNAIL_BATCH_SIZE})',
+        )
+        parser.add_argument('--regenerate', action='store_true', help='Wygeneruj ponownie wszystkie miniatury')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--workers musi być >= 0, a --batch-size >= 1')
+
+        stats = generate_thumbnails(
+            workers=options['workers'], batch_size=options['batch_size'], regenerate=options['regenerate']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'>> Miniatury: {stats[Blob.THUMBNAIL_READY]} gotowych, '
+            f'{stats[Blob.THUMBNAIL_NONE]} pominietych (nie obraz), {stats[Blob.THUMBNAIL_FAILED]} bledow'
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Rozmiar (bajty)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Liczba odwołań')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('last_stored_at', models.DateTimeField(auto_now=True, verbose_name='Ostatni zapis')),
+            ],
+            options={
+                'verbose_name': 'Blob',
+                'verbose_name_plural': 'Bloby',
+                'indexes': [models.Index(fields=['ref_count', 'last_stored_at'], name='blob_gc_idx')],
+            },
+        ),
+    ]
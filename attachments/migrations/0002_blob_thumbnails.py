@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attachments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='thumbnail_height',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Wysokość miniatury'),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='thumbnail_status',
+            field=models.CharField(choices=[('pending', 'Do wygenerowania'), ('ready', 'Gotowa'), ('none', 'Brak (to nie obraz)'), ('failed', 'Błąd')], default='pending', max_length=10, verbose_name='Miniatura'),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='thumbnail_width',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Szerokość miniatury'),
+        ),
+        migrations.AddIndex(
+            model_name='blob',
+            index=models.Index(fields=['thumbnail_status'], name='blob_thumbnail_status_idx'),
+        ),
+    ]
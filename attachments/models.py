@@ -0,0 +1,62 @@
+"""
+Bloby załączników
+
+Każdy wgrany plik jest zapisywany raz, pod skrótem SHA-256 zawartości
+(attachments/storage.py). Ta sama oferta PDF dołączona do 40 interakcji
+to jeden plik na dysku i jeden wiersz Blob z ref_count = 40. Nazwy plików
+nigdy się nie zmieniają, więc kopia zapasowa katalogu blobs/ jest
+przyrostowa - dochodzą tylko nowe pliki.
+"""
+
+from django.db import models
+
+
+class Blob(models.Model):
+    """Plik zapisany pod skrótem zawartości, z licznikiem odwołań"""
+
+    THUMBNAIL_PENDING = 'pending'
+    THUMBNAIL_READY = 'ready'
+    THUMBNAIL_NONE = 'none'
+    THUMBNAIL_FAILED = 'failed'
+    THUMBNAIL_CHOICES = [
+        (THUMBNAIL_PENDING, 'Do wygenerowania'),
+        (THUMBNAIL_READY, 'Gotowa'),
+        (THUMBNAIL_NONE, 'Brak (to nie obraz)'),
+        (THUMBNAIL_FAILED, 'Błąd'),
+    ]
+
+    digest = models.CharField('SHA-256', max_length=64, unique=True)
+    size = models.PositiveBigIntegerField('Rozmiar (bajty)')
+    ref_count = models.PositiveIntegerField('Liczba odwołań', default=0)
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+    # Ostatni zapis tej zawartości - GC nie usuwa blobów "świeżo wgranych",
+    # których obiekt (interakcja) nie zdążył się jeszcze zapisać
+    last_stored_at = models.DateTimeField('Ostatni zapis', auto_now=True)
+    # Miniaturę generuje w tle `generate_thumbnails` (attachments/thumbnails.py)
+    thumbnail_status = models.CharField(
+        'Miniatura', max_length=10, choices=THUMBNAIL_CHOICES, default=THUMBNAIL_PENDING
+    )
+    thumbnail_width = models.PositiveSmallIntegerField('Szerokość miniatury', null=True, blank=True)
+    thumbnail_height = models.PositiveSmallIntegerField('Wysokość miniatury', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Blob'
+        verbose_name_plural = 'Bloby'
+        indexes = [
+            # GC: WHERE ref_count = 0 AND last_stored_at < ?
+            models.Index(fields=['ref_count', 'last_stored_at'], name='blob_gc_idx'),
+            # Kolejka miniatur: WHERE thumbnail_status = 'pending'
+            models.Index(fields=['thumbnail_status'], name='blob_thumbnail_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count})"
+
+    @property
+    def name(self):
+        from .storage import blob_name
+        return blob_name(self.digest)
+
+    @property
+    def has_thumbnail(self):
+        return self.thumbnail_status == self.THUMBNAIL_READY
@@ -0,0 +1,84 @@
+"""
+Liczniki odwołań blobów (attachments/blobs.py)
+
+Zapis obiektu z nowym plikiem zwiększa licznik nowego bloba i zmniejsza
+licznik poprzedniego; usunięcie obiektu zmniejsza licznik jego bloba.
+Masowy zapis (post_bulk_create) zwiększa, a masowe usunięcie
+(post_bulk_delete) zmniejsza liczniki jednym UPDATE na blob.
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from interactions.models import ArchivedInteraction, Interaction
+from mini_crm.signals import post_bulk_create, post_bulk_delete
+
+from . import blobs
+
+blobs.register(Interaction, 'attachments', name_field='attachment_name')
+# Archiwum trzyma samą nazwę bloba (CharField) - oryginalna nazwa jest w payload
+blobs.register(ArchivedInteraction, 'attachments')
+
+
+def _file_name(instance, field_name):
+    value = getattr(instance, field_name)
+    # FileField zwraca FieldFile, CharField - nazwę
+    return getattr(value, 'name', value) or ''
+
+
+def remember_previous_file(sender, instance, raw=False, **kwargs):
+    instance._blob_previous = {}
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    fields = [field_name for model, field_name, _name_field in blobs.registered_fields() if model is sender]
+    instance._blob_previous = sender._default_manager.filter(pk=instance.pk).values(*fields).first() or {}
+
+
+def update_ref_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_blob_previous', {})
+    for model, field_name, _name_field in blobs.registered_fields():
+        if model is not sender:
+            continue
+        old_name, new_name = previous.get(field_name) or '', _file_name(instance, field_name)
+        if old_name != new_name:
+            blobs.change_ref_count(new_name, 1)
+            blobs.change_ref_count(old_name, -1)
+
+
+def update_ref_counts_on_delete(sender, instance, **kwargs):
+    for model, field_name, _name_field in blobs.registered_fields():
+        if model is sender:
+            blobs.change_ref_count(_file_name(instance, field_name), -1)
+
+
+def _names(sender, instances):
+    names = Counter()
+    for model, field_name, _name_field in blobs.registered_fields():
+        if model is sender:
+            names.update(_file_name(instance, field_name) for instance in instances)
+    return names
+
+
+def update_ref_counts_on_bulk_create(sender, instances, **kwargs):
+    for name, count in _names(sender, instances).items():
+        blobs.change_ref_count(name, count)
+
+
+def update_ref_counts_on_bulk_delete(sender, instances, **kwargs):
+    for name, count in _names(sender, instances).items():
+        blobs.change_ref_count(name, -count)
+
+
+for model in {model for model, _field_name, _name_field in blobs.registered_fields()}:
+    pre_save.connect(remember_previous_file, sender=model, dispatch_uid=f'blob_previous_{model.__name__}')
+    post_save.connect(update_ref_counts_on_save, sender=model, dispatch_uid=f'blob_refs_save_{model.__name__}')
+    post_delete.connect(update_ref_counts_on_delete, sender=model, dispatch_uid=f'blob_refs_delete_{model.__name__}')
+    post_bulk_create.connect(
+        update_ref_counts_on_bulk_create, sender=model, dispatch_uid=f'blob_refs_bulk_{model.__name__}'
+    )
+    post_bulk_delete.connect(
+        update_ref_counts_on_bulk_delete, sender=model, dispatch_uid=f'blob_refs_bulk_delete_{model.__name__}'
+    )
@@ -0,0 +1,111 @@
+"""
+Storage adresowany zawartością (content-addressed)
+
+Wgrywany plik jest strumieniowany porcjami do pliku tymczasowego,
+a po drodze liczymy jego SHA-256. Docelowa nazwa to skrót zawartości:
+
+    blobs/3f/a2/3fa2...c9
+
+Jeśli taki blob już istnieje, plik tymczasowy jest usuwany - ta sama
+zawartość leży na dysku tylko raz. Oryginalną nazwę pliku model trzyma
+osobno (np. Interaction.attachment_name).
+
+Pliki nie są usuwane przez storage.delete() - blob może być używany przez
+inne obiekty. Liczniki odwołań utrzymują sygnały (attachments/signals.py),
+a nieużywane bloby usuwa komenda `gc_blobs`.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Blob
+
+BLOB_PREFIX = 'blobs'
+TEMP_DIR = f'{BLOB_PREFIX}/tmp'
+
+_BLOB_NAME_RE = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+
+
+def blob_name(digest):
+    """Ścieżka bloba w storage dla skrótu SHA-256"""
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+def digest_from_name(name):
+    """Skrót z nazwy bloba; None dla plików spoza blobs/ (np. starych załączników)"""
+    match = _BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage zapisujący każdą zawartość raz, pod jej skrótem"""
+
+    def get_available_name(self, name, max_length=None):
+        # Nazwę wyznacza zawartość (_save) - nie dopisujemy sufiksów "_abc123"
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(TEMP_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+
+        hasher = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(settings.ATTACHMENT_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            name = blob_name(digest)
+            path = self.path(name)
+            # Wiersz bloba jest zablokowany, zanim sprawdzimy, czy plik istnieje -
+            # gc_blobs nie usunie go w trakcie zapisu, a odświeżony last_stored_at
+            # chroni blob przez okres karencji, aż obiekt, który go używa, zostanie zapisany
+            with transaction.atomic():
+                blob, created = Blob.objects.select_for_update().get_or_create(
+                    digest=digest, defaults={'size': size}
+                )
+                if not created:
+                    Blob.objects.filter(pk=blob.pk).update(last_stored_at=timezone.now())
+                if os.path.exists(path):
+                    os.remove(temp_path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    # os.replace w obrębie jednego systemu plików jest atomowe -
+                    # równoległy zapis tej samej zawartości nie zostawi połówki pliku
+                    os.replace(temp_path, path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return name
+
+    def delete(self, name):
+        """Nie usuwa pliku - o usunięciu nieużywanego bloba decyduje gc_blobs"""
+        if digest_from_name(name) is None:
+            super().delete(name)
+
+    def delete_blob(self, digest):
+        super().delete(blob_name(digest))
+
+
+# Katalog (MEDIA_ROOT) i URL są czytane z ustawień przy pierwszym użyciu
+blob_storage = ContentAddressedStorage()
+
+
+def attachment_storage():
+    """Storage załączników (callable - migracje zapisują odwołanie, a nie konfigurację)"""
+    return blob_storage
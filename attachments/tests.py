@@ -0,0 +1,289 @@
+"""
+Testy storage blobów, liczników odwołań i odśmiecania
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from attachments.blobs import collect_garbage
+from attachments.downloads import parse_range
+from attachments.models import Blob
+from attachments.thumbnails import generate_thumbnails, thumbnail_name
+from attachments.storage import blob_name, blob_storage
+from interactions.models import Interaction
+
+OFFER = b'%PDF-1.4 oferta handlowa' * 1000
+
+
+class BlobTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, ATTACHMENT_CHUNK_SIZE=1024)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_interaction(self, content=OFFER, file_name='oferta.pdf'):
+        return Interaction.objects.create(
+            interaction_type='email', subject='Oferta', description='Opis',
+            interaction_date=timezone.now(), owner=self.user,
+            attachments=SimpleUploadedFile(file_name, content),
+        )
+
+    def blob(self, content=OFFER):
+        return Blob.objects.get(digest=hashlib.sha256(content).hexdigest())
+
+
+class TestContentAddressedStorage(BlobTestCase):
+    """Zapis pod skrótem zawartości i deduplikacja"""
+
+    def test_same_content_stored_once(self):
+        first = self.create_interaction(file_name='oferta.pdf')
+        second = self.create_interaction(file_name='oferta-kopia.pdf')
+
+        digest = hashlib.sha256(OFFER).hexdigest()
+        self.assertEqual(first.attachments.name, blob_name(digest))
+        self.assertEqual(second.attachments.name, first.attachments.name)
+        self.assertEqual(second.attachment_name, 'oferta-kopia.pdf')
+        self.assertEqual(self.blob().ref_count, 2)
+        self.assertEqual(self.blob().size, len(OFFER))
+
+        with blob_storage.open(first.attachments.name) as stored:
+            self.assertEqual(stored.read(), OFFER)
+        self.assertEqual(os.listdir(blob_storage.path('blobs/tmp')), [])
+
+    def test_ref_counts_follow_changes_and_deletes(self):
+        interaction = self.create_interaction()
+        other = self.create_interaction()
+
+        interaction.attachments = SimpleUploadedFile('umowa.pdf', b'umowa')
+        interaction.save()
+        self.assertEqual(self.blob().ref_count, 1)
+        self.assertEqual(self.blob(b'umowa').ref_count, 1)
+        self.assertEqual(interaction.attachment_name, 'umowa.pdf')
+
+        # Zapis bez zmiany pliku nie zmienia liczników
+        interaction.subject = 'Umowa'
+        interaction.save()
+        self.assertEqual(self.blob(b'umowa').ref_count, 1)
+
+        other.delete()
+        self.assertEqual(self.blob().ref_count, 0)
+        # Plik zostaje do odśmiecania - storage.delete() nie usuwa blobów
+        self.assertTrue(blob_storage.exists(self.blob().name))
+
+
+class TestGarbageCollection(BlobTestCase):
+    """Komenda gc_blobs"""
+
+    def test_removes_unreferenced_blobs_after_grace_period(self):
+        kept = self.create_interaction(b'zostaje')
+        self.create_interaction().delete()
+        orphan = self.blob()
+
+        call_command('gc_blobs', stdout=io.StringIO())
+        self.assertTrue(Blob.objects.filter(pk=orphan.pk).exists())
+
+        Blob.objects.update(last_stored_at=timezone.now() - timedelta(days=2))
+        call_command('gc_blobs', stdout=io.StringIO())
+        self.assertFalse(Blob.objects.filter(pk=orphan.pk).exists())
+        self.assertFalse(blob_storage.exists(orphan.name))
+        self.assertTrue(blob_storage.exists(kept.attachments.name))
+
+    def test_upload_during_collection_keeps_file(self):
+        """gc_blobs w chwili, gdy ta sama zawartość jest wgrywana ponownie"""
+        self.create_interaction().delete()
+        Blob.objects.update(last_stored_at=timezone.now() - timedelta(days=2))
+        exists = os.path.exists
+        path = blob_storage.path(self.blob().name)
+        collected = []
+
+        def exists_after_collection(checked_path):
+            if checked_path == path and not collected:
+                collected.append(collect_garbage())
+            return exists(checked_path)
+
+        with mock.patch('attachments.storage.os.path.exists', exists_after_collection):
+            interaction = self.create_interaction()
+
+        self.assertEqual(collected, [(0, 0)])
+        self.assertEqual(self.blob().ref_count, 1)
+        self.assertTrue(blob_storage.exists(interaction.attachments.name))
+
+    def test_recount_after_update(self):
+        interaction = self.create_interaction()
+        Interaction.objects.filter(pk=interaction.pk).update(attachments='')
+
+        call_command('gc_blobs', recount=True, grace_hours=0, stdout=io.StringIO())
+        self.assertFalse(Blob.objects.exists())
+
+    def test_adopt_legacy_files(self):
+        legacy_name = default_storage.save('interactions/2025/01/oferta.pdf', ContentFile(OFFER))
+        interaction = self.create_interaction(b'inna')
+        Interaction.objects.filter(pk=interaction.pk).update(attachments=legacy_name, attachment_name='')
+
+        call_command('gc_blobs', adopt_legacy=True, stdout=io.StringIO())
+        interaction.refresh_from_db()
+        self.assertEqual(interaction.attachments.name, self.blob().name)
+        self.assertEqual(interaction.attachment_name, 'oferta.pdf')
+        self.assertEqual(self.blob().ref_count, 1)
+
+
+class TestAttachmentDownload(BlobTestCase):
+    """Pobieranie załącznika - uprawnienia, Range i X-Accel-Redirect"""
+
+    def setUp(self):
+        super().setUp()
+        self.interaction = self.create_interaction(file_name='oferta ąę.pdf')
+        self.url = reverse('interactions:interaction_attachment', args=[self.interaction.pk])
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_owner_downloads_whole_file(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), OFFER)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(OFFER)))
+        self.assertIn("filename*=utf-8''oferta%20%C4%85%C4%99.pdf", response['Content-Disposition'])
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{self.blob().digest}"')
+
+    def test_other_user_gets_404(self):
+        User.objects.create_user(username='otheruser', password='otherpass123')
+        self.client.login(username='otheruser', password='otherpass123')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), OFFER[10:20])
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(OFFER)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), OFFER[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(OFFER)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(OFFER)}')
+
+        # Inna wersja pliku u klienta - wysyłamy całość
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"inny"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-', 100), (0, 99))
+        self.assertEqual(parse_range('bytes=90-200', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range('bytes=abc', 100))
+        self.assertIsNone(parse_range('items=0-1', 100))
+        self.assertFalse(parse_range('bytes=100-', 100))
+
+    def test_nginx_backend(self):
+        with override_settings(ATTACHMENT_SENDFILE_BACKEND='nginx'):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.interaction.attachments.name}')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+    def test_apache_backend(self):
+        with override_settings(ATTACHMENT_SENDFILE_BACKEND='apache'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.interaction.attachments.path)
+
+
+def png_bytes(size=(1000, 500), mode='RGBA'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class TestThumbnails(BlobTestCase):
+    """Miniatury załączników graficznych"""
+
+    def setUp(self):
+        super().setUp()
+        self.image = png_bytes()
+        self.interaction = self.create_interaction(self.image, file_name='zdjecie.png')
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_generates_bounded_thumbnail_once(self):
+        self.create_interaction(file_name='oferta.pdf')
+
+        stats = generate_thumbnails(workers=0)
+        self.assertEqual(stats, {Blob.THUMBNAIL_READY: 1, Blob.THUMBNAIL_NONE: 1})
+
+        blob = self.blob(self.image)
+        self.assertEqual((blob.thumbnail_status, blob.thumbnail_width, blob.thumbnail_height), ('ready', 320, 160))
+        with blob_storage.open(thumbnail_name(blob.digest)) as thumbnail, Image.open(thumbnail) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (320, 160)))
+        self.assertEqual(self.blob().thumbnail_status, Blob.THUMBNAIL_NONE)
+
+        # Nic nie czeka w kolejce - drugie uruchomienie niczego nie robi
+        self.assertEqual(generate_thumbnails(workers=0), {})
+
+    def test_command_uses_process_pool_and_regenerates(self):
+        self.create_interaction(png_bytes((200, 600), mode='RGB'), file_name='pion.png')
+
+        call_command('generate_thumbnails', workers=2, stdout=io.StringIO())
+        self.assertEqual(Blob.objects.filter(thumbnail_status=Blob.THUMBNAIL_READY).count(), 2)
+        tall = self.blob(png_bytes((200, 600), mode='RGB'))
+        self.assertEqual((tall.thumbnail_width, tall.thumbnail_height), (107, 320))
+
+        output = io.StringIO()
+        call_command('generate_thumbnails', workers=0, regenerate=True, stdout=output)
+        self.assertIn('2 gotowych', output.getvalue())
+
+    def test_detail_shows_thumbnail_for_owner_only(self):
+        detail_url = reverse('interactions:interaction_detail', args=[self.interaction.pk])
+        thumbnail_url = reverse('interactions:interaction_attachment_thumbnail', args=[self.interaction.pk])
+        self.assertNotContains(self.client.get(detail_url), thumbnail_url)
+        self.assertEqual(self.client.get(thumbnail_url).status_code, 404)
+
+        generate_thumbnails(workers=0)
+        self.assertContains(self.client.get(detail_url), thumbnail_url)
+        response = self.client.get(thumbnail_url)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+
+        User.objects.create_user(username='otheruser', password='otherpass123')
+        self.client.login(username='otheruser', password='otherpass123')
+        self.assertEqual(self.client.get(thumbnail_url).status_code, 404)
+
+    def test_garbage_collection_removes_thumbnail(self):
+        generate_thumbnails(workers=0)
+        name = thumbnail_name(self.blob(self.image).digest)
+        self.interaction.delete()
+
+        call_command('gc_blobs', grace_hours=0, stdout=io.StringIO())
+        self.assertFalse(blob_storage.exists(name))
@@ -0,0 +1,91 @@
+"""
+Miniatury załączników graficznych
+
+Miniatura jest kluczowana skrótem zawartości bloba i rozmiarem:
+
+    thumbs/320/3f/a2/3fa2...c9.jpg
+
+Ta sama zawartość zawsze daje ten sam plik, więc generowanie jest
+idempotentne - ponowne uruchomienie (np. po przerwanym wsadzie) nadpisuje
+plik identycznym wynikiem, a istniejące miniatury są pomijane. Zmiana
+ATTACHMENT_THUMBNAIL_SIZE to nowy katalog; stare miniatury nie są używane.
+
+Nowy blob ma status 'pending'. Komenda `generate_thumbnails` (cron / worker)
+pobiera paczkę takich blobów i skaluje obrazy w puli procesów
+(ProcessPoolExecutor) - dekodowanie obrazu obciąża CPU, a GIL nie pozwala
+zrobić tego równolegle w wątkach. Procesy robocze operują tylko na plikach;
+statusy w bazie zapisuje proces główny.
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from django.conf import settings
+
+from .imaging import render_thumbnail
+from .models import Blob
+from .storage import blob_name, blob_storage
+
+THUMBNAIL_PREFIX = 'thumbs'
+
+
+def thumbnail_name(digest, size=None):
+    """Ścieżka miniatury w storage dla skrótu SHA-256"""
+    size = size or settings.ATTACHMENT_THUMBNAIL_SIZE
+    return f'{THUMBNAIL_PREFIX}/{size}/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+
+
+def generate_thumbnails(workers=None, batch_size=None, regenerate=False):
+    """
+    Generuje miniatury dla blobów oczekujących w kolejce
+
+    Args:
+        workers: liczba procesów roboczych (0 - w bieżącym procesie)
+        batch_size: ile blobów przetwarzać naraz
+        regenerate: najpierw wróć do kolejki wszystkie bloby (np. po zmianie rozmiaru)
+
+    Returns:
+        Counter ze statusami przetworzonych blobów
+    """
+    workers = settings.ATTACHMENT_THUMBNAIL_WORKERS if workers is None else workers
+    batch_size = batch_size or settings.ATTACHMENT_THUMBNAIL_BATCH_SIZE
+    size = settings.ATTACHMENT_THUMBNAIL_SIZE
+    quality = settings.ATTACHMENT_THUMBNAIL_QUALITY
+
+    if regenerate:
+        Blob.objects.exclude(thumbnail_status=Blob.THUMBNAIL_PENDING).update(
+            thumbnail_status=Blob.THUMBNAIL_PENDING, thumbnail_width=None, thumbnail_height=None
+        )
+
+    stats = Counter()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        last_pk = 0
+        while True:
+            batch = list(
+                Blob.objects.filter(thumbnail_status=Blob.THUMBNAIL_PENDING, ref_count__gt=0, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', 'digest')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            sources = [blob_storage.path(blob_name(digest)) for _pk, digest in batch]
+            targets = [blob_storage.path(thumbnail_name(digest, size)) for _pk, digest in batch]
+            run = executor.map if executor else map
+            results = run(render_thumbnail, sources, targets, repeat(size), repeat(quality))
+            for (pk, _digest), (status, width, height) in zip(batch, results):
+                # Warunkowo - równolegle uruchomiony worker mógł już zapisać wynik
+                Blob.objects.filter(pk=pk, thumbnail_status=Blob.THUMBNAIL_PENDING).update(
+                    thumbnail_status=status, thumbnail_width=width, thumbnail_height=height
+                )
+                stats[status] += 1
+    finally:
+        if executor:
+            executor.shutdown()
+    return stats
+
+
+def delete_thumbnail(digest):
+    blob_storage.delete(thumbnail_name(digest))
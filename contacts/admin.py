@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Contact, Company
+from .models import Contact, Company, Tag, ImportJob, DuplicateCandidate
 
 
 @admin.register(Company)
@@ -8,7 +8,10 @@ class CompanyAdmin(admin.ModelAdmin):
     list_display = ['name', 'industry', 'city', 'owner', 'created_at']
     list_filter = ['industry', 'city', 'created_at']
     search_fields = ['name', 'nip', 'email', 'phone']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'created_at', 'updated_at', 'last_contact_date', 'interaction_count', 'open_task_count',
+        'open_opportunity_count', 'contacts_count',
+    ]
     fieldsets = (
         ('Dane podstawowe', {
             'fields': ('name', 'nip', 'industry', 'website')
@@ -22,6 +25,12 @@ class CompanyAdmin(admin.ModelAdmin):
         ('Dodatkowe informacje', {
             'fields': ('notes', 'owner')
         }),
+        ('Aktywność', {
+            'fields': (
+                'contacts_count', 'last_contact_date', 'interaction_count', 'open_task_count',
+                'open_opportunity_count',
+            )
+        }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -29,14 +38,23 @@ class CompanyAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    """Panel administracyjny dla tagów"""
+    list_display = ['name', 'owner', 'usage_count', 'created_at']
+    list_filter = ['owner']
+    search_fields = ['name']
+    readonly_fields = ['usage_count', 'created_at']
+
+
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     """Panel administracyjny dla kontaktów"""
     list_display = ['first_name', 'last_name', 'email', 'company', 'status', 'owner', 'created_at']
     list_filter = ['status', 'company', 'created_at', 'last_contact_date']
     search_fields = ['first_name', 'last_name', 'email', 'phone', 'mobile', 'company__name']
-    readonly_fields = ['created_at', 'updated_at']
-    autocomplete_fields = ['company']
+    readonly_fields = ['created_at', 'updated_at', 'last_contact_date', 'interaction_count', 'open_task_count', 'open_opportunity_count']
+    autocomplete_fields = ['company', 'tags']
     fieldsets = (
         ('Dane podstawowe', {
             'fields': ('first_name', 'last_name', 'email')
@@ -55,10 +73,33 @@ class ContactAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Dodatkowe informacje', {
-            'fields': ('notes', 'owner', 'last_contact_date')
+            'fields': ('notes', 'owner')
+        }),
+        ('Aktywność', {
+            'fields': ('last_contact_date', 'interaction_count', 'open_task_count', 'open_opportunity_count')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """Panel administracyjny dla importów kontaktów"""
+    list_display = ['pk', 'owner', 'status', 'rows_processed', 'created_count', 'duplicate_count', 'error_count', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = [
+        'rows_processed', 'created_count', 'duplicate_count', 'error_count',
+        'errors', 'created_at', 'updated_at', 'finished_at',
+    ]
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """Panel administracyjny dla potencjalnych duplikatów"""
+    list_display = ['contact_a', 'contact_b', 'score', 'reasons', 'status', 'owner', 'created_at']
+    list_filter = ['status']
+    raw_id_fields = ['contact_a', 'contact_b']
+    readonly_fields = ['created_at', 'reviewed_at']
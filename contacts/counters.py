@@ -0,0 +1,203 @@
+"""
+Liczniki aktywności kontaktów i firm
+
+Contact i Company mają zdenormalizowane pola:
+
+    last_contact_date       - data ostatniej interakcji (także zarchiwizowanej)
+    interaction_count       - liczba interakcji
+    open_task_count         - liczba otwartych zadań (status inny niż done/cancelled)
+    open_opportunity_count  - liczba otwartych szans sprzedaży (etap inny niż closed_*)
+    contacts_count          - liczba kontaktów firmy (tylko Company)
+
+Są aktualizowane przyrostowo (UPDATE ... SET x = x + 1) przez sygnały
+w interactions/signals.py, tasks/signals.py, opportunities/signals.py
+i contacts/signals.py,
+więc listy i filtry ("bez kontaktu od 90 dni") czytają gotowe kolumny
+zamiast liczyć COUNT(*) / MAX() przy każdym wyświetleniu.
+
+Zmiany z pominięciem sygnałów (QuerySet.update(), bulk_create()) trzeba
+wyrównać przez recompute() lub komendę `repair_counters`.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from interactions.models import ArchivedInteraction, Interaction
+from opportunities.models import Opportunity
+from tasks.models import Task
+
+from .models import Company, Contact
+
+# Pola FK do kontaktu / firmy w modelach, które liczymy
+_TARGETS = (
+    (Contact, 'contact_id'),
+    (Company, 'company_id'),
+)
+
+
+def previous_values(instance, fields):
+    """
+    Wartości pól zapisane w bazie przed zapisem - wywoływane z pre_save
+
+    Zwraca None dla nowego obiektu.
+    """
+    if instance.pk is None or instance._state.adding:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def counter_values(instance):
+    """Kontakt i firma, których liczniki zależą od obiektu (interakcji, zadania, szansy)"""
+    return {'contact_id': instance.contact_id, 'company_id': instance.company_id}
+
+
+def _targets(values):
+    for model, field in _TARGETS:
+        if values.get(field):
+            yield model, values[field]
+
+
+def _add(model, pk, counter, delta):
+    if delta > 0:
+        expression = F(counter) + delta
+    else:
+        expression = Greatest(F(counter) + delta, Value(0))
+    model.objects.filter(pk=pk).update(**{counter: expression})
+
+
+def change_count(counter, values, delta):
+    """Zmienia licznik kontaktu i firmy z values (słownik z contact_id/company_id) o delta"""
+    if not delta:
+        return
+    for model, pk in _targets(values):
+        _add(model, pk, counter, delta)
+
+
+def move_count(counter, before, after):
+    """
+    Przenosi jednostkę licznika ze stanu przed zapisem do stanu po zapisie
+
+    before / after: słownik z counter_values() albo None, gdy obiekt nie był /
+    nie jest liczony (np. zadanie zamknięte). Zmiany się znoszą, więc zapis
+    bez zmiany powiązań ani statusu nie wykonuje żadnego UPDATE.
+    """
+    deltas = Counter()
+    for values, delta in ((before, -1), (after, 1)):
+        if values:
+            for model, pk in _targets(values):
+                deltas[model, pk] += delta
+    for (model, pk), delta in deltas.items():
+        if delta:
+            _add(model, pk, counter, delta)
+
+
+def touch_last_contact(values, interaction_date):
+    """Przesuwa last_contact_date do przodu, jeśli interakcja jest nowsza"""
+    day = timezone.localdate(interaction_date)
+    for model, pk in _targets(values):
+        model.objects.filter(pk=pk).filter(
+            Q(last_contact_date__isnull=True) | Q(last_contact_date__lt=day)
+        ).update(last_contact_date=day)
+
+
+def latest_of(*values):
+    """
+    GREATEST z pominięciem NULL
+
+    MySQL i SQLite zwracają NULL, gdy którykolwiek argument GREATEST jest
+    NULL - każdy argument jest więc zastępowany pierwszym niepustym.
+    """
+    return Greatest(*(Coalesce(value, *(other for other in values if other is not value)) for value in values))
+
+
+def _last_contact(field):
+    """
+    Dzień ostatniej interakcji kontaktu / firmy OuterRef('pk') - bieżącej
+    albo zarchiwizowanej, więc archiwizacja nie cofa last_contact_date.
+    Dla kontaktu nie wcześniej niż data wpisana kiedyś ręcznie.
+
+    Data w strefie czasowej projektu - tak samo jak touch_last_contact().
+    """
+    def latest(model):
+        return Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by('-interaction_date')
+            .annotate(day=TruncDate('interaction_date', tzinfo=timezone.get_current_timezone()))
+            .values('day')[:1]
+        )
+
+    values = [latest(Interaction), latest(ArchivedInteraction)]
+    if field == 'contact':
+        values.append(F('manual_last_contact_date'))
+    return latest_of(*values)
+
+
+def refresh_last_contact(values):
+    """Wylicza last_contact_date od nowa (po usunięciu lub przesunięciu interakcji)"""
+    for model, pk in _targets(values):
+        field = 'contact' if model is Contact else 'company'
+        model.objects.filter(pk=pk).update(last_contact_date=_last_contact(field))
+
+
+def remove_interactions(values_list):
+    """
+    Usunięcie paczki interakcji (post_bulk_delete, np. archiwizacja)
+
+    values_list: słowniki z counter_values() usuniętych interakcji.
+    interaction_count maleje, a last_contact_date jest liczona od nowa -
+    jeden UPDATE na model i liczbę usuniętych interakcji, a nie na interakcję.
+    """
+    deltas = Counter()
+    for values in values_list:
+        for model, pk in _targets(values):
+            deltas[model, pk] += 1
+    groups = defaultdict(list)
+    for (model, pk), delta in deltas.items():
+        groups[model, delta].append(pk)
+    for (model, delta), pks in groups.items():
+        field = 'contact' if model is Contact else 'company'
+        model.objects.filter(pk__in=pks).update(
+            interaction_count=Greatest(F('interaction_count') - delta, Value(0)),
+            last_contact_date=_last_contact(field),
+        )
+
+
+# ========== PRZELICZENIE ==========
+
+def _count_subquery(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recompute(queryset):
+    """
+    Przelicza wszystkie liczniki kontaktów lub firm z querysetu jednym UPDATE
+
+    Przykład:
+        recompute(Contact.objects.filter(owner=user))
+
+    Returns:
+        Liczba zaktualizowanych wierszy
+    """
+    field = 'contact' if queryset.model is Contact else 'company'
+    extra = {}
+    if queryset.model is Company:
+        extra['contacts_count'] = _count_subquery(Contact.objects.all(), 'company')
+    return queryset.update(
+        last_contact_date=_last_contact(field),
+        interaction_count=_count_subquery(Interaction.objects.all(), field),
+        open_task_count=_count_subquery(Task.objects.exclude(status__in=Task.CLOSED_STATUSES), field),
+        open_opportunity_count=_count_subquery(
+            Opportunity.objects.exclude(stage__in=Opportunity.CLOSED_STAGES), field
+        ),
+        **extra,
+    )
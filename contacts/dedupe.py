@@ -0,0 +1,272 @@
+"""
+Wykrywanie i scalanie duplikatów kontaktów
+
+Porównanie każdego kontaktu z każdym to O(n²) - przy 200k kontaktów
+20 miliardów par. Zamiast tego każdy kontakt dostaje kilka kluczy
+blokujących (blocking keys) i porównujemy tylko kontakty, które mają
+wspólny klucz:
+
+- część lokalna emaila po normalizacji ('jan.kowalski+crm@' -> 'jankowalski'),
+- domena emaila + fonetyczne nazwisko,
+- znormalizowany telefon / komórka (E.164),
+- fonetyczne nazwisko (Soundex po usunięciu polskich znaków) + inicjał imienia.
+
+Bloki większe niż DEDUPE_MAX_BLOCK_SIZE są pomijane (klucz zbyt ogólny,
+np. popularne nazwisko), więc liczba par jest ograniczona niezależnie od
+liczby kontaktów. Pary są oceniane (score 0..1) i trafiają do kolejki
+DuplicateCandidate do ręcznego przeglądu.
+"""
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+
+from activities.models import Activity
+from interactions.models import ArchivedInteraction, Interaction
+from opportunities.models import Opportunity
+from search.text import fold
+from tasks.models import Task
+
+from .counters import recompute
+from .models import COUNTER_FIELDS, Contact, DuplicateCandidate
+
+# Modele z FK do kontaktu przepinane przy scalaniu (model, nazwa pola)
+MERGE_RELATIONS = [
+    (Interaction, 'contact'),
+    (ArchivedInteraction, 'contact'),
+    (Task, 'contact'),
+    (Opportunity, 'contact'),
+    # Strumień aktywności - FK z CASCADE, bez przepięcia usunięcie duplikatu skasowałoby jego historię
+    (Activity, 'contact'),
+]
+
+# Pola uzupełniane w kontakcie głównym wartościami z duplikatu, jeśli są puste
+MERGE_FILL_FIELDS = [
+    'phone', 'mobile', 'company_id', 'position',
+    'street', 'city', 'postal_code', 'country', 'manual_last_contact_date',
+]
+
+# Wagi cech przy ocenie pary
+SCORE_WEIGHTS = {
+    'email': 0.35,
+    'phone': 0.35,
+    'last_name': 0.2,
+    'first_name': 0.15,
+    'company': 0.1,
+}
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+_NON_ALPHA_RE = re.compile(r'[^a-z]+')
+_NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+
+CONTACT_FIELDS = [
+    'pk', 'first_name', 'last_name', 'email', 'phone_normalized', 'mobile_normalized', 'company_id',
+]
+
+
+def soundex(value):
+    """
+    Kod fonetyczny Soundex po usunięciu znaków diakrytycznych
+
+    Przykład: soundex('Kowalski') == soundex('Kowalsky') == 'K420'
+    """
+    letters = _NON_ALPHA_RE.sub('', fold(value or ''))
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # 'h' i 'w' nie rozdzielają jednakowych kodów, samogłoski tak
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def split_email(email):
+    """Zwraca (znormalizowana część lokalna, domena); '+dopisek' i kropki są pomijane"""
+    local, _sep, domain = (email or '').lower().partition('@')
+    local = local.split('+', 1)[0]
+    return _NON_ALNUM_RE.sub('', local), domain.strip()
+
+
+def blocking_keys(contact):
+    """Klucze blokujące dla kontaktu (słownik z polami CONTACT_FIELDS)"""
+    keys = set()
+    local, domain = split_email(contact['email'])
+    last_name_code = soundex(contact['last_name'])
+    first_initial = fold(contact['first_name'] or '')[:1]
+
+    if local:
+        keys.add(f'local:{local}')
+    if domain and last_name_code:
+        keys.add(f'domain:{domain}:{last_name_code}')
+    for phone in (contact['phone_normalized'], contact['mobile_normalized']):
+        if phone:
+            keys.add(f'phone:{phone}')
+    if last_name_code:
+        keys.add(f'name:{last_name_code}:{first_initial}')
+    return keys
+
+
+def _similarity(a, b):
+    a, b = fold(a or '').strip(), fold(b or '').strip()
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def score_pair(a, b):
+    """
+    Ocena podobieństwa dwóch kontaktów
+
+    Returns:
+        (score 0..1, lista powodów), np. (0.85, ['email', 'nazwisko'])
+    """
+    score = 0.0
+    reasons = []
+
+    local_a = split_email(a['email'])[0]
+    local_b = split_email(b['email'])[0]
+    if local_a and local_a == local_b:
+        score += SCORE_WEIGHTS['email']
+        reasons.append('email')
+
+    phones_a = {a['phone_normalized'], a['mobile_normalized']} - {''}
+    phones_b = {b['phone_normalized'], b['mobile_normalized']} - {''}
+    if phones_a & phones_b:
+        score += SCORE_WEIGHTS['phone']
+        reasons.append('telefon')
+
+    last_name = _similarity(a['last_name'], b['last_name'])
+    if last_name < 1 and soundex(a['last_name']) == soundex(b['last_name']):
+        last_name = max(last_name, 0.9)
+    if last_name >= 0.8:
+        reasons.append('nazwisko')
+    score += SCORE_WEIGHTS['last_name'] * last_name
+
+    first_name = _similarity(a['first_name'], b['first_name'])
+    if first_name >= 0.8:
+        reasons.append('imię')
+    score += SCORE_WEIGHTS['first_name'] * first_name
+
+    if a['company_id'] and a['company_id'] == b['company_id']:
+        score += SCORE_WEIGHTS['company']
+        reasons.append('firma')
+
+    return min(round(score, 3), 1.0), reasons
+
+
+def find_candidates(queryset, min_score=None, max_block_size=None):
+    """
+    Generator par (contact_a_id, contact_b_id, score, powody) z wynikiem >= min_score
+
+    contact_a_id < contact_b_id; każda para zwracana najwyżej raz.
+    """
+    if min_score is None:
+        min_score = settings.DEDUPE_MIN_SCORE
+    if max_block_size is None:
+        max_block_size = settings.DEDUPE_MAX_BLOCK_SIZE
+
+    contacts = {}
+    blocks = defaultdict(list)
+    for contact in queryset.order_by('pk').values(*CONTACT_FIELDS).iterator(chunk_size=5000):
+        contacts[contact['pk']] = contact
+        for key in blocking_keys(contact):
+            blocks[key].append(contact['pk'])
+
+    seen = set()
+    for pks in blocks.values():
+        if len(pks) < 2 or len(pks) > max_block_size:
+            continue
+        for pair in combinations(pks, 2):
+            if pair in seen:
+                continue
+            seen.add(pair)
+            score, reasons = score_pair(contacts[pair[0]], contacts[pair[1]])
+            if score >= min_score:
+                yield pair[0], pair[1], score, reasons
+
+
+def refresh_candidates(owner, min_score=None, batch_size=1000):
+    """
+    Przelicza kolejkę duplikatów użytkownika
+
+    Oczekujące pary są zastępowane nowymi; pary odrzucone przy przeglądzie
+    zostają (unikalność pary blokuje ich ponowne dodanie).
+
+    Returns:
+        Liczba par w kolejce po przeliczeniu
+    """
+    candidates = [
+        DuplicateCandidate(
+            owner=owner, contact_a_id=a_id, contact_b_id=b_id, score=score, reasons=', '.join(reasons)
+        )
+        for a_id, b_id, score, reasons in find_candidates(Contact.objects.filter(owner=owner), min_score)
+    ]
+    with transaction.atomic():
+        DuplicateCandidate.objects.filter(owner=owner, status='pending').delete()
+        DuplicateCandidate.objects.bulk_create(candidates, batch_size=batch_size, ignore_conflicts=True)
+    return DuplicateCandidate.objects.filter(owner=owner, status='pending').count()
+
+
+def merge_contacts(primary, duplicate):
+    """
+    Scala duplikat z kontaktem głównym i usuwa duplikat
+
+    Interakcje (także zarchiwizowane), zadania, szanse sprzedaży i wpisy
+    strumienia aktywności są przepinane jednym UPDATE na tabelę, wszystko
+    w jednej transakcji. Puste pola kontaktu głównego są uzupełniane danymi
+    duplikatu, tagi są łączone, a liczniki aktywności przeliczane.
+    """
+    if primary.pk == duplicate.pk or primary.owner_id != duplicate.owner_id:
+        raise ValueError('Można scalić tylko dwa różne kontakty tego samego właściciela')
+
+    with transaction.atomic():
+        for model, field_name in MERGE_RELATIONS:
+            model.objects.filter(**{field_name: duplicate}).update(**{field_name: primary})
+
+        update_fields = []
+        for field_name in MERGE_FILL_FIELDS:
+            if not getattr(primary, field_name) and getattr(duplicate, field_name):
+                setattr(primary, field_name, getattr(duplicate, field_name))
+                update_fields.append(field_name.removesuffix('_id'))
+        if duplicate.notes:
+            primary.notes = '\n\n'.join(filter(None, [primary.notes, duplicate.notes]))
+            update_fields.append('notes')
+        if update_fields:
+            primary.save(update_fields=update_fields + ['updated_at'])
+
+        primary.tags.add(*duplicate.tags.all())
+        duplicate.delete()
+
+        # Przepięcie przez update() omija sygnały liczników
+        recompute(Contact.objects.filter(pk=primary.pk))
+    primary.refresh_from_db(fields=COUNTER_FIELDS)
+    return primary
+
+
+def pending_candidates(owner):
+    """Kolejka do przeglądu - najbardziej prawdopodobne duplikaty na początku"""
+    return (
+        DuplicateCandidate.objects
+        .filter(owner=owner, status='pending')
+        .select_related('contact_a', 'contact_a__company', 'contact_b', 'contact_b__company')
+    )
+
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
 from django import forms
-from .models import Contact, Company
+from django.db.models import Q
+from django.utils import timezone
+from search.index import search
+from .models import Contact, Company, Tag, parse_tags
 
 
 class CompanyForm(forms.ModelForm):
@@ -41,13 +46,21 @@ class CompanyForm(forms.ModelForm):
 class ContactForm(forms.ModelForm):
     """Formularz dla kontaktów"""
 
+    # Tagi wpisywane jako tekst "vip, partner" - zapisywane do tabeli Tag w _save_m2m()
+    tags = forms.CharField(
+        label='Tagi',
+        required=False,
+        help_text='Oddziel przecinkami',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'vip, partner, supplier'})
+    )
+
     class Meta:
         model = Contact
         fields = [
             'first_name', 'last_name', 'email', 'phone', 'mobile',
-            'company', 'position', 'status', 'tags',
+            'company', 'position', 'status',
             'street', 'city', 'postal_code', 'country',
-            'notes', 'last_contact_date'
+            'notes'
         ]
         widgets = {
             'first_name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Jan'}),
@@ -58,13 +71,11 @@ class ContactForm(forms.ModelForm):
             'company': forms.Select(attrs={'class': 'form-select'}),
             'position': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Dyrektor, Manager, itp.'}),
             'status': forms.Select(attrs={'class': 'form-select'}),
-            'tags': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'vip, partner, supplier'}),
             'street': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'ul. Przykładowa 123'}),
             'city': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Warszawa'}),
             'postal_code': forms.TextInput(attrs={'class': 'form-control', 'placeholder': '00-000'}),
             'country': forms.TextInput(attrs={'class': 'form-control'}),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'Dodatkowe notatki...'}),
-            'last_contact_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
         }
 
     def __init__(self, *args, **kwargs):
@@ -75,15 +86,39 @@ class ContactForm(forms.ModelForm):
         if self.user:
             self.fields['company'].queryset = Company.objects.filter(owner=self.user)
 
+        if self.instance.pk:
+            self.initial.setdefault('tags', ', '.join(self.instance.get_tags_list()))
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        self.instance.set_tags(parse_tags(self.cleaned_data.get('tags')))
+
     def save(self, commit=True):
         instance = super().save(commit=False)
         if self.user and not instance.pk:
             instance.owner = self.user
         if commit:
             instance.save()
+            self._save_m2m()
         return instance
 
 
+class ContactImportForm(forms.Form):
+    """Formularz wgrania pliku CSV z kontaktami"""
+
+    file = forms.FileField(
+        label='Plik CSV',
+        help_text='Wymagane kolumny: imię, nazwisko, email. Opcjonalnie: telefon, firma, NIP, status, tagi, adres.',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'})
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith('.csv'):
+            raise forms.ValidationError('Obsługiwane są tylko pliki CSV.')
+        return file
+
+
 class ContactSearchForm(forms.Form):
     """Formularz wyszukiwania kontaktów"""
 
@@ -105,12 +140,68 @@ class ContactSearchForm(forms.Form):
         empty_label='Wszystkie firmy',
         widget=forms.Select(attrs={'class': 'form-select'})
     )
+    tag = forms.ModelChoiceField(
+        required=False,
+        queryset=Tag.objects.none(),
+        empty_label='Wszystkie tagi',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    inactive_days = forms.TypedChoiceField(
+        required=False,
+        coerce=int,
+        empty_value=None,
+        choices=[
+            ('', 'Dowolna aktywność'),
+            (30, 'Bez kontaktu od 30 dni'),
+            (90, 'Bez kontaktu od 90 dni'),
+            (180, 'Bez kontaktu od 180 dni'),
+        ],
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
 
     def __init__(self, *args, **kwargs):
-        user = kwargs.pop('user', None)
+        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
-        if user:
-            self.fields['company'].queryset = Company.objects.filter(owner=user)
+        if self.user:
+            self.fields['company'].queryset = Company.objects.filter(owner=self.user)
+            self.fields['tag'].queryset = Tag.objects.filter(owner=self.user)
+
+    def filter_queryset(self, queryset):
+        """
+        Stosuje filtry formularza do querysetu kontaktów
+
+        Wspólne dla listy kontaktów i eksportu. Przy wyszukiwaniu frazy
+        queryset dostaje adnotację search_rank.
+        """
+        if not self.is_valid():
+            return queryset
+
+        query = self.cleaned_data.get('query')
+        status = self.cleaned_data.get('status')
+        company = self.cleaned_data.get('company')
+        tag = self.cleaned_data.get('tag')
+        inactive_days = self.cleaned_data.get('inactive_days')
+
+        if query:
+            # Indeks pełnotekstowy (search.index)
+            queryset = search(queryset, query, owner=self.user)
+
+        if status:
+            queryset = queryset.filter(status=status)
+
+        if company:
+            queryset = queryset.filter(company=company)
+
+        if tag:
+            # JOIN po tabeli powiązań kontakt-tag (indeks na tag_id)
+            queryset = queryset.filter(tags=tag)
+
+        if inactive_days:
+            # Zakres po indeksie contact_owner_last_contact_idx (+ kontakty bez żadnej interakcji)
+            cutoff = timezone.localdate() - timedelta(days=inactive_days)
+            queryset = queryset.filter(Q(last_contact_date__lt=cutoff) | Q(last_contact_date__isnull=True))
+
+        return queryset
 
 
 class CompanySearchForm(forms.Form):
@@ -130,3 +221,23 @@ class CompanySearchForm(forms.Form):
             'placeholder': 'Branża'
         })
     )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        """Stosuje filtry formularza do querysetu firm (lista i eksport)"""
+        if not self.is_valid():
+            return queryset
+
+        query = self.cleaned_data.get('query')
+        industry = self.cleaned_data.get('industry')
+
+        if query:
+            queryset = search(queryset, query, owner=self.user).order_by('-search_rank', 'name')
+
+        if industry:
+            queryset = queryset.filter(industry__icontains=industry)
+
+        return queryset
@@ -0,0 +1,396 @@
+"""
+Masowy import kontaktów z CSV
+
+Import 500k wierszy przez ContactForm.save() to setki tysięcy zapytań
+(walidacja unikalności emaila, zapis, sygnały). Tutaj plik jest czytany
+paczkami po CONTACT_IMPORT_CHUNK_SIZE wierszy i każda paczka to kilka
+zapytań niezależnie od rozmiaru:
+
+- walidacja wierszy w Pythonie (bez zapytań),
+- jedno zapytanie o istniejące emaile (Contact.email jest unikalny),
+- firmy rozpoznawane po NIP lub nazwie z indeksu w pamięci (budowanego raz),
+  brakujące tworzone jednym bulk_create,
+- kontakty zapisywane przez bulk_create (na PostgreSQL przez COPY),
+- tagi: jedno zapytanie o istniejące + bulk_create powiązań.
+
+Paczka i licznik ImportJob.rows_processed są zapisywane w jednej
+transakcji, więc po awarii import można wznowić od miejsca przerwania.
+
+Nagłówki kolumn mogą być nazwami pól (first_name, email, ...) albo
+polskimi nazwami z eksportu (Imię, Nazwisko, Firma, ...). Plik może być
+w UTF-8 (z BOM lub bez) albo w cp1250 - domyślnym kodowaniu CSV z Excela
+na polskim Windows.
+"""
+
+import codecs
+import csv
+import io
+import re
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from exports.writers import unescape_csv_cell
+from mini_crm.signals import post_bulk_create
+from search.text import fold
+
+from .models import Company, Contact, Tag, parse_tags
+from .phone import normalize_phone
+
+# Nazwa kolumny w pliku (po fold()) -> pole importu
+COLUMN_ALIASES = {
+    'first_name': ['first_name', 'imie'],
+    'last_name': ['last_name', 'nazwisko'],
+    'email': ['email', 'e-mail'],
+    'phone': ['phone', 'telefon'],
+    'mobile': ['mobile', 'telefon komorkowy'],
+    'position': ['position', 'stanowisko'],
+    'status': ['status'],
+    'tags': ['tags', 'tagi'],
+    'company': ['company', 'firma', 'nazwa firmy'],
+    'nip': ['nip'],
+    'street': ['street', 'ulica'],
+    'city': ['city', 'miasto'],
+    'postal_code': ['postal_code', 'kod pocztowy'],
+    'country': ['country', 'kraj'],
+    'notes': ['notes', 'notatki'],
+}
+
+REQUIRED_COLUMNS = ['first_name', 'last_name', 'email']
+
+# Pola kopiowane wprost do Contact (po walidacji długości)
+CONTACT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'mobile', 'position',
+    'street', 'city', 'postal_code', 'country', 'notes',
+]
+
+_NON_DIGITS_RE = re.compile(r'\D+')
+
+
+# Kodowanie pliku, którego początek nie jest poprawnym UTF-8 (Excel na polskim Windows)
+FALLBACK_ENCODING = 'cp1250'
+
+
+class ImportFileError(Exception):
+    """Pliku nie da się zaimportować (np. brak wymaganych kolumn)"""
+
+
+def detect_encoding(raw, sample_size=64 * 1024):
+    """'utf-8-sig', jeśli początek pliku jest poprawnym UTF-8, w przeciwnym razie FALLBACK_ENCODING"""
+    sample = raw.read(sample_size)
+    raw.seek(0)
+    try:
+        # final=False - znak wielobajtowy przecięty na końcu próbki nie jest błędem
+        codecs.getincrementaldecoder('utf-8-sig')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return 'utf-8-sig'
+
+
+def map_columns(header):
+    """Zwraca słownik pole -> numer kolumny na podstawie nagłówka pliku"""
+    lookup = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    columns = {}
+    for position, name in enumerate(header or []):
+        field = lookup.get(fold(name.strip()))
+        if field and field not in columns:
+            columns[field] = position
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise ImportFileError(f"Brak wymaganych kolumn: {', '.join(missing)}")
+    return columns
+
+
+class ContactImporter:
+    """
+    Wykonuje (lub wznawia) ImportJob
+
+    Użycie:
+        ContactImporter(job).run()
+
+    Args:
+        job: ImportJob z plikiem CSV
+        chunk_size: Liczba wierszy w paczce (domyślnie CONTACT_IMPORT_CHUNK_SIZE)
+        delimiter: Separator kolumn (domyślnie wykrywany: ',', ';' lub tabulator)
+        progress: Opcjonalna funkcja wywoływana z jobem po każdej paczce
+    """
+
+    def __init__(self, job, chunk_size=None, delimiter=None, progress=None):
+        self.job = job
+        self.owner = job.owner
+        self.chunk_size = chunk_size or settings.CONTACT_IMPORT_CHUNK_SIZE
+        self.delimiter = delimiter
+        self.progress = progress
+        self.statuses = {}
+        for value, label in Contact.STATUS_CHOICES:
+            self.statuses[value] = value
+            self.statuses[label.casefold()] = value
+        self.max_lengths = {name: Contact._meta.get_field(name).max_length for name in CONTACT_FIELDS}
+
+    def run(self):
+        job = self.job
+        job.status = 'running'
+        job.save(update_fields=['status', 'updated_at'])
+        try:
+            try:
+                self._import_file()
+            except UnicodeDecodeError as exc:
+                # Bajty spoza kodowania dalej w pliku niż próbka z detect_encoding()
+                raise ImportFileError(
+                    f'Nie można odczytać pliku w kodowaniu {exc.encoding} - zapisz go jako CSV UTF-8'
+                ) from exc
+        except Exception as exc:
+            # Liczniki w pamięci mogły wyprzedzić wycofaną transakcję paczki
+            job.refresh_from_db()
+            job.status = 'failed'
+            job.add_errors([f'Import przerwany: {exc}'])
+            job.save()
+            raise
+
+        job.status = 'done'
+        job.finished_at = timezone.now()
+        job.save()
+        return job
+
+    def _import_file(self):
+        job = self.job
+        with job.file.open('rb') as raw:
+            text = io.TextIOWrapper(raw, encoding=detect_encoding(raw), newline='')
+            reader = csv.reader(text, delimiter=self.delimiter or self._sniff_delimiter(text))
+            columns = map_columns(next(reader, None))
+            self._load_companies()
+
+            # Wznowienie: pomijamy wiersze zapisane w poprzednich przebiegach
+            for _row in islice(reader, job.rows_processed):
+                pass
+
+            while True:
+                rows = list(islice(reader, self.chunk_size))
+                if not rows:
+                    break
+                self._import_chunk(rows, columns)
+                if self.progress:
+                    self.progress(job)
+
+    @staticmethod
+    def _sniff_delimiter(text):
+        sample = text.read(64 * 1024)
+        text.seek(0)
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+        except csv.Error:
+            return ','
+
+    # ========== FIRMY ==========
+
+    def _load_companies(self):
+        """Indeks firm właściciela w pamięci: NIP -> pk oraz nazwa -> pk"""
+        self.companies_by_nip = {}
+        self.companies_by_name = {}
+        companies = Company.objects.filter(owner=self.owner).order_by('pk').values_list('pk', 'nip', 'name')
+        for pk, nip, name in companies:
+            self._remember_company(pk, nip, name)
+
+    def _remember_company(self, pk, nip, name):
+        if nip:
+            self.companies_by_nip.setdefault(nip, pk)
+        self.companies_by_name.setdefault(name.casefold(), pk)
+
+    def _find_company(self, data):
+        if data['nip'] and data['nip'] in self.companies_by_nip:
+            return self.companies_by_nip[data['nip']]
+        if data['company']:
+            return self.companies_by_name.get(data['company'].casefold())
+        return None
+
+    def _create_missing_companies(self, rows):
+        """Tworzy jednym bulk_create firmy, których nie ma w indeksie"""
+        missing = {}
+        for data in rows:
+            if data['company'] and self._find_company(data) is None:
+                key = data['nip'] or data['company'].casefold()
+                missing.setdefault(key, Company(
+                    owner=self.owner, name=data['company'], nip=data['nip']
+                ))
+        if not missing:
+            return
+
+        companies = Company.objects.bulk_create(missing.values())
+        if companies[0].pk is None:
+            # MySQL nie zwraca kluczy z bulk_create - doczytujemy po nazwie
+            created = Company.objects.filter(
+                owner=self.owner, name__in=[company.name for company in companies]
+            ).order_by('pk').values_list('pk', 'name')
+            pks = {name.casefold(): pk for pk, name in created}
+            for company in companies:
+                company.pk = pks[company.name.casefold()]
+        for company in companies:
+            self._remember_company(company.pk, company.nip, company.name)
+        post_bulk_create.send(sender=Company, instances=companies)
+
+    # ========== WALIDACJA ==========
+
+    def _clean_row(self, row, columns):
+        """Zwraca (dane, błąd) dla jednego wiersza pliku"""
+        data = {field: '' for field in COLUMN_ALIASES}
+        for field, position in columns.items():
+            if position < len(row):
+                data[field] = unescape_csv_cell(row[position].strip())
+
+        for field in REQUIRED_COLUMNS:
+            if not data[field]:
+                return None, f'brak wartości w kolumnie {field}'
+
+        data['email'] = data['email'].lower()
+        try:
+            validate_email(data['email'])
+        except ValidationError:
+            return None, f"niepoprawny email '{data['email']}'"
+
+        for field, max_length in self.max_lengths.items():
+            if max_length and len(data[field]) > max_length:
+                return None, f'wartość w kolumnie {field} dłuższa niż {max_length} znaków'
+
+        status = data['status'].casefold()
+        if status and status not in self.statuses:
+            return None, f"nieznany status '{data['status']}'"
+        data['status'] = self.statuses.get(status, 'lead')
+
+        if data['nip']:
+            data['nip'] = _NON_DIGITS_RE.sub('', data['nip'])
+            if len(data['nip']) != 10:
+                return None, 'NIP musi składać się z 10 cyfr'
+
+        data['company'] = data['company'][:Company._meta.get_field('name').max_length]
+        return data, None
+
+    # ========== ZAPIS ==========
+
+    def _import_chunk(self, rows, columns):
+        job = self.job
+        first_line = job.rows_processed + 2  # +1 za nagłówek, numeracja od 1
+
+        valid = []
+        errors = []
+        for offset, row in enumerate(rows):
+            data, error = self._clean_row(row, columns)
+            if error:
+                errors.append(f'Wiersz {first_line + offset}: {error}')
+            else:
+                valid.append(data)
+
+        # Deduplikacja po emailu: jedno zapytanie na paczkę + duplikaty w samej paczce
+        existing = {
+            email.lower()
+            for email in Contact.objects.filter(email__in=[data['email'] for data in valid])
+            .values_list('email', flat=True)
+        }
+        new_rows = []
+        for data in valid:
+            if data['email'] in existing:
+                continue
+            existing.add(data['email'])
+            new_rows.append(data)
+
+        with transaction.atomic():
+            self._create_missing_companies(new_rows)
+            contacts = [self._build_contact(data) for data in new_rows]
+            if contacts:
+                self._insert_contacts(contacts)
+                self._add_tags(contacts, [parse_tags(data['tags']) for data in new_rows])
+                post_bulk_create.send(sender=Contact, instances=contacts)
+
+            job.rows_processed += len(rows)
+            job.created_count += len(contacts)
+            job.duplicate_count += len(valid) - len(new_rows)
+            job.add_errors(errors)
+            job.save()
+
+    def _build_contact(self, data):
+        contact = Contact(
+            owner=self.owner,
+            company_id=self._find_company(data),
+            status=data['status'],
+            **{field: data[field] for field in CONTACT_FIELDS}
+        )
+        # bulk_create() nie wywołuje Contact.save() - pola pochodne ustawiamy sami
+        contact.phone_normalized = normalize_phone(contact.phone)
+        contact.mobile_normalized = normalize_phone(contact.mobile)
+        return contact
+
+    def _insert_contacts(self, contacts):
+        if connection.vendor == 'postgresql':
+            self._copy_contacts(contacts)
+        else:
+            Contact.objects.bulk_create(contacts)
+
+        if contacts[0].pk is None:
+            # COPY i MySQL nie zwracają kluczy - email jest unikalny, więc doczytujemy po nim
+            pks = dict(
+                Contact.objects.filter(email__in=[contact.email for contact in contacts])
+                .values_list('email', 'pk')
+            )
+            pks = {email.lower(): pk for email, pk in pks.items()}
+            for contact in contacts:
+                contact.pk = pks[contact.email]
+                contact._state.adding = False
+
+    def _copy_contacts(self, contacts):
+        """Zapis przez COPY ... FROM STDIN (PostgreSQL, psycopg2 lub psycopg 3)"""
+        fields = [field for field in Contact._meta.concrete_fields if not field.primary_key]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for contact in contacts:
+            values = []
+            for field in fields:
+                value = field.get_db_prep_save(field.pre_save(contact, add=True), connection)
+                values.append(r'\N' if value is None else value)
+            writer.writerow(values)
+
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'.format(
+            quote(Contact._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+        )
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy_expert'):
+                buffer.seek(0)
+                raw_cursor.copy_expert(sql, buffer)
+            else:
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def _add_tags(self, contacts, tag_names):
+        """Powiązania kontakt-tag dla całej paczki + przyrostowe usage_count"""
+        names = {name for names in tag_names for name in names}
+        if not names:
+            return
+
+        tags = dict(Tag.objects.filter(owner=self.owner, name__in=names).values_list('name', 'pk'))
+        missing = names - set(tags)
+        if missing:
+            Tag.objects.bulk_create([Tag(owner=self.owner, name=name) for name in missing], ignore_conflicts=True)
+            tags.update(Tag.objects.filter(owner=self.owner, name__in=missing).values_list('name', 'pk'))
+
+        Through = Contact.tags.through
+        links = [
+            Through(contact_id=contact.pk, tag_id=tags[name])
+            for contact, names in zip(contacts, tag_names)
+            for name in names
+        ]
+        Through.objects.bulk_create(links)
+
+        # bulk_create powiązań nie wysyła m2m_changed - liczniki aktualizujemy sami
+        usage = Counter(link.tag_id for link in links)
+        tag_ids_by_delta = {}
+        for tag_id, delta in usage.items():
+            tag_ids_by_delta.setdefault(delta, []).append(tag_id)
+        for delta, tag_ids in tag_ids_by_delta.items():
+            Tag.objects.filter(pk__in=tag_ids).update(usage_count=F('usage_count') + delta)
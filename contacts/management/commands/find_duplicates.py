@@ -0,0 +1,35 @@
+"""
+Wyszukiwanie potencjalnych duplikatów kontaktów
+
+Użycie:
+    python manage.py find_duplicates
+    python manage.py find_duplicates --user jan --min-score 0.7
+
+Przelicza kolejkę DuplicateCandidate (contacts/dedupe.py). Pary odrzucone
+przy przeglądzie nie wracają do kolejki.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.dedupe import refresh_candidates
+
+
+class Command(BaseCommand):
+    help = 'Wyszukuje potencjalne duplikaty kontaktów i tworzy kolejkę do przeglądu'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Nazwa użytkownika (domyślnie: wszyscy użytkownicy z kontaktami)')
+        parser.add_argument('--min-score', type=float, help='Minimalne podobieństwo pary 0..1 (domyślnie: DEDUPE_MIN_SCORE)')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            users = User.objects.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+        else:
+            users = User.objects.filter(contacts__isnull=False).distinct()
+
+        for user in users.order_by('pk'):
+            count = refresh_candidates(user, min_score=options['min_score'])
+            self.stdout.write(self.style.SUCCESS(f'>> {user.username}: {count} par do przegladu'))
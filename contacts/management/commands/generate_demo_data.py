@@ -14,7 +14,7 @@ from django.utils import timezone
 from datetime import timedelta
 import random
 
-from contacts.models import Contact, Company
+from contacts.models import Contact, Company, parse_tags
 from interactions.models import Interaction
 from tasks.models import Task
 
@@ -231,10 +231,10 @@ class Command(BaseCommand):
                 company=random.choice(companies) if random.random() > 0.2 else None,  # 80% ma firmę
                 position=random.choice(positions),
                 status=random.choices(statuses, weights=status_weights)[0],
-                tags=random.choice(tags_options),
                 notes=f'Kontakt dodany automatycznie w celach demonstracyjnych.\n{"Bardzo aktywny klient." if random.random() > 0.7 else ""}',
                 owner=random.choice(users)
             )
+            contact.set_tags(parse_tags(random.choice(tags_options)))
             contacts.append(contact)
 
         return contacts
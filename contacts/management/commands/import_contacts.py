@@ -0,0 +1,119 @@
+"""
+Masowy import kontaktów z pliku CSV
+
+Użycie:
+    python manage.py import_contacts kontakty.csv --user jan
+    python manage.py import_contacts kontakty.csv --user jan --chunk-size 5000 --delimiter ";"
+    python manage.py import_contacts --resume 12
+    python manage.py import_contacts --pending
+
+Plik jest zapisywany w ImportJob, a postęp (rows_processed) po każdej
+paczce. Przerwany import (--resume ID) startuje od pierwszego
+nieprzetworzonego wiersza. --pending przetwarza importy wgrane przez
+stronę, które były za duże, żeby wykonać je w żądaniu HTTP (cron co minutę,
+docker/crontab). Każdy import jest najpierw przejmowany jednym UPDATE
+(pending -> running), więc dwa nakładające się uruchomienia nie wykonają
+go dwa razy. Nieudany import jest oznaczany jako 'failed' i nie zatrzymuje
+kolejnych.
+"""
+
+import os
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.importer import ContactImporter
+from contacts.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = 'Importuje kontakty (i brakujące firmy) z pliku CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Ścieżka pliku CSV')
+        parser.add_argument('--user', help='Nazwa użytkownika - właściciela importowanych kontaktów')
+        parser.add_argument('--resume', type=int, metavar='ID', help='Wznawia przerwany import o podanym ID')
+        parser.add_argument('--pending', action='store_true', help='Przetwarza wszystkie oczekujące importy')
+        parser.add_argument('--chunk-size', type=int, help='Liczba wierszy zapisywanych w jednej transakcji')
+        parser.add_argument('--delimiter', help='Separator kolumn (domyślnie wykrywany automatycznie)')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            jobs = list(ImportJob.objects.filter(status='pending').order_by('pk'))
+        elif options['resume']:
+            try:
+                job = ImportJob.objects.get(pk=options['resume'])
+            except ImportJob.DoesNotExist:
+                raise CommandError(f"Nie znaleziono importu #{options['resume']}")
+            if job.status == 'done':
+                raise CommandError(f'Import #{job.pk} jest już zakończony')
+            jobs = [job]
+        else:
+            jobs = [self.create_job(options)]
+
+        failed = []
+        for job in jobs:
+            if options['pending'] and not self.claim(job):
+                continue
+            try:
+                self.run_job(job, options)
+            except CommandError as exc:
+                if not options['pending']:
+                    raise
+                # Importer oznaczył job jako 'failed' - pozostałe oczekujące importy idą dalej
+                self.stderr.write(str(exc))
+                failed.append(job)
+        if failed:
+            raise CommandError(f"Nieudane importy: {', '.join(f'#{job.pk}' for job in failed)}")
+
+    def claim(self, job):
+        """Przejmuje oczekujący import - False, jeśli przejęło go już inne uruchomienie komendy"""
+        if not ImportJob.objects.filter(pk=job.pk, status='pending').update(status='running'):
+            self.stdout.write(f'>> Import #{job.pk} jest juz wykonywany - pomijam')
+            return False
+        job.status = 'running'
+        return True
+
+    def create_job(self, options):
+        if not options['path'] or not options['user']:
+            raise CommandError('Podaj ścieżkę pliku i --user (albo --resume / --pending)')
+        try:
+            owner = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+        if not os.path.isfile(options['path']):
+            raise CommandError(f"Nie znaleziono pliku: {options['path']}")
+
+        job = ImportJob(owner=owner)
+        with open(options['path'], 'rb') as source:
+            job.file.save(os.path.basename(options['path']), File(source), save=False)
+        job.save()
+        self.stdout.write(f'>> Utworzono import #{job.pk}')
+        return job
+
+    def run_job(self, job, options):
+        def progress(job):
+            self.stdout.write(
+                f'>> Import #{job.pk}: {job.rows_processed} wierszy '
+                f'(utworzono {job.created_count}, duplikaty {job.duplicate_count}, bledy {job.error_count})'
+            )
+
+        importer = ContactImporter(
+            job,
+            chunk_size=options['chunk_size'],
+            delimiter=options['delimiter'],
+            progress=progress,
+        )
+        try:
+            importer.run()
+        except Exception as exc:
+            raise CommandError(
+                f'Import #{job.pk} przerwany po {job.rows_processed} wierszach: {exc}\n'
+                f'Wznowienie: python manage.py import_contacts --resume {job.pk}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'>> Import #{job.pk} zakonczony: utworzono {job.created_count} kontaktow, '
+            f'pominieto {job.duplicate_count} duplikatow, bledne wiersze: {job.error_count}'
+        ))
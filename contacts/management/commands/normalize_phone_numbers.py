@@ -0,0 +1,65 @@
+"""
+Uzupełnienie znormalizowanych numerów telefonów (E.164)
+
+Użycie:
+    python manage.py normalize_phone_numbers
+    python manage.py normalize_phone_numbers --batch-size 5000
+
+Nowe i edytowane rekordy są normalizowane w save(). Ta komenda służy do
+jednorazowego uzupełnienia danych sprzed migracji oraz po imporcie
+przez bulk_create()/update().
+"""
+
+from django.core.management.base import BaseCommand
+
+from contacts.models import Contact, Company
+from contacts.phone import normalize_phone
+
+
+class Command(BaseCommand):
+    help = 'Uzupełnia znormalizowane numery telefonów kontaktów i firm'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Liczba rekordów zapisywanych jednym bulk_update (domyślnie: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        updated = self.backfill(Contact, {'phone': 'phone_normalized', 'mobile': 'mobile_normalized'}, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'>> Kontakty: zaktualizowano {updated}'))
+
+        updated = self.backfill(Company, {'phone': 'phone_normalized'}, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'>> Firmy: zaktualizowano {updated}'))
+
+    def backfill(self, model, field_map, batch_size):
+        """
+        Przechodzi tabelę partiami (iterator + only) i zapisuje tylko
+        rekordy, w których wartość znormalizowana się zmieniła
+        """
+        fields = list(field_map) + list(field_map.values())
+        queryset = model.objects.only('pk', *fields).order_by('pk')
+
+        updated = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            changed = False
+            for source, target in field_map.items():
+                normalized = normalize_phone(getattr(obj, source))
+                if getattr(obj, target) != normalized:
+                    setattr(obj, target, normalized)
+                    changed = True
+            if changed:
+                batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, list(field_map.values()))
+                updated += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, list(field_map.values()))
+            updated += len(batch)
+        return updated
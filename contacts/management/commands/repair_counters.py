@@ -0,0 +1,55 @@
+"""
+Przeliczenie liczników aktywności kontaktów i firm
+
+Użycie:
+    python manage.py repair_counters
+    python manage.py repair_counters --user jan --batch-size 5000
+
+Liczniki (last_contact_date, interaction_count, open_task_count,
+open_opportunity_count) są utrzymywane przyrostowo przez sygnały. Komenda
+wyrównuje je po zmianach z pominięciem sygnałów (QuerySet.update(),
+bulk_create(), ręczne poprawki w bazie). Każda paczka to jeden UPDATE
+z podzapytaniami po zakresie kluczy głównych.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from contacts.counters import recompute
+from contacts.models import Company, Contact
+
+
+class Command(BaseCommand):
+    help = 'Przelicza liczniki aktywności kontaktów i firm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Nazwa użytkownika (domyślnie: wszyscy)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Liczba rekordów przeliczanych jednym UPDATE (domyślnie: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['user']:
+            owner = User.objects.filter(username=options['user']).first()
+            if owner is None:
+                raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+
+        for model in (Contact, Company):
+            queryset = model.objects.all()
+            if owner is not None:
+                queryset = queryset.filter(owner=owner)
+
+            bounds = queryset.aggregate(first=Min('pk'), last=Max('pk'))
+            total = 0
+            if bounds['first'] is not None:
+                batch_size = options['batch_size']
+                for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+                    total += recompute(queryset.filter(pk__gte=start, pk__lt=start + batch_size))
+            self.stdout.write(self.style.SUCCESS(
+                f'>> {model._meta.verbose_name_plural}: przeliczono {total} rekordow'
+            ))
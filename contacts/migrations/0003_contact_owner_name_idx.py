@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 02:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0002_company_erp_customer_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['owner', 'last_name', 'first_name', 'id'], name='contact_owner_name_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0003_contact_owner_name_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=15, verbose_name='Telefon (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='mobile_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=15, verbose_name='Telefon komórkowy (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=15, verbose_name='Telefon (E.164)'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['owner', 'phone_normalized'], name='company_owner_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['owner', 'phone_normalized'], name='contact_owner_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['owner', 'mobile_normalized'], name='contact_owner_mobile_idx'),
+        ),
+    ]
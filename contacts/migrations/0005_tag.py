@@ -0,0 +1,46 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0004_phone_normalized'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Nazwa')),
+                ('usage_count', models.PositiveIntegerField(default=0, verbose_name='Liczba użyć')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Tag',
+                'verbose_name_plural': 'Tagi',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='tag_unique_owner_name'),
+        ),
+        # Stare pole tekstowe zostaje chwilowo pod inną nazwą - dane przeniesie 0006
+        migrations.RenameField(
+            model_name='contact',
+            old_name='tags',
+            new_name='tags_text',
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='contacts', to='contacts.tag', verbose_name='Tagi'),
+        ),
+    ]
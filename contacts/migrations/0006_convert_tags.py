@@ -0,0 +1,60 @@
+# Przeniesienie tagów z pola tekstowego "vip, partner" do tabeli Tag
+
+from django.db import migrations
+
+
+def parse_tags(value):
+    # Kopia contacts.models.parse_tags z chwili tworzenia migracji
+    names = []
+    for name in (value or '').split(','):
+        name = ' '.join(name.split()).lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def convert_tags(apps, schema_editor):
+    Contact = apps.get_model('contacts', 'Contact')
+    Tag = apps.get_model('contacts', 'Tag')
+    Through = Contact.tags.through
+
+    tags = {}  # (owner_id, name) -> tag_id
+    links = []
+    contacts = Contact.objects.exclude(tags_text='').values_list('pk', 'owner_id', 'tags_text')
+    for contact_id, owner_id, tags_text in contacts.iterator(chunk_size=2000):
+        for name in parse_tags(tags_text):
+            key = (owner_id, name)
+            if key not in tags:
+                tags[key] = Tag.objects.create(owner_id=owner_id, name=name).pk
+            links.append(Through(contact_id=contact_id, tag_id=tags[key]))
+        if len(links) >= 5000:
+            Through.objects.bulk_create(links)
+            links = []
+    Through.objects.bulk_create(links)
+
+    for tag in Tag.objects.all():
+        tag.usage_count = Through.objects.filter(tag_id=tag.pk).count()
+        tag.save(update_fields=['usage_count'])
+
+
+def restore_tags_text(apps, schema_editor):
+    Contact = apps.get_model('contacts', 'Contact')
+    Tag = apps.get_model('contacts', 'Tag')
+    for contact in Contact.objects.prefetch_related('tags').iterator(chunk_size=2000):
+        names = [tag.name for tag in contact.tags.all()]
+        if names:
+            contact.tags_text = ', '.join(names)[:200]
+            contact.save(update_fields=['tags_text'])
+    Contact.tags.through.objects.all().delete()
+    Tag.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0005_tag'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_tags, restore_tags_text),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0006_convert_tags'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='contact',
+            name='tags_text',
+        ),
+    ]
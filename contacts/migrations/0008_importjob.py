@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0007_remove_contact_tags_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/%Y/%m/', verbose_name='Plik CSV')),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W trakcie'), ('done', 'Zakończony'), ('failed', 'Błąd')], default='pending', max_length=20, verbose_name='Status')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='Przetworzone wiersze')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Utworzone kontakty')),
+                ('duplicate_count', models.PositiveIntegerField(default=0, verbose_name='Pominięte duplikaty')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Błędne wiersze')),
+                ('errors', models.TextField(blank=True, verbose_name='Błędy')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Data aktualizacji')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Data zakończenia')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Import kontaktów',
+                'verbose_name_plural': 'Importy kontaktów',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
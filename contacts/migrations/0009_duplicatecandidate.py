@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0008_importjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Podobieństwo')),
+                ('reasons', models.CharField(blank=True, max_length=100, verbose_name='Powody')),
+                ('status', models.CharField(choices=[('pending', 'Do przeglądu'), ('dismissed', 'Odrzucony')], default='pending', max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True, verbose_name='Data przeglądu')),
+                ('contact_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contacts.contact', verbose_name='Kontakt A')),
+                ('contact_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contacts.contact', verbose_name='Kontakt B')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Potencjalny duplikat',
+                'verbose_name_plural': 'Potencjalne duplikaty',
+                'ordering': ['-score', 'id'],
+                'indexes': [models.Index(fields=['owner', 'status', '-score', 'id'], name='duplicate_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('contact_a', 'contact_b'), name='duplicate_unique_pair')],
+            },
+        ),
+    ]
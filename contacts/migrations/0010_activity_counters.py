@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0009_duplicatecandidate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='interaction_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Liczba interakcji'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='last_contact_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Data ostatniego kontaktu'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='open_opportunity_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Otwarte szanse sprzedaży'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='open_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Otwarte zadania'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='interaction_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Liczba interakcji'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='open_opportunity_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Otwarte szanse sprzedaży'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='open_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Otwarte zadania'),
+        ),
+        migrations.AlterField(
+            model_name='contact',
+            name='last_contact_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Data ostatniego kontaktu'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['owner', 'last_contact_date'], name='company_owner_last_contact_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['owner', 'last_contact_date'], name='contact_owner_last_contact_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Wyliczenie liczników aktywności dla istniejących kontaktów i firm
+#
+# last_contact_date kontaktu był dotąd wpisywany ręcznie - od teraz to data
+# ostatniej interakcji (contacts/counters.py). Wpisana data jest zachowana
+# w manual_last_contact_date i pozostaje dolną granicą: migracja nie zastępuje
+# jej datą starszą ani pustą, a cofnięcie migracji przywraca ją w last_contact_date.
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+# Migawka Task.CLOSED_STATUSES i Opportunity.CLOSED_STAGES
+CLOSED_TASK_STATUSES = ['done', 'cancelled']
+CLOSED_OPPORTUNITY_STAGES = ['closed_won', 'closed_lost']
+
+
+def _count(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def compute_counters(apps, schema_editor):
+    Interaction = apps.get_model('interactions', 'Interaction')
+    Task = apps.get_model('tasks', 'Task')
+    Opportunity = apps.get_model('opportunities', 'Opportunity')
+
+    for model_name, field in [('Contact', 'contact'), ('Company', 'company')]:
+        model = apps.get_model('contacts', model_name)
+        last_contact = (
+            Interaction.objects.filter(**{field: OuterRef('pk')})
+            .order_by('-interaction_date')
+            .annotate(day=TruncDate('interaction_date', tzinfo=timezone.get_current_timezone()))
+            .values('day')[:1]
+        )
+        if model_name == 'Contact':
+            model.objects.update(manual_last_contact_date=F('last_contact_date'))
+            latest = Subquery(last_contact)
+            last_contact_date = Greatest(
+                Coalesce(latest, F('manual_last_contact_date')), Coalesce(F('manual_last_contact_date'), latest)
+            )
+        else:
+            # Firma nie miała pola last_contact_date przed 0010
+            last_contact_date = Subquery(last_contact)
+        model.objects.update(
+            last_contact_date=last_contact_date,
+            interaction_count=_count(Interaction.objects.all(), field),
+            open_task_count=_count(Task.objects.exclude(status__in=CLOSED_TASK_STATUSES), field),
+            open_opportunity_count=_count(
+                Opportunity.objects.exclude(stage__in=CLOSED_OPPORTUNITY_STAGES), field
+            ),
+        )
+
+
+def restore_manual_dates(apps, schema_editor):
+    Contact = apps.get_model('contacts', 'Contact')
+    Contact.objects.update(last_contact_date=F('manual_last_contact_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0010_activity_counters'),
+        ('interactions', '0001_initial'),
+        ('opportunities', '0001_initial'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='manual_last_contact_date',
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name='Data ostatniego kontaktu (wpisana ręcznie)'
+            ),
+        ),
+        migrations.RunPython(compute_counters, restore_manual_dates),
+    ]
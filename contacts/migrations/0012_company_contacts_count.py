@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def compute_contacts_count(apps, schema_editor):
+    Company = apps.get_model('contacts', 'Company')
+    Contact = apps.get_model('contacts', 'Contact')
+    counts = (
+        Contact.objects.filter(company=OuterRef('pk'))
+        .order_by()
+        .values('company')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Company.objects.update(contacts_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0011_compute_activity_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='contacts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Liczba kontaktów'),
+        ),
+        migrations.RunPython(compute_contacts_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['owner', 'contacts_count'], name='company_owner_contacts_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0012_company_contacts_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['owner', 'status'], name='contact_owner_status_idx'),
+        ),
+    ]
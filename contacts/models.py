@@ -1,6 +1,35 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from .phone import normalize_phone
+
+
+def _extend_update_fields(kwargs, source_fields, derived_fields):
+    """Dopisuje pola wyliczane do update_fields, jeśli zapisywane są pola źródłowe"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) & set(source_fields):
+        kwargs['update_fields'] = set(update_fields) | set(derived_fields)
+
+
+# Liczniki aktualizowane przyrostowo w bazie (contacts/counters.py)
+COUNTER_FIELDS = ['last_contact_date', 'interaction_count', 'open_task_count', 'open_opportunity_count']
+COMPANY_COUNTER_FIELDS = COUNTER_FIELDS + ['contacts_count']
+
+
+def _skip_counter_fields(instance, kwargs, counter_fields=COUNTER_FIELDS):
+    """
+    Pełny save() istniejącego obiektu nie nadpisuje liczników
+
+    Wartości w pamięci mogą być nieaktualne (liczniki zmieniają się przez
+    UPDATE ... SET x = x + 1 w sygnałach innych modeli), więc zapisujemy
+    wszystkie pola oprócz liczników.
+    """
+    if instance._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+        return
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counter_fields
+    ]
 
 
 class Company(models.Model):
@@ -16,6 +45,7 @@ class Company(models.Model):
     industry = models.CharField('Branża', max_length=100, blank=True)
     website = models.URLField('Strona WWW', blank=True)
     phone = models.CharField('Telefon', max_length=20, blank=True)
+    phone_normalized = models.CharField('Telefon (E.164)', max_length=15, blank=True, editable=False)
     email = models.EmailField('Email', blank=True)
 
     # Adres
@@ -38,20 +68,84 @@ class Company(models.Model):
     created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
     updated_at = models.DateTimeField('Data aktualizacji', auto_now=True)
 
+    # Liczniki aktywności - utrzymywane automatycznie (contacts/counters.py)
+    last_contact_date = models.DateField('Data ostatniego kontaktu', null=True, blank=True, editable=False)
+    interaction_count = models.PositiveIntegerField('Liczba interakcji', default=0, editable=False)
+    open_task_count = models.PositiveIntegerField('Otwarte zadania', default=0, editable=False)
+    open_opportunity_count = models.PositiveIntegerField('Otwarte szanse sprzedaży', default=0, editable=False)
+    contacts_count = models.PositiveIntegerField('Liczba kontaktów', default=0, editable=False)
+
     class Meta:
         verbose_name = 'Firma'
         verbose_name_plural = 'Firmy'
         ordering = ['name']
+        indexes = [
+            # Identyfikacja dzwoniącego: WHERE owner = ? AND phone_normalized = ?
+            models.Index(fields=['owner', 'phone_normalized'], name='company_owner_phone_idx'),
+            # Firmy bez kontaktu od N dni: WHERE owner = ? AND last_contact_date < ?
+            models.Index(fields=['owner', 'last_contact_date'], name='company_owner_last_contact_idx'),
+            # Firmy z kontaktami (dashboard): WHERE owner = ? AND contacts_count > 0
+            models.Index(fields=['owner', 'contacts_count'], name='company_owner_contacts_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        _extend_update_fields(kwargs, ['phone'], ['phone_normalized'])
+        _skip_counter_fields(self, kwargs, COMPANY_COUNTER_FIELDS)
+        super().save(*args, **kwargs)
+
     def get_full_address(self):
         """Zwraca pełny adres firmy"""
         parts = [self.street, f"{self.postal_code} {self.city}", self.country]
         return ', '.join(filter(None, parts))
 
 
+def parse_tags(value):
+    """
+    Zamienia tekst 'vip, Partner,  vip' na listę unikalnych nazw tagów ['vip', 'partner']
+
+    Nazwy są przycinane i zapisywane małymi literami, żeby 'VIP' i 'vip'
+    były tym samym tagiem.
+    """
+    names = []
+    for name in (value or '').split(','):
+        name = ' '.join(name.split()).lower()[:Tag.NAME_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class Tag(models.Model):
+    """
+    Tag kontaktu (np. 'vip', 'partner')
+
+    Tagi są osobne dla każdego użytkownika. usage_count to liczba kontaktów
+    z danym tagiem - aktualizowana przyrostowo przy dodawaniu/usuwaniu
+    tagów (contacts/signals.py), żeby nie liczyć jej przy każdym wyświetleniu.
+    """
+
+    NAME_MAX_LENGTH = 50
+
+    name = models.CharField('Nazwa', max_length=NAME_MAX_LENGTH)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='tags')
+    usage_count = models.PositiveIntegerField('Liczba użyć', default=0)
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tagi'
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='tag_unique_owner_name'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class Contact(models.Model):
     """Model reprezentujący kontakt (osobę)"""
 
@@ -68,6 +162,8 @@ class Contact(models.Model):
     email = models.EmailField('Email', unique=True)
     phone = models.CharField('Telefon', max_length=20, blank=True)
     mobile = models.CharField('Telefon komórkowy', max_length=20, blank=True)
+    phone_normalized = models.CharField('Telefon (E.164)', max_length=15, blank=True, editable=False)
+    mobile_normalized = models.CharField('Telefon komórkowy (E.164)', max_length=15, blank=True, editable=False)
 
     # Powiązania
     company = models.ForeignKey(
@@ -82,7 +178,7 @@ class Contact(models.Model):
 
     # Status i kategoria
     status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='lead')
-    tags = models.CharField('Tagi', max_length=200, blank=True, help_text='Oddziel przecinkami')
+    tags = models.ManyToManyField(Tag, blank=True, verbose_name='Tagi', related_name='contacts')
 
     # Adres (jeśli inny niż firma)
     street = models.CharField('Ulica', max_length=200, blank=True)
@@ -95,16 +191,43 @@ class Contact(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='contacts')
     created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
     updated_at = models.DateTimeField('Data aktualizacji', auto_now=True)
-    last_contact_date = models.DateField('Data ostatniego kontaktu', null=True, blank=True)
+
+    # Liczniki aktywności - utrzymywane automatycznie (contacts/counters.py)
+    last_contact_date = models.DateField('Data ostatniego kontaktu', null=True, blank=True, editable=False)
+    interaction_count = models.PositiveIntegerField('Liczba interakcji', default=0, editable=False)
+    open_task_count = models.PositiveIntegerField('Otwarte zadania', default=0, editable=False)
+    open_opportunity_count = models.PositiveIntegerField('Otwarte szanse sprzedaży', default=0, editable=False)
+    # Data wpisana ręcznie przed wprowadzeniem liczników (migracja 0011) - last_contact_date nie spada poniżej niej
+    manual_last_contact_date = models.DateField(
+        'Data ostatniego kontaktu (wpisana ręcznie)', null=True, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = 'Kontakt'
         verbose_name_plural = 'Kontakty'
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Paginacja kursorowa listy kontaktów: WHERE owner = ? ORDER BY last_name, first_name, id
+            models.Index(fields=['owner', 'last_name', 'first_name', 'id'], name='contact_owner_name_idx'),
+            # Filtr statusu i wykres statusów na dashboardzie: WHERE owner = ? AND status = ?
+            models.Index(fields=['owner', 'status'], name='contact_owner_status_idx'),
+            # Identyfikacja dzwoniącego: WHERE owner = ? AND (phone_normalized = ? OR mobile_normalized = ?)
+            models.Index(fields=['owner', 'phone_normalized'], name='contact_owner_phone_idx'),
+            models.Index(fields=['owner', 'mobile_normalized'], name='contact_owner_mobile_idx'),
+            # Kontakty bez kontaktu od N dni: WHERE owner = ? AND last_contact_date < ?
+            models.Index(fields=['owner', 'last_contact_date'], name='contact_owner_last_contact_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        self.mobile_normalized = normalize_phone(self.mobile)
+        _extend_update_fields(kwargs, ['phone', 'mobile'], ['phone_normalized', 'mobile_normalized'])
+        _skip_counter_fields(self, kwargs)
+        super().save(*args, **kwargs)
+
     def get_full_name(self):
         """Zwraca pełne imię i nazwisko"""
         return f"{self.first_name} {self.last_name}"
@@ -117,7 +240,113 @@ class Contact(models.Model):
         return ', '.join(filter(None, parts))
 
     def get_tags_list(self):
-        """Zwraca listę tagów"""
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        """Zwraca listę nazw tagów (korzysta z prefetch_related('tags'), jeśli był użyty)"""
+        if self.pk is None:
+            return []
+        return [tag.name for tag in self.tags.all()]
+
+    def set_tags(self, names):
+        """
+        Ustawia tagi kontaktu na podstawie listy nazw
+
+        Brakujące tagi właściciela są tworzone. Zmiana idzie przez
+        tags.set(), więc liczniki usage_count aktualizuje sygnał m2m_changed.
+        """
+        existing = {tag.name: tag for tag in Tag.objects.filter(owner_id=self.owner_id, name__in=names)}
+        missing = [name for name in names if name not in existing]
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(owner_id=self.owner_id, name=name) for name in missing],
+                ignore_conflicts=True
+            )
+            existing.update({
+                tag.name: tag for tag in Tag.objects.filter(owner_id=self.owner_id, name__in=missing)
+            })
+        self.tags.set([existing[name] for name in names])
+
+
+class ImportJob(models.Model):
+    """
+    Masowy import kontaktów z pliku CSV
+
+    Plik jest przetwarzany paczkami; po każdej zapisanej paczce w tej samej
+    transakcji zwiększamy rows_processed. Po awarii import wznawia się od
+    pierwszego nieprzetworzonego wiersza (contacts/importer.py).
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Oczekuje'),
+        ('running', 'W trakcie'),
+        ('done', 'Zakończony'),
+        ('failed', 'Błąd'),
+    ]
+
+    # Ile komunikatów o błędnych wierszach przechowujemy w zadaniu
+    MAX_STORED_ERRORS = 200
+
+    file = models.FileField('Plik CSV', upload_to='imports/%Y/%m/')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='import_jobs')
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows_processed = models.PositiveIntegerField('Przetworzone wiersze', default=0)
+    created_count = models.PositiveIntegerField('Utworzone kontakty', default=0)
+    duplicate_count = models.PositiveIntegerField('Pominięte duplikaty', default=0)
+    error_count = models.PositiveIntegerField('Błędne wiersze', default=0)
+    errors = models.TextField('Błędy', blank=True)
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+    updated_at = models.DateTimeField('Data aktualizacji', auto_now=True)
+    finished_at = models.DateTimeField('Data zakończenia', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Import kontaktów'
+        verbose_name_plural = 'Importy kontaktów'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.get_status_display()})"
+
+    def add_errors(self, messages):
+        """Dopisuje komunikaty o błędach (najwyżej MAX_STORED_ERRORS linii)"""
+        self.error_count += len(messages)
+        stored = self.errors.splitlines() if self.errors else []
+        stored.extend(messages[:max(self.MAX_STORED_ERRORS - len(stored), 0)])
+        self.errors = '\n'.join(stored)
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Para kontaktów, które mogą być duplikatami - kolejka do przeglądu
+
+    Pary wyznacza contacts/dedupe.py (komenda find_duplicates).
+    contact_a ma zawsze mniejsze pk niż contact_b. Po scaleniu para znika
+    razem z usuniętym duplikatem; odrzucone pary zostają ze statusem
+    'dismissed', żeby nie wracały przy kolejnym przeliczeniu.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Do przeglądu'),
+        ('dismissed', 'Odrzucony'),
+    ]
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='+')
+    contact_a = models.ForeignKey(Contact, on_delete=models.CASCADE, verbose_name='Kontakt A', related_name='+')
+    contact_b = models.ForeignKey(Contact, on_delete=models.CASCADE, verbose_name='Kontakt B', related_name='+')
+    score = models.FloatField('Podobieństwo')
+    reasons = models.CharField('Powody', max_length=100, blank=True)
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+    reviewed_at = models.DateTimeField('Data przeglądu', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Potencjalny duplikat'
+        verbose_name_plural = 'Potencjalne duplikaty'
+        ordering = ['-score', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['contact_a', 'contact_b'], name='duplicate_unique_pair'),
+        ]
+        indexes = [
+            # Kolejka przeglądu: WHERE owner = ? AND status = 'pending' ORDER BY score DESC
+            models.Index(fields=['owner', 'status', '-score', 'id'], name='duplicate_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.contact_a} / {self.contact_b} ({self.score:.2f})"
@@ -0,0 +1,70 @@
+"""
+Normalizacja numerów telefonów
+
+Numery wpisywane ręcznie mają dowolny format ("+48 123 456 789",
+"0048123456789", "123-456-789"). Do wyszukiwania zapisujemy obok nich
+postać E.164 bez znaku '+' (same cyfry, z kodem kraju), np. "48123456789".
+Dzięki temu identyfikacja dzwoniącego to dokładne porównanie po indeksie
+zamiast skanowania tabeli przez LIKE.
+"""
+
+import re
+
+from django.conf import settings
+from django.db.models import Q
+
+_NON_DIGITS_RE = re.compile(r'\D+')
+
+# Maksymalna długość numeru E.164 (bez '+')
+E164_MAX_LENGTH = 15
+
+
+def normalize_phone(value, default_country_code=None):
+    """
+    Zamienia numer telefonu na cyfry w formacie E.164 (bez '+')
+
+    Przykłady (domyślny kod kraju 48):
+        '+48 123 456 789' -> '48123456789'
+        '0048 123 456 789' -> '48123456789'
+        '123-456-789' -> '48123456789'
+        '' -> ''
+    """
+    if not value:
+        return ''
+    if default_country_code is None:
+        default_country_code = settings.PHONE_DEFAULT_COUNTRY_CODE
+
+    value = value.strip()
+    digits = _NON_DIGITS_RE.sub('', value)
+    if not digits:
+        return ''
+
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        # Prefiks międzynarodowy 00 zamiast '+'
+        digits = digits[2:]
+    elif len(digits) == settings.PHONE_NATIONAL_NUMBER_LENGTH:
+        # Numer krajowy - dopisujemy kod kraju
+        digits = default_country_code + digits
+    elif digits.startswith('0') and len(digits) == settings.PHONE_NATIONAL_NUMBER_LENGTH + 1:
+        # Numer krajowy z prefiksem 0 (np. stare zapisy numerów stacjonarnych)
+        digits = default_country_code + digits[1:]
+
+    return digits[:E164_MAX_LENGTH]
+
+
+def contacts_by_phone(queryset, number):
+    """Kontakty z numerem telefonu lub komórki równym podanemu (po normalizacji)"""
+    normalized = normalize_phone(number)
+    if not normalized:
+        return queryset.none()
+    return queryset.filter(Q(phone_normalized=normalized) | Q(mobile_normalized=normalized))
+
+
+def companies_by_phone(queryset, number):
+    """Firmy z numerem telefonu równym podanemu (po normalizacji)"""
+    normalized = normalize_phone(number)
+    if not normalized:
+        return queryset.none()
+    return queryset.filter(phone_normalized=normalized)
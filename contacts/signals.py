@@ -0,0 +1,104 @@
+"""
+Sygnały aplikacji contacts
+
+Liczniki Tag.usage_count są aktualizowane przyrostowo (UPDATE ... SET
+usage_count = usage_count +/- n) przy każdej zmianie powiązań
+kontakt-tag, zamiast liczyć COUNT(*) przy wyświetlaniu listy tagów.
+Tak samo Company.contacts_count przy dodaniu, przeniesieniu i usunięciu
+kontaktu (contacts/counters.py).
+"""
+
+from collections import Counter
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from mini_crm.signals import post_bulk_create
+
+from . import counters
+from .models import Company, Contact, Tag
+
+
+def _change_usage(tag_ids, delta):
+    if not tag_ids:
+        return
+    if delta > 0:
+        Tag.objects.filter(pk__in=tag_ids).update(usage_count=F('usage_count') + delta)
+    else:
+        Tag.objects.filter(pk__in=tag_ids).update(usage_count=Greatest(F('usage_count') + delta, Value(0)))
+
+
+@receiver(m2m_changed, sender=Contact.tags.through, dispatch_uid='contacts_tag_usage_count')
+def update_tag_usage_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Obsługa contact.tags.add/remove/set/clear oraz tag.contacts.add/remove/clear
+
+    Przy clear() Django nie podaje pk_set, więc zapamiętujemy powiązania
+    w pre_clear i odejmujemy je w post_clear.
+    """
+    if action == 'pre_clear':
+        if reverse:
+            instance._tag_usage_cleared = instance.contacts.count()
+        else:
+            instance._tag_usage_cleared = list(instance.tags.values_list('pk', flat=True))
+        return
+
+    if action == 'post_clear':
+        cleared = getattr(instance, '_tag_usage_cleared', None)
+        if reverse:
+            _change_usage([instance.pk], -(cleared or 0))
+        else:
+            _change_usage(cleared, -1)
+        return
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        # instance to Tag, pk_set to ID kontaktów
+        _change_usage([instance.pk], delta * len(pk_set))
+    else:
+        # instance to Contact, pk_set to ID tagów
+        _change_usage(pk_set, delta)
+
+
+@receiver(pre_delete, sender=Contact, dispatch_uid='contacts_tag_usage_on_delete')
+def release_tags_of_deleted_contact(sender, instance, **kwargs):
+    """Powiązania z tagami znikają kaskadowo (bez m2m_changed) - odejmujemy je ręcznie"""
+    _change_usage(list(instance.tags.values_list('pk', flat=True)), -1)
+
+
+# ========== Company.contacts_count ==========
+
+@receiver(pre_save, sender=Contact, dispatch_uid='contacts_company_count_previous')
+def remember_previous_company(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Zapis wybranych pól bez 'company' nie zmienia licznika - bez dodatkowego SELECT
+    if raw or (update_fields is not None and 'company' not in update_fields):
+        instance._company_previous = None
+        instance._company_unchanged = True
+        return
+    instance._company_unchanged = False
+    instance._company_previous = counters.previous_values(instance, ['company_id'])
+
+
+@receiver(post_save, sender=Contact, dispatch_uid='contacts_company_count_save')
+def update_company_contacts_count(sender, instance, created, raw=False, **kwargs):
+    if raw or getattr(instance, '_company_unchanged', False):
+        return
+    previous = None if created else getattr(instance, '_company_previous', None)
+    counters.move_count('contacts_count', previous, {'company_id': instance.company_id})
+
+
+@receiver(post_delete, sender=Contact, dispatch_uid='contacts_company_count_delete')
+def release_company_of_deleted_contact(sender, instance, **kwargs):
+    counters.change_count('contacts_count', {'company_id': instance.company_id}, -1)
+
+
+@receiver(post_bulk_create, sender=Contact, dispatch_uid='contacts_company_count_bulk')
+def update_company_contacts_count_bulk(sender, instances, **kwargs):
+    """Import: jeden UPDATE na firmę zamiast jednego na kontakt"""
+    for company_id, delta in Counter(contact.company_id for contact in instances if contact.company_id).items():
+        Company.objects.filter(pk=company_id).update(contacts_count=F('contacts_count') + delta)
@@ -0,0 +1,188 @@
+"""
+Testy liczników aktywności kontaktów i firm
+"""
+
+import io
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from contacts.counters import recompute
+from contacts.models import Company, Contact
+from interactions.models import Interaction
+from opportunities.models import Opportunity
+from tasks.models import Task
+
+
+class CountersTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.company = Company.objects.create(name='Acme', owner=self.user)
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', company=self.company, owner=self.user
+        )
+        self.other = Contact.objects.create(
+            first_name='Anna', last_name='Nowak', email='anna@example.com', owner=self.user
+        )
+
+    def create_interaction(self, days_ago=0, **kwargs):
+        defaults = {
+            'contact': self.contact, 'company': self.company, 'interaction_type': 'call',
+            'subject': 'Rozmowa', 'description': 'Opis', 'owner': self.user,
+            'interaction_date': timezone.now() - timedelta(days=days_ago),
+        }
+        defaults.update(kwargs)
+        return Interaction.objects.create(**defaults)
+
+    def assertCounters(self, obj, **expected):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in expected}, expected)
+
+
+class TestInteractionCounters(CountersTestCase):
+    """interaction_count i last_contact_date"""
+
+    def test_create_updates_contact_and_company(self):
+        self.create_interaction(days_ago=10)
+        self.create_interaction(days_ago=3)
+        self.create_interaction(days_ago=20)
+
+        three_days_ago = timezone.localdate() - timedelta(days=3)
+        self.assertCounters(self.contact, interaction_count=3, last_contact_date=three_days_ago)
+        self.assertCounters(self.company, interaction_count=3, last_contact_date=three_days_ago)
+
+    def test_delete_recomputes_last_contact_date(self):
+        self.create_interaction(days_ago=10)
+        latest = self.create_interaction(days_ago=1)
+        latest.delete()
+
+        self.assertCounters(
+            self.contact, interaction_count=1, last_contact_date=timezone.localdate() - timedelta(days=10)
+        )
+
+    def test_manual_date_is_a_lower_bound(self):
+        manual = timezone.localdate() - timedelta(days=5)
+        Contact.objects.filter(pk=self.contact.pk).update(manual_last_contact_date=manual)
+        self.create_interaction(days_ago=30).delete()
+        self.assertCounters(self.contact, last_contact_date=manual)
+
+        self.create_interaction(days_ago=1)
+        recompute(Contact.objects.filter(pk=self.contact.pk))
+        self.assertCounters(self.contact, last_contact_date=timezone.localdate() - timedelta(days=1))
+
+    def test_moving_interaction_to_other_contact(self):
+        interaction = self.create_interaction(days_ago=2)
+        interaction.contact = self.other
+        interaction.company = None
+        interaction.save()
+
+        self.assertCounters(self.contact, interaction_count=0, last_contact_date=None)
+        self.assertCounters(self.company, interaction_count=0, last_contact_date=None)
+        self.assertCounters(self.other, interaction_count=1, last_contact_date=timezone.localdate() - timedelta(days=2))
+
+    def test_saving_contact_does_not_overwrite_counters(self):
+        contact = Contact.objects.get(pk=self.contact.pk)
+        self.create_interaction()
+        contact.position = 'Dyrektor'
+        contact.save()
+
+        self.assertCounters(self.contact, interaction_count=1, position='Dyrektor')
+
+
+class TestOpenTaskAndOpportunityCounters(CountersTestCase):
+    """open_task_count i open_opportunity_count"""
+
+    def test_task_status_changes(self):
+        task = Task.objects.create(title='Oddzwonić', contact=self.contact, company=self.company, owner=self.user)
+        Task.objects.create(title='Wysłać ofertę', contact=self.contact, status='done', owner=self.user)
+        self.assertCounters(self.contact, open_task_count=1)
+        self.assertCounters(self.company, open_task_count=1)
+
+        task.status = 'done'
+        task.save()
+        self.assertCounters(self.contact, open_task_count=0)
+
+        task.status = 'in_progress'
+        task.save()
+        task.delete()
+        self.assertCounters(self.contact, open_task_count=0)
+        self.assertCounters(self.company, open_task_count=0)
+
+    def test_opportunity_stage_changes(self):
+        opportunity = Opportunity.objects.create(
+            name='Wdrożenie', amount=10000, expected_close_date=date(2030, 1, 1),
+            contact=self.contact, owner=self.user
+        )
+        self.assertCounters(self.contact, open_opportunity_count=1)
+
+        opportunity.stage = 'closed_won'
+        opportunity.save()
+        self.assertCounters(self.contact, open_opportunity_count=0)
+
+
+class TestCompanyContactsCount(CountersTestCase):
+    """Company.contacts_count przy dodaniu, przeniesieniu i usunięciu kontaktu"""
+
+    def test_create_move_and_delete(self):
+        self.assertCounters(self.company, contacts_count=1)
+
+        other_company = Company.objects.create(name='Beta', owner=self.user)
+        self.contact.company = other_company
+        self.contact.save()
+        self.assertCounters(self.company, contacts_count=0)
+        self.assertCounters(other_company, contacts_count=1)
+
+        self.contact.delete()
+        self.assertCounters(other_company, contacts_count=0)
+
+    def test_saving_company_does_not_overwrite_count(self):
+        stale = Company.objects.get(pk=self.company.pk)
+        self.other.company = self.company
+        self.other.save()
+
+        stale.name = 'Acme S.A.'
+        stale.save()
+        self.assertCounters(self.company, contacts_count=2)
+
+    def test_company_views_read_counter(self):
+        Company.objects.filter(pk=self.company.pk).update(contacts_count=5)
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.get(reverse('contacts:company_list'))
+        self.assertEqual(response.context['companies'][0].contacts_count, 5)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['companies_with_contacts'], 1)
+
+    def test_repair_counters(self):
+        Company.objects.update(contacts_count=9)
+
+        call_command('repair_counters', stdout=io.StringIO())
+        self.assertCounters(self.company, contacts_count=1)
+
+
+class TestRepairAndFilter(CountersTestCase):
+    """Komenda repair_counters i filtr 'bez kontaktu od N dni'"""
+
+    def test_repair_counters(self):
+        self.create_interaction(days_ago=5)
+        Task.objects.create(title='Oddzwonić', contact=self.contact, owner=self.user)
+        Contact.objects.update(interaction_count=0, open_task_count=7, last_contact_date=None)
+
+        call_command('repair_counters', stdout=io.StringIO())
+        self.assertCounters(
+            self.contact, interaction_count=1, open_task_count=1,
+            last_contact_date=timezone.localdate() - timedelta(days=5)
+        )
+
+    def test_inactive_filter(self):
+        self.create_interaction(days_ago=100)
+        self.create_interaction(contact=self.other, company=None, days_ago=5)
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.get(reverse('contacts:contact_list'), {'inactive_days': 90})
+        self.assertEqual(list(response.context['contacts']), [self.contact])
@@ -0,0 +1,168 @@
+"""
+Testy wykrywania i scalania duplikatów kontaktów
+"""
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from activities.models import Activity
+from contacts.dedupe import blocking_keys, merge_contacts, refresh_candidates, soundex
+from contacts.models import Company, Contact, DuplicateCandidate, Tag
+from interactions.archive import archive_interactions
+from interactions.models import ArchivedInteraction, Interaction
+from opportunities.models import Opportunity
+from tasks.models import Task
+
+
+class TestBlockingKeys(TestCase):
+    """Klucze blokujące i kod fonetyczny"""
+
+    def test_soundex_ignores_polish_characters_and_spelling(self):
+        self.assertEqual(soundex('Kowalski'), 'K420')
+        self.assertEqual(soundex('Kowalsky'), 'K420')
+        self.assertEqual(soundex('Wiśniewski'), soundex('Wisniewski'))
+        self.assertEqual(soundex(''), '')
+
+    def test_email_local_part_is_normalized(self):
+        keys = blocking_keys({
+            'first_name': 'Jan', 'last_name': 'Kowalski', 'email': 'Jan.Kowalski+crm@firma.pl',
+            'phone_normalized': '48123456789', 'mobile_normalized': '',
+        })
+        self.assertIn('local:jankowalski', keys)
+        self.assertIn('domain:firma.pl:K420', keys)
+        self.assertIn('phone:48123456789', keys)
+        self.assertIn('name:K420:j', keys)
+
+
+class TestFindDuplicates(TestCase):
+    """Kolejka potencjalnych duplikatów"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.jan = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan.kowalski@firma.pl',
+            phone='123 456 789', owner=self.user
+        )
+        self.jan_duplicate = Contact.objects.create(
+            first_name='Jan', last_name='Kowalsky', email='jankowalski@gmail.com',
+            mobile='+48 123-456-789', owner=self.user
+        )
+        self.anna = Contact.objects.create(
+            first_name='Anna', last_name='Nowak', email='anna@firma.pl', owner=self.user
+        )
+
+    def test_duplicates_are_found(self):
+        self.assertEqual(refresh_candidates(self.user), 1)
+        candidate = DuplicateCandidate.objects.get()
+        self.assertEqual((candidate.contact_a, candidate.contact_b), (self.jan, self.jan_duplicate))
+        self.assertIn('telefon', candidate.reasons)
+        self.assertGreater(candidate.score, 0.9)
+
+    def test_dismissed_pair_does_not_return(self):
+        refresh_candidates(self.user)
+        DuplicateCandidate.objects.update(status='dismissed')
+        self.assertEqual(refresh_candidates(self.user), 0)
+
+    def test_other_owners_contacts_are_not_compared(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan.kowalski@example.com',
+            phone='123 456 789', owner=other_user
+        )
+        self.assertEqual(refresh_candidates(self.user), 1)
+        self.assertEqual(refresh_candidates(other_user), 0)
+
+
+class TestMergeContacts(TestCase):
+    """Scalanie kontaktów"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.company = Company.objects.create(name='Acme', owner=self.user)
+        self.primary = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@firma.pl', owner=self.user
+        )
+        self.duplicate = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@gmail.com', phone='123456789',
+            company=self.company, owner=self.user
+        )
+        self.primary.set_tags(['vip'])
+        self.duplicate.set_tags(['vip', 'b2b'])
+
+        self.interaction = Interaction.objects.create(
+            contact=self.duplicate, interaction_type='call', subject='Rozmowa',
+            description='Opis', interaction_date=timezone.now(), owner=self.user
+        )
+        self.task = Task.objects.create(title='Oddzwonić', contact=self.duplicate, owner=self.user)
+        self.opportunity = Opportunity.objects.create(
+            name='Wdrożenie', amount=10000, expected_close_date=date(2024, 12, 31),
+            contact=self.duplicate, owner=self.user
+        )
+
+    def test_merge_repoints_relations_and_fills_fields(self):
+        merge_contacts(self.primary, self.duplicate)
+
+        self.assertFalse(Contact.objects.filter(pk=self.duplicate.pk).exists())
+        self.interaction.refresh_from_db()
+        self.task.refresh_from_db()
+        self.opportunity.refresh_from_db()
+        self.assertEqual(self.interaction.contact, self.primary)
+        self.assertEqual(self.task.contact, self.primary)
+        self.assertEqual(self.opportunity.contact, self.primary)
+
+        self.primary.refresh_from_db()
+        self.assertEqual(self.primary.phone_normalized, '48123456789')
+        self.assertEqual(self.primary.company, self.company)
+        self.assertEqual(self.primary.last_contact_date, timezone.localdate())
+        self.assertEqual(self.primary.interaction_count, 1)
+        self.assertEqual(self.primary.open_task_count, 1)
+        self.assertEqual(self.primary.open_opportunity_count, 1)
+        self.assertEqual(self.primary.get_tags_list(), ['b2b', 'vip'])
+        self.assertEqual(Tag.objects.get(name='vip').usage_count, 1)
+
+    def test_merge_keeps_activity_timeline(self):
+        verbs = set(Activity.objects.filter(contact=self.duplicate).values_list('verb', flat=True))
+        self.assertEqual(verbs, {Activity.INTERACTION_LOGGED, Activity.TASK_CREATED, Activity.OPPORTUNITY_CREATED})
+
+        merge_contacts(self.primary, self.duplicate)
+
+        self.assertEqual(set(Activity.objects.filter(contact=self.primary).values_list('verb', flat=True)), verbs)
+
+    def test_merge_keeps_archived_interactions(self):
+        old = Interaction.objects.create(
+            contact=self.duplicate, interaction_type='meeting', subject='Spotkanie',
+            description='Opis', interaction_date=timezone.now() - timedelta(days=5 * 365), owner=self.user
+        )
+        archive_interactions(timezone.now() - timedelta(days=365))
+
+        merge_contacts(self.primary, self.duplicate)
+
+        self.assertEqual(ArchivedInteraction.objects.get(pk=old.pk).contact, self.primary)
+
+    def test_merge_view_keeps_selected_contact(self):
+        candidate = DuplicateCandidate.objects.create(
+            owner=self.user, contact_a=self.primary, contact_b=self.duplicate, score=0.9
+        )
+        response = self.client.post(
+            reverse('contacts:duplicate_merge', args=[candidate.pk]), {'primary': self.duplicate.pk}
+        )
+        self.assertRedirects(response, reverse('contacts:duplicate_list'))
+        self.assertFalse(Contact.objects.filter(pk=self.primary.pk).exists())
+        self.assertFalse(DuplicateCandidate.objects.exists())
+
+    def test_dismiss_view(self):
+        candidate = DuplicateCandidate.objects.create(
+            owner=self.user, contact_a=self.primary, contact_b=self.duplicate, score=0.9
+        )
+        self.client.post(reverse('contacts:duplicate_dismiss', args=[candidate.pk]))
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.status, 'dismissed')
+
+        response = self.client.get(reverse('contacts:duplicate_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['candidates']), [])
@@ -7,7 +7,7 @@ CZYTAJ UWAŻNIE - Tutaj uczysz się testowania formularzy!
 from django.test import TestCase
 from django.contrib.auth.models import User
 from contacts.forms import ContactForm, CompanyForm, ContactSearchForm
-from contacts.models import Contact, Company
+from contacts.models import Contact, Company, Tag
 
 
 class TestContactForm(TestCase):
@@ -231,6 +231,29 @@ class TestContactForm(TestCase):
         self.assertEqual(saved_contact.first_name, 'Nowy')
         self.assertEqual(saved_contact.owner, self.user)
 
+    def test_form_saves_tags(self):
+        """
+        Test 9: Tagi wpisane jako tekst trafiają do tabeli Tag
+
+        Przy edycji pole tags pokazuje aktualne tagi oddzielone przecinkami.
+        """
+        data = {
+            'first_name': 'Nowy',
+            'last_name': 'Kontakt',
+            'email': 'nowy@example.com',
+            'status': 'lead',
+            'tags': 'VIP, partner',
+        }
+
+        form = ContactForm(data=data, user=self.user)
+        self.assertTrue(form.is_valid())
+        contact = form.save()
+
+        self.assertEqual(sorted(contact.get_tags_list()), ['partner', 'vip'])
+
+        edit_form = ContactForm(instance=contact, user=self.user)
+        self.assertEqual(edit_form.initial['tags'], 'partner, vip')
+
 
 class TestCompanyForm(TestCase):
     """
@@ -398,6 +421,21 @@ class TestContactSearchForm(TestCase):
         self.assertTrue(form.is_valid())
         self.assertEqual(form.cleaned_data['company'], company)
 
+    def test_search_with_tag_filter(self):
+        """
+        Test: Filtrowanie po tagu - tylko tagi zalogowanego użytkownika
+        """
+        tag = Tag.objects.create(name='vip', owner=self.user)
+        other_user = User.objects.create_user(username='tagowner', password='pass12345')
+        other_tag = Tag.objects.create(name='vip', owner=other_user)
+
+        form = ContactSearchForm(data={'tag': tag.pk}, user=self.user)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['tag'], tag)
+
+        form = ContactSearchForm(data={'tag': other_tag.pk}, user=self.user)
+        self.assertFalse(form.is_valid())
+
     def test_invalid_status_in_search(self):
         """
         Test: Niepoprawny status w wyszukiwaniu
@@ -0,0 +1,218 @@
+"""
+Testy masowego importu kontaktów z CSV
+"""
+
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from contacts.importer import ContactImporter
+from contacts.models import Company, Contact, ImportJob, Tag
+from search.index import search
+
+CSV_CONTENT = (
+    'Imię;Nazwisko;Email;Telefon;Firma;NIP;Status;Tagi\n'
+    'Jan;Kowalski;Jan@Example.com;123-456-789;Acme;1234567890;Klient;vip, b2b\n'
+    'Anna;Nowak;anna@example.com;;ACME;;lead;vip\n'
+    'Piotr;Zieliński;istniejacy@example.com;;;;;\n'
+    'Ewa;Wiśniewska;zly-email;;;;;\n'
+    'Jan;Kowalski;jan@example.com;;;;;\n'
+    'Adam;Mały;adam@example.com;;Nowa Firma;9876543210;prospect;\n'
+)
+
+
+class ImportTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.acme = Company.objects.create(name='Acme', owner=self.user)
+        Contact.objects.create(first_name='Stary', last_name='Kontakt', email='istniejacy@example.com', owner=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_job(self, content=CSV_CONTENT, encoding='utf-8'):
+        job = ImportJob(owner=self.user)
+        job.file.save('kontakty.csv', ContentFile(content.encode(encoding)), save=False)
+        job.save()
+        return job
+
+
+class TestContactImporter(ImportTestCase):
+    """Walidacja, deduplikacja, firmy i tagi"""
+
+    def test_import(self):
+        job = ContactImporter(self.create_job(), chunk_size=2).run()
+
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.rows_processed, 6)
+        self.assertEqual(job.created_count, 3)
+        self.assertEqual(job.duplicate_count, 2)
+        self.assertEqual(job.error_count, 1)
+        self.assertIn('Wiersz 5', job.errors)
+
+        jan = Contact.objects.get(email='jan@example.com')
+        self.assertEqual(jan.status, 'customer')
+        self.assertEqual(jan.phone_normalized, '48123456789')
+        self.assertEqual(jan.get_tags_list(), ['b2b', 'vip'])
+
+    def test_companies_resolved_by_name_and_created(self):
+        ContactImporter(self.create_job()).run()
+
+        self.assertEqual(Contact.objects.get(email='anna@example.com').company, self.acme)
+        adam = Contact.objects.get(email='adam@example.com')
+        self.assertEqual(adam.company.name, 'Nowa Firma')
+        self.assertEqual(adam.company.nip, '9876543210')
+        self.acme.refresh_from_db()
+        self.assertEqual(self.acme.contacts_count, 2)
+        self.assertEqual(adam.company.contacts_count, 1)
+
+    def test_tag_usage_count_and_search_index(self):
+        ContactImporter(self.create_job()).run()
+
+        self.assertEqual(Tag.objects.get(owner=self.user, name='vip').usage_count, 2)
+        results = search(Contact.objects.filter(owner=self.user), 'kowalski', owner=self.user)
+        self.assertEqual([contact.email for contact in results], ['jan@example.com'])
+
+    def test_cp1250_file_from_excel(self):
+        job = ContactImporter(self.create_job(encoding='cp1250')).run()
+
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.created_count, 3)
+        self.assertEqual(Contact.objects.get(email='adam@example.com').last_name, 'Mały')
+
+    def test_reimport_of_csv_export(self):
+        """Plik z eksportu kontaktów wraca do bazy z tymi samymi wartościami"""
+        Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', phone='+48 123 456 789',
+            mobile='-', position='=Prezes', owner=self.user
+        )
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('exports:export', args=['contacts']))
+        content = b''.join(response.streaming_content).decode('utf-8')
+        Contact.objects.all().delete()
+
+        job = ContactImporter(self.create_job(content)).run()
+
+        self.assertEqual(job.created_count, 2)
+        jan = Contact.objects.get(email='jan@example.com')
+        self.assertEqual((jan.phone, jan.mobile, jan.position), ('+48 123 456 789', '-', '=Prezes'))
+
+    def test_resume_after_failure(self):
+        """Paczka zapisana przed awarią nie jest importowana drugi raz"""
+        job = self.create_job()
+        original = ContactImporter._import_chunk
+        calls = []
+
+        def failing_import_chunk(importer, rows, columns):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError('awaria bazy')
+            return original(importer, rows, columns)
+
+        with mock.patch.object(ContactImporter, '_import_chunk', failing_import_chunk):
+            with self.assertRaises(RuntimeError):
+                ContactImporter(job, chunk_size=2).run()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.rows_processed, 2)
+
+        ContactImporter(job, chunk_size=2).run()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.rows_processed, 6)
+        self.assertEqual(job.created_count, 3)
+        self.assertEqual(Contact.objects.filter(owner=self.user).count(), 4)
+
+
+class TestImportCommandAndView(ImportTestCase):
+    """Komenda import_contacts i strona importu"""
+
+    def test_command(self):
+        path = f'{self.media_root}/kontakty.csv'
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(CSV_CONTENT)
+        out = io.StringIO()
+        call_command('import_contacts', path, user='testuser', stdout=out)
+
+        self.assertIn('utworzono 3 kontaktow', out.getvalue())
+        self.assertEqual(ImportJob.objects.get().status, 'done')
+
+    def test_upload_view(self):
+        self.client.login(username='testuser', password='testpass123')
+        upload = SimpleUploadedFile('kontakty.csv', CSV_CONTENT.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(reverse('contacts:contact_import'), {'file': upload})
+
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse('contacts:import_job_detail', args=[job.pk]))
+        self.assertEqual(job.created_count, 3)
+
+    @override_settings(CONTACT_IMPORT_INLINE_MAX_BYTES=10)
+    def test_large_upload_waits_for_command(self):
+        self.client.login(username='testuser', password='testpass123')
+        upload = SimpleUploadedFile('kontakty.csv', CSV_CONTENT.encode('utf-8'), content_type='text/csv')
+        self.client.post(reverse('contacts:contact_import'), {'file': upload})
+        self.assertEqual(ImportJob.objects.get().status, 'pending')
+
+        call_command('import_contacts', pending=True, stdout=io.StringIO())
+        self.assertEqual(ImportJob.objects.get().status, 'done')
+
+    def test_undecodable_upload_shows_error(self):
+        self.client.login(username='testuser', password='testpass123')
+        # 0x98 nie jest poprawnym UTF-8 ani znakiem cp1250
+        upload = SimpleUploadedFile('kontakty.csv', b'Imi\x98;Nazwisko;Email\n', content_type='text/csv')
+        response = self.client.post(reverse('contacts:contact_import'), {'file': upload}, follow=True)
+
+        job = ImportJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertContains(response, 'zapisz go jako CSV UTF-8')
+
+    def test_pending_failure_does_not_block_next_jobs(self):
+        broken = ImportJob(owner=self.user)
+        broken.file.save('zepsuty.csv', ContentFile(b'Imi\x98;Nazwisko;Email\n'), save=False)
+        broken.save()
+        job = self.create_job()
+
+        with self.assertRaisesMessage(CommandError, f'Nieudane importy: #{broken.pk}'):
+            call_command('import_contacts', pending=True, stdout=io.StringIO(), stderr=io.StringIO())
+
+        broken.refresh_from_db()
+        job.refresh_from_db()
+        self.assertEqual((broken.status, job.status), ('failed', 'done'))
+
+    def test_pending_skips_job_claimed_by_another_run(self):
+        job = self.create_job()
+        original = ImportJob.objects.filter
+
+        def claimed_meanwhile(*args, **kwargs):
+            # Inne uruchomienie przejmuje import między odczytem listy a przejęciem
+            if kwargs == {'pk': job.pk, 'status': 'pending'}:
+                ImportJob.objects.all().update(status='running')
+            return original(*args, **kwargs)
+
+        with mock.patch.object(ImportJob.objects, 'filter', side_effect=claimed_meanwhile):
+            out = io.StringIO()
+            call_command('import_contacts', pending=True, stdout=out)
+
+        self.assertIn('jest juz wykonywany', out.getvalue())
+        self.assertEqual(Contact.objects.filter(owner=self.user).count(), 1)
+
+    def test_job_is_visible_only_to_owner(self):
+        job = self.create_job()
+        User.objects.create_user(username='otheruser', password='otherpass123')
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(reverse('contacts:import_job_detail', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
@@ -6,7 +6,8 @@ CZYTAJ UWAŻNIE KOMENTARZE - Wszystko jest wyjaśnione krok po kroku!
 
 from django.test import TestCase
 from django.contrib.auth.models import User
-from contacts.models import Contact, Company
+from contacts.models import Contact, Company, Tag, parse_tags
+from contacts.phone import normalize_phone
 
 
 class TestContactModel(TestCase):
@@ -123,23 +124,23 @@ class TestContactModel(TestCase):
         """
         Test 5: Sprawdzamy metodę get_tags_list()
 
+        Tagi są osobną tabelą (Tag) powiązaną relacją many-to-many.
         Testujemy różne przypadki (edge cases):
-        1. Brak tagów (puste pole)
+        1. Brak tagów
         2. Jeden tag
-        3. Wiele tagów
+        3. Wiele tagów (parse_tags usuwa spacje i duplikaty)
         """
         # Przypadek 1: Brak tagów
-        self.contact.tags = ''
         result = self.contact.get_tags_list()
         self.assertEqual(result, [])
 
         # Przypadek 2: Jeden tag
-        self.contact.tags = 'vip'
+        self.contact.set_tags(parse_tags('vip'))
         result = self.contact.get_tags_list()
         self.assertEqual(result, ['vip'])
 
-        # Przypadek 3: Wiele tagów (ze spacjami)
-        self.contact.tags = 'vip, partner, złoty klient'
+        # Przypadek 3: Wiele tagów (ze spacjami i powtórzeniem)
+        self.contact.set_tags(parse_tags('vip,  partner, złoty klient, VIP'))
         result = self.contact.get_tags_list()
         # Sprawdzamy czy są 3 tagi i czy są oczyszczone ze spacji
         self.assertEqual(len(result), 3)
@@ -292,6 +293,93 @@ class TestCompanyModel(TestCase):
         self.assertEqual(self.company.contacts.count(), 2)
 
 
+
+class TestPhoneNormalization(TestCase):
+    """
+    Testy normalizacji numerów telefonów do E.164
+
+    Różne zapisy tego samego numeru muszą dać ten sam wynik,
+    bo po nim wyszukujemy dzwoniącego.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_normalize_phone_formats(self):
+        for raw in ['+48 123 456 789', '0048 123-456-789', '123 456 789', '(+48) 123456789']:
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_phone(raw), '48123456789')
+
+    def test_normalize_foreign_and_empty(self):
+        self.assertEqual(normalize_phone('+49 30 1234567'), '49301234567')
+        self.assertEqual(normalize_phone(''), '')
+        self.assertEqual(normalize_phone('brak'), '')
+
+    def test_contact_save_fills_normalized_columns(self):
+        contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com',
+            phone='+48 123 456 789', mobile='600-700-800', owner=self.user
+        )
+        self.assertEqual(contact.phone_normalized, '48123456789')
+        self.assertEqual(contact.mobile_normalized, '48600700800')
+
+        # update_fields też aktualizuje kolumnę znormalizowaną
+        contact.phone = '22 111 22 33'
+        contact.save(update_fields=['phone'])
+        contact.refresh_from_db()
+        self.assertEqual(contact.phone_normalized, '48221112233')
+
+    def test_company_save_fills_normalized_column(self):
+        company = Company.objects.create(name='Firma', phone='0048 22 111 22 33', owner=self.user)
+        self.assertEqual(company.phone_normalized, '48221112233')
+
+
+class TestTagUsageCount(TestCase):
+    """
+    Testy liczników Tag.usage_count
+
+    Licznik jest aktualizowany przyrostowo przy każdej zmianie tagów
+    kontaktu (sygnały m2m_changed i pre_delete).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.jan = Contact.objects.create(first_name='Jan', last_name='Kowalski', email='jan@example.com', owner=self.user)
+        self.anna = Contact.objects.create(first_name='Anna', last_name='Nowak', email='anna@example.com', owner=self.user)
+
+    def usage(self, name):
+        return Tag.objects.get(owner=self.user, name=name).usage_count
+
+    def test_counts_follow_set_tags(self):
+        self.jan.set_tags(['vip', 'partner'])
+        self.anna.set_tags(['vip'])
+        self.assertEqual(self.usage('vip'), 2)
+        self.assertEqual(self.usage('partner'), 1)
+
+        self.jan.set_tags(['partner'])
+        self.assertEqual(self.usage('vip'), 1)
+        self.assertEqual(self.usage('partner'), 1)
+
+    def test_counts_after_clear_and_delete(self):
+        self.jan.set_tags(['vip'])
+        self.anna.set_tags(['vip'])
+
+        self.jan.tags.clear()
+        self.assertEqual(self.usage('vip'), 1)
+
+        self.anna.delete()
+        self.assertEqual(self.usage('vip'), 0)
+
+    def test_tags_are_per_owner(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        other = Contact.objects.create(first_name='Ktoś', last_name='Inny', email='inny@example.com', owner=other_user)
+
+        self.jan.set_tags(['vip'])
+        other.set_tags(['vip'])
+
+        self.assertEqual(Tag.objects.filter(name='vip').count(), 2)
+        self.assertEqual(self.usage('vip'), 1)
+
 # PODSUMOWANIE CO NAUCZYŁEŚ SIĘ:
 # 1. setUp() - przygotowanie danych przed każdym testem
 # 2. assertEqual() - sprawdzanie równości
@@ -4,10 +4,18 @@ Testy dla widoków Contact i Company
 CZYTAJ UWAŻNIE - Tutaj uczysz się testowania widoków Django!
 """
 
+from datetime import timedelta
+
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 from contacts.models import Contact, Company
+from interactions.models import Interaction
+from opportunities.models import Opportunity
+from tasks.models import Task
 
 
 class TestContactListView(TestCase):
@@ -183,6 +191,135 @@ class TestContactListView(TestCase):
         self.assertEqual(contacts[0].status, 'lead')
 
 
+
+class TestContactListPagination(TestCase):
+    """
+    Testy paginacji kursorowej listy kontaktów
+
+    Kursor zapamiętuje (last_name, first_name, id) ostatniego wiersza,
+    więc kolejne strony nie używają OFFSET.
+    """
+
+    def setUp(self):
+        """Tworzymy 5 kontaktów o nazwiskach A..E"""
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for index, last_name in enumerate(['Adamski', 'Bednarek', 'Cieślak', 'Dudek', 'Emerson']):
+            Contact.objects.create(
+                first_name='Jan',
+                last_name=last_name,
+                email=f'jan{index}@example.com',
+                status='lead' if index % 2 == 0 else 'customer',
+                owner=self.user
+            )
+        self.client.login(username='testuser', password='testpass123')
+
+    def get_list(self, **params):
+        return self.client.get(reverse('contacts:contact_list'), data=params)
+
+    def test_first_page_respects_page_size(self):
+        """Pierwsza strona ma page_size wierszy i kursor do następnej"""
+        response = self.get_list(page_size=2)
+
+        names = [contact.last_name for contact in response.context['contacts']]
+        self.assertEqual(names, ['Adamski', 'Bednarek'])
+        self.assertTrue(response.context['page'].has_next)
+        self.assertFalse(response.context['page'].has_previous)
+
+    def test_next_and_previous_cursors(self):
+        """Przechodzimy do przodu i wracamy kursorem 'poprzednia'"""
+        first = self.get_list(page_size=2)
+        second = self.get_list(page_size=2, cursor=first.context['page'].next_cursor)
+        self.assertEqual(
+            [contact.last_name for contact in second.context['contacts']],
+            ['Cieślak', 'Dudek']
+        )
+
+        third = self.get_list(page_size=2, cursor=second.context['page'].next_cursor)
+        self.assertEqual([contact.last_name for contact in third.context['contacts']], ['Emerson'])
+        self.assertFalse(third.context['page'].has_next)
+
+        back = self.get_list(page_size=2, cursor=third.context['page'].previous_cursor)
+        self.assertEqual(
+            [contact.last_name for contact in back.context['contacts']],
+            ['Cieślak', 'Dudek']
+        )
+        self.assertTrue(back.context['page'].has_previous)
+
+    def test_filters_are_kept_between_pages(self):
+        """Filtr statusu działa także na kolejnych stronach"""
+        first = self.get_list(page_size=1, status='lead')
+        self.assertIn('status=lead', first.context['query_string'])
+
+        second = self.get_list(page_size=1, status='lead', cursor=first.context['page'].next_cursor)
+        self.assertEqual(second.context['contacts'][0].last_name, 'Cieślak')
+
+    def test_filter_by_tag(self):
+        """Filtr po tagu (JOIN przez tabelę kontakt-tag)"""
+        contact = Contact.objects.get(last_name='Dudek')
+        contact.set_tags(['vip'])
+        tag = contact.tags.get()
+
+        response = self.get_list(tag=tag.pk)
+
+        self.assertEqual(list(response.context['contacts']), [contact])
+        self.assertContains(response, '<span class="badge bg-secondary">vip</span>', html=True)
+
+    def test_invalid_cursor_shows_first_page(self):
+        """Uszkodzony kursor nie powoduje błędu - pokazujemy pierwszą stronę"""
+        response = self.get_list(page_size=2, cursor='to-nie-jest-kursor')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['contacts'][0].last_name, 'Adamski')
+
+    def test_approximate_total(self):
+        """Liczba wyników jest liczona tylko do limitu"""
+        with self.settings(CONTACT_LIST_COUNT_LIMIT=3):
+            response = self.get_list()
+
+        self.assertEqual(response.context['total_count'], 3)
+        self.assertFalse(response.context['total_is_exact'])
+
+
+class TestPhoneLookupView(TestCase):
+    """Testy identyfikacji dzwoniącego po numerze telefonu"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+
+        self.company = Company.objects.create(name='Acme', phone='+48 22 111 22 33', owner=self.user)
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com',
+            mobile='+48 600 700 800', company=self.company, owner=self.user
+        )
+        Contact.objects.create(
+            first_name='Inny', last_name='Użytkownik', email='inny@example.com',
+            mobile='600700800', owner=self.other_user
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_lookup_matches_differently_formatted_number(self):
+        response = self.client.get(reverse('contacts:phone_lookup'), data={'number': '0048600700800'})
+
+        data = response.json()
+        self.assertEqual(data['number'], '48600700800')
+        self.assertEqual([item['id'] for item in data['contacts']], [self.contact.pk])
+        self.assertEqual(data['contacts'][0]['company'], 'Acme')
+
+    def test_lookup_finds_company(self):
+        response = self.client.get(reverse('contacts:phone_lookup'), data={'number': '22 111 22 33'})
+
+        data = response.json()
+        self.assertEqual([item['id'] for item in data['companies']], [self.company.pk])
+        self.assertEqual(data['contacts'], [])
+
+    def test_lookup_without_number(self):
+        response = self.client.get(reverse('contacts:phone_lookup'))
+
+        self.assertEqual(response.json()['contacts'], [])
+
 class TestContactDetailView(TestCase):
     """
     Testy dla widoku szczegółów kontaktu
@@ -275,6 +412,49 @@ class TestContactDetailView(TestCase):
         self.assertEqual(contact.company, company)
 
 
+    def detail_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('contacts:contact_detail', args=[self.contact.pk]))
+        return response, len(queries)
+
+    def test_contact_360_uses_bounded_prefetches(self):
+        """
+        Test: Widok 360 - ostatnie interakcje, otwarte zadania i szanse,
+        ze stałą liczbą zapytań niezależnie od długości historii
+        """
+        self.client.login(username='testuser', password='testpass123')
+        now = timezone.now()
+
+        def add_history(count, offset=0):
+            for i in range(offset, offset + count):
+                Interaction.objects.create(
+                    contact=self.contact, interaction_type='call', subject=f'Rozmowa {i}', description='',
+                    interaction_date=now - timedelta(days=100 - i), owner=self.user,
+                )
+                Task.objects.create(
+                    contact=self.contact, title=f'Zadanie {i}', due_date=now + timedelta(days=i), owner=self.user,
+                )
+                Opportunity.objects.create(
+                    contact=self.contact, name=f'Szansa {i}', amount=100, owner=self.user,
+                    expected_close_date=timezone.localdate() + timedelta(days=i),
+                )
+
+        add_history(1)
+        _response, queries_small = self.detail_queries()
+
+        add_history(11, offset=1)
+        Task.objects.filter(title='Zadanie 0').update(status='done', completed_at=now)
+        Opportunity.objects.filter(name='Szansa 0').update(stage='closed_lost')
+        response, queries_large = self.detail_queries()
+
+        self.assertEqual(queries_small, queries_large)
+        contact = response.context['contact']
+        self.assertEqual([i.subject for i in contact.latest_interactions], [f'Rozmowa {i}' for i in range(11, 6, -1)])
+        self.assertEqual([t.title for t in contact.latest_open_tasks], [f'Zadanie {i}' for i in range(1, 6)])
+        self.assertEqual([o.name for o in contact.latest_open_opportunities], [f'Szansa {i}' for i in range(1, 6)])
+        self.assertContains(response, 'Interakcje (12)')
+        self.assertContains(response, f"{reverse('interactions:interaction_list')}?contact={self.contact.pk}")
+
 class TestContactCreateView(TestCase):
     """
     Testy dla tworzenia nowego kontaktu
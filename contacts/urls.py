@@ -10,6 +10,13 @@ urlpatterns = [
     path('create/', views.contact_create, name='contact_create'),
     path('<int:pk>/update/', views.contact_update, name='contact_update'),
     path('<int:pk>/delete/', views.contact_delete, name='contact_delete'),
+    path('lookup/phone/', views.phone_lookup, name='phone_lookup'),
+    path('import/', views.contact_import, name='contact_import'),
+    path('import/<int:pk>/', views.import_job_detail, name='import_job_detail'),
+    path('duplicates/', views.duplicate_list, name='duplicate_list'),
+    path('duplicates/refresh/', views.duplicate_refresh, name='duplicate_refresh'),
+    path('duplicates/<int:pk>/merge/', views.duplicate_merge, name='duplicate_merge'),
+    path('duplicates/<int:pk>/dismiss/', views.duplicate_dismiss, name='duplicate_dismiss'),
 
     # Company URLs
     path('companies/', views.company_list, name='company_list'),
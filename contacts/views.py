@@ -1,9 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
-from .models import Contact, Company
-from .forms import ContactForm, CompanyForm, ContactSearchForm, CompanySearchForm
+from django.conf import settings
+from django.db.models import F, Prefetch
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from mini_crm.pagination import KeysetPaginator, approximate_count, get_page_size
+from activities.feed import feed_queryset, get_feed_page
+from interactions.models import Interaction
+from opportunities.models import Opportunity
+from tasks.models import Task
+from .models import Contact, Company, DuplicateCandidate, ImportJob
+from .dedupe import merge_contacts, pending_candidates, refresh_candidates
+from .importer import ContactImporter, ImportFileError
+from .phone import normalize_phone, contacts_by_phone, companies_by_phone
+from .forms import ContactForm, CompanyForm, ContactSearchForm, CompanySearchForm, ContactImportForm
+
+# Maksymalna liczba zarchiwizowanych interakcji na karcie kontaktu
+ARCHIVED_INTERACTIONS_LIMIT = 100
+# Ostatnie interakcje, otwarte zadania i szanse na karcie kontaktu (każdej z list)
+CONTACT_DETAIL_ITEMS = 5
+# Aktywności na karcie kontaktu / firmy (pełny strumień: activities:activity_feed)
+RECENT_ACTIVITIES_LIMIT = 10
 
 
 # Contact Views
@@ -11,45 +31,94 @@ from .forms import ContactForm, CompanyForm, ContactSearchForm, CompanySearchFor
 @login_required
 def contact_list(request):
     """Lista kontaktów z wyszukiwaniem i filtrowaniem"""
-    contacts = Contact.objects.filter(owner=request.user).select_related('company')
+    contacts = Contact.objects.filter(owner=request.user).select_related('company').prefetch_related('tags')
+    ordering = ('last_name', 'first_name', 'id')
 
     search_form = ContactSearchForm(request.GET, user=request.user)
+    contacts = search_form.filter_queryset(contacts)
+    if search_form.is_valid() and search_form.cleaned_data.get('query'):
+        # Przy wyszukiwaniu najlepiej dopasowane na górze
+        ordering = ('-search_rank',) + ordering
+
+    # Paginacja kursorowa po (last_name, first_name, id) - indeks contact_owner_name_idx
+    page_size = get_page_size(
+        request,
+        default=settings.CONTACT_LIST_PAGE_SIZE,
+        maximum=settings.CONTACT_LIST_MAX_PAGE_SIZE,
+    )
+    paginator = KeysetPaginator(contacts, ordering=ordering, page_size=page_size)
+    page = paginator.get_page(request.GET.get('cursor'))
 
-    if search_form.is_valid():
-        query = search_form.cleaned_data.get('query')
-        status = search_form.cleaned_data.get('status')
-        company = search_form.cleaned_data.get('company')
-
-        if query:
-            contacts = contacts.filter(
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(email__icontains=query) |
-                Q(phone__icontains=query) |
-                Q(mobile__icontains=query)
-            )
-
-        if status:
-            contacts = contacts.filter(status=status)
+    # Parametry filtrów bez kursora - do budowania linków następna/poprzednia
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
 
-        if company:
-            contacts = contacts.filter(company=company)
+    total_count, total_is_exact = None, True
+    if settings.CONTACT_LIST_COUNT_LIMIT:
+        total_count, total_is_exact = approximate_count(contacts, settings.CONTACT_LIST_COUNT_LIMIT)
 
     context = {
-        'contacts': contacts,
+        'contacts': page.object_list,
+        'page': page,
         'search_form': search_form,
-        'total_count': contacts.count(),
+        'query_string': query_params.urlencode(),
+        'total_count': total_count,
+        'total_is_exact': total_is_exact,
     }
     return render(request, 'contacts/contact_list.html', context)
 
 
 @login_required
 def contact_detail(request, pk):
-    """Szczegóły kontaktu"""
-    contact = get_object_or_404(Contact, pk=pk, owner=request.user)
+    """
+    Szczegóły kontaktu (widok 360)
+
+    Ostatnie interakcje, otwarte zadania i otwarte szanse sprzedaży są
+    pobierane przez Prefetch z wycinkiem - Django ogranicza je w SQL funkcją
+    okna (ROW_NUMBER() OVER (PARTITION BY contact_id ...)), więc liczba
+    zapytań i wczytanych wierszy nie rośnie z historią kontaktu. Liczby
+    wszystkich są w licznikach kontaktu (contacts/counters.py).
+    """
+    contact = get_object_or_404(
+        Contact.objects.prefetch_related(
+            'tags',
+            Prefetch(
+                'interactions',
+                queryset=Interaction.objects.filter(owner=request.user)
+                .order_by('-interaction_date', '-id')[:CONTACT_DETAIL_ITEMS],
+                to_attr='latest_interactions',
+            ),
+            Prefetch(
+                'tasks',
+                queryset=Task.objects.filter(owner=request.user).open()
+                .order_by(F('due_date').asc(nulls_last=True), 'id')[:CONTACT_DETAIL_ITEMS],
+                to_attr='latest_open_tasks',
+            ),
+            Prefetch(
+                'opportunities',
+                queryset=Opportunity.objects.filter(owner=request.user).exclude(stage__in=Opportunity.CLOSED_STAGES)
+                .order_by('expected_close_date', 'id')[:CONTACT_DETAIL_ITEMS],
+                to_attr='latest_open_opportunities',
+            ),
+        ),
+        pk=pk,
+        owner=request.user,
+    )
+
+    # Zarchiwizowane interakcje (interactions/archive.py) - lista tylko na życzenie (?archived=1)
+    archived = contact.archived_interactions.all()
+    archived_interactions = None
+    if request.GET.get('archived'):
+        archived_interactions = archived.defer('payload')[:ARCHIVED_INTERACTIONS_LIMIT]
+
+    activities = get_feed_page(feed_queryset(request.user, contact=contact), page_size=RECENT_ACTIVITIES_LIMIT)
 
     context = {
         'contact': contact,
+        'recent_activities': activities.object_list,
+        'more_activities': activities.has_next,
+        'archived_count': archived.count(),
+        'archived_interactions': archived_interactions,
     }
     return render(request, 'contacts/contact_detail.html', context)
 
@@ -73,6 +142,105 @@ def contact_create(request):
     return render(request, 'contacts/contact_form.html', context)
 
 
+@login_required
+def contact_import(request):
+    """Import kontaktów z pliku CSV"""
+    if request.method == 'POST':
+        form = ContactImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            job = ImportJob.objects.create(owner=request.user, file=upload)
+
+            # Małe pliki importujemy od razu, duże czekają na komendę import_contacts --pending
+            if upload.size <= settings.CONTACT_IMPORT_INLINE_MAX_BYTES:
+                try:
+                    ContactImporter(job).run()
+                except ImportFileError as exc:
+                    messages.error(request, f'Nie można zaimportować pliku: {exc}')
+                else:
+                    messages.success(request, f'Zaimportowano {job.created_count} kontakt(ów).')
+            else:
+                messages.info(request, 'Plik został przyjęty - import zostanie wykonany w tle.')
+            return redirect('contacts:import_job_detail', pk=job.pk)
+    else:
+        form = ContactImportForm()
+
+    context = {
+        'form': form,
+        'jobs': ImportJob.objects.filter(owner=request.user)[:10],
+    }
+    return render(request, 'contacts/contact_import.html', context)
+
+
+@login_required
+def import_job_detail(request, pk):
+    """Postęp i wynik importu"""
+    job = get_object_or_404(ImportJob, pk=pk, owner=request.user)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'status': job.status,
+            'rows_processed': job.rows_processed,
+            'created_count': job.created_count,
+            'duplicate_count': job.duplicate_count,
+            'error_count': job.error_count,
+        })
+    return render(request, 'contacts/import_job_detail.html', {'job': job})
+
+
+@login_required
+def duplicate_list(request):
+    """Kolejka potencjalnych duplikatów do przeglądu"""
+    candidates = pending_candidates(request.user)
+    paginator = KeysetPaginator(candidates, ordering=('-score', 'id'), page_size=settings.CONTACT_LIST_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get('cursor'))
+
+    context = {
+        'candidates': page.object_list,
+        'page': page,
+    }
+    return render(request, 'contacts/duplicate_list.html', context)
+
+
+@login_required
+@require_POST
+def duplicate_refresh(request):
+    """Przeliczenie kolejki duplikatów użytkownika"""
+    count = refresh_candidates(request.user)
+    messages.success(request, f'Znaleziono {count} par(y) do przeglądu.')
+    return redirect('contacts:duplicate_list')
+
+
+@login_required
+@require_POST
+def duplicate_merge(request, pk):
+    """Scalenie pary - kontakt wskazany w polu 'primary' zostaje, drugi jest usuwany"""
+    candidate = get_object_or_404(
+        DuplicateCandidate.objects.select_related('contact_a', 'contact_b'),
+        pk=pk, owner=request.user, status='pending'
+    )
+    if request.POST.get('primary') == str(candidate.contact_b_id):
+        primary, duplicate = candidate.contact_b, candidate.contact_a
+    else:
+        primary, duplicate = candidate.contact_a, candidate.contact_b
+
+    duplicate_name = duplicate.get_full_name()
+    merge_contacts(primary, duplicate)
+    messages.success(request, f'Kontakt {duplicate_name} został scalony z {primary.get_full_name()}.')
+    return redirect('contacts:duplicate_list')
+
+
+@login_required
+@require_POST
+def duplicate_dismiss(request, pk):
+    """Oznaczenie pary jako różnych kontaktów"""
+    candidate = get_object_or_404(DuplicateCandidate, pk=pk, owner=request.user, status='pending')
+    candidate.status = 'dismissed'
+    candidate.reviewed_at = timezone.now()
+    candidate.save(update_fields=['status', 'reviewed_at'])
+    messages.info(request, 'Para została oznaczona jako różne kontakty.')
+    return redirect('contacts:duplicate_list')
+
+
 @login_required
 def contact_update(request, pk):
     """Edycja kontaktu"""
@@ -112,30 +280,52 @@ def contact_delete(request, pk):
     return render(request, 'contacts/contact_confirm_delete.html', context)
 
 
-# Company Views
-
 @login_required
-def company_list(request):
-    """Lista firm z wyszukiwaniem i filtrowaniem"""
-    companies = Company.objects.filter(owner=request.user).annotate(
-        contacts_count=Count('contacts')
+def phone_lookup(request):
+    """
+    Identyfikacja dzwoniącego (caller ID) dla centrali telefonicznej
+
+    GET ?number=+48123456789 -> JSON z kontaktami i firmami o tym numerze.
+    Numer jest normalizowany do E.164, więc zapytanie to dokładne
+    porównanie po indeksie (owner, phone_normalized).
+    """
+    number = request.GET.get('number', '')
+    contacts = contacts_by_phone(
+        Contact.objects.filter(owner=request.user).select_related('company'), number
     )
+    companies = companies_by_phone(Company.objects.filter(owner=request.user), number)
+
+    return JsonResponse({
+        'number': normalize_phone(number),
+        'contacts': [
+            {
+                'id': contact.pk,
+                'name': contact.get_full_name(),
+                'company': contact.company.name if contact.company else None,
+                'url': reverse('contacts:contact_detail', args=[contact.pk]),
+            }
+            for contact in contacts[:20]
+        ],
+        'companies': [
+            {
+                'id': company.pk,
+                'name': company.name,
+                'url': reverse('contacts:company_detail', args=[company.pk]),
+            }
+            for company in companies[:20]
+        ],
+    })
 
-    search_form = CompanySearchForm(request.GET)
 
-    if search_form.is_valid():
-        query = search_form.cleaned_data.get('query')
-        industry = search_form.cleaned_data.get('industry')
+# Company Views
 
-        if query:
-            companies = companies.filter(
-                Q(name__icontains=query) |
-                Q(nip__icontains=query) |
-                Q(email__icontains=query)
-            )
+@login_required
+def company_list(request):
+    """Lista firm z wyszukiwaniem i filtrowaniem"""
+    companies = Company.objects.filter(owner=request.user)
 
-        if industry:
-            companies = companies.filter(industry__icontains=industry)
+    search_form = CompanySearchForm(request.GET, user=request.user)
+    companies = search_form.filter_queryset(companies)
 
     context = {
         'companies': companies,
@@ -150,10 +340,13 @@ def company_detail(request, pk):
     """Szczegóły firmy"""
     company = get_object_or_404(Company, pk=pk, owner=request.user)
     contacts = company.contacts.all()
+    activities = get_feed_page(feed_queryset(request.user, company=company), page_size=RECENT_ACTIVITIES_LIMIT)
 
     context = {
         'company': company,
         'contacts': contacts,
+        'recent_activities': activities.object_list,
+        'more_activities': activities.has_next,
     }
     return render(request, 'contacts/company_detail.html', context)
 
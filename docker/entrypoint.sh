@@ -110,6 +110,12 @@ case "$1" in
         exec tail -f /var/log/cron.log
         ;;
 
+    reminders)
+        echo -e "${GREEN}Uruchamiam worker przypomnień o zadaniach...${NC}"
+        wait_for_db
+        exec python manage.py run_reminders
+        ;;
+
     migrate)
         echo -e "${GREEN}Uruchamiam tylko migracje...${NC}"
         wait_for_db
@@ -0,0 +1,179 @@
+"""
+Definicje eksportowanych zbiorów danych
+
+Każdy zbiór to model właściciela + formularz wyszukiwania z listy
+(eksport honoruje dokładnie te same filtry co widok listy) + lista kolumn
+pobieranych przez .values(), bez budowania instancji modeli.
+"""
+
+from datetime import date, datetime
+
+from django.utils import timezone
+
+from contacts.forms import CompanySearchForm, ContactSearchForm
+from contacts.models import Company, Contact
+from interactions.forms import InteractionSearchForm
+from interactions.models import Interaction
+from tasks.forms import TaskSearchForm
+from tasks.models import Task
+
+
+class Column:
+    """
+    Kolumna eksportu: nagłówek, lookup dla .values() i opcjonalne słownikowanie wartości
+
+    Kolumny computed nie są pobierane przez .values() - wypełnia je Dataset.enrich().
+    """
+
+    def __init__(self, header, lookup, choices=None, computed=False):
+        self.header = header
+        self.lookup = lookup
+        self.choices = dict(choices) if choices else None
+        self.computed = computed
+
+    def format(self, value):
+        if value is None:
+            return ''
+        if self.choices is not None:
+            return self.choices.get(value, value)
+        if isinstance(value, bool):
+            return 'tak' if value else 'nie'
+        if isinstance(value, datetime):
+            return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+
+
+class Dataset:
+    """Zbiór danych do eksportu"""
+
+    def __init__(self, kind, model, form_class, columns, sheet_name):
+        self.kind = kind
+        self.model = model
+        self.form_class = form_class
+        self.columns = columns
+        self.sheet_name = sheet_name
+
+    @property
+    def header(self):
+        return [column.header for column in self.columns]
+
+    def get_queryset(self, user, params):
+        """Obiekty użytkownika przefiltrowane formularzem wyszukiwania z listy"""
+        queryset = self.model.objects.filter(owner=user)
+        form = self.form_class(params, user=user)
+        return form.filter_queryset(queryset)
+
+    def enrich(self, chunk):
+        """Dodatkowe dane dla paczki wierszy (np. relacje M2M) - domyślnie brak"""
+        return chunk
+
+    def iter_chunks(self, queryset, chunk_size):
+        """
+        Paczki słowników z .values() w kolejności klucza głównego
+
+        Zamiast queryset.iterator() stronicujemy po pk (WHERE pk > ostatni
+        LIMIT n): mysqlclient buforuje cały wynik zapytania po stronie
+        klienta, więc iterator() na MySQL nie ogranicza pamięci. Każda
+        paczka to osobne, krótkie zapytanie po indeksie klucza głównego.
+        """
+        lookups = [column.lookup for column in self.columns if not column.computed]
+        queryset = queryset.order_by('pk').values('pk', *lookups)
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            chunk = list(page[:chunk_size])
+            if not chunk:
+                return
+            yield self.enrich(chunk)
+            if len(chunk) < chunk_size:
+                return
+            last_pk = chunk[-1]['pk']
+
+    def iter_rows(self, queryset, chunk_size):
+        """Gotowe wiersze (listy wartości) w kolejności kolumn"""
+        for chunk in self.iter_chunks(queryset, chunk_size):
+            for values in chunk:
+                yield [column.format(values[column.lookup]) for column in self.columns]
+
+
+class ContactDataset(Dataset):
+    """Kontakty - tagi (M2M) doczytywane jednym zapytaniem na paczkę"""
+
+    def enrich(self, chunk):
+        tags = {}
+        links = (
+            Contact.tags.through.objects
+            .filter(contact_id__in=[values['pk'] for values in chunk])
+            .order_by('tag__name')
+            .values_list('contact_id', 'tag__name')
+        )
+        for contact_id, name in links:
+            tags.setdefault(contact_id, []).append(name)
+        for values in chunk:
+            values['tags'] = ', '.join(tags.get(values['pk'], []))
+        return chunk
+
+
+DATASETS = {
+    'contacts': ContactDataset('contacts', Contact, ContactSearchForm, [
+        Column('ID', 'id'),
+        Column('Imię', 'first_name'),
+        Column('Nazwisko', 'last_name'),
+        Column('Email', 'email'),
+        Column('Telefon', 'phone'),
+        Column('Telefon komórkowy', 'mobile'),
+        Column('Firma', 'company__name'),
+        Column('Stanowisko', 'position'),
+        Column('Status', 'status', Contact.STATUS_CHOICES),
+        Column('Tagi', 'tags', computed=True),
+        Column('Ulica', 'street'),
+        Column('Miasto', 'city'),
+        Column('Kod pocztowy', 'postal_code'),
+        Column('Kraj', 'country'),
+        Column('Data ostatniego kontaktu', 'last_contact_date'),
+        Column('Data utworzenia', 'created_at'),
+    ], 'Kontakty'),
+    'companies': Dataset('companies', Company, CompanySearchForm, [
+        Column('ID', 'id'),
+        Column('Nazwa firmy', 'name'),
+        Column('NIP', 'nip'),
+        Column('Branża', 'industry'),
+        Column('Strona WWW', 'website'),
+        Column('Telefon', 'phone'),
+        Column('Email', 'email'),
+        Column('Ulica', 'street'),
+        Column('Miasto', 'city'),
+        Column('Kod pocztowy', 'postal_code'),
+        Column('Kraj', 'country'),
+        Column('Kod klienta ERP', 'erp_customer_code'),
+        Column('Data utworzenia', 'created_at'),
+    ], 'Firmy'),
+    'interactions': Dataset('interactions', Interaction, InteractionSearchForm, [
+        Column('ID', 'id'),
+        Column('Data interakcji', 'interaction_date'),
+        Column('Typ interakcji', 'interaction_type', Interaction.TYPE_CHOICES),
+        Column('Temat', 'subject'),
+        Column('Opis', 'description'),
+        Column('Imię kontaktu', 'contact__first_name'),
+        Column('Nazwisko kontaktu', 'contact__last_name'),
+        Column('Firma', 'company__name'),
+        Column('Czas trwania (min)', 'duration_minutes'),
+        Column('Ważne', 'is_important'),
+    ], 'Interakcje'),
+    'tasks': Dataset('tasks', Task, TaskSearchForm, [
+        Column('ID', 'id'),
+        Column('Tytuł', 'title'),
+        Column('Opis', 'description'),
+        Column('Status', 'status', Task.STATUS_CHOICES),
+        Column('Priorytet', 'priority', Task.PRIORITY_CHOICES),
+        Column('Termin wykonania', 'due_date'),
+        Column('Imię kontaktu', 'contact__first_name'),
+        Column('Nazwisko kontaktu', 'contact__last_name'),
+        Column('Firma', 'company__name'),
+        Column('Przypisane do', 'assigned_to__username'),
+        Column('Data wykonania', 'completed_at'),
+        Column('Data utworzenia', 'created_at'),
+    ], 'Zadania'),
+}
@@ -0,0 +1,76 @@
+"""
+Eksport danych do CSV / XLSX z linii poleceń
+
+Użycie:
+    python manage.py export_data --kind contacts --user jan --output kontakty.csv
+    python manage.py export_data --kind tasks --user jan --format xlsx --output zadania.xlsx
+    python manage.py export_data --kind contacts --user jan --filter status=customer --filter tag=3
+
+Filtry (--filter) mają te same nazwy co parametry formularza
+wyszukiwania na liście. Bez --output CSV trafia na standardowe wyjście.
+"""
+
+import sys
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from exports.datasets import DATASETS
+from exports.writers import FORMATS
+
+
+class Command(BaseCommand):
+    help = 'Eksportuje kontakty, firmy, interakcje lub zadania użytkownika do CSV / XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', required=True, choices=sorted(DATASETS), help='Rodzaj danych')
+        parser.add_argument('--user', required=True, help='Nazwa użytkownika (właściciela danych)')
+        parser.add_argument('--format', default='csv', choices=sorted(FORMATS), help='Format pliku (domyślnie: csv)')
+        parser.add_argument('--output', help='Ścieżka pliku wynikowego (domyślnie: stdout, tylko CSV)')
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='POLE=WARTOSC',
+            help='Filtr formularza wyszukiwania, można podać wielokrotnie',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help=f'Liczba wierszy pobieranych jednym zapytaniem (domyślnie: {settings.EXPORT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+
+        params = QueryDict(mutable=True)
+        for item in options['filter']:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Niepoprawny filtr (oczekiwano POLE=WARTOSC): {item}')
+            params.appendlist(key, value)
+
+        export_format = options['format']
+        if export_format != 'csv' and not options['output']:
+            raise CommandError('Eksport XLSX wymaga podania --output')
+
+        dataset = DATASETS[options['kind']]
+        queryset = dataset.get_queryset(user, params)
+        writer, _content_type = FORMATS[export_format]
+        stream = writer(dataset.header, dataset.iter_rows(queryset, options['chunk_size']), sheet_name=dataset.sheet_name)
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for data in stream:
+                    output.write(data)
+            self.stdout.write(self.style.SUCCESS(f">> Zapisano eksport: {options['output']}"))
+        else:
+            for data in stream:
+                sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,142 @@
+"""
+Testy eksportu CSV / XLSX
+"""
+
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from contacts.models import Contact
+from interactions.models import Interaction
+from tasks.models import Task
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+class TestExportView(TestCase):
+    """Eksport przez widok - filtry z formularzy list i izolacja danych"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        self.client.login(username='testuser', password='testpass123')
+
+        self.jan = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', status='customer', owner=self.user
+        )
+        self.jan.set_tags(['vip', 'b2b'])
+        self.anna = Contact.objects.create(
+            first_name='Anna', last_name='Nowak', email='anna@example.com', status='lead', owner=self.user
+        )
+        Contact.objects.create(
+            first_name='Obcy', last_name='Kontakt', email='obcy@example.com', owner=self.other_user
+        )
+
+    def export_url(self, kind):
+        return reverse('exports:export', args=[kind])
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(self.export_url('contacts'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_kind_returns_404(self):
+        response = self.client.get(self.export_url('users'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_format_returns_400(self):
+        response = self.client.get(self.export_url('contacts'), {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_contacts_csv(self):
+        response = self.client.get(self.export_url('contacts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        rows = read_csv(response)
+        header, data = rows[0], rows[1:]
+        self.assertEqual(len(data), 2)
+        jan = dict(zip(header, data[0]))
+        self.assertEqual(jan['Nazwisko'], 'Kowalski')
+        self.assertEqual(jan['Status'], 'Klient')
+        self.assertEqual(jan['Tagi'], 'b2b, vip')
+
+    def test_contacts_csv_honors_search_form_filters(self):
+        rows = read_csv(self.client.get(self.export_url('contacts'), {'status': 'lead'}))
+        self.assertEqual([row[2] for row in rows[1:]], ['Nowak'])
+
+        rows = read_csv(self.client.get(self.export_url('contacts'), {'query': 'kowal'}))
+        self.assertEqual([row[2] for row in rows[1:]], ['Kowalski'])
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_rows_are_fetched_in_chunks(self):
+        """Paczki po 1 wierszu - wynik taki sam, bez duplikatów i pominięć"""
+        rows = read_csv(self.client.get(self.export_url('contacts')))
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.jan.pk), str(self.anna.pk)])
+
+    def test_tasks_overdue_filter(self):
+        now = timezone.now()
+        Task.objects.create(title='Zaległe', due_date=now - timedelta(days=1), owner=self.user)
+        Task.objects.create(title='Zrobione', due_date=now - timedelta(days=1), status='done', owner=self.user)
+        Task.objects.create(title='Przyszłe', due_date=now + timedelta(days=1), owner=self.user)
+
+        rows = read_csv(self.client.get(self.export_url('tasks'), {'overdue_only': 'on'}))
+        self.assertEqual([row[1] for row in rows[1:]], ['Zaległe'])
+
+    def test_interactions_xlsx(self):
+        Interaction.objects.create(
+            contact=self.jan, interaction_type='call', subject='Rozmowa <ofertowa> & więcej',
+            description='Opis', interaction_date=timezone.now(), owner=self.user
+        )
+        response = self.client.get(self.export_url('interactions'), {'format': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('Rozmowa &lt;ofertowa&gt; &amp; więcej', sheet)
+        self.assertIn('Kowalski', sheet)
+
+    def test_formula_like_text_is_neutralized(self):
+        Interaction.objects.create(
+            contact=self.jan, interaction_type='email', subject='=HYPERLINK("http://evil.example","x")',
+            description='Opis', interaction_date=timezone.now(), owner=self.user
+        )
+        rows = read_csv(self.client.get(self.export_url('interactions')))
+        self.assertIn('\'=HYPERLINK("http://evil.example","x")', rows[1])
+
+        response = self.client.get(self.export_url('interactions'), {'format': 'xlsx'})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('<c t="inlineStr" s="1"><is><t xml:space="preserve">=HYPERLINK(', sheet)
+        self.assertIn('quotePrefix="1"', archive.read('xl/styles.xml').decode('utf-8'))
+
+
+class TestExportCommand(TestCase):
+    """Komenda export_data"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Contact.objects.create(first_name='Jan', last_name='Kowalski', email='jan@example.com', owner=self.user)
+
+    def test_export_to_file_with_filter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'kontakty.csv')
+            call_command('export_data', kind='contacts', user='testuser', output=path, filter=['status=lead'], stdout=io.StringIO())
+            with open(path, encoding='utf-8-sig', newline='') as handle:
+                rows = list(csv.reader(handle))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], 'Kowalski')
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+
+from .datasets import DATASETS
+from .writers import FORMATS
+
+
+@login_required
+def export_view(request, kind):
+    """
+    Eksport listy do CSV / XLSX
+
+    Parametry GET są te same co na liście (formularz wyszukiwania),
+    dodatkowo ?format=csv|xlsx. Odpowiedź jest strumieniowana paczkami
+    po EXPORT_CHUNK_SIZE wierszy.
+    """
+    dataset = DATASETS.get(kind)
+    if dataset is None:
+        raise Http404('Nieznany rodzaj eksportu')
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in FORMATS:
+        return HttpResponseBadRequest('Nieobsługiwany format eksportu')
+    writer, content_type = FORMATS[export_format]
+
+    queryset = dataset.get_queryset(request.user, request.GET)
+    rows = dataset.iter_rows(queryset, settings.EXPORT_CHUNK_SIZE)
+    stream = writer(dataset.header, rows, sheet_name=dataset.sheet_name)
+
+    filename = f'{kind}-{timezone.localdate():%Y%m%d}.{export_format}'
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,212 @@
+"""
+Strumieniowe formaty eksportu (CSV i XLSX)
+
+Oba writery to generatory: dostają nagłówek i iterator wierszy, zwracają
+kolejne fragmenty pliku (bytes). Nic nie jest budowane w pamięci w całości,
+więc nadają się bezpośrednio do StreamingHttpResponse i zapisu do pliku.
+
+Tekst zaczynający się od '=', '+', '-' lub '@' Excel i LibreOffice biorą
+za formułę (CSV injection - np. temat maila z importu poczty). W CSV taka
+komórka dostaje prefiks "'" (usuwany przy imporcie kontaktów -
+unescape_csv_cell()), w XLSX styl quotePrefix - komórka pokazuje
+oryginalny tekst, ale nie staje się formułą także po edycji.
+"""
+
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# Excel rozpoznaje UTF-8 w CSV tylko po BOM (inaczej "Łódź" zamienia się w krzaki)
+UTF8_BOM = '\ufeff'
+
+# Po ilu bajtach oddajemy skompresowany fragment XLSX do klienta
+XLSX_FLUSH_SIZE = 64 * 1024
+
+# Znaki sterujące niedozwolone w XML 1.0 (Excel odrzuca cały plik)
+_XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Początek tekstu, od którego arkusz kalkulacyjny zaczyna formułę
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Numery telefonów i liczby ('+48 123 456 789', '-5') nie wywołają funkcji ani
+# nie odwołają się do innej komórki - zostają bez prefiksu
+_PHONE_OR_NUMBER_RE = re.compile(r'[0-9 +()\-.,]+')
+
+
+def is_formula_like(value):
+    """Tekst, który arkusz kalkulacyjny potraktowałby jak formułę (liczby są bezpieczne)"""
+    return (
+        isinstance(value, str)
+        and value.startswith(FORMULA_PREFIXES)
+        and not _PHONE_OR_NUMBER_RE.fullmatch(value)
+    )
+
+
+def _csv_cell(value):
+    return "'" + value if is_formula_like(value) else value
+
+
+def unescape_csv_cell(value):
+    """Usuwa prefiks "'" dodany przez stream_csv() - import kontaktów czyta pliki z eksportu"""
+    if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+class _Echo:
+    """Pseudo-bufor dla csv.writer - zamiast zapisywać zwraca sformatowaną linię"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows, sheet_name=None):
+    """Generator kolejnych linii CSV (UTF-8 z BOM); sheet_name tylko dla zgodności z XLSX"""
+    writer = csv.writer(_Echo())
+    yield (UTF8_BOM + writer.writerow(header)).encode('utf-8')
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row]).encode('utf-8')
+
+
+# ========== XLSX ==========
+
+class _StreamBuffer:
+    """
+    Bufor bez seek() dla zipfile
+
+    ZipFile wykrywa brak tell()/seek() i zapisuje nagłówki lokalne
+    z data descriptorem, dzięki czemu archiwum da się wysyłać w trakcie
+    zapisu. drain() oddaje to, co do tej pory trafiło do bufora.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Styl 0 - domyślny, styl 1 - quotePrefix (tekst, który wyglądałby jak formuła)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" quotePrefix="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool):
+        value = 'tak' if value else 'nie'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    style = ' s="1"' if is_formula_like(value) else ''
+    text = escape(_XML_ILLEGAL_RE.sub('', str(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return ('<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>').encode('utf-8')
+
+
+def stream_xlsx(header, rows, sheet_name='Eksport'):
+    """
+    Generator kolejnych fragmentów pliku XLSX
+
+    Arkusz używa komórek inlineStr (bez sharedStrings.xml, który wymagałby
+    zebrania wszystkich tekstów przed zapisem). Zip64 jest włączony od razu,
+    bo rozmiaru arkusza nie znamy z góry.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(sheet_name=escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', _STYLES)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_SHEET_HEAD.encode('utf-8'))
+            sheet.write(_xlsx_row(header))
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                if buffer.size >= XLSX_FLUSH_SIZE:
+                    yield buffer.drain()
+            sheet.write(_SHEET_TAIL.encode('utf-8'))
+    yield buffer.drain()
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
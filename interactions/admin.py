@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Interaction
+from .models import ArchivedInteraction, Interaction
 
 
 @admin.register(Interaction)
@@ -8,7 +8,7 @@ class InteractionAdmin(admin.ModelAdmin):
     list_display = ['subject', 'interaction_type', 'get_related_name', 'interaction_date', 'is_important', 'owner']
     list_filter = ['interaction_type', 'is_important', 'interaction_date', 'created_at']
     search_fields = ['subject', 'description', 'contact__first_name', 'contact__last_name', 'company__name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['attachment_name', 'created_at', 'updated_at']
     date_hierarchy = 'interaction_date'
 
     fieldsets = (
@@ -19,7 +19,7 @@ class InteractionAdmin(admin.ModelAdmin):
             'fields': ('interaction_type', 'subject', 'description', 'interaction_date')
         }),
         ('Dodatkowe informacje', {
-            'fields': ('duration_minutes', 'attachments', 'is_important', 'owner')
+            'fields': ('duration_minutes', 'attachments', 'attachment_name', 'is_important', 'owner')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
@@ -31,3 +31,24 @@ class InteractionAdmin(admin.ModelAdmin):
         """Wyświetla nazwę powiązanego kontaktu lub firmy"""
         return obj.get_related_object_name()
     get_related_name.short_description = 'Powiązane z'
+
+
+@admin.register(ArchivedInteraction)
+class ArchivedInteractionAdmin(admin.ModelAdmin):
+    """Podgląd archiwum interakcji (tylko do odczytu - zapisuje komenda archive_interactions)"""
+    list_display = ['subject', 'interaction_type', 'interaction_date', 'owner', 'archived_at']
+    list_filter = ['interaction_type', 'archived_at']
+    search_fields = ['subject']
+    date_hierarchy = 'interaction_date'
+    exclude = ['payload']
+    readonly_fields = ['description']
+
+    def description(self, obj):
+        return obj.description
+    description.short_description = 'Opis'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,75 @@
+"""
+Archiwum starych interakcji
+
+Interakcje starsze niż INTERACTION_ARCHIVE_AFTER_DAYS są przenoszone
+(komenda `archive_interactions`) do tabeli ArchivedInteraction: opis i
+rzadko czytane pola są skompresowane, a tabela Interaction i jej indeksy
+zawierają tylko bieżące dane.
+
+Zarchiwizowane wiersze są zapisywane przez bulk_create z sygnałem
+post_bulk_create, więc trafiają do indeksu wyszukiwania (rodzaj
+'archived_interaction'), a ich załączniki nadal liczą się jako odwołania do
+blobów. Interakcje bieżące są usuwane jednym DELETE na paczkę, bez
+post_delete dla każdego wiersza; sygnał post_bulk_delete aktualizuje
+paczką liczniki kontaktów i firm (interaction_count obejmuje tylko
+interakcje bieżące, last_contact_date także archiwum, więc się nie cofa),
+dzienne podsumowania, indeks wyszukiwania i liczniki blobów.
+
+Odczyt (read-through):
+
+    interaction = get_interaction_or_404(request.user, pk)
+
+zwraca interakcję z tabeli bieżącej albo odtworzoną z archiwum
+(interaction.is_archived = True).
+"""
+
+from django.db import router, transaction
+from django.http import Http404
+
+from mini_crm.signals import post_bulk_create, post_bulk_delete
+
+from .models import ArchivedInteraction, Interaction
+
+
+def get_interaction_or_404(owner, pk):
+    """Interakcja właściciela - bieżąca albo z archiwum (tylko do odczytu)"""
+    interaction = Interaction.objects.filter(pk=pk, owner=owner).select_related('contact', 'company').first()
+    if interaction is not None:
+        return interaction
+    archived = ArchivedInteraction.objects.filter(pk=pk, owner=owner).first()
+    if archived is None:
+        raise Http404('Nie znaleziono interakcji')
+    return archived.as_interaction()
+
+
+def archive_interactions(cutoff, batch_size=500, owner=None):
+    """
+    Przenosi do archiwum interakcje sprzed `cutoff`
+
+    Każda paczka to osobna transakcja: zapis do archiwum i usunięcie
+    z tabeli bieżącej są widoczne razem albo wcale.
+
+    Returns:
+        Liczba przeniesionych interakcji
+    """
+    candidates = Interaction.objects.filter(interaction_date__lt=cutoff)
+    if owner is not None:
+        candidates = candidates.filter(owner=owner)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(candidates.select_for_update().order_by('pk')[:batch_size])
+            if not batch:
+                break
+            archived = ArchivedInteraction.objects.bulk_create(
+                [ArchivedInteraction.from_interaction(interaction) for interaction in batch]
+            )
+            post_bulk_create.send(sender=ArchivedInteraction, instances=archived)
+            # Na Interaction nie wskazuje żaden klucz obcy - DELETE bez kolektora i post_delete na wiersz
+            Interaction.objects.filter(pk__in=[interaction.pk for interaction in batch])._raw_delete(
+                router.db_for_write(Interaction)
+            )
+            post_bulk_delete.send(sender=Interaction, instances=batch)
+        moved += len(batch)
+    return moved
@@ -1,6 +1,8 @@
 from django import forms
 from .models import Interaction
 from contacts.models import Contact, Company
+from mini_crm.timewindows import date_range_filter
+from search.index import search
 
 
 class InteractionForm(forms.ModelForm):
@@ -111,10 +113,55 @@ class InteractionSearchForm(forms.Form):
         required=False,
         widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
     )
+    include_archived = forms.BooleanField(
+        required=False,
+        label='Szukaj także w archiwum',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
 
     def __init__(self, *args, **kwargs):
-        user = kwargs.pop('user', None)
+        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
-        if user:
-            self.fields['contact'].queryset = Contact.objects.filter(owner=user)
-            self.fields['company'].queryset = Company.objects.filter(owner=user)
+        if self.user:
+            self.fields['contact'].queryset = Contact.objects.filter(owner=self.user)
+            self.fields['company'].queryset = Company.objects.filter(owner=self.user)
+
+    def filter_queryset(self, queryset):
+        """
+        Stosuje filtry formularza do querysetu interakcji (lista i eksport)
+
+        Działa też dla ArchivedInteraction - filtrowane pola są w obu tabelach.
+        Przy wyszukiwaniu frazy queryset dostaje adnotację search_rank.
+        """
+        if not self.is_valid():
+            return queryset
+
+        query = self.cleaned_data.get('query')
+        interaction_type = self.cleaned_data.get('interaction_type')
+        contact = self.cleaned_data.get('contact')
+        company = self.cleaned_data.get('company')
+        is_important = self.cleaned_data.get('is_important')
+        date_from = self.cleaned_data.get('date_from')
+        date_to = self.cleaned_data.get('date_to')
+
+        if query:
+            # Indeks pełnotekstowy (search.index) zamiast LIKE '%...%' po długich opisach
+            queryset = search(queryset, query, owner=self.user)
+
+        if interaction_type:
+            queryset = queryset.filter(interaction_type=interaction_type)
+
+        if contact:
+            queryset = queryset.filter(contact=contact)
+
+        if company:
+            queryset = queryset.filter(company=company)
+
+        if is_important is not None:
+            queryset = queryset.filter(is_important=is_important)
+
+        if date_from or date_to:
+            # Przedział [od, do + 1 dzień) zamiast __date - bez rzutowania kolumny, z indeksem
+            queryset = queryset.filter(date_range_filter('interaction_date', date_from, date_to))
+
+        return queryset
@@ -0,0 +1,145 @@
+"""
+Import poczty jako interakcji typu 'email' (komenda `ingest_mail`)
+
+Wiadomości z plików .eml i skrzynek mbox (interactions/mail.py) są
+parsowane w puli procesów - dekodowanie MIME obciąża CPU. Proces główny:
+
+- przypisuje wiadomość do kontaktu po adresie nadawcy, a dla poczty
+  wysłanej (nadawca nie jest kontaktem) - po adresatach (To, Cc); indeks
+  adres -> kontakt właściciela jest budowany raz, w pamięci,
+- pomija wiadomości już zaimportowane: Message-ID jest unikalny w obrębie
+  właściciela (Interaction.message_id, także w archiwum), więc ponowne
+  uruchomienie na tej samej skrzynce to jedno zapytanie na paczkę,
+- zapisuje paczkę przez bulk_create i wysyła post_bulk_create (liczniki
+  kontaktów, indeks wyszukiwania, strumień aktywności).
+
+Wiadomości bez pasującego kontaktu są pomijane (newslettery, powiadomienia).
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from contacts.models import Contact
+from mini_crm.signals import post_bulk_create
+
+from .mail import iter_messages, parse_message
+from .models import ArchivedInteraction, Interaction
+
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+UNMATCHED = 'unmatched'
+INVALID = 'invalid'
+
+NO_SUBJECT = '(bez tematu)'
+
+
+def contact_index(owner):
+    """Adres e-mail (małymi literami) -> (contact_id, company_id) kontaktów właściciela"""
+    return {
+        email.lower(): (pk, company_id)
+        for email, pk, company_id in Contact.objects.filter(owner=owner).exclude(email='')
+        .values_list('email', 'pk', 'company_id')
+    }
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _known_message_ids(owner, message_ids):
+    known = set()
+    for model in (Interaction, ArchivedInteraction):
+        known.update(
+            model.objects.filter(owner=owner, message_id__in=message_ids).values_list('message_id', flat=True)
+        )
+    return known
+
+
+def _build_interaction(owner, message, contact_id, company_id):
+    return Interaction(
+        owner=owner,
+        contact_id=contact_id,
+        company_id=company_id,
+        interaction_type='email',
+        subject=(message['subject'] or NO_SUBJECT)[:Interaction._meta.get_field('subject').max_length],
+        description=message['body'],
+        interaction_date=message['date'],
+        message_id=message['message_id'],
+    )
+
+
+def _save_batch(owner, index, messages):
+    stats = Counter()
+    unique = {}
+    for message in messages:
+        if message is None:
+            stats[INVALID] += 1
+        elif message['message_id'] in unique:
+            stats[DUPLICATE] += 1
+        else:
+            unique[message['message_id']] = message
+
+    known = _known_message_ids(owner, list(unique))
+    interactions = []
+    for message_id, message in unique.items():
+        if message_id in known:
+            stats[DUPLICATE] += 1
+            continue
+        match = next((index[address] for address in message['senders'] + message['recipients'] if address in index), None)
+        if match is None:
+            stats[UNMATCHED] += 1
+            continue
+        interactions.append(_build_interaction(owner, message, *match))
+
+    if interactions:
+        with transaction.atomic():
+            Interaction.objects.bulk_create(interactions)
+            if interactions[0].pk is None:
+                # MySQL nie zwraca kluczy - Message-ID jest unikalny u właściciela, więc doczytujemy po nim
+                pks = dict(
+                    Interaction.objects.filter(owner=owner, message_id__in=[i.message_id for i in interactions])
+                    .values_list('message_id', 'pk')
+                )
+                for interaction in interactions:
+                    interaction.pk = pks[interaction.message_id]
+                    interaction._state.adding = False
+            post_bulk_create.send(sender=Interaction, instances=interactions)
+    stats[CREATED] += len(interactions)
+    return stats
+
+
+def ingest_mail(paths, owner, workers=None, batch_size=None):
+    """
+    Importuje pocztę z plików / katalogów jako interakcje właściciela
+
+    Args:
+        paths: pliki .eml, skrzynki mbox i katalogi z nimi
+        workers: liczba procesów parsujących (0 - w bieżącym procesie)
+        batch_size: liczba wiadomości zapisywanych w jednej transakcji
+
+    Returns:
+        Counter: created, duplicate, unmatched, invalid
+    """
+    workers = settings.MAIL_INGEST_WORKERS if workers is None else workers
+    batch_size = batch_size or settings.MAIL_INGEST_BATCH_SIZE
+    index = contact_index(owner)
+
+    stats = Counter()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        for raw_messages in _batches(iter_messages(paths), batch_size):
+            if executor:
+                parsed = executor.map(parse_message, raw_messages, chunksize=max(1, len(raw_messages) // (workers * 4)))
+            else:
+                parsed = map(parse_message, raw_messages)
+            stats += _save_batch(owner, index, list(parsed))
+    finally:
+        if executor:
+            executor.shutdown()
+    return stats
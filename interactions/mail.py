@@ -0,0 +1,132 @@
+"""
+Odczyt i parsowanie poczty (.eml, mbox) dla komendy `ingest_mail`
+
+Moduł nie importuje Django: parse_message() jest wykonywana w procesach
+roboczych puli (ProcessPoolExecutor), a do procesów trafiają tylko surowe
+bajty wiadomości i wracają zwykłe słowniki.
+
+    for raw in iter_messages(['/var/mail/export']):
+        message = parse_message(raw)
+        # {'message_id': '<...>', 'subject': ..., 'date': datetime (UTC),
+        #  'senders': [...], 'recipients': [...], 'body': ...} albo None
+"""
+
+import hashlib
+import html
+import mailbox
+import os
+import re
+from datetime import timezone
+from email import policy
+from email.parser import BytesParser
+from email.utils import getaddresses, parsedate_to_datetime
+
+EML_SUFFIX = '.eml'
+# Plik mbox zaczyna się od linii separatora "From nadawca data"
+MBOX_MAGIC = b'From '
+MESSAGE_ID_MAX_LENGTH = 255
+
+_SPACE_RE = re.compile(r'\s+')
+_TAG_RE = re.compile(r'<(script|style)\b.*?</\1>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+
+def _message_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def iter_messages(paths):
+    """
+    Surowe bajty kolejnych wiadomości z plików i katalogów (rekurencyjnie)
+
+    Pliki *.eml to pojedyncze wiadomości, pliki zaczynające się od "From "
+    to skrzynki mbox; pozostałe pliki są pomijane.
+    """
+    for file_name in _message_files(paths):
+        if file_name.lower().endswith(EML_SUFFIX):
+            with open(file_name, 'rb') as file:
+                yield file.read()
+            continue
+        with open(file_name, 'rb') as file:
+            if file.read(len(MBOX_MAGIC)) != MBOX_MAGIC:
+                continue
+        box = mailbox.mbox(file_name, create=False)
+        try:
+            for key in box.iterkeys():
+                yield box.get_bytes(key)
+        finally:
+            box.close()
+
+
+def _addresses(message, *headers):
+    values = [str(value) for header in headers for value in message.get_all(header, [])]
+    return [address.lower() for _name, address in getaddresses(values) if '@' in address]
+
+
+def _date(message):
+    try:
+        date = parsedate_to_datetime(str(message['Date']))
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
+
+def _decode(part):
+    """Bajty części jako UTF-8 (z zastępowaniem błędów)"""
+    return (part.get_payload(decode=True) or b'').decode('utf-8', errors='replace')
+
+
+def _body(message):
+    """Treść tekstowa - część text/plain, a bez niej text/html bez znaczników"""
+    part = message.get_body(preferencelist=('plain', 'html'))
+    if part is None:
+        return ''
+    if part.get_param('charset') is None:
+        # Brak deklaracji kodowania - w praktyce 8-bitowa poczta to UTF-8, nie ASCII
+        content = _decode(part)
+    else:
+        try:
+            content = part.get_content()
+        except (LookupError, UnicodeError):
+            # Nieznane kodowanie znaków
+            content = _decode(part)
+    if part.get_content_subtype() == 'html':
+        content = html.unescape(_TAG_RE.sub(' ', content))
+    return _BLANK_LINES_RE.sub('\n\n', content.replace('\r\n', '\n')).strip()
+
+
+def parse_message(raw):
+    """
+    Słownik z danymi wiadomości albo None (uszkodzona, bez daty)
+
+    Wiadomość bez nagłówka Message-ID dostaje identyfikator ze skrótu
+    jej bajtów - ponowny import tego samego pliku też jej nie zdubluje.
+    """
+    try:
+        message = BytesParser(policy=policy.default).parsebytes(raw)
+        date = _date(message)
+        if date is None:
+            return None
+        message_id = _SPACE_RE.sub('', str(message['Message-ID'] or ''))
+        if not message_id:
+            message_id = f'<sha256:{hashlib.sha256(raw).hexdigest()}>'
+        return {
+            'message_id': message_id[:MESSAGE_ID_MAX_LENGTH],
+            'subject': _SPACE_RE.sub(' ', str(message['Subject'] or '')).strip(),
+            'date': date,
+            'senders': _addresses(message, 'From'),
+            'recipients': _addresses(message, 'To', 'Cc'),
+            'body': _body(message),
+        }
+    except Exception:
+        # Pojedyncza uszkodzona wiadomość nie może przerwać importu całej skrzynki
+        return None
@@ -0,0 +1,66 @@
+"""
+Archiwizacja starych interakcji
+
+Użycie:
+    python manage.py archive_interactions
+    python manage.py archive_interactions --days 1095 --batch-size 1000
+    python manage.py archive_interactions --user jan --dry-run
+
+Przenosi interakcje starsze niż --days dni (domyślnie
+INTERACTION_ARCHIVE_AFTER_DAYS) do tabeli ArchivedInteraction - patrz
+interactions/archive.py. Szczegóły, pobieranie załączników, karta kontaktu
+i wyszukiwarka nadal sięgają do archiwum.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from interactions.archive import archive_interactions
+from interactions.models import Interaction
+
+
+class Command(BaseCommand):
+    help = 'Przenosi stare interakcje do archiwum'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.INTERACTION_ARCHIVE_AFTER_DAYS,
+            help=f'Archiwizuj interakcje starsze niż N dni (domyślnie: {settings.INTERACTION_ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument('--user', help='Tylko interakcje tego użytkownika (login)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Liczba interakcji przenoszonych w jednej transakcji (domyślnie: 500)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Tylko policz, nic nie przenoś')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days i --batch-size muszą być dodatnie')
+
+        owner = None
+        if options['user']:
+            owner = User.objects.filter(username=options['user']).first()
+            if owner is None:
+                raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            candidates = Interaction.objects.filter(interaction_date__lt=cutoff)
+            if owner is not None:
+                candidates = candidates.filter(owner=owner)
+            self.stdout.write(self.style.SUCCESS(
+                f'>> Do archiwizacji: {candidates.count()} interakcji sprzed {cutoff:%Y-%m-%d}'
+            ))
+            return
+
+        moved = archive_interactions(cutoff, batch_size=options['batch_size'], owner=owner)
+        self.stdout.write(self.style.SUCCESS(f'>> Przeniesiono do archiwum {moved} interakcji sprzed {cutoff:%Y-%m-%d}'))
@@ -0,0 +1,59 @@
+"""
+Import poczty (.eml, mbox) jako interakcji typu email
+
+Użycie:
+    python manage.py ingest_mail --user jan /srv/mail/jan
+    python manage.py ingest_mail --user jan eksport.mbox wyslane/ --workers 4
+    python manage.py ingest_mail --user jan /srv/mail/jan --batch-size 1000
+
+Wiadomości są przypisywane do kontaktów użytkownika po adresach nadawcy
+i adresatów; pozostałe są pomijane. Ponowne uruchomienie na tych samych
+plikach pomija wiadomości już zaimportowane (po Message-ID) - patrz
+interactions/ingest.py.
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from interactions import ingest
+
+
+class Command(BaseCommand):
+    help = 'Importuje pocztę z plików .eml i skrzynek mbox jako interakcje'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Pliki .eml, skrzynki mbox lub katalogi z nimi')
+        parser.add_argument('--user', required=True, help='Właściciel interakcji (login)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.MAIL_INGEST_WORKERS,
+            help=f'Liczba procesów parsujących, 0 = bez puli (domyślnie: {settings.MAIL_INGEST_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.MAIL_INGEST_BATCH_SIZE,
+            help=f'Liczba wiadomości w jednej transakcji (domyślnie: {settings.MAIL_INGEST_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--workers musi być >= 0, a --batch-size >= 1')
+        missing = [path for path in options['paths'] if not os.path.exists(path)]
+        if missing:
+            raise CommandError(f"Nie znaleziono: {', '.join(missing)}")
+        owner = User.objects.filter(username=options['user']).first()
+        if owner is None:
+            raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+
+        stats = ingest.ingest_mail(
+            options['paths'], owner, workers=options['workers'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'>> Poczta: {stats[ingest.CREATED]} nowych interakcji, {stats[ingest.DUPLICATE]} juz zaimportowanych, '
+            f'{stats[ingest.UNMATCHED]} bez kontaktu, {stats[ingest.INVALID]} uszkodzonych'
+        ))
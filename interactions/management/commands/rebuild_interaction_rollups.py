@@ -0,0 +1,34 @@
+"""
+Przebudowa dziennych podsumowań interakcji
+
+Użycie:
+    python manage.py rebuild_interaction_rollups
+    python manage.py rebuild_interaction_rollups --user jan
+
+Podsumowania (InteractionDailyRollup) są utrzymywane przyrostowo przez
+sygnały. Komenda liczy je od nowa z tabeli interakcji - po zmianach
+z pominięciem sygnałów (QuerySet.update(), ręczne poprawki w bazie) albo
+po zmianie TIME_ZONE (inne granice dni). Patrz interactions/rollups.py.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from interactions import rollups
+
+
+class Command(BaseCommand):
+    help = 'Przelicza dzienne podsumowania interakcji (wykresy i liczniki dashboardu)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Nazwa użytkownika (domyślnie: wszyscy)')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['user']:
+            owner = User.objects.filter(username=options['user']).first()
+            if owner is None:
+                raise CommandError(f"Nie znaleziono użytkownika: {options['user']}")
+
+        rows = rollups.rebuild(owner=owner)
+        self.stdout.write(self.style.SUCCESS(f'>> Zapisano {rows} dziennych podsumowan interakcji'))
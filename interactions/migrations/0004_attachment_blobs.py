@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:51
+
+import os
+
+import attachments.storage
+from django.db import migrations, models
+
+
+def fill_attachment_name(apps, schema_editor):
+    """Istniejące załączniki (interactions/%Y/%m/...) - nazwa z dotychczasowej ścieżki"""
+    Interaction = apps.get_model('interactions', 'Interaction')
+    rows = Interaction.objects.exclude(attachments='').exclude(attachments__isnull=True).values_list('pk', 'attachments')
+    for pk, name in rows.iterator():
+        Interaction.objects.filter(pk=pk).update(attachment_name=os.path.basename(name)[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interaction',
+            name='attachment_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Nazwa załącznika'),
+        ),
+        migrations.AlterField(
+            model_name='interaction',
+            name='attachments',
+            field=models.FileField(blank=True, max_length=200, null=True, storage=attachments.storage.attachment_storage, upload_to='', verbose_name='Załączniki'),
+        ),
+        migrations.RunPython(fill_attachment_name, migrations.RunPython.noop),
+    ]
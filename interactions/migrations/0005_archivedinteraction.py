@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('interactions', '0004_attachment_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInteraction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('interaction_type', models.CharField(choices=[('email', 'Email'), ('phone', 'Telefon'), ('meeting', 'Spotkanie'), ('note', 'Notatka'), ('call', 'Połączenie'), ('other', 'Inne')], max_length=20, verbose_name='Typ interakcji')),
+                ('subject', models.CharField(max_length=200, verbose_name='Temat')),
+                ('interaction_date', models.DateTimeField(verbose_name='Data interakcji')),
+                ('is_important', models.BooleanField(default=False, verbose_name='Oznacz jako ważne')),
+                ('attachments', models.CharField(blank=True, max_length=200, verbose_name='Załączniki')),
+                ('payload', models.BinaryField(verbose_name='Dane (zlib JSON)')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Data archiwizacji')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_interactions', to='contacts.company', verbose_name='Firma')),
+                ('contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_interactions', to='contacts.contact', verbose_name='Kontakt')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_interactions', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Zarchiwizowana interakcja',
+                'verbose_name_plural': 'Zarchiwizowane interakcje',
+                'ordering': ['-interaction_date'],
+                'indexes': [models.Index(fields=['owner', 'interaction_date', 'id'], name='archived_owner_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('interactions', '0005_archivedinteraction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedinteraction',
+            name='message_id',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Message-ID'),
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='message_id',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Message-ID'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedinteraction',
+            constraint=models.UniqueConstraint(fields=('owner', 'message_id'), name='archived_owner_msgid_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='interaction',
+            constraint=models.UniqueConstraint(fields=('owner', 'message_id'), name='interaction_owner_msgid_uniq'),
+        ),
+    ]
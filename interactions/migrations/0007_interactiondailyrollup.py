@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0006_mail_message_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dzień')),
+                ('interaction_type', models.CharField(choices=[('email', 'Email'), ('phone', 'Telefon'), ('meeting', 'Spotkanie'), ('note', 'Notatka'), ('call', 'Połączenie'), ('other', 'Inne')], max_length=20, verbose_name='Typ interakcji')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Liczba interakcji')),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='interaction_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Dzienne podsumowanie interakcji',
+                'verbose_name_plural': 'Dzienne podsumowania interakcji',
+                'ordering': ['-day', 'interaction_type'],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'day', 'interaction_type'), name='rollup_owner_day_type_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Dzienne podsumowania dla interakcji istniejących przed dodaniem InteractionDailyRollup
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def build_rollups(apps, schema_editor):
+    Interaction = apps.get_model('interactions', 'Interaction')
+    InteractionDailyRollup = apps.get_model('interactions', 'InteractionDailyRollup')
+    grouped = (
+        Interaction.objects.order_by()
+        .annotate(day=TruncDate('interaction_date', tzinfo=timezone.get_current_timezone()))
+        .values('owner_id', 'day', 'interaction_type')
+        .annotate(total=Count('pk'))
+    )
+    InteractionDailyRollup.objects.bulk_create(
+        [
+            InteractionDailyRollup(
+                owner_id=row['owner_id'], day=row['day'], interaction_type=row['interaction_type'], count=row['total']
+            )
+            for row in grouped
+        ],
+        batch_size=2000,
+    )
+
+
+def remove_rollups(apps, schema_editor):
+    apps.get_model('interactions', 'InteractionDailyRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0007_interactiondailyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_rollups, remove_rollups),
+    ]
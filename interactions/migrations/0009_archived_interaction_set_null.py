@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('interactions', '0008_build_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedinteraction',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_interactions', to='contacts.company', verbose_name='Firma'),
+        ),
+        migrations.AlterField(
+            model_name='archivedinteraction',
+            name='contact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_interactions', to='contacts.contact', verbose_name='Kontakt'),
+        ),
+    ]
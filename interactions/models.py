@@ -1,5 +1,13 @@
+import json
+import os
+import zlib
+from functools import cached_property
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.dateparse import parse_datetime
+from attachments.storage import attachment_storage
 from contacts.models import Contact, Company
 
 
@@ -46,28 +54,54 @@ class Interaction(models.Model):
         blank=True,
         help_text='Dla spotkań i połączeń'
     )
+    # Plik zapisywany raz pod skrótem zawartości (attachments/storage.py) -
+    # oryginalna nazwa pliku jest w attachment_name
     attachments = models.FileField(
         'Załączniki',
-        upload_to='interactions/%Y/%m/',
+        storage=attachment_storage,
+        max_length=200,
         blank=True,
         null=True
     )
+    attachment_name = models.CharField('Nazwa załącznika', max_length=255, blank=True, editable=False)
     is_important = models.BooleanField('Oznacz jako ważne', default=False)
+    # Nagłówek Message-ID poczty zaimportowanej przez `ingest_mail` (NULL dla pozostałych)
+    message_id = models.CharField('Message-ID', max_length=255, null=True, blank=True, editable=False)
 
     # Metadata
     owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='interactions')
     created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
     updated_at = models.DateTimeField('Data aktualizacji', auto_now=True)
 
+    # True dla obiektów odtworzonych z archiwum (ArchivedInteraction.as_interaction)
+    is_archived = False
+
     class Meta:
         verbose_name = 'Interakcja'
         verbose_name_plural = 'Interakcje'
         ordering = ['-interaction_date']
+        indexes = [
+            # Lista, oś czasu i dashboard: WHERE owner = ? [AND interaction_date >= ?]
+            # ORDER BY interaction_date DESC, id DESC (paginacja kursorowa osi czasu)
+            models.Index(fields=['owner', 'interaction_date', 'id'], name='interaction_owner_date_idx'),
+        ]
+        constraints = [
+            # Ponowny import tej samej poczty (interactions/ingest.py) - NULL-e się nie powtarzają
+            models.UniqueConstraint(fields=['owner', 'message_id'], name='interaction_owner_msgid_uniq'),
+        ]
 
     def __str__(self):
         target = self.contact or self.company or 'Brak powiązania'
         return f"{self.get_interaction_type_display()} - {target} ({self.interaction_date.strftime('%d.%m.%Y')})"
 
+    def save(self, *args, **kwargs):
+        # Nowy, jeszcze niezapisany plik - zapamiętujemy nazwę, zanim storage zamieni ją na skrót
+        if self.attachments and not self.attachments._committed:
+            self.attachment_name = os.path.basename(self.attachments.name)[:255]
+        elif not self.attachments:
+            self.attachment_name = ''
+        super().save(*args, **kwargs)
+
     def clean(self):
         from django.core.exceptions import ValidationError
         if not self.contact and not self.company:
@@ -87,3 +121,145 @@ class Interaction(models.Model):
         elif self.company:
             return self.company.name
         return 'Brak powiązania'
+
+
+class ArchivedInteraction(models.Model):
+    """
+    Interakcja przeniesiona do archiwum (komenda `archive_interactions`)
+
+    Wiersz zachowuje id interakcji, więc adresy /interactions/<id>/ działają
+    dalej (interactions/archive.py czyta z archiwum, gdy interakcji nie ma).
+    W kolumnach zostaje tylko to, po czym filtrujemy listy i wyszukiwarkę;
+    opis i pozostałe pola są w `payload` jako JSON skompresowany zlib.
+    """
+
+    # Pola przenoszone do payload (reszta ma własne kolumny)
+    PAYLOAD_FIELDS = ['description', 'duration_minutes', 'attachment_name', 'created_at', 'updated_at']
+
+    id = models.BigIntegerField(primary_key=True)
+    # SET_NULL, nie CASCADE - usunięcie kontaktu lub firmy nie kasuje historii z archiwum
+    contact = models.ForeignKey(
+        Contact,
+        on_delete=models.SET_NULL,
+        verbose_name='Kontakt',
+        related_name='archived_interactions',
+        null=True,
+        blank=True
+    )
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        verbose_name='Firma',
+        related_name='archived_interactions',
+        null=True,
+        blank=True
+    )
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='archived_interactions'
+    )
+    interaction_type = models.CharField('Typ interakcji', max_length=20, choices=Interaction.TYPE_CHOICES)
+    subject = models.CharField('Temat', max_length=200)
+    interaction_date = models.DateTimeField('Data interakcji')
+    is_important = models.BooleanField('Oznacz jako ważne', default=False)
+    # Nazwa bloba załącznika - liczona w Blob.ref_count jak Interaction.attachments
+    attachments = models.CharField('Załączniki', max_length=200, blank=True)
+    # Kolumna, nie payload - import poczty sprawdza, czy wiadomość nie trafiła już do archiwum
+    message_id = models.CharField('Message-ID', max_length=255, null=True, blank=True, editable=False)
+    payload = models.BinaryField('Dane (zlib JSON)')
+    archived_at = models.DateTimeField('Data archiwizacji', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Zarchiwizowana interakcja'
+        verbose_name_plural = 'Zarchiwizowane interakcje'
+        ordering = ['-interaction_date']
+        indexes = [
+            models.Index(fields=['owner', 'interaction_date', 'id'], name='archived_owner_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'message_id'], name='archived_owner_msgid_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_interaction_type_display()} - {self.subject} (archiwum)"
+
+    @classmethod
+    def from_interaction(cls, interaction):
+        data = {field: getattr(interaction, field) for field in cls.PAYLOAD_FIELDS}
+        return cls(
+            id=interaction.pk,
+            contact_id=interaction.contact_id,
+            company_id=interaction.company_id,
+            owner_id=interaction.owner_id,
+            interaction_type=interaction.interaction_type,
+            subject=interaction.subject,
+            interaction_date=interaction.interaction_date,
+            is_important=interaction.is_important,
+            attachments=interaction.attachments.name or '',
+            message_id=interaction.message_id,
+            payload=zlib.compress(json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')),
+        )
+
+    @cached_property
+    def data(self):
+        return json.loads(zlib.decompress(bytes(self.payload)))
+
+    @property
+    def description(self):
+        return self.data['description']
+
+    def as_interaction(self):
+        """
+        Niezapisywany obiekt Interaction z danymi z archiwum
+
+        Te same szablony i widoki (szczegóły, pobranie załącznika) obsługują
+        interakcje bieżące i zarchiwizowane; is_archived = True ukrywa edycję.
+        """
+        data = self.data
+        interaction = Interaction(
+            id=self.pk,
+            contact_id=self.contact_id,
+            company_id=self.company_id,
+            owner_id=self.owner_id,
+            interaction_type=self.interaction_type,
+            subject=self.subject,
+            description=data['description'],
+            interaction_date=self.interaction_date,
+            duration_minutes=data['duration_minutes'],
+            attachments=self.attachments or None,
+            attachment_name=data['attachment_name'],
+            is_important=self.is_important,
+            message_id=self.message_id,
+            created_at=parse_datetime(data['created_at']),
+            updated_at=parse_datetime(data['updated_at']),
+        )
+        interaction.is_archived = True
+        return interaction
+
+
+class InteractionDailyRollup(models.Model):
+    """
+    Liczba interakcji właściciela danego typu z danego dnia (dzień lokalny)
+
+    Utrzymywana przyrostowo przez sygnały - patrz interactions/rollups.py.
+    """
+
+    # Indeks unikalny (owner, day, interaction_type) obsługuje też filtr po właścicielu
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name='Właściciel', related_name='interaction_rollups',
+        db_index=False
+    )
+    day = models.DateField('Dzień')
+    interaction_type = models.CharField('Typ interakcji', max_length=20, choices=Interaction.TYPE_CHOICES)
+    count = models.PositiveIntegerField('Liczba interakcji', default=0)
+
+    class Meta:
+        verbose_name = 'Dzienne podsumowanie interakcji'
+        verbose_name_plural = 'Dzienne podsumowania interakcji'
+        ordering = ['-day', 'interaction_type']
+        constraints = [
+            # Wykresy i liczniki dashboardu: WHERE owner = ? AND day BETWEEN ? AND ?
+            models.UniqueConstraint(fields=['owner', 'day', 'interaction_type'], name='rollup_owner_day_type_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_interaction_type_display()}: {self.count}"
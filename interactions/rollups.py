@@ -0,0 +1,135 @@
+"""
+Dzienne podsumowania interakcji (InteractionDailyRollup)
+
+Wiersz (właściciel, dzień, typ) przechowuje liczbę interakcji danego typu
+z danego dnia (dzień lokalny, strefa projektu - jak last_contact_date).
+Sygnały w interactions/signals.py zmieniają licznik przyrostowo przy
+zapisie, zmianie daty / typu, usunięciu, masowym zapisie (post_bulk_create)
+i masowym usunięciu (post_bulk_delete, archiwizacja). Dashboard sumuje wiersze zamiast
+liczyć COUNT(*) po tabeli interakcji, więc koszt zależy od liczby dni
+w oknie, a nie od liczby interakcji:
+
+    totals(user)                        -> liczba wszystkich interakcji
+    totals(user, date_from, date_to)    -> liczba w przedziale dni
+    counts_by_type(user)                -> {'email': 120, 'meeting': 14, ...}
+
+Zmiany z pominięciem sygnałów (QuerySet.update(), surowy SQL) oraz zmianę
+TIME_ZONE wyrównuje komenda `rebuild_interaction_rollups`.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Interaction, InteractionDailyRollup
+
+
+def rollup_key(values):
+    """(owner_id, dzień lokalny, typ) dla interakcji albo słownika z jej polami"""
+    if isinstance(values, dict):
+        return values['owner_id'], timezone.localdate(values['interaction_date']), values['interaction_type']
+    return values.owner_id, timezone.localdate(values.interaction_date), values.interaction_type
+
+
+def _add(key, delta):
+    owner_id, day, interaction_type = key
+    rows = InteractionDailyRollup.objects.filter(owner_id=owner_id, day=day, interaction_type=interaction_type)
+    if delta < 0:
+        rows.update(count=Greatest(F('count') + delta, Value(0)))
+        return
+    if rows.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            InteractionDailyRollup.objects.create(
+                owner_id=owner_id, day=day, interaction_type=interaction_type, count=delta
+            )
+    except IntegrityError:
+        # Równoległy zapis utworzył wiersz między UPDATE a INSERT
+        rows.update(count=F('count') + delta)
+
+
+def apply_changes(changes):
+    """Zmienia liczniki o wartości z Counter {klucz: delta}; zmiany, które się znoszą, nie robią UPDATE"""
+    for key, delta in changes.items():
+        if delta:
+            _add(key, delta)
+
+
+def move(before, after):
+    """Przenosi interakcję między wierszami (None - nie było / nie ma jej w podsumowaniu)"""
+    changes = Counter()
+    if before is not None:
+        changes[rollup_key(before)] -= 1
+    if after is not None:
+        changes[rollup_key(after)] += 1
+    apply_changes(changes)
+
+
+def add_many(interactions):
+    """Masowy zapis - jeden UPDATE na (właściciel, dzień, typ)"""
+    apply_changes(Counter(rollup_key(interaction) for interaction in interactions))
+
+
+def remove_many(interactions):
+    """Masowe usunięcie (archiwizacja) - jeden UPDATE na (właściciel, dzień, typ)"""
+    changes = Counter()
+    changes.subtract(rollup_key(interaction) for interaction in interactions)
+    apply_changes(changes)
+
+
+# ========== ODCZYT ==========
+
+def _rollups(owner, date_from=None, date_to=None):
+    queryset = InteractionDailyRollup.objects.filter(owner=owner)
+    if date_from is not None:
+        queryset = queryset.filter(day__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(day__lte=date_to)
+    return queryset
+
+
+def totals(owner, date_from=None, date_to=None):
+    """Liczba interakcji właściciela w dniach od date_from do date_to (włącznie)"""
+    return _rollups(owner, date_from, date_to).aggregate(total=Sum('count'))['total'] or 0
+
+
+def counts_by_type(owner, date_from=None, date_to=None):
+    rows = _rollups(owner, date_from, date_to).values('interaction_type').annotate(total=Sum('count'))
+    return {row['interaction_type']: row['total'] for row in rows if row['total']}
+
+
+# ========== PRZELICZENIE ==========
+
+def rebuild(owner=None, batch_size=2000):
+    """
+    Buduje podsumowania od nowa z tabeli interakcji (GROUP BY dzień, typ)
+
+    Returns:
+        Liczba zapisanych wierszy
+    """
+    interactions = Interaction.objects.all()
+    rollups = InteractionDailyRollup.objects.all()
+    if owner is not None:
+        interactions = interactions.filter(owner=owner)
+        rollups = rollups.filter(owner=owner)
+
+    grouped = (
+        interactions.order_by()
+        .annotate(day=TruncDate('interaction_date', tzinfo=timezone.get_current_timezone()))
+        .values('owner_id', 'day', 'interaction_type')
+        .annotate(total=Count('pk'))
+    )
+    with transaction.atomic():
+        rollups.delete()
+        rows = [
+            InteractionDailyRollup(
+                owner_id=row['owner_id'], day=row['day'], interaction_type=row['interaction_type'], count=row['total']
+            )
+            for row in grouped
+        ]
+        InteractionDailyRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,100 @@
+"""
+Sygnały aplikacji interactions
+
+Utrzymują liczniki aktywności kontaktu i firmy (contacts/counters.py):
+interaction_count i last_contact_date, oraz dzienne podsumowania
+interakcji (interactions/rollups.py) - także po masowym zapisie
+(post_bulk_create, np. import poczty) i masowym usunięciu (post_bulk_delete,
+archiwizacja).
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from contacts import counters
+from mini_crm.signals import post_bulk_create, post_bulk_delete
+
+from . import rollups
+from .models import Interaction
+
+_TRACKED_FIELDS = ['contact_id', 'company_id', 'interaction_date', 'owner_id', 'interaction_type']
+
+
+@receiver(pre_save, sender=Interaction, dispatch_uid='interaction_counters_previous')
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._counter_previous = None if raw else counters.previous_values(instance, _TRACKED_FIELDS)
+
+
+@receiver(post_save, sender=Interaction, dispatch_uid='interaction_counters_save')
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = counters.counter_values(instance)
+    previous = getattr(instance, '_counter_previous', None)
+
+    if created or previous is None:
+        counters.change_count('interaction_count', current, 1)
+        counters.touch_last_contact(current, instance.interaction_date)
+        return
+
+    counters.move_count('interaction_count', previous, current)
+    if any(previous[key] != current[key] for key in current):
+        # Interakcja przepięta do innego kontaktu / firmy - poprzedni tracą datę tej interakcji
+        counters.refresh_last_contact(previous)
+    if previous['interaction_date'] != instance.interaction_date:
+        counters.refresh_last_contact(current)
+    else:
+        counters.touch_last_contact(current, instance.interaction_date)
+
+
+@receiver(post_delete, sender=Interaction, dispatch_uid='interaction_counters_delete')
+def update_counters_on_delete(sender, instance, **kwargs):
+    values = counters.counter_values(instance)
+    counters.change_count('interaction_count', values, -1)
+    counters.refresh_last_contact(values)
+
+
+@receiver(post_bulk_create, sender=Interaction, dispatch_uid='interaction_counters_bulk')
+def update_counters_on_bulk_create(sender, instances, **kwargs):
+    """Jeden UPDATE licznika i jeden daty na kontakt / firmę zamiast na interakcję"""
+    counts, latest = Counter(), {}
+    for instance in instances:
+        for field, pk in counters.counter_values(instance).items():
+            if pk:
+                counts[field, pk] += 1
+                latest[field, pk] = max(latest.get((field, pk), instance.interaction_date), instance.interaction_date)
+    for (field, pk), delta in counts.items():
+        counters.change_count('interaction_count', {field: pk}, delta)
+        counters.touch_last_contact({field: pk}, latest[field, pk])
+
+
+@receiver(post_bulk_delete, sender=Interaction, dispatch_uid='interaction_counters_bulk_delete')
+def update_counters_on_bulk_delete(sender, instances, **kwargs):
+    counters.remove_interactions(counters.counter_values(instance) for instance in instances)
+
+
+# ========== InteractionDailyRollup ==========
+
+@receiver(post_save, sender=Interaction, dispatch_uid='interaction_rollups_save')
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Zapis bez zmiany dnia, typu ani właściciela nie wykonuje żadnego UPDATE
+    rollups.move(None if created else getattr(instance, '_counter_previous', None), instance)
+
+
+@receiver(post_delete, sender=Interaction, dispatch_uid='interaction_rollups_delete')
+def update_rollups_on_delete(sender, instance, **kwargs):
+    rollups.move(instance, None)
+
+
+@receiver(post_bulk_create, sender=Interaction, dispatch_uid='interaction_rollups_bulk')
+def update_rollups_on_bulk_create(sender, instances, **kwargs):
+    rollups.add_many(instances)
+
+
+@receiver(post_bulk_delete, sender=Interaction, dispatch_uid='interaction_rollups_bulk_delete')
+def update_rollups_on_bulk_delete(sender, instances, **kwargs):
+    rollups.remove_many(instances)
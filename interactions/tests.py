@@ -1,3 +1,494 @@
-from django.test import TestCase
+"""
+Testy osi czasu, wyszukiwania, archiwum, importu poczty i dziennych podsumowań
+"""
 
-# Create your tests here.
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from attachments.models import Blob
+from activities.models import Activity
+from contacts.counters import recompute
+from contacts.models import Company, Contact
+from interactions.archive import archive_interactions
+from interactions.forms import InteractionSearchForm
+from interactions.ingest import ingest_mail
+from interactions.mail import parse_message
+from interactions.models import ArchivedInteraction, Interaction, InteractionDailyRollup
+from interactions.rollups import counts_by_type, totals
+from mini_crm.signals import post_bulk_create
+from mini_crm.timewindows import date_range, month_days
+from search.index import search
+from search.models import SearchTerm
+
+
+@override_settings(INTERACTION_TIMELINE_PAGE_SIZE=2)
+class TestInteractionTimeline(TestCase):
+    """Paginacja kursorowa, nagłówki miesięcy / dni i porcje JSON"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', owner=self.user
+        )
+        # 00:30 czasu polskiego to jeszcze poprzedni dzień w UTC - grupujemy po dniu lokalnym
+        self.dates = [
+            datetime(2026, 3, 3, 0, 30),
+            datetime(2026, 3, 2, 9, 0),
+            datetime(2026, 3, 1, 12, 0),
+            datetime(2026, 2, 27, 12, 0),
+            datetime(2026, 2, 27, 8, 0),
+        ]
+        self.interactions = [
+            Interaction.objects.create(
+                contact=self.contact, interaction_type='call', subject=f'Rozmowa {number}',
+                description='Opis', interaction_date=timezone.make_aware(date), owner=self.user,
+            )
+            for number, date in enumerate(self.dates)
+        ]
+        Interaction.objects.create(
+            interaction_type='note', subject='Obca', description='Opis',
+            interaction_date=timezone.now(), owner=self.other_user,
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def headers(self, interactions):
+        return [(item.show_month, item.show_day) for item in interactions]
+
+    def test_first_page(self):
+        response = self.client.get(reverse('interactions:interaction_timeline'))
+
+        interactions = response.context['interactions']
+        self.assertEqual(list(interactions), self.interactions[:2])
+        self.assertEqual(interactions[0].timeline_day.isoformat(), '2026-03-03')
+        self.assertEqual(self.headers(interactions), [(True, True), (False, True)])
+        self.assertTrue(response.context['page'].has_next)
+        self.assertContains(response, 'timeline-more')
+
+    def test_more_continues_groups_across_pages(self):
+        first = self.client.get(reverse('interactions:interaction_timeline')).context['page']
+
+        response = self.client.get(reverse('interactions:interaction_timeline_more'), {'cursor': first.next_cursor})
+        data = response.json()
+        self.assertIn('Rozmowa 2', data['html'])
+        self.assertNotIn('Rozmowa 1', data['html'])
+        # Nowy dzień (1 marca), ale ten sam miesiąc co koniec poprzedniej porcji
+        self.assertEqual(data['html'].count('timeline-month'), 1)
+        self.assertTrue(data['has_next'])
+
+        response = self.client.get(reverse('interactions:interaction_timeline'), {'cursor': data['next_cursor']})
+        interactions = response.context['interactions']
+        self.assertEqual(list(interactions), self.interactions[4:])
+        # Ten sam dzień (27 lutego) co ostatnia interakcja poprzedniej porcji
+        self.assertEqual(self.headers(interactions), [(False, False)])
+        self.assertFalse(response.context['page'].has_next)
+
+    def test_scoped_to_owner(self):
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(reverse('interactions:interaction_timeline'))
+        self.assertEqual([item.subject for item in response.context['interactions']], ['Obca'])
+
+
+class TestInteractionDateFilter(TestCase):
+    """Filtr dat jako przedział [od, do + 1 dzień) w strefie Europe/Warsaw"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def create(self, subject, local_datetime):
+        return Interaction.objects.create(
+            interaction_type='note', subject=subject, description='Opis',
+            interaction_date=timezone.make_aware(local_datetime), owner=self.user,
+        )
+
+    def filtered(self, **data):
+        form = InteractionSearchForm(data, user=self.user)
+        return sorted(form.filter_queryset(Interaction.objects.filter(owner=self.user)).values_list('subject', flat=True))
+
+    def test_date_range_is_half_open_in_local_time(self):
+        start, end = date_range(date(2026, 3, 2), date(2026, 3, 3))
+        self.assertEqual(start.isoformat(), '2026-03-02T00:00:00+01:00')
+        self.assertEqual(end.isoformat(), '2026-03-04T00:00:00+01:00')
+
+    def test_dst_day_keeps_local_midnight(self):
+        # 29 marca 2026 - zmiana czasu na letni, doba ma 23 godziny
+        start, end = date_range(date(2026, 3, 29), date(2026, 3, 29))
+        elapsed = end.astimezone(dt_timezone.utc) - start.astimezone(dt_timezone.utc)
+        self.assertEqual(elapsed.total_seconds(), 23 * 3600)
+
+    def test_month_days_uses_local_month(self):
+        # 28 lutego 23:30 UTC to już 1 marca w Warszawie
+        now = datetime(2026, 2, 28, 23, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(month_days(now), (date(2026, 3, 1), date(2026, 3, 31)))
+
+    def test_filter_uses_local_days(self):
+        self.create('przed', datetime(2026, 3, 1, 23, 59))
+        self.create('po polnocy', datetime(2026, 3, 2, 0, 15))
+        self.create('koniec dnia', datetime(2026, 3, 2, 23, 59, 59))
+        self.create('nastepny dzien', datetime(2026, 3, 3, 0, 0))
+
+        self.assertEqual(
+            self.filtered(date_from='2026-03-02', date_to='2026-03-02'), ['koniec dnia', 'po polnocy']
+        )
+        self.assertEqual(self.filtered(date_from='2026-03-03'), ['nastepny dzien'])
+        self.assertEqual(len(self.filtered(date_to='2026-03-02')), 3)
+
+    def test_query_compares_column_without_date_cast(self):
+        form = InteractionSearchForm({'date_from': '2026-03-02'}, user=self.user)
+        sql = str(form.filter_queryset(Interaction.objects.all()).query)
+        self.assertIn('"interactions_interaction"."interaction_date" >=', sql)
+
+
+class TestInteractionSearch(TestCase):
+    """Wyszukiwanie pełnotekstowe interakcji z rankingiem i fragmentami opisu"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.meeting = self.create('Spotkanie w Łodzi', 'Omówiliśmy warunki umowy serwisowej.', 'meeting')
+        self.call = self.create('Umowa serwisowa', 'Klient prosi o aneks do umowy.', 'call')
+        self.other = self.create('Oferta', 'Wysłano cennik.', 'email')
+        self.client.login(username='testuser', password='testpass123')
+
+    def create(self, subject, description, interaction_type):
+        return Interaction.objects.create(
+            interaction_type=interaction_type, subject=subject, description=description,
+            interaction_date=timezone.now(), owner=self.user,
+        )
+
+    def test_ranked_by_subject_weight(self):
+        response = self.client.get(reverse('interactions:interaction_list'), {'query': 'umow'})
+
+        self.assertEqual(list(response.context['interactions']), [self.call, self.meeting])
+        self.assertContains(response, '<mark>Umowa</mark> serwisowa')
+        self.assertContains(response, 'warunki <mark>umowy</mark> serwisowej')
+
+    def test_combines_with_filters(self):
+        response = self.client.get(
+            reverse('interactions:interaction_list'), {'query': 'umow', 'interaction_type': 'meeting'}
+        )
+        self.assertEqual(list(response.context['interactions']), [self.meeting])
+
+    def test_index_follows_description_changes(self):
+        self.other.description = 'Cennik i projekt umowy ramowej.'
+        self.other.save()
+        form = InteractionSearchForm({'query': 'ramow'}, user=self.user)
+        self.assertEqual(list(form.filter_queryset(Interaction.objects.filter(owner=self.user))), [self.other])
+
+        pk = self.other.pk
+        self.other.delete()
+        self.assertFalse(SearchTerm.objects.filter(kind='interaction', object_id=pk).exists())
+
+    def test_save_without_indexed_fields_skips_reindex(self):
+        self.call.is_important = True
+        with CaptureQueriesContext(connection) as queries:
+            self.call.save(update_fields=['is_important'])
+        self.assertFalse([query for query in queries if 'search_searchterm' in query['sql']])
+
+
+class TestInteractionArchive(TestCase):
+    """Archiwizacja starych interakcji i odczyt z archiwum"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com', owner=self.user
+        )
+        self.old = Interaction.objects.create(
+            contact=self.contact, interaction_type='meeting', subject='Negocjacje umowy ramowej',
+            description='Długa notatka ze spotkania w Łodzi. ' * 50,
+            interaction_date=timezone.now() - timedelta(days=5 * 365), owner=self.user,
+            attachments=SimpleUploadedFile('protokol.pdf', b'%PDF protokol'),
+        )
+        self.recent = Interaction.objects.create(
+            contact=self.contact, interaction_type='call', subject='Telefon', description='Opis',
+            interaction_date=timezone.now(), owner=self.user,
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def archive(self):
+        return archive_interactions(timezone.now() - timedelta(days=3 * 365))
+
+    def test_moves_old_interactions_with_compressed_payload(self):
+        self.assertEqual(self.archive(), 1)
+
+        self.assertEqual(list(Interaction.objects.all()), [self.recent])
+        archived = ArchivedInteraction.objects.get(pk=self.old.pk)
+        self.assertLess(len(archived.payload), len(self.old.description))
+        self.assertEqual(archived.description, self.old.description)
+        self.assertEqual(archived.as_interaction().attachment_name, 'protokol.pdf')
+
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.interaction_count, 1)
+        # Archiwum nadal odwołuje się do bloba załącznika
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+        self.assertEqual(self.archive(), 0)
+
+    def test_search_reaches_archive(self):
+        self.archive()
+        results = search(ArchivedInteraction.objects.filter(owner=self.user), 'lodz', owner=self.user)
+        self.assertEqual([item.pk for item in results], [self.old.pk])
+        self.assertFalse(SearchTerm.objects.filter(kind='interaction', object_id=self.old.pk).exists())
+
+        response = self.client.get(
+            reverse('interactions:interaction_list'), {'query': 'umowy', 'include_archived': 'on'}
+        )
+        self.assertEqual(list(response.context['interactions']), [])
+        self.assertEqual([item.pk for item in response.context['archived_interactions']], [self.old.pk])
+        self.assertContains(response, 'Negocjacje <mark>umowy</mark> ramowej')
+
+    def test_detail_and_attachment_read_through(self):
+        self.archive()
+
+        response = self.client.get(reverse('interactions:interaction_detail', args=[self.old.pk]))
+        self.assertContains(response, 'Negocjacje umowy ramowej')
+        self.assertContains(response, 'tylko do odczytu')
+        self.assertNotContains(response, reverse('interactions:interaction_update', args=[self.old.pk]))
+
+        response = self.client.get(reverse('interactions:interaction_attachment', args=[self.old.pk]))
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF protokol')
+        self.assertEqual(self.client.get(reverse('interactions:interaction_update', args=[self.old.pk])).status_code, 404)
+
+    def test_contact_detail_lists_archive_on_demand(self):
+        self.archive()
+        url = reverse('contacts:contact_detail', args=[self.contact.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.context['archived_count'], 1)
+        self.assertIsNone(response.context['archived_interactions'])
+
+        response = self.client.get(url, {'archived': '1'})
+        self.assertContains(response, 'Negocjacje umowy ramowej')
+
+    def test_keeps_last_contact_date(self):
+        self.recent.delete()
+        last_contact = timezone.localdate(self.old.interaction_date)
+
+        self.archive()
+
+        self.contact.refresh_from_db()
+        self.assertEqual((self.contact.interaction_count, self.contact.last_contact_date), (0, last_contact))
+        recompute(Contact.objects.filter(pk=self.contact.pk))
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.last_contact_date, last_contact)
+
+    def test_batch_side_effects_do_not_scale_with_rows(self):
+        for number in range(20):
+            Interaction.objects.create(
+                contact=self.contact, interaction_type='meeting', subject=f'Spotkanie {number}',
+                description='Opis', interaction_date=self.old.interaction_date, owner=self.user,
+            )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.archive(), 21)
+        # Stała liczba zapytań na paczkę - nie kilka na każdy przeniesiony wiersz
+        self.assertLess(len(queries), 21)
+
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.interaction_count, 1)
+        self.assertEqual(totals(self.user), 1)
+        self.assertFalse(SearchTerm.objects.filter(kind='interaction', object_id=self.old.pk).exists())
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+    def test_deleting_contact_keeps_archive(self):
+        self.archive()
+        self.contact.delete()
+
+        archived = ArchivedInteraction.objects.get(pk=self.old.pk)
+        self.assertIsNone(archived.contact)
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+    def test_command(self):
+        output = io.StringIO()
+        call_command('archive_interactions', dry_run=True, stdout=output)
+        self.assertIn('Do archiwizacji: 1', output.getvalue())
+        self.assertEqual(ArchivedInteraction.objects.count(), 0)
+
+        call_command('archive_interactions', days=365, user='testuser', stdout=io.StringIO())
+        self.assertTrue(ArchivedInteraction.objects.filter(pk=self.old.pk).exists())
+
+
+def eml(message_id, sender, to, subject, day, body='Treść wiadomości'):
+    headers = [f'From: {sender}', f'To: {to}', f'Subject: {subject}', f'Date: {day}']
+    if message_id:
+        headers.insert(0, f'Message-ID: {message_id}')
+    return ('\n'.join(headers) + '\n\n' + body + '\n').encode('utf-8')
+
+
+class TestMailIngest(TestCase):
+    """Import poczty: przypisanie do kontaktów, deduplikacja po Message-ID, liczniki"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123', email='ja@firma.pl')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        self.company = Company.objects.create(name='Acme', owner=self.user)
+        self.contact = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='Jan@Acme.pl', company=self.company, owner=self.user
+        )
+        Contact.objects.create(first_name='Obcy', last_name='X', email='obcy@example.com', owner=self.other_user)
+
+        self.mail_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.mail_dir, ignore_errors=True)
+        os.makedirs(os.path.join(self.mail_dir, 'wyslane'))
+        self.write('odebrana.eml', eml('<1@acme.pl>', 'Jan <jan@acme.pl>', 'ja@firma.pl', 'Oferta', 'Mon, 02 Mar 2026 10:00:00 +0100'))
+        self.write('wyslane/odpowiedz.eml', eml(
+            '<2@firma.pl>', 'ja@firma.pl', 'Jan Kowalski <JAN@acme.pl>', 'Re: Oferta', 'Tue, 03 Mar 2026 09:00:00 +0100'
+        ))
+        self.write('newsletter.eml', eml('<3@news.pl>', 'news@news.pl', 'ja@firma.pl', 'Promocja', 'Tue, 03 Mar 2026 09:00:00 +0100'))
+        self.write('obcy.eml', eml('<4@example.com>', 'obcy@example.com', 'ja@firma.pl', 'Cudzy', 'Tue, 03 Mar 2026 09:00:00 +0100'))
+        self.write('skrzynka', b''.join(
+            b'From nadawca@acme.pl Wed Mar  4 10:00:00 2026\n' + message for message in [
+                eml('<5@acme.pl>', 'jan@acme.pl', 'ja@firma.pl', 'Z mbox', 'Wed, 04 Mar 2026 10:00:00 +0100'),
+                eml(None, 'jan@acme.pl', 'ja@firma.pl', 'Bez Message-ID', 'Wed, 04 Mar 2026 11:00:00 +0100'),
+                eml('<1@acme.pl>', 'Jan <jan@acme.pl>', 'ja@firma.pl', 'Oferta', 'Mon, 02 Mar 2026 10:00:00 +0100'),
+                eml('<6@acme.pl>', 'jan@acme.pl', 'ja@firma.pl', 'Bez daty', 'nie-data'),
+            ]
+        ))
+        self.write('notatki.txt', b'to nie jest poczta')
+
+    def write(self, name, content):
+        with open(os.path.join(self.mail_dir, name), 'wb') as file:
+            file.write(content)
+
+    def test_imports_matched_mail_once(self):
+        stats = ingest_mail([self.mail_dir], self.user, workers=0, batch_size=2)
+        self.assertEqual(stats, {'created': 4, 'duplicate': 1, 'unmatched': 2, 'invalid': 1})
+
+        interactions = Interaction.objects.filter(owner=self.user).order_by('interaction_date')
+        self.assertEqual(
+            [i.subject for i in interactions], ['Oferta', 'Re: Oferta', 'Z mbox', 'Bez Message-ID']
+        )
+        first = interactions[0]
+        self.assertEqual((first.interaction_type, first.contact, first.company), ('email', self.contact, self.company))
+        self.assertEqual(first.message_id, '<1@acme.pl>')
+        self.assertEqual(first.description, 'Treść wiadomości')
+        self.assertTrue(interactions[3].message_id.startswith('<sha256:'))
+
+        # Masowy zapis aktualizuje liczniki, indeks wyszukiwania i strumień aktywności
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.interaction_count, 4)
+        self.assertEqual(self.contact.last_contact_date, date(2026, 3, 4))
+        self.assertEqual(Company.objects.get(pk=self.company.pk).interaction_count, 4)
+        self.assertEqual(list(search(Interaction.objects.all(), 'mbox', self.user).values_list('pk', flat=True)), [interactions[2].pk])
+        self.assertEqual(Activity.objects.filter(contact=self.contact).count(), 4)
+
+        # Ponowny import - także po przeniesieniu do archiwum - niczego nie dubluje
+        archive_interactions(timezone.make_aware(datetime(2026, 3, 3)))
+        stats = ingest_mail([self.mail_dir], self.user, workers=0)
+        self.assertEqual(stats['created'], 0)
+        self.assertEqual(stats['duplicate'], 5)
+        self.assertEqual(ArchivedInteraction.objects.get(pk=first.pk).message_id, '<1@acme.pl>')
+
+    def test_command_parses_in_process_pool(self):
+        output = io.StringIO()
+        call_command('ingest_mail', self.mail_dir, user='testuser', workers=2, stdout=output)
+
+        self.assertIn('4 nowych interakcji', output.getvalue())
+        self.assertEqual(Interaction.objects.filter(owner=self.user).count(), 4)
+        self.assertFalse(Interaction.objects.filter(owner=self.other_user).exists())
+
+    def test_parse_html_and_encoded_headers(self):
+        raw = (
+            'Message-ID: <7@acme.pl>\nFrom: =?utf-8?q?=C5=81ukasz?= <lukasz@acme.pl>\n'
+            'Subject: =?utf-8?q?Za=C5=BC=C3=B3=C5=82=C4=87?=\nDate: Thu, 05 Mar 2026 08:00:00 +0000\n'
+            'Content-Type: text/html; charset=utf-8\n\n<p>Cena: <b>100&nbsp;z&#322;</b></p><style>p {}</style>\n'
+        ).encode('ascii')
+
+        message = parse_message(raw)
+        self.assertEqual(message['subject'], 'Zażółć')
+        self.assertEqual(message['senders'], ['lukasz@acme.pl'])
+        self.assertEqual(message['date'], datetime(2026, 3, 5, 8, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(message['body'].split(), ['Cena:', '100', 'zł'])
+        self.assertIsNone(parse_message(b'\x00\xff'))
+
+
+class TestInteractionDailyRollup(TestCase):
+    """Dzienne podsumowania interakcji utrzymywane przyrostowo"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+
+    def create(self, when, interaction_type='email', owner=None):
+        return Interaction.objects.create(
+            interaction_type=interaction_type, subject='Rozmowa', description='Opis',
+            interaction_date=timezone.make_aware(when), owner=owner or self.user,
+        )
+
+    def rows(self):
+        return sorted(
+            InteractionDailyRollup.objects.filter(count__gt=0).values_list('owner__username', 'day', 'interaction_type', 'count')
+        )
+
+    def test_incremental_updates(self):
+        # 00:30 czasu polskiego 2 marca to 1 marca w UTC - liczymy po dniu lokalnym
+        first = self.create(datetime(2026, 3, 2, 0, 30))
+        second = self.create(datetime(2026, 3, 2, 15, 0))
+        self.create(datetime(2026, 3, 2, 9, 0), owner=self.other_user)
+        self.assertEqual(self.rows(), [
+            ('otheruser', date(2026, 3, 2), 'email', 1),
+            ('testuser', date(2026, 3, 2), 'email', 2),
+        ])
+
+        second.interaction_type = 'meeting'
+        second.interaction_date = timezone.make_aware(datetime(2026, 3, 5, 10, 0))
+        second.save()
+        # Zapis bez zmiany dnia i typu nie zmienia podsumowań
+        with CaptureQueriesContext(connection) as queries:
+            first.subject = 'Inny temat'
+            first.save()
+        self.assertFalse([q for q in queries if 'interactiondailyrollup' in q['sql']])
+        first.delete()
+
+        Interaction.objects.bulk_create([
+            Interaction(interaction_type='call', subject='Tel', description='', owner=self.user,
+                        interaction_date=timezone.make_aware(datetime(2026, 3, 5, 12, 0)))
+            for _ in range(3)
+        ])
+        post_bulk_create.send(sender=Interaction, instances=list(Interaction.objects.filter(interaction_type='call')))
+
+        self.assertEqual(self.rows(), [
+            ('otheruser', date(2026, 3, 2), 'email', 1),
+            ('testuser', date(2026, 3, 5), 'call', 3),
+            ('testuser', date(2026, 3, 5), 'meeting', 1),
+        ])
+        self.assertEqual(totals(self.user), 4)
+        self.assertEqual(totals(self.user, date(2026, 3, 1), date(2026, 3, 4)), 0)
+        self.assertEqual(counts_by_type(self.user), {'call': 3, 'meeting': 1})
+
+    def test_rebuild_and_dashboard(self):
+        now = timezone.localtime()
+        self.create(now.replace(tzinfo=None), 'email')
+        self.create(now.replace(tzinfo=None), 'note')
+        self.create(datetime(2020, 1, 1, 12, 0), 'email')
+        Interaction.objects.filter(interaction_type='note').update(interaction_type='call')
+        InteractionDailyRollup.objects.update(count=99)
+
+        output = io.StringIO()
+        call_command('rebuild_interaction_rollups', user='testuser', stdout=output)
+        self.assertIn('Zapisano 3', output.getvalue())
+        self.assertEqual(counts_by_type(self.user), {'email': 2, 'call': 1})
+
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_interactions'], 3)
+        self.assertEqual(response.context['interactions_this_month'], 2)
+        self.assertEqual(response.context['interaction_type_values'], [2, 1])
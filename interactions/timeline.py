@@ -0,0 +1,70 @@
+"""
+Oś czasu interakcji
+
+Interakcje są pobierane porcjami paginacją kursorową po
+(interaction_date, id) malejąco - indeks (owner, interaction_date, id)
+obsługuje każdą porcję bez OFFSET, niezależnie od tego, jak daleko
+w historii jest użytkownik.
+
+Nagłówki miesięcy i dni liczy baza (TruncMonth / TruncDate w strefie
+czasowej projektu). Kolejna porcja doczytywana przez przeglądarkę
+dostaje nagłówek tylko wtedy, gdy jej pierwsza interakcja jest z innego
+dnia / miesiąca niż ostatnia interakcja poprzedniej porcji - tę datę
+znamy z kursora.
+"""
+
+from django.db.models import DateField
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from mini_crm.pagination import InvalidCursor, KeysetPaginator
+
+from .models import Interaction
+
+TIMELINE_ORDERING = ('-interaction_date', '-id')
+
+
+def timeline_queryset(owner):
+    """Interakcje użytkownika z dniem i miesiącem (lokalnym) wyliczonym w SQL"""
+    tzinfo = timezone.get_current_timezone()
+    return (
+        Interaction.objects.filter(owner=owner)
+        .select_related('contact', 'company')
+        .annotate(
+            timeline_day=TruncDate('interaction_date', tzinfo=tzinfo),
+            timeline_month=TruncMonth('interaction_date', output_field=DateField(), tzinfo=tzinfo),
+        )
+    )
+
+
+def mark_group_headers(interactions, previous_date=None):
+    """
+    Ustawia show_month / show_day na interakcjach, od których zaczyna się nowa grupa
+
+    previous_date: data ostatniej interakcji poprzedniej porcji (None dla pierwszej).
+    """
+    previous_day = timezone.localdate(previous_date) if previous_date else None
+    previous_month = previous_day.replace(day=1) if previous_day else None
+    for interaction in interactions:
+        interaction.show_month = interaction.timeline_month != previous_month
+        interaction.show_day = interaction.timeline_day != previous_day
+        previous_day, previous_month = interaction.timeline_day, interaction.timeline_month
+    return interactions
+
+
+def get_timeline_page(owner, cursor=None, page_size=50):
+    """Porcja osi czasu po kursorze, z oznaczonymi nagłówkami grup"""
+    paginator = KeysetPaginator(timeline_queryset(owner), ordering=TIMELINE_ORDERING, page_size=page_size)
+    page = paginator.get_page(cursor)
+
+    previous_date = None
+    if cursor:
+        try:
+            values, direction = paginator.decode_cursor(cursor)
+        except InvalidCursor:
+            pass
+        else:
+            if direction == 'next':
+                previous_date = values[0]
+    mark_group_headers(page.object_list, previous_date)
+    return page
@@ -6,7 +6,10 @@ app_name = 'interactions'
 urlpatterns = [
     path('', views.interaction_list, name='interaction_list'),
     path('timeline/', views.interaction_timeline, name='interaction_timeline'),
+    path('timeline/more/', views.interaction_timeline_more, name='interaction_timeline_more'),
     path('<int:pk>/', views.interaction_detail, name='interaction_detail'),
+    path('<int:pk>/attachment/', views.interaction_attachment, name='interaction_attachment'),
+    path('<int:pk>/attachment/thumbnail/', views.interaction_attachment_thumbnail, name='interaction_attachment_thumbnail'),
     path('create/', views.interaction_create, name='interaction_create'),
     path('<int:pk>/update/', views.interaction_update, name='interaction_update'),
     path('<int:pk>/delete/', views.interaction_delete, name='interaction_delete'),
@@ -1,10 +1,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
 from datetime import datetime
-from .models import Interaction
+import os
+from attachments.blobs import get_blob
+from attachments.downloads import serve_file
+from attachments.thumbnails import thumbnail_name
+from mini_crm.pagination import approximate_count
+from .archive import get_interaction_or_404
+from .models import ArchivedInteraction, Interaction
 from .forms import InteractionForm, InteractionSearchForm
+from .timeline import get_timeline_page
+
+# Maksymalna liczba wyników z archiwum pokazywanych pod listą
+ARCHIVED_RESULTS_LIMIT = 50
 
 
 @login_required
@@ -13,43 +25,28 @@ def interaction_list(request):
     interactions = Interaction.objects.filter(owner=request.user).select_related('contact', 'company')
 
     search_form = InteractionSearchForm(request.GET, user=request.user)
-
-    if search_form.is_valid():
-        query = search_form.cleaned_data.get('query')
-        interaction_type = search_form.cleaned_data.get('interaction_type')
-        contact = search_form.cleaned_data.get('contact')
-        company = search_form.cleaned_data.get('company')
-        is_important = search_form.cleaned_data.get('is_important')
-        date_from = search_form.cleaned_data.get('date_from')
-        date_to = search_form.cleaned_data.get('date_to')
-
-        if query:
-            interactions = interactions.filter(
-                Q(subject__icontains=query) |
-                Q(description__icontains=query)
-            )
-
-        if interaction_type:
-            interactions = interactions.filter(interaction_type=interaction_type)
-
-        if contact:
-            interactions = interactions.filter(contact=contact)
-
-        if company:
-            interactions = interactions.filter(company=company)
-
-        if is_important is not None:
-            interactions = interactions.filter(is_important=is_important)
-
-        if date_from:
-            interactions = interactions.filter(interaction_date__date__gte=date_from)
-
-        if date_to:
-            interactions = interactions.filter(interaction_date__date__lte=date_to)
+    interactions = search_form.filter_queryset(interactions)
+    search_query = search_form.cleaned_data.get('query') if search_form.is_valid() else ''
+    if search_query:
+        # Przy wyszukiwaniu najlepiej dopasowane na górze
+        interactions = interactions.order_by('-search_rank', '-interaction_date', '-id')
+
+    archived_interactions = None
+    if search_form.is_valid() and search_form.cleaned_data.get('include_archived'):
+        # Archiwum tylko na życzenie - te same filtry, osobna (krótka) lista
+        archived_interactions = search_form.filter_queryset(
+            ArchivedInteraction.objects.filter(owner=request.user).select_related('contact', 'company')
+        )
+        if search_query:
+            archived_interactions = archived_interactions.order_by('-search_rank', '-interaction_date', '-id')
+        archived_interactions = archived_interactions[:ARCHIVED_RESULTS_LIMIT]
 
     context = {
         'interactions': interactions,
+        'archived_interactions': archived_interactions,
+        'archived_results_limit': ARCHIVED_RESULTS_LIMIT,
         'search_form': search_form,
+        'search_query': search_query,
         'total_count': interactions.count(),
     }
     return render(request, 'interactions/interaction_list.html', context)
@@ -57,15 +54,46 @@ def interaction_list(request):
 
 @login_required
 def interaction_detail(request, pk):
-    """Szczegóły interakcji"""
-    interaction = get_object_or_404(Interaction, pk=pk, owner=request.user)
+    """Szczegóły interakcji (także zarchiwizowanej)"""
+    interaction = get_interaction_or_404(request.user, pk)
 
     context = {
         'interaction': interaction,
+        # Blob załącznika - status i wymiary miniatury
+        'attachment_blob': get_blob(interaction.attachments.name) if interaction.attachments else None,
     }
     return render(request, 'interactions/interaction_detail.html', context)
 
 
+@login_required
+def interaction_attachment(request, pk):
+    """
+    Pobranie załącznika interakcji (tylko właściciel)
+
+    Plik nie jest dostępny pod publicznym adresem /media/ - bajty wysyła
+    Django albo, po sprawdzeniu uprawnień, serwer proxy (attachments/downloads.py).
+    """
+    interaction = get_interaction_or_404(request.user, pk)
+    if not interaction.attachments:
+        raise Http404('Interakcja nie ma załącznika')
+    filename = interaction.attachment_name or os.path.basename(interaction.attachments.name)
+    return serve_file(request, interaction.attachments.storage, interaction.attachments.name, filename)
+
+
+@login_required
+def interaction_attachment_thumbnail(request, pk):
+    """Miniatura załącznika graficznego (tylko właściciel, gdy już wygenerowana)"""
+    interaction = get_interaction_or_404(request.user, pk)
+    blob = get_blob(interaction.attachments.name) if interaction.attachments else None
+    if blob is None or not blob.has_thumbnail:
+        raise Http404('Brak miniatury załącznika')
+    name = thumbnail_name(blob.digest)
+    return serve_file(
+        request, interaction.attachments.storage, name, os.path.basename(name),
+        as_attachment=False, etag=f'"{blob.digest}-{settings.ATTACHMENT_THUMBNAIL_SIZE}"',
+    )
+
+
 @login_required
 def interaction_create(request):
     """Tworzenie nowej interakcji"""
@@ -145,11 +173,44 @@ def interaction_delete(request, pk):
 
 @login_required
 def interaction_timeline(request):
-    """Widok timeline wszystkich interakcji"""
-    interactions = Interaction.objects.filter(owner=request.user).select_related('contact', 'company').order_by('-interaction_date')
+    """
+    Oś czasu interakcji z doczytywaniem przy przewijaniu
+
+    Strona renderuje pierwszą porcję; kolejne pobiera przeglądarka
+    z interaction_timeline_more. Bez JavaScriptu działa link
+    "Starsze interakcje" z tym samym kursorem.
+    """
+    page = get_timeline_page(
+        request.user, request.GET.get('cursor'), settings.INTERACTION_TIMELINE_PAGE_SIZE
+    )
+    total_count, total_is_exact = approximate_count(
+        Interaction.objects.filter(owner=request.user), settings.CONTACT_LIST_COUNT_LIMIT
+    )
 
     context = {
-        'interactions': interactions,
-        'total_count': interactions.count(),
+        'interactions': page.object_list,
+        'page': page,
+        'total_count': total_count,
+        'total_is_exact': total_is_exact,
     }
     return render(request, 'interactions/interaction_timeline.html', context)
+
+
+@login_required
+def interaction_timeline_more(request):
+    """
+    Kolejna porcja osi czasu jako JSON
+
+    {"html": "<fragment>", "next_cursor": "...", "has_next": true}
+    """
+    page = get_timeline_page(
+        request.user, request.GET.get('cursor'), settings.INTERACTION_TIMELINE_PAGE_SIZE
+    )
+    html = render_to_string(
+        'interactions/_timeline_items.html', {'interactions': page.object_list}, request=request
+    )
+    return JsonResponse({
+        'html': html,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next,
+    })
@@ -0,0 +1,194 @@
+"""
+Paginacja kursorowa (keyset pagination)
+
+Zamiast OFFSET/LIMIT (który przy dużych tabelach musi "przewinąć" wszystkie
+wcześniejsze wiersze) zapamiętujemy klucz sortowania ostatniego wiersza
+strony i pobieramy kolejne wiersze warunkiem WHERE (klucz) > (ostatni klucz).
+Dzięki temu koszt każdej strony jest stały i zapytanie korzysta z indeksu
+złożonego na kolumnach sortowania.
+
+Kursor jest nieprzezroczysty dla użytkownika - to zakodowany base64 JSON
+z wartościami klucza i kierunkiem (następna / poprzednia strona).
+
+UWAGA: Kolumny w `ordering` muszą być NOT NULL, a ostatnia z nich
+unikalna (np. 'id'), żeby kolejność była jednoznaczna.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Kursor nie daje się zdekodować"""
+
+
+class KeysetPage:
+    """Jedna strona wyników paginacji kursorowej"""
+
+    def __init__(self, object_list, page_size, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """
+    Paginator kursorowy dla QuerySetów
+
+    Użycie:
+        paginator = KeysetPaginator(queryset, ordering=('last_name', 'first_name', 'id'))
+        page = paginator.get_page(request.GET.get('cursor'))
+
+    Pola z prefiksem '-' są sortowane malejąco (np. ('-interaction_date', '-id')).
+    """
+
+    def __init__(self, queryset, ordering, page_size=50):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    # ========== KURSORY ==========
+
+    def encode_cursor(self, values, direction):
+        payload = json.dumps({'v': list(values), 'd': direction}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        padded = cursor + '=' * (-len(cursor) % 4)
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values, direction = payload['v'], payload['d']
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise InvalidCursor(cursor)
+        if direction not in ('next', 'prev') or len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        return [self._to_python(name, value) for name, value in zip(self.fields, values)], direction
+
+    def _to_python(self, name, value):
+        """Przywraca typ wartości (np. datetime z tekstu ISO) na podstawie pola modelu"""
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        try:
+            return field.to_python(value)
+        except Exception:
+            raise InvalidCursor(value)
+
+    def _key(self, obj):
+        return [obj[name] if isinstance(obj, dict) else getattr(obj, name) for name in self.fields]
+
+    # ========== ZAPYTANIA ==========
+
+    def _seek_filter(self, values, forward):
+        """
+        Buduje warunek (a, b, c) > (x, y, z) jako alternatywę:
+        a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+        """
+        condition = Q()
+        for position, name in enumerate(self.fields):
+            # Rosnąco do przodu -> '>', malejąco do przodu -> '<', wstecz odwrotnie
+            use_lt = self.descending[position] == forward
+            lookup = f'{name}__lt' if use_lt else f'{name}__gt'
+            term = Q(**{lookup: values[position]})
+            for previous in range(position):
+                term &= Q(**{self.fields[previous]: values[previous]})
+            condition |= term
+        return condition
+
+    def _order_by(self, forward):
+        if forward:
+            return self.ordering
+        return tuple(
+            name if descending else f'-{name}'
+            for name, descending in zip(self.fields, self.descending)
+        )
+
+    def get_page(self, cursor=None):
+        """
+        Zwraca stronę wyników dla podanego kursora
+
+        Niepoprawny kursor jest traktowany jak brak kursora (pierwsza strona).
+        Pobieramy page_size + 1 wierszy - dodatkowy wiersz mówi tylko,
+        czy istnieje kolejna strona.
+        """
+        values, direction = None, 'next'
+        if cursor:
+            try:
+                values, direction = self.decode_cursor(cursor)
+            except InvalidCursor:
+                values, direction = None, 'next'
+
+        forward = direction == 'next'
+        queryset = self.queryset.order_by(*self._order_by(forward))
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, forward))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        # Idąc do przodu: kolejna strona istnieje gdy został dodatkowy wiersz,
+        # poprzednia - gdy przyszliśmy z kursora. Idąc wstecz - odwrotnie.
+        came_from_cursor = values is not None
+        more_after = has_more if forward else came_from_cursor
+        more_before = came_from_cursor if forward else has_more
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if more_after:
+                next_cursor = self.encode_cursor(self._key(rows[-1]), 'next')
+            if more_before:
+                previous_cursor = self.encode_cursor(self._key(rows[0]), 'prev')
+
+        return KeysetPage(rows, self.page_size, next_cursor, previous_cursor)
+
+
+def get_page_size(request, default, maximum, param='page_size'):
+    """Odczytuje rozmiar strony z parametru GET, z ograniczeniem do [1, maximum]"""
+    try:
+        page_size = int(request.GET.get(param, default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def approximate_count(queryset, limit):
+    """
+    Liczy wiersze, ale najwyżej do `limit`
+
+    Zwraca (liczba, czy_dokładna). Dla dużych zbiorów COUNT(*) po całym
+    filtrze bywa droższy niż sama strona - zliczamy więc tylko pierwsze
+    limit + 1 wierszy i pokazujemy "ponad N".
+    """
+    count = queryset.order_by()[:limit + 1].count()
+    if count > limit:
+        return limit, False
+    return count, True
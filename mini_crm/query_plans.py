@@ -0,0 +1,117 @@
+"""
+Weryfikacja planów zapytań (EXPLAIN)
+
+Każdy widok filtruje po właścicielu, a potem po statusie, etapie lub
+dacie. Przy małej bazie plan nie ma znaczenia, przy setkach tysięcy
+wierszy pełne skanowanie tabeli to sekundy na każde wyświetlenie listy.
+Ten moduł uruchamia EXPLAIN dla querysetu i wyciąga z planu:
+
+- tabele czytane w całości (SQLite "SCAN tabela", PostgreSQL "Seq Scan",
+  MySQL access_type "ALL"),
+- nazwy użytych indeksów.
+
+Używane przez komendę `check_query_plans` (accounts).
+"""
+
+import json
+import re
+import time
+
+from django.db import connection
+
+_SQLITE_SCAN_RE = re.compile(r'\bSCAN (\w+)(.*)$')
+_SQLITE_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+_POSTGRES_INDEX_RE = re.compile(r'(?:Index (?:Only )?Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)')
+
+
+class PlanCheck:
+    """
+    Zapytanie do sprawdzenia: etykieta + queryset
+
+    count=True - widok wykonuje na querysecie .count() (pomiar czasu też).
+    """
+
+    def __init__(self, label, queryset, count=False):
+        self.label = label
+        self.queryset = queryset
+        self.count = count
+
+    def execute(self):
+        # .all() - kopia querysetu, inaczej kolejne pomiary czytałyby wyniki z cache
+        if self.count:
+            return self.queryset.all().count()
+        return len(list(self.queryset.all()))
+
+
+class QueryPlan:
+    """Wynik EXPLAIN: surowy plan, tabele skanowane w całości i użyte indeksy"""
+
+    def __init__(self, text, full_scans, indexes):
+        self.text = text
+        self.full_scans = full_scans
+        self.indexes = indexes
+
+    @property
+    def uses_index(self):
+        return not self.full_scans
+
+
+def _mysql_nodes(node):
+    """Wszystkie węzły "table" z planu MySQL w formacie JSON"""
+    if isinstance(node, dict):
+        if 'table_name' in node:
+            yield node
+        for value in node.values():
+            yield from _mysql_nodes(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _mysql_nodes(value)
+
+
+def parse_plan(text, vendor, tables):
+    """
+    Analizuje tekst planu dla danego silnika bazy
+
+    tables: nazwy tabel projektu - SQLite opisuje tym samym słowem SCAN
+    także podzapytania i stałe wiersze, które nie są tabelami.
+    """
+    full_scans, indexes = [], []
+
+    if vendor == 'sqlite':
+        for line in text.splitlines():
+            match = _SQLITE_SCAN_RE.search(line)
+            if match and match.group(1) in tables and 'INDEX' not in match.group(2):
+                full_scans.append(match.group(1))
+            indexes.extend(_SQLITE_INDEX_RE.findall(line))
+    elif vendor == 'postgresql':
+        full_scans = _POSTGRES_SCAN_RE.findall(text)
+        indexes = _POSTGRES_INDEX_RE.findall(text)
+    elif vendor == 'mysql':
+        for node in _mysql_nodes(json.loads(text)):
+            if node.get('access_type') == 'ALL':
+                full_scans.append(node['table_name'])
+            if node.get('key'):
+                indexes.append(node['key'])
+    else:
+        raise ValueError(f'Nieobsługiwany silnik bazy: {vendor}')
+
+    return QueryPlan(text, full_scans, list(dict.fromkeys(indexes)))
+
+
+def explain(queryset):
+    """EXPLAIN querysetu w bieżącej bazie"""
+    vendor = connection.vendor
+    # MySQL w formacie tekstowym zwraca tabelę kolumn - JSON jest jednoznaczny
+    text = queryset.explain(format='json') if vendor == 'mysql' else queryset.explain()
+    return parse_plan(text, vendor, set(connection.introspection.table_names()))
+
+
+def best_time(check, repeat=3):
+    """Najkrótszy z `repeat` czasów wykonania zapytania, w milisekundach"""
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        check.execute()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
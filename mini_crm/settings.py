@@ -54,6 +54,10 @@ INSTALLED_APPS = [
     'tasks',
     'opportunities',
     'erp_integration',
+    'search',
+    'exports',
+    'attachments',
+    'activities',
     # 'ai_assistant',
 ]
 
@@ -181,6 +185,106 @@ LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'accounts:login'
 
+# =============================================================================
+# LISTY I PAGINACJA
+# =============================================================================
+
+# Domyślna i maksymalna liczba kontaktów na stronie (?page_size=)
+CONTACT_LIST_PAGE_SIZE = int(os.getenv('CONTACT_LIST_PAGE_SIZE', '50'))
+CONTACT_LIST_MAX_PAGE_SIZE = int(os.getenv('CONTACT_LIST_MAX_PAGE_SIZE', '200'))
+
+# Do ilu wierszy liczymy wyniki na liście ("ponad N" powyżej limitu)
+# 0 = nie licz w ogóle
+CONTACT_LIST_COUNT_LIMIT = int(os.getenv('CONTACT_LIST_COUNT_LIMIT', '1000'))
+
+# Oś czasu interakcji - liczba interakcji w jednej porcji (doczytywanej przy przewijaniu)
+INTERACTION_TIMELINE_PAGE_SIZE = int(os.getenv('INTERACTION_TIMELINE_PAGE_SIZE', '50'))
+
+# Interakcje starsze niż tyle dni trafiają do archiwum (`python manage.py archive_interactions`)
+INTERACTION_ARCHIVE_AFTER_DAYS = int(os.getenv('INTERACTION_ARCHIVE_AFTER_DAYS', str(3 * 365)))
+
+# Import poczty (`python manage.py ingest_mail`) - liczba procesów parsujących
+# wiadomości (0 = w procesie komendy) i wiadomości zapisywanych w jednej transakcji
+MAIL_INGEST_WORKERS = int(os.getenv('MAIL_INGEST_WORKERS', '2'))
+MAIL_INGEST_BATCH_SIZE = int(os.getenv('MAIL_INGEST_BATCH_SIZE', '500'))
+
+# Eksport CSV/XLSX - liczba wierszy pobieranych z bazy jednym zapytaniem
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Import CSV - liczba wierszy zapisywanych w jednej transakcji
+CONTACT_IMPORT_CHUNK_SIZE = int(os.getenv('CONTACT_IMPORT_CHUNK_SIZE', '2000'))
+# Pliki do tej wielkości są importowane od razu w żądaniu HTTP; większe czekają
+# na `python manage.py import_contacts --pending` (cron / worker)
+CONTACT_IMPORT_INLINE_MAX_BYTES = int(os.getenv('CONTACT_IMPORT_INLINE_MAX_BYTES', str(2 * 1024 * 1024)))
+
+# =============================================================================
+# ZAŁĄCZNIKI
+# =============================================================================
+
+# Rozmiar porcji przy strumieniowym liczeniu skrótu i zapisie wgrywanego pliku
+ATTACHMENT_CHUNK_SIZE = int(os.getenv('ATTACHMENT_CHUNK_SIZE', str(64 * 1024)))
+# Bloby bez odwołań są usuwane przez gc_blobs dopiero po tylu godzinach od ostatniego zapisu
+ATTACHMENT_GC_GRACE_HOURS = int(os.getenv('ATTACHMENT_GC_GRACE_HOURS', '24'))
+# Kto wysyła pobierane załączniki: '' - Django (FileResponse z obsługą Range),
+# 'nginx' - X-Accel-Redirect, 'apache' - X-Sendfile (mod_xsendfile)
+ATTACHMENT_SENDFILE_BACKEND = os.getenv('ATTACHMENT_SENDFILE_BACKEND', '')
+# Wewnętrzna lokalizacja nginx (`internal;`) wskazująca na MEDIA_ROOT - patrz docker/nginx.conf
+ATTACHMENT_SENDFILE_PREFIX = os.getenv('ATTACHMENT_SENDFILE_PREFIX', '/protected-media/')
+
+# Miniatury załączników graficznych (`python manage.py generate_thumbnails`)
+# Dłuższy bok miniatury w pikselach i jakość JPEG
+ATTACHMENT_THUMBNAIL_SIZE = int(os.getenv('ATTACHMENT_THUMBNAIL_SIZE', '320'))
+ATTACHMENT_THUMBNAIL_QUALITY = int(os.getenv('ATTACHMENT_THUMBNAIL_QUALITY', '80'))
+# Liczba procesów skalujących obrazy (0 = w procesie komendy) i blobów w jednej paczce
+ATTACHMENT_THUMBNAIL_WORKERS = int(os.getenv('ATTACHMENT_THUMBNAIL_WORKERS', '2'))
+ATTACHMENT_THUMBNAIL_BATCH_SIZE = int(os.getenv('ATTACHMENT_THUMBNAIL_BATCH_SIZE', '100'))
+
+# =============================================================================
+# PRZYPOMNIENIA I ZADANIA CYKLICZNE
+# =============================================================================
+
+# Worker `python manage.py run_reminders` - patrz tasks/reminders.py
+# Klasa wysyłająca przypomnienia (podklasa tasks.notifiers.BaseNotifier)
+TASK_REMINDER_NOTIFIER = os.getenv('TASK_REMINDER_NOTIFIER', 'tasks.notifiers.EmailNotifier')
+# Co ile sekund czytać oczekujące przypomnienia i ile przetwarzać w jednej paczce
+TASK_REMINDER_POLL_SECONDS = int(os.getenv('TASK_REMINDER_POLL_SECONDS', '30'))
+TASK_REMINDER_BATCH_SIZE = int(os.getenv('TASK_REMINDER_BATCH_SIZE', '100'))
+# Nieudana wysyłka jest ponawiana po RETRY_SECONDS, potem po 2x, 4x... tym czasie;
+# po MAX_ATTEMPTS próbach przypomnienie dostaje status 'failed'
+TASK_REMINDER_MAX_ATTEMPTS = int(os.getenv('TASK_REMINDER_MAX_ATTEMPTS', '5'))
+TASK_REMINDER_RETRY_SECONDS = int(os.getenv('TASK_REMINDER_RETRY_SECONDS', '60'))
+
+# Zadania cykliczne (`python manage.py materialize_recurring_tasks`, cron) - na ile dni
+# do przodu tworzyć wystąpienia serii i ile serii uzupełniać w jednej transakcji
+TASK_RECURRENCE_HORIZON_DAYS = int(os.getenv('TASK_RECURRENCE_HORIZON_DAYS', '30'))
+TASK_RECURRENCE_BATCH_SIZE = int(os.getenv('TASK_RECURRENCE_BATCH_SIZE', '200'))
+
+# Poczta wychodząca (przypomnienia e-mailem)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'minicrm@localhost')
+
+# =============================================================================
+# TELEFONY
+# =============================================================================
+
+# Kod kraju dopisywany do numerów krajowych przy normalizacji do E.164
+PHONE_DEFAULT_COUNTRY_CODE = os.getenv('PHONE_DEFAULT_COUNTRY_CODE', '48')
+PHONE_NATIONAL_NUMBER_LENGTH = int(os.getenv('PHONE_NATIONAL_NUMBER_LENGTH', '9'))
+
+# =============================================================================
+# DUPLIKATY KONTAKTÓW
+# =============================================================================
+
+# Minimalne podobieństwo (0..1), od którego para trafia do kolejki przeglądu
+DEDUPE_MIN_SCORE = float(os.getenv('DEDUPE_MIN_SCORE', '0.6'))
+# Bloki (wspólny klucz) większe niż limit są pomijane - klucz zbyt ogólny
+DEDUPE_MAX_BLOCK_SIZE = int(os.getenv('DEDUPE_MAX_BLOCK_SIZE', '100'))
+
 # =============================================================================
 # ERP INTEGRATION SETTINGS
 # =============================================================================
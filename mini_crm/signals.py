@@ -0,0 +1,37 @@
+"""
+Sygnały wspólne dla całego projektu
+
+post_bulk_create
+    bulk_create() nie wysyła post_save, więc podsystemy utrzymujące dane
+    pochodne (indeks wyszukiwania, liczniki) nie dowiedzą się o nowych
+    wierszach. Kod wykonujący masowy zapis (import, ingest) wysyła ten
+    sygnał po zapisaniu paczki:
+
+        post_bulk_create.send(sender=Contact, instances=contacts)
+
+    instances to lista zapisanych obiektów z ustawionym pk.
+
+post_bulk_update
+    Odpowiednik dla masowej zmiany pól przez QuerySet.update() (np. zmiana
+    statusu wielu zadań - tasks/transitions.py):
+
+        post_bulk_update.send(sender=Task, changes=[(task, {'status': 'todo'}), ...])
+
+    changes to lista par: obiekt z nowymi wartościami i słownik poprzednich
+    wartości zmienionych pól.
+
+post_bulk_delete
+    Odpowiednik dla usunięcia paczki wierszy bez sygnałów post_delete
+    wysyłanych osobno dla każdego obiektu (np. archiwizacja interakcji -
+    interactions/archive.py):
+
+        post_bulk_delete.send(sender=Interaction, instances=interactions)
+
+    instances to lista usuniętych obiektów z wartościami sprzed usunięcia.
+"""
+
+from django.dispatch import Signal
+
+post_bulk_create = Signal()
+post_bulk_update = Signal()
+post_bulk_delete = Signal()
@@ -0,0 +1,69 @@
+"""
+Okna czasowe dla filtrów dat
+
+Filtr `interaction_date__date__gte=dzień` owija kolumnę w rzutowanie na
+datę (DATE(CONVERT_TZ(...)) w MySQL) - baza musi je policzyć dla
+każdego wiersza i nie może użyć indeksu (owner, interaction_date).
+Tutaj dni wybrane przez użytkownika (w strefie czasowej projektu,
+Europe/Warsaw) zamieniamy na przedział półotwarty [początek, koniec)
+jako datetime ze strefą, więc w SQL zostaje zwykłe porównanie kolumny:
+
+    interaction_date >= '2026-03-01 23:00:00' AND interaction_date < '2026-03-03 23:00:00'
+
+Koniec przedziału to północ dnia następnego po ostatnim dniu (a nie
+23:59:59), więc nie gubimy interakcji z ostatniej sekundy dnia i poprawnie
+liczymy dni zmiany czasu (23 i 25 godzin).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def day_start(day, tz=None):
+    """Północ danego dnia w strefie czasowej projektu (datetime ze strefą)"""
+    return timezone.make_aware(datetime.combine(day, time.min), tz or timezone.get_current_timezone())
+
+
+def date_range(date_from=None, date_to=None, tz=None):
+    """
+    Dni od date_from do date_to włącznie jako przedział [start, end)
+
+    Każda z granic może być None (przedział otwarty z tej strony).
+
+    Przykład (Europe/Warsaw, czas zimowy):
+        date_range(date(2026, 3, 2), date(2026, 3, 3))
+        -> (2026-03-01 23:00 UTC, 2026-03-03 23:00 UTC)
+    """
+    start = day_start(date_from, tz) if date_from else None
+    end = day_start(date_to + timedelta(days=1), tz) if date_to else None
+    return start, end
+
+
+def range_filter(field, start=None, end=None):
+    """Warunek field >= start AND field < end (pomija brakujące granice)"""
+    condition = Q()
+    if start is not None:
+        condition &= Q(**{f'{field}__gte': start})
+    if end is not None:
+        condition &= Q(**{f'{field}__lt': end})
+    return condition
+
+
+def date_range_filter(field, date_from=None, date_to=None, tz=None):
+    """Filtr pola DateTimeField po dniach wybranych przez użytkownika (włącznie)"""
+    return range_filter(field, *date_range(date_from, date_to, tz))
+
+
+def month_days(now=None):
+    """
+    Pierwszy i ostatni dzień bieżącego miesiąca kalendarzowego (lokalnego)
+
+    Dni, nie datetime - do dziennych podsumowań (interactions/rollups.py);
+    dla kolumny DateTimeField: date_range(*month_days(now)).
+    """
+    first_day = timezone.localdate(now).replace(day=1)
+    next_month = (first_day + timedelta(days=32)).replace(day=1)
+    return first_day, next_month - timedelta(days=1)
+
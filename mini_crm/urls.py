@@ -16,8 +16,6 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from django.views.generic import RedirectView
 from accounts.dashboard_views import dashboard_view
 
@@ -28,10 +26,11 @@ urlpatterns = [
     path('interactions/', include('interactions.urls')),
     path('tasks/', include('tasks.urls')),
     path('opportunities/', include('opportunities.urls')),
+    path('exports/', include('exports.urls')),
+    path('activities/', include('activities.urls')),
     path('dashboard/', dashboard_view, name='dashboard'),
     path('', RedirectView.as_view(url='/accounts/login/', permanent=False), name='home'),
 ]
 
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Bez static(MEDIA_URL) także w DEBUG - media to załączniki, miniatury i pliki importu,
+# wydawane tylko przez widoki ze sprawdzeniem właściciela (attachments/downloads.py)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('opportunities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=models.Index(fields=['owner', 'stage', 'expected_close_date'], name='opp_owner_stage_close_idx'),
+        ),
+    ]
@@ -40,6 +40,9 @@ class Opportunity(models.Model):
         ('closed_lost', 'Przegrana'),           # 😞 Klient zrezygnował
     ]
 
+    # Etapy zamknięte (wygrana lub przegrana)
+    CLOSED_STAGES = ['closed_won', 'closed_lost']
+
     # Powody przegranej (dlaczego nie kupił?)
     LOST_REASON_CHOICES = [
         ('price', 'Za drogo'),
@@ -147,6 +150,10 @@ class Opportunity(models.Model):
         verbose_name = 'Szansa sprzedaży'
         verbose_name_plural = 'Szanse sprzedaży'
         ordering = ['-expected_close_date']  # Najbliższe zamknięcia na górze
+        indexes = [
+            # Pipeline i najbliższe zamknięcia: WHERE owner = ? AND stage IN (...) AND expected_close_date BETWEEN ? AND ?
+            models.Index(fields=['owner', 'stage', 'expected_close_date'], name='opp_owner_stage_close_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.get_stage_display()}"
@@ -192,7 +199,7 @@ class Opportunity(models.Model):
         if not self.is_open():
             return False
 
-        return timezone.now().date() > self.expected_close_date
+        return timezone.localdate() > self.expected_close_date
 
     def get_stage_color(self):
         """
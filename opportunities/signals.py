@@ -0,0 +1,43 @@
+"""
+Sygnały aplikacji opportunities
+
+Utrzymują licznik otwartych szans sprzedaży kontaktu i firmy (contacts/counters.py).
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from contacts import counters
+
+from .models import Opportunity
+
+_TRACKED_FIELDS = ['contact_id', 'company_id', 'stage']
+
+
+def _is_open(stage):
+    return stage not in Opportunity.CLOSED_STAGES
+
+
+@receiver(pre_save, sender=Opportunity, dispatch_uid='opportunity_counters_previous')
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._counter_previous = None if raw else counters.previous_values(instance, _TRACKED_FIELDS)
+
+
+@receiver(post_save, sender=Opportunity, dispatch_uid='opportunity_counters_save')
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = counters.counter_values(instance)
+    previous = getattr(instance, '_counter_previous', None) if not created else None
+
+    counters.move_count(
+        'open_opportunity_count',
+        previous if previous is not None and _is_open(previous['stage']) else None,
+        current if _is_open(instance.stage) else None,
+    )
+
+
+@receiver(post_delete, sender=Opportunity, dispatch_uid='opportunity_counters_delete')
+def update_counters_on_delete(sender, instance, **kwargs):
+    if _is_open(instance.stage):
+        counters.change_count('open_opportunity_count', counters.counter_values(instance), -1)
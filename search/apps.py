@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+
+    def ready(self):
+        # Rejestracja modeli w indeksie + podpięcie sygnałów post_save/post_delete
+        from . import signals  # noqa: F401
@@ -0,0 +1,159 @@
+"""
+API wyszukiwania pełnotekstowego
+
+Jedno miejsce, przez które widoki szukają i przez które indeks jest
+aktualizowany:
+
+    from search.index import search
+    contacts = search(contacts, query, owner=request.user)
+
+Każdy indeksowany model jest zarejestrowany przez `register()` z listą pól,
+wag i analizatorów (patrz search/signals.py).
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import SearchTerm
+from .text import ANALYZERS, tokenize
+
+# Maksymalna liczba słów w zapytaniu - chroni przed bardzo długimi frazami
+MAX_QUERY_TERMS = 8
+
+# Górna granica zakresu dla wyszukiwania prefiksowego: term >= 'abc' AND term < 'abc\uffff'
+# (zapytanie zakresowe korzysta z indeksu B-tree niezależnie od collation, w przeciwieństwie do LIKE)
+_PREFIX_UPPER_BOUND = '\uffff'
+
+_registry = {}
+
+
+class SearchSpec:
+    """Opis indeksowanego modelu: rodzaj dokumentu i pola (nazwa, waga, analizator)"""
+
+    def __init__(self, model, kind, fields):
+        self.model = model
+        self.kind = kind
+        self.fields = fields
+
+    @property
+    def field_names(self):
+        return {field_name for field_name, _weight, _analyzer in self.fields}
+
+    def build_terms(self, obj):
+        """Zwraca słownik term -> waga (najwyższa waga, jeśli term występuje w kilku polach)"""
+        terms = {}
+        for field_name, weight, analyzer in self.fields:
+            for term in ANALYZERS[analyzer](getattr(obj, field_name, '') or ''):
+                terms[term] = max(weight, terms.get(term, 0))
+        return terms
+
+
+def register(model, kind, fields):
+    """
+    Rejestruje model w indeksie
+
+    Args:
+        model: Klasa modelu (musi mieć pole owner)
+        kind: Krótka nazwa rodzaju dokumentu, np. 'contact'
+        fields: Lista krotek (pole, waga, analizator), analizator: 'text' lub 'phone'
+    """
+    _registry[model] = SearchSpec(model, kind, fields)
+    return _registry[model]
+
+
+def get_spec(model):
+    return _registry[model]
+
+
+def registered_models():
+    return list(_registry)
+
+
+# ========== INDEKSOWANIE ==========
+
+def _term_rows(spec, obj):
+    return [
+        SearchTerm(owner_id=obj.owner_id, kind=spec.kind, object_id=obj.pk, term=term, weight=weight)
+        for term, weight in spec.build_terms(obj).items()
+    ]
+
+
+def index_objects(objects, batch_size=1000):
+    """
+    (Re)indeksuje listę obiektów jednego modelu
+
+    Stare termy usuwamy jednym DELETE ... WHERE object_id IN (...),
+    nowe zapisujemy przez bulk_create.
+    """
+    objects = [obj for obj in objects if obj.pk is not None]
+    if not objects:
+        return 0
+    spec = get_spec(type(objects[0]))
+    rows = [row for obj in objects for row in _term_rows(spec, obj)]
+    with transaction.atomic():
+        SearchTerm.objects.filter(kind=spec.kind, object_id__in=[obj.pk for obj in objects]).delete()
+        SearchTerm.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def index_object(obj):
+    """(Re)indeksuje pojedynczy obiekt - wywoływane z post_save"""
+    return index_objects([obj])
+
+
+def remove_object(model, pk):
+    """Usuwa obiekt z indeksu - wywoływane z post_delete"""
+    SearchTerm.objects.filter(kind=get_spec(model).kind, object_id=pk).delete()
+
+
+def remove_objects(model, pks):
+    """Usuwa paczkę obiektów z indeksu jednym DELETE - wywoływane z post_bulk_delete"""
+    SearchTerm.objects.filter(kind=get_spec(model).kind, object_id__in=pks).delete()
+
+
+# ========== WYSZUKIWANIE ==========
+
+def _prefix_q(token):
+    return Q(term__gte=token, term__lt=token + _PREFIX_UPPER_BOUND)
+
+
+def search(queryset, query, owner):
+    """
+    Zawęża queryset do obiektów pasujących do zapytania i dodaje ranking
+
+    - Każde słowo zapytania musi pasować (AND) jako prefiks któregoś termu.
+    - search_rank = suma wag pasujących termów; dokładne trafienie liczy się podwójnie.
+
+    Args:
+        queryset: QuerySet zarejestrowanego modelu (np. Contact.objects.filter(owner=...))
+        query: Tekst wpisany przez użytkownika
+        owner: Użytkownik - indeks jest zawsze przeszukiwany w obrębie właściciela
+
+    Returns:
+        QuerySet z adnotacją `search_rank` (bez zmiany sortowania)
+    """
+    spec = get_spec(queryset.model)
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not tokens:
+        return queryset.annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    terms = SearchTerm.objects.filter(owner=owner, kind=spec.kind)
+    for token in tokens:
+        queryset = queryset.filter(pk__in=terms.filter(_prefix_q(token)).values('object_id'))
+
+    rank = (
+        terms.filter(object_id=OuterRef('pk'))
+        .filter(reduce(or_, [_prefix_q(token) for token in tokens]))
+        .values('object_id')
+        .annotate(rank=Sum(Case(
+            When(term__in=tokens, then=F('weight') * 2),
+            default=F('weight'),
+            output_field=IntegerField(),
+        )))
+        .values('rank')
+    )
+    return queryset.annotate(search_rank=Coalesce(Subquery(rank, output_field=IntegerField()), 0))
@@ -0,0 +1,52 @@
+"""
+Przebudowa indeksu wyszukiwania
+
+Użycie:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --kind contact --batch-size 2000
+
+Przydatne po imporcie danych przez bulk_create() lub po zmianie
+listy indeksowanych pól.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = 'Przebudowuje indeks wyszukiwania pełnotekstowego'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            help='Rodzaj dokumentów do przebudowy (domyślnie: wszystkie)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Liczba obiektów indeksowanych w jednej transakcji (domyślnie: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        specs = [index.get_spec(model) for model in index.registered_models()]
+        if options['kind']:
+            specs = [spec for spec in specs if spec.kind == options['kind']]
+            if not specs:
+                raise CommandError(f"Nieznany rodzaj dokumentu: {options['kind']}")
+
+        batch_size = options['batch_size']
+        for spec in specs:
+            total = 0
+            batch = []
+            for obj in spec.model.objects.order_by('pk').iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    index.index_objects(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                index.index_objects(batch)
+                total += len(batch)
+            self.stdout.write(self.style.SUCCESS(f'>> {spec.kind}: zaindeksowano {total} obiektow'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 02:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, verbose_name='Rodzaj dokumentu')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID obiektu')),
+                ('term', models.CharField(max_length=64, verbose_name='Term')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Waga')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Właściciel')),
+            ],
+            options={
+                'verbose_name': 'Term wyszukiwania',
+                'verbose_name_plural': 'Termy wyszukiwania',
+                'indexes': [models.Index(fields=['owner', 'kind', 'term', 'object_id'], name='searchterm_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'term'), name='searchterm_unique_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Zbudowanie indeksu dla kontaktów i firm istniejących przed wprowadzeniem wyszukiwarki
+
+from django.db import migrations
+
+from search.text import ANALYZERS
+
+# Migawka konfiguracji z search/signals.py w chwili tworzenia migracji
+DOCUMENTS = [
+    ('contacts', 'Contact', 'contact', [
+        ('first_name', 3, 'text'),
+        ('last_name', 3, 'text'),
+        ('email', 2, 'text'),
+        ('phone', 1, 'phone'),
+        ('mobile', 1, 'phone'),
+    ]),
+    ('contacts', 'Company', 'company', [
+        ('name', 3, 'text'),
+        ('nip', 2, 'text'),
+        ('email', 2, 'text'),
+    ]),
+]
+
+
+def build_index(apps, schema_editor):
+    SearchTerm = apps.get_model('search', 'SearchTerm')
+    for app_label, model_name, kind, fields in DOCUMENTS:
+        model = apps.get_model(app_label, model_name)
+        rows = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=1000):
+            terms = {}
+            for field_name, weight, analyzer in fields:
+                for term in ANALYZERS[analyzer](getattr(obj, field_name) or ''):
+                    terms[term] = max(weight, terms.get(term, 0))
+            rows.extend(
+                SearchTerm(owner_id=obj.owner_id, kind=kind, object_id=obj.pk, term=term, weight=weight)
+                for term, weight in terms.items()
+            )
+            if len(rows) >= 5000:
+                SearchTerm.objects.bulk_create(rows)
+                rows = []
+        SearchTerm.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('contacts', '0003_contact_owner_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Zbudowanie indeksu dla interakcji istniejących przed dodaniem ich do wyszukiwarki
+
+from django.db import migrations
+
+from search.text import ANALYZERS
+
+# Migawka konfiguracji z search/signals.py w chwili tworzenia migracji
+KIND = 'interaction'
+FIELDS = [
+    ('subject', 3, 'text'),
+    ('description', 1, 'text'),
+]
+
+
+def build_index(apps, schema_editor):
+    SearchTerm = apps.get_model('search', 'SearchTerm')
+    Interaction = apps.get_model('interactions', 'Interaction')
+    rows = []
+    for obj in Interaction.objects.order_by('pk').iterator(chunk_size=1000):
+        terms = {}
+        for field_name, weight, analyzer in FIELDS:
+            for term in ANALYZERS[analyzer](getattr(obj, field_name) or ''):
+                terms[term] = max(weight, terms.get(term, 0))
+        rows.extend(
+            SearchTerm(owner_id=obj.owner_id, kind=KIND, object_id=obj.pk, term=term, weight=weight)
+            for term, weight in terms.items()
+        )
+        if len(rows) >= 5000:
+            SearchTerm.objects.bulk_create(rows)
+            rows = []
+    SearchTerm.objects.bulk_create(rows)
+
+
+def remove_index(apps, schema_editor):
+    apps.get_model('search', 'SearchTerm').objects.filter(kind=KIND).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_index_existing_documents'),
+        ('interactions', '0004_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, remove_index),
+    ]
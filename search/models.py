@@ -0,0 +1,36 @@
+"""
+Indeks wyszukiwania pełnotekstowego
+
+Zamiast LIKE '%fraza%' po kilku kolumnach (pełny skan tabeli) trzymamy
+odwrócony indeks: dla każdego dokumentu (kontakt, firma) zapisujemy
+znormalizowane słowa (termy) w osobnej tabeli. Wyszukiwanie to zapytanie
+zakresowe po indeksie (owner, kind, term), więc jego koszt zależy od liczby
+pasujących termów, a nie od liczby wierszy w tabeli kontaktów.
+"""
+
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class SearchTerm(models.Model):
+    """Pojedyncze słowo (term) jednego dokumentu w indeksie"""
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name='Właściciel')
+    kind = models.CharField('Rodzaj dokumentu', max_length=20)
+    object_id = models.PositiveBigIntegerField('ID obiektu')
+    term = models.CharField('Term', max_length=64)
+    weight = models.PositiveSmallIntegerField('Waga', default=1)
+
+    class Meta:
+        verbose_name = 'Term wyszukiwania'
+        verbose_name_plural = 'Termy wyszukiwania'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'term'], name='searchterm_unique_term'),
+        ]
+        indexes = [
+            # Wyszukiwanie prefiksowe: WHERE owner = ? AND kind = ? AND term >= ? AND term < ?
+            models.Index(fields=['owner', 'kind', 'term', 'object_id'], name='searchterm_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id}: {self.term}"
@@ -0,0 +1,73 @@
+"""
+Synchronizacja indeksu wyszukiwania z modelami
+
+Po każdym zapisie / usunięciu zarejestrowanego obiektu aktualizujemy
+jego termy. Masowe zapisy (import) wysyłają mini_crm.signals.post_bulk_create,
+a masowe usunięcia (archiwizacja) - post_bulk_delete.
+UWAGA: QuerySet.update() nie wysyła sygnałów - po takich operacjach trzeba
+wywołać search.index.index_objects() lub komendę `rebuild_search_index`.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from contacts.models import Company, Contact
+from interactions.models import ArchivedInteraction, Interaction
+from mini_crm.signals import post_bulk_create, post_bulk_delete
+
+from . import index
+
+index.register(Contact, 'contact', [
+    ('first_name', 3, 'text'),
+    ('last_name', 3, 'text'),
+    ('email', 2, 'text'),
+    ('phone', 1, 'phone'),
+    ('mobile', 1, 'phone'),
+])
+
+index.register(Company, 'company', [
+    ('name', 3, 'text'),
+    ('nip', 2, 'text'),
+    ('email', 2, 'text'),
+])
+
+# Opisy to długie notatki ze spotkań - temat waży więcej niż pojedyncze słowo z opisu
+index.register(Interaction, 'interaction', [
+    ('subject', 3, 'text'),
+    ('description', 1, 'text'),
+])
+
+# Archiwum (interactions/archive.py) - description to właściwość czytająca skompresowany payload
+index.register(ArchivedInteraction, 'archived_interaction', [
+    ('subject', 3, 'text'),
+    ('description', 1, 'text'),
+])
+
+
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields and not index.get_spec(sender).field_names & set(update_fields):
+        # save(update_fields=[...]) bez pól indeksowanych - termy się nie zmieniły
+        return
+    index.index_object(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    index.remove_object(sender, instance.pk)
+
+
+def bulk_update_search_index(sender, instances, **kwargs):
+    index.index_objects(instances)
+
+
+def bulk_remove_from_search_index(sender, instances, **kwargs):
+    index.remove_objects(sender, [instance.pk for instance in instances])
+
+
+for model in index.registered_models():
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_index_{model.__name__}')
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_remove_{model.__name__}')
+    post_bulk_create.connect(bulk_update_search_index, sender=model, dispatch_uid=f'search_bulk_{model.__name__}')
+    post_bulk_delete.connect(
+        bulk_remove_from_search_index, sender=model, dispatch_uid=f'search_bulk_remove_{model.__name__}'
+    )
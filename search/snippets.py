@@ -0,0 +1,141 @@
+"""
+Podświetlanie trafień i fragmenty (snippety) wyników wyszukiwania
+
+Dopasowanie działa tak samo jak w indeksie (search.index.search): słowo
+tekstu jest trafieniem, jeśli któryś z jego termów zaczyna się od słowa
+zapytania. Dzięki temu "lodz" podświetla "Łódź", a "kowal" - "Kowalskim".
+
+    snippet('...długa notatka ze spotkania...', 'umowa') ->
+        '… przesłać <mark>umowę</mark> do akceptacji …'
+
+Tekst jest escapowany; znaczniki <mark> to jedyny HTML w wyniku.
+"""
+
+import re
+from collections import Counter
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .index import MAX_QUERY_TERMS
+from .text import tokenize
+
+SNIPPET_LENGTH = 200
+# Najwięcej trafień branych pod uwagę przy wyborze fragmentu
+MAX_WINDOW_MATCHES = 1000
+ELLIPSIS = '…'
+
+_WORD_RE = re.compile(r'\w+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def query_terms(query):
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def _matches(text, terms):
+    """Pozycje (start, koniec, term zapytania) słów tekstu pasujących do zapytania"""
+    found = []
+    for match in _WORD_RE.finditer(text):
+        for word_term in tokenize(match.group()):
+            term = next((term for term in terms if word_term.startswith(term)), None)
+            if term:
+                found.append((match.start(), match.end(), term))
+                break
+    return found
+
+
+def _render(text, matches, start, end):
+    parts = []
+    position = start
+    for match_start, match_end, _term in matches:
+        if match_start < start or match_end > end:
+            continue
+        parts.append(escape(text[position:match_start]))
+        parts.append(f'<mark>{escape(text[match_start:match_end])}</mark>')
+        position = match_end
+    parts.append(escape(text[position:end]))
+    return ''.join(parts)
+
+
+def highlight(text, query):
+    """Cały tekst z trafieniami w <mark> (np. temat interakcji)"""
+    text = text or ''
+    terms = query_terms(query)
+    if not terms:
+        return escape(text)
+    return mark_safe(_render(text, _matches(text, terms), 0, len(text)))
+
+
+def _best_window(matches, length):
+    """
+    Okno o długości `length` z największą liczbą różnych słów zapytania
+
+    Okno przesuwane dwoma wskaźnikami po trafieniach posortowanych według
+    pozycji - koszt liniowy w liczbie trafień. Brane jest pod uwagę
+    najwyżej MAX_WINDOW_MATCHES pierwszych trafień (długi opis z maila
+    i zapytanie z jedną literą to dziesiątki tysięcy trafień).
+
+    Returns:
+        (początek okna, początek pierwszego trafienia w oknie)
+    """
+    matches = matches[:MAX_WINDOW_MATCHES]
+    best, best_score = (0, 0), None
+    in_window = Counter()
+    right = 0
+    for index, (match_start, _end, term) in enumerate(matches):
+        # Trafienie nie na samym brzegu - trochę kontekstu przed nim
+        window_start = max(0, match_start - length // 4)
+        # Koniec okna nie maleje, więc prawy wskaźnik tylko idzie do przodu
+        right = max(right, index)
+        while right < len(matches) and matches[right][1] <= window_start + length:
+            in_window[matches[right][2]] += 1
+            right += 1
+        score = (len(in_window), right - index)
+        if best_score is None or score > best_score:
+            best, best_score = (window_start, match_start), score
+        if right > index:
+            # Bieżące trafienie wypada z okna przed następnym krokiem
+            in_window[term] -= 1
+            if not in_window[term]:
+                del in_window[term]
+    return best
+
+
+def _word_boundary(text, position, forward):
+    """Przesuwa pozycję do najbliższej spacji, żeby nie ucinać słów"""
+    if position <= 0 or position >= len(text):
+        return max(0, min(position, len(text)))
+    if forward:
+        space = text.find(' ', position)
+        return space + 1 if space != -1 else position
+    space = text.rfind(' ', 0, position)
+    return space if space > 0 else position
+
+
+def snippet(text, query, length=SNIPPET_LENGTH):
+    """
+    Fragment tekstu o długości ok. `length` znaków wokół trafień, z <mark>
+
+    Wybierany jest fragment z największą liczbą różnych słów zapytania.
+    Bez trafień - początek tekstu.
+    """
+    text = _SPACE_RE.sub(' ', text or '').strip()
+    matches = _matches(text, query_terms(query))
+    if len(text) <= length:
+        return mark_safe(_render(text, matches, 0, len(text)))
+
+    start = 0
+    if matches:
+        start, anchor = _best_window(matches, length)
+        start = min(_word_boundary(text, start, forward=True), anchor)
+    end = _word_boundary(text, start + length, forward=False)
+    if end <= start:
+        end = min(start + length, len(text))
+
+    result = _render(text, matches, start, end)
+    if start > 0:
+        result = f'{ELLIPSIS} {result}'
+    if end < len(text):
+        result = f'{result} {ELLIPSIS}'
+    return mark_safe(result)
@@ -0,0 +1,25 @@
+"""
+Filtry szablonów dla wyników wyszukiwania
+
+    {% load search_tags %}
+    {{ interaction.subject|search_highlight:search_query }}
+    {{ interaction.description|search_snippet:search_query }}
+"""
+
+from django import template
+
+from search.snippets import highlight, snippet
+
+register = template.Library()
+
+
+@register.filter
+def search_highlight(text, query):
+    """Tekst z trafieniami zapytania w <mark>"""
+    return highlight(text, query)
+
+
+@register.filter
+def search_snippet(text, query):
+    """Fragment tekstu wokół trafień zapytania, z <mark>"""
+    return snippet(text, query)
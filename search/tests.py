@@ -0,0 +1,114 @@
+"""
+Testy indeksu wyszukiwania pełnotekstowego
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from contacts.models import Company, Contact
+from search.index import search
+from search.models import SearchTerm
+from search.snippets import SNIPPET_LENGTH, highlight, snippet
+from search.text import phone_terms, tokenize
+
+
+class TestTokenizer(TestCase):
+    """Normalizacja tekstu - ta sama dla dokumentów i zapytań"""
+
+    def test_tokenize_folds_polish_characters(self):
+        self.assertEqual(tokenize('Łódź Żółć'), ['lodz', 'zolc'])
+
+    def test_tokenize_splits_email(self):
+        self.assertEqual(tokenize('Jan.Kowalski@Firma.pl'), ['jan', 'kowalski', 'firma', 'pl'])
+
+    def test_phone_terms_include_digits_and_national_number(self):
+        terms = phone_terms('+48 123 456 789')
+        self.assertIn('48123456789', terms)
+        self.assertIn('123456789', terms)
+        self.assertIn('456', terms)
+
+
+class TestSearchIndex(TestCase):
+    """Synchronizacja indeksu i wyszukiwanie"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+
+        self.jan = Contact.objects.create(
+            first_name='Jan', last_name='Kowalski', email='jan@example.com',
+            phone='+48 123 456 789', owner=self.user
+        )
+        self.janina = Contact.objects.create(
+            first_name='Janina', last_name='Nowak', email='janina@example.com', owner=self.user
+        )
+        self.other = Contact.objects.create(
+            first_name='Jan', last_name='Obcy', email='obcy@example.com', owner=self.other_user
+        )
+
+    def search_contacts(self, query):
+        return list(search(Contact.objects.filter(owner=self.user), query, owner=self.user).order_by('-search_rank'))
+
+    def test_index_is_built_on_save(self):
+        terms = set(SearchTerm.objects.filter(kind='contact', object_id=self.jan.pk).values_list('term', flat=True))
+        self.assertIn('kowalski', terms)
+        self.assertIn('123456789', terms)
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.search_contacts('kowal'), [self.jan])
+
+    def test_exact_match_ranked_first(self):
+        """'jan' to dokładne trafienie dla Jana i tylko prefiks dla Janiny"""
+        self.assertEqual(self.search_contacts('jan'), [self.jan, self.janina])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search_contacts('jan nowak'), [self.janina])
+
+    def test_phone_search_ignores_formatting(self):
+        self.assertEqual(self.search_contacts('123-456-789'), [self.jan])
+
+    def test_search_is_scoped_to_owner(self):
+        self.assertNotIn(self.other, self.search_contacts('obcy'))
+
+    def test_index_updated_on_change_and_delete(self):
+        self.jan.last_name = 'Zieliński'
+        self.jan.save()
+        self.assertEqual(self.search_contacts('zielinski'), [self.jan])
+        self.assertEqual(self.search_contacts('kowalski'), [])
+
+        contact_pk = self.jan.pk
+        self.jan.delete()
+        self.assertFalse(SearchTerm.objects.filter(kind='contact', object_id=contact_pk).exists())
+
+    def test_company_search(self):
+        company = Company.objects.create(name='Acme Polska', nip='1234567890', owner=self.user)
+        results = search(Company.objects.filter(owner=self.user), '1234567890', owner=self.user)
+        self.assertEqual(list(results), [company])
+
+
+class TestSnippets(TestCase):
+    """Podświetlanie trafień i fragmenty długich opisów"""
+
+    def test_highlight_folds_and_escapes(self):
+        self.assertEqual(
+            highlight('Oferta <b> dla Łodzi', 'lodz ofer'),
+            '<mark>Oferta</mark> &lt;b&gt; dla <mark>Łodzi</mark>',
+        )
+
+    def test_snippet_picks_window_with_most_query_words(self):
+        text = 'Wstęp o umowie. ' + 'Nieistotne zdanie o pogodzie. ' * 20 + 'Umowa serwisowa dla oddziału w Łodzi. ' + 'Koniec notatki. ' * 20
+
+        result = snippet(text, 'umow lodz', length=80)
+        self.assertIn('<mark>Łodzi</mark>', result)
+        self.assertIn('<mark>Umowa</mark>', result)
+        self.assertTrue(result.startswith('… ') and result.endswith(' …'))
+        self.assertLessEqual(len(result.replace('<mark>', '').replace('</mark>', '')), 84)
+
+    def test_snippet_of_long_text_with_many_matches(self):
+        # Cała treść maila z importu poczty i zapytanie z jedną literą - 20 tys. trafień
+        result = snippet('a ' * 20000, 'a')
+        self.assertTrue(result.startswith('<mark>a</mark> '))
+        self.assertLessEqual(len(result.replace('<mark>', '').replace('</mark>', '')), SNIPPET_LENGTH + 2)
+
+    def test_snippet_without_match_returns_beginning(self):
+        self.assertEqual(snippet('Krótka\nnotatka', 'xyz'), 'Krótka notatka')
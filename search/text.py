@@ -0,0 +1,63 @@
+"""
+Normalizacja tekstu dla indeksu wyszukiwania
+
+Ten sam tokenizer jest używany przy indeksowaniu i przy zapytaniu,
+więc "Łódź", "lodz" i "ŁÓDŹ" trafiają w ten sam term.
+"""
+
+import re
+import unicodedata
+
+MAX_TERM_LENGTH = 64
+
+# Znaki, których NFKD nie rozkłada na literę + akcent
+_EXTRA_FOLDING = str.maketrans({'ł': 'l', 'Ł': 'l', 'ø': 'o', 'Ø': 'o', 'ß': 'ss'})
+
+_TOKEN_RE = re.compile(r'[0-9a-z]+')
+_DIGITS_RE = re.compile(r'\D+')
+
+# Długość numeru krajowego (PL) - pozwala znaleźć "+48 123 456 789" po "123456789"
+NATIONAL_NUMBER_LENGTH = 9
+
+
+def fold(value):
+    """Zamienia na małe litery i usuwa polskie (i inne) znaki diakrytyczne"""
+    value = value.translate(_EXTRA_FOLDING)
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return value.lower()
+
+
+def tokenize(value):
+    """
+    Dzieli tekst na termy
+
+    Przykład:
+        tokenize('Jan.Kowalski@Firma.pl') -> ['jan', 'kowalski', 'firma', 'pl']
+    """
+    if not value:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in _TOKEN_RE.findall(fold(str(value)))]
+
+
+def phone_terms(value):
+    """
+    Termy dla numeru telefonu
+
+    Oprócz grup cyfr ("48", "123", ...) indeksujemy cały numer bez separatorów
+    i numer krajowy (ostatnie 9 cyfr), żeby wyszukiwanie działało niezależnie
+    od sposobu zapisu.
+    """
+    terms = tokenize(value)
+    digits = _DIGITS_RE.sub('', value or '')
+    if digits:
+        terms.append(digits[:MAX_TERM_LENGTH])
+        if len(digits) > NATIONAL_NUMBER_LENGTH:
+            terms.append(digits[-NATIONAL_NUMBER_LENGTH:])
+    return terms
+
+
+ANALYZERS = {
+    'text': tokenize,
+    'phone': phone_terms,
+}
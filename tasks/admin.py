@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Task
+from django.utils import timezone
+from .models import ReminderMessage, Task, TaskRecurrence
+from .transitions import change_status
 
 
 @admin.register(Task)
@@ -36,18 +38,49 @@ class TaskAdmin(admin.ModelAdmin):
 
     def mark_as_done(self, request, queryset):
         """Oznacz zadania jako wykonane"""
-        updated = queryset.update(status='done')
+        updated = change_status(queryset, 'done')
         self.message_user(request, f'{updated} zadań oznaczono jako wykonane.')
     mark_as_done.short_description = 'Oznacz jako wykonane'
 
     def mark_as_in_progress(self, request, queryset):
         """Oznacz zadania jako w trakcie"""
-        updated = queryset.update(status='in_progress')
+        updated = change_status(queryset, 'in_progress')
         self.message_user(request, f'{updated} zadań oznaczono jako w trakcie.')
     mark_as_in_progress.short_description = 'Oznacz jako w trakcie'
 
     def mark_as_todo(self, request, queryset):
         """Oznacz zadania jako do zrobienia"""
-        updated = queryset.update(status='todo')
+        updated = change_status(queryset, 'todo')
         self.message_user(request, f'{updated} zadań oznaczono jako do zrobienia.')
     mark_as_todo.short_description = 'Oznacz jako do zrobienia'
+
+
+@admin.register(TaskRecurrence)
+class TaskRecurrenceAdmin(admin.ModelAdmin):
+    """Reguły zadań cyklicznych"""
+    list_display = ['task', 'rule', 'dtstart', 'next_occurrence_at']
+    search_fields = ['task__title', 'rule']
+    list_select_related = ['task']
+    raw_id_fields = ['task']
+    readonly_fields = ['next_occurrence_at', 'created_at']
+
+
+@admin.register(ReminderMessage)
+class ReminderMessageAdmin(admin.ModelAdmin):
+    """Outbox przypomnień - podgląd i ponowienie nieudanych wysyłek"""
+    list_display = ['task', 'recipient', 'reminder_date', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['task__title', 'recipient__username', 'recipient__email']
+    list_select_related = ['task', 'recipient']
+    raw_id_fields = ['task', 'recipient']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error']
+
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        """Wróć wiadomości do kolejki wysyłki"""
+        updated = queryset.exclude(status=ReminderMessage.STATUS_SENT).update(
+            status=ReminderMessage.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} przypomnień wróciło do kolejki wysyłki.')
+    retry.short_description = 'Wyślij ponownie'
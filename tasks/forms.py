@@ -1,11 +1,24 @@
 from django import forms
+from django.db.models import Q
 from .models import Task
+from .recurrence import set_recurrence
+from .rrule import parse_rrule
 from contacts.models import Contact, Company
+from mini_crm.timewindows import date_range_filter
 
 
 class TaskForm(forms.ModelForm):
     """Formularz dla zadań"""
 
+    recurrence_rule = forms.CharField(
+        label='Powtarzaj (RRULE)',
+        required=False,
+        max_length=200,
+        help_text='Np. FREQ=WEEKLY;BYDAY=MO - co poniedziałek, FREQ=MONTHLY;COUNT=12 - co miesiąc przez rok. '
+                  'Puste - zadanie jednorazowe.',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'FREQ=WEEKLY;BYDAY=MO'}),
+    )
+
     class Meta:
         model = Task
         fields = [
@@ -39,6 +52,13 @@ class TaskForm(forms.ModelForm):
             from django.contrib.auth.models import User
             self.fields['assigned_to'].queryset = User.objects.filter(id=self.user.id)
 
+        # Regułę ma tylko zadanie wzorcowe serii - wystąpienia edytuje się jak zwykłe zadania
+        recurrence = self.instance.recurrence if self.instance.recurrence_id else None
+        if recurrence and recurrence.task_id != self.instance.pk:
+            del self.fields['recurrence_rule']
+        elif recurrence:
+            self.fields['recurrence_rule'].initial = recurrence.rule
+
         # Ustaw domyślne wartości
         if contact_id:
             self.fields['contact'].initial = contact_id
@@ -50,6 +70,22 @@ class TaskForm(forms.ModelForm):
         self.fields['company'].empty_label = '--- Brak powiązania ---'
         self.fields['assigned_to'].empty_label = '--- Przypisz do mnie ---'
 
+    def clean_recurrence_rule(self):
+        rule = self.cleaned_data.get('recurrence_rule', '').strip()
+        if not rule:
+            return ''
+        try:
+            # Postać kanoniczna - ta sama reguła wpisana inaczej nie przebudowuje serii
+            return str(parse_rrule(rule))
+        except ValueError as exc:
+            raise forms.ValidationError(str(exc))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('recurrence_rule') and not cleaned_data.get('due_date'):
+            self.add_error('due_date', 'Zadanie cykliczne wymaga terminu wykonania - to pierwsze wystąpienie serii.')
+        return cleaned_data
+
     def save(self, commit=True):
         instance = super().save(commit=False)
         if self.user and not instance.pk:
@@ -59,6 +95,8 @@ class TaskForm(forms.ModelForm):
                 instance.assigned_to = self.user
         if commit:
             instance.save()
+            if 'recurrence_rule' in self.fields:
+                set_recurrence(instance, self.cleaned_data.get('recurrence_rule', ''))
         return instance
 
 
@@ -98,13 +136,76 @@ class TaskSearchForm(forms.Form):
         required=False,
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
+    due_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    due_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
 
     def __init__(self, *args, **kwargs):
-        user = kwargs.pop('user', None)
+        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
-        if user:
-            self.fields['contact'].queryset = Contact.objects.filter(owner=user)
-            self.fields['company'].queryset = Company.objects.filter(owner=user)
+        if self.user:
+            self.fields['contact'].queryset = Contact.objects.filter(owner=self.user)
+            self.fields['company'].queryset = Company.objects.filter(owner=self.user)
+
+    def filter_queryset(self, queryset):
+        """Stosuje filtry formularza do querysetu zadań (lista i eksport)"""
+        if not self.is_valid():
+            return queryset
+
+        query = self.cleaned_data.get('query')
+        status = self.cleaned_data.get('status')
+        priority = self.cleaned_data.get('priority')
+        contact = self.cleaned_data.get('contact')
+        company = self.cleaned_data.get('company')
+        overdue_only = self.cleaned_data.get('overdue_only')
+        due_from = self.cleaned_data.get('due_from')
+        due_to = self.cleaned_data.get('due_to')
+
+        if query:
+            queryset = queryset.filter(
+                Q(title__icontains=query) |
+                Q(description__icontains=query)
+            )
+
+        if status:
+            queryset = queryset.filter(status=status)
+
+        if priority:
+            queryset = queryset.filter(priority=priority)
+
+        if contact:
+            queryset = queryset.filter(contact=contact)
+
+        if company:
+            queryset = queryset.filter(company=company)
+
+        if overdue_only:
+            queryset = queryset.overdue()
+
+        if due_from or due_to:
+            # Dni w strefie projektu -> przedział [od, do + 1 dzień) po indeksie (owner, status, due_date)
+            queryset = queryset.filter(date_range_filter('due_date', due_from, due_to))
+
+        return queryset
+
+
+class TaskBulkStatusForm(forms.Form):
+    """Masowa zmiana statusu zaznaczonych zadań (lista zadań)"""
+
+    tasks = forms.ModelMultipleChoiceField(queryset=Task.objects.none())
+    status = forms.ChoiceField(choices=Task.STATUS_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if self.user:
+            self.fields['tasks'].queryset = Task.objects.filter(owner=self.user)
+        self.fields['tasks'].error_messages['required'] = 'Zaznacz co najmniej jedno zadanie.'
 
 
 class QuickTaskForm(forms.ModelForm):
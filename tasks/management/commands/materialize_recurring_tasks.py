@@ -0,0 +1,41 @@
+"""
+Tworzenie wystąpień zadań cyklicznych w kroczącym horyzoncie
+
+Użycie:
+    python manage.py materialize_recurring_tasks
+    python manage.py materialize_recurring_tasks --horizon-days 60 --batch-size 500
+
+Dla serii, których następne wystąpienie wypada w horyzoncie, tworzy
+brakujące zadania i przesuwa serię za horyzont - patrz tasks/recurrence.py.
+Uruchamiana z crona; ponowne lub równoległe uruchomienie jest bezpieczne.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.recurrence import materialize_due
+
+
+class Command(BaseCommand):
+    help = 'Tworzy wystąpienia zadań cyklicznych z wyprzedzeniem (kroczący horyzont)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days',
+            type=int,
+            default=settings.TASK_RECURRENCE_HORIZON_DAYS,
+            help=f'Na ile dni do przodu tworzyć zadania (domyślnie: {settings.TASK_RECURRENCE_HORIZON_DAYS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TASK_RECURRENCE_BATCH_SIZE,
+            help=f'Liczba serii w jednej transakcji (domyślnie: {settings.TASK_RECURRENCE_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['horizon_days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--horizon-days i --batch-size muszą być >= 1')
+
+        series, tasks = materialize_due(horizon_days=options['horizon_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'>> Zadania cykliczne: {series} serii, {tasks} nowych zadan'))
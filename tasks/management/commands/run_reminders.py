@@ -0,0 +1,60 @@
+"""
+Worker wysyłający przypomnienia o zadaniach (Task.reminder_date)
+
+Użycie:
+    python manage.py run_reminders
+    python manage.py run_reminders --poll-seconds 10 --batch-size 200
+    python manage.py run_reminders --once
+
+Proces działa stale (kontener `reminders` w docker-compose) i kończy pracę
+po SIGTERM / SIGINT, po bieżącej paczce. Można uruchomić kilka workerów -
+przypomnienia są przejmowane atomowo, patrz tasks/reminders.py. --once
+wykonuje jeden przebieg (odczyt, przejęcie, wysyłka) i kończy pracę.
+"""
+
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.reminders import ReminderWorker
+
+
+class Command(BaseCommand):
+    help = 'Wysyła przypomnienia o zadaniach (worker działający stale)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-seconds',
+            type=int,
+            default=settings.TASK_REMINDER_POLL_SECONDS,
+            help=f'Co ile sekund czytać oczekujące przypomnienia (domyślnie: {settings.TASK_REMINDER_POLL_SECONDS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TASK_REMINDER_BATCH_SIZE,
+            help=f'Liczba przypomnień w jednej paczce (domyślnie: {settings.TASK_REMINDER_BATCH_SIZE})',
+        )
+        parser.add_argument('--once', action='store_true', help='Jeden przebieg zamiast pracy ciągłej')
+
+    def handle(self, *args, **options):
+        if options['poll_seconds'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--poll-seconds i --batch-size muszą być >= 1')
+
+        worker = ReminderWorker(poll_seconds=options['poll_seconds'], batch_size=options['batch_size'])
+        if options['once']:
+            self.report(worker.run_once())
+            return
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(self.style.SUCCESS(f'>> Worker przypomnien uruchomiony (odczyt co {worker.poll_seconds} s)'))
+        worker.run(report=self.report)
+        self.stdout.write(self.style.SUCCESS('>> Worker przypomnien zatrzymany'))
+
+    def report(self, stats):
+        self.stdout.write(self.style.SUCCESS(
+            f'>> Przypomnienia: {stats["claimed"]} przejetych, {stats["sent"]} wyslanych, '
+            f'{stats["retry"]} do ponowienia, {stats["failed"]} bledow'
+        ))
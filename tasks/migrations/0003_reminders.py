@@ -0,0 +1,62 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('tasks', '0002_owner_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reminder_date', models.DateTimeField(verbose_name='Data przypomnienia')),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('sent', 'Wysłane'), ('failed', 'Błąd')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Liczba prób')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Następna próba')),
+                ('last_error', models.TextField(blank=True, verbose_name='Ostatni błąd')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Data wysłania')),
+            ],
+            options={
+                'verbose_name': 'Przypomnienie',
+                'verbose_name_plural': 'Przypomnienia',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Przypomnienie obsłużone'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['reminder_sent_at', 'reminder_date'], name='task_pending_reminder_idx'),
+        ),
+        migrations.AddField(
+            model_name='remindermessage',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Odbiorca'),
+        ),
+        migrations.AddField(
+            model_name='remindermessage',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_messages', to='tasks.task', verbose_name='Zadanie'),
+        ),
+        migrations.AddIndex(
+            model_name='remindermessage',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='reminder_status_next_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='remindermessage',
+            constraint=models.UniqueConstraint(fields=('task', 'reminder_date'), name='reminder_task_date_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Przypomnienia z datą sprzed wdrożenia workera run_reminders nigdy nie były
+# wysyłane - oznaczamy je jako obsłużone, żeby pierwsze uruchomienie nie
+# rozesłało zaległych przypomnień sprzed miesięcy.
+
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+
+def mark_past_reminders(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(reminder_sent_at__isnull=True, reminder_date__lt=timezone.now()).update(
+        reminder_sent_at=F('reminder_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_reminders'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_past_reminders, migrations.RunPython.noop),
+    ]
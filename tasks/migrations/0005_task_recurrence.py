@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_mark_past_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRecurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(max_length=200, verbose_name='Reguła (RRULE)')),
+                ('dtstart', models.DateTimeField(verbose_name='Pierwsze wystąpienie')),
+                ('next_occurrence_at', models.DateTimeField(blank=True, null=True, verbose_name='Następne wystąpienie do utworzenia')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data utworzenia')),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_rule', to='tasks.task', verbose_name='Zadanie wzorcowe')),
+            ],
+            options={
+                'verbose_name': 'Reguła powtarzania',
+                'verbose_name_plural': 'Reguły powtarzania',
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='tasks.taskrecurrence', verbose_name='Seria'),
+        ),
+        migrations.AddIndex(
+            model_name='taskrecurrence',
+            index=models.Index(fields=['next_occurrence_at'], name='recurrence_next_idx'),
+        ),
+    ]
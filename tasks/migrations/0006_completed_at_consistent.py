@@ -0,0 +1,31 @@
+# Ograniczenie spójności completed_at ze statusem. Wcześniej akcje panelu
+# administracyjnego zmieniały status przez QuerySet.update() bez daty
+# wykonania - takie wiersze są wyrównywane przed dodaniem ograniczenia
+# (brakująca data wykonania = data ostatniej zmiany zadania).
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fix_completed_at(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(status='done', completed_at__isnull=True).update(completed_at=F('updated_at'))
+    Task.objects.exclude(status='done').filter(completed_at__isnull=False).update(completed_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0013_owner_indexes'),
+        ('tasks', '0005_task_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_completed_at, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('completed_at__isnull', False), ('status', 'done')), models.Q(models.Q(('status', 'done'), _negated=True), ('completed_at__isnull', True)), _connector='OR'), name='task_completed_at_consistent'),
+        ),
+    ]
@@ -1,8 +1,36 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.utils import timezone
 from contacts.models import Contact, Company
 
+from .rrule import describe, parse_rrule
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Filtry terminów zadań w SQL - te same warunki co Task.is_overdue() / is_due_soon()
+
+        Task.objects.filter(owner=user).overdue().order_by('due_date')
+        Task.objects.filter(owner=user).due_soon(hours=48).count()
+
+    Status jest filtrowany przez IN z listą otwartych statusów (a nie NOT IN
+    zamkniętych), więc baza czyta indeks (owner, status, due_date) zakresem
+    po due_date dla każdego statusu.
+    """
+
+    def open(self):
+        return self.filter(status__in=Task.OPEN_STATUSES)
+
+    def overdue(self, now=None):
+        return self.open().filter(due_date__lt=now or timezone.now())
+
+    def due_soon(self, hours=24, now=None):
+        now = now or timezone.now()
+        return self.open().filter(due_date__gt=now, due_date__lte=now + timedelta(hours=hours))
+
 
 class Task(models.Model):
     """Model reprezentujący zadanie"""
@@ -14,6 +42,10 @@ class Task(models.Model):
         ('cancelled', 'Anulowane'),
     ]
 
+    # Statusy zadań zamkniętych (nie liczą się do otwartych ani zaległych) i otwartych
+    CLOSED_STATUSES = ['done', 'cancelled']
+    OPEN_STATUSES = ['todo', 'in_progress']
+
     PRIORITY_CHOICES = [
         ('low', 'Niska'),
         ('medium', 'Średnia'),
@@ -30,6 +62,8 @@ class Task(models.Model):
     # Terminy
     due_date = models.DateTimeField('Termin wykonania', null=True, blank=True)
     reminder_date = models.DateTimeField('Data przypomnienia', null=True, blank=True)
+    # Ustawiane przez worker przypomnień (tasks/reminders.py); zmiana reminder_date je zeruje
+    reminder_sent_at = models.DateTimeField('Przypomnienie obsłużone', null=True, blank=True, editable=False)
 
     # Powiązania
     contact = models.ForeignKey(
@@ -62,17 +96,49 @@ class Task(models.Model):
     created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
     updated_at = models.DateTimeField('Data aktualizacji', auto_now=True)
     completed_at = models.DateTimeField('Data wykonania', null=True, blank=True)
+    # Seria zadania cyklicznego (również dla zadania wzorcowego) - patrz tasks/recurrence.py
+    recurrence = models.ForeignKey(
+        'TaskRecurrence',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Seria',
+        related_name='occurrences'
+    )
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Zadanie'
         verbose_name_plural = 'Zadania'
         ordering = ['-priority', 'due_date', '-created_at']
+        indexes = [
+            # Zadania otwarte / pilne / po terminie / z bliskim terminem (TaskQuerySet):
+            # WHERE owner = ? AND status IN (...) AND due_date < ? ORDER BY due_date
+            models.Index(fields=['owner', 'status', 'due_date'], name='task_owner_status_due_idx'),
+            # Oczekujące przypomnienia (worker run_reminders):
+            # WHERE reminder_sent_at IS NULL AND reminder_date <= ? ORDER BY reminder_date
+            models.Index(fields=['reminder_sent_at', 'reminder_date'], name='task_pending_reminder_idx'),
+        ]
+        constraints = [
+            # Data wykonania jest tylko przy zadaniu wykonanym - pilnuje baza także przy
+            # QuerySet.update() i bulk_create (zmiany statusu: tasks/transitions.py)
+            models.CheckConstraint(
+                condition=(
+                    Q(status='done', completed_at__isnull=False)
+                    | (~Q(status='done') & Q(completed_at__isnull=True))
+                ),
+                name='task_completed_at_consistent',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
     def save(self, *args, **kwargs):
-        # Automatycznie ustaw datę wykonania gdy status zmieni się na 'done'
+        # Automatycznie ustaw datę wykonania gdy status zmieni się na 'done' (formularze, admin);
+        # przełącznik i masowa zmiana statusu ustawiają ją w UPDATE - tasks/transitions.py
         if self.status == 'done' and not self.completed_at:
             self.completed_at = timezone.now()
         elif self.status != 'done':
@@ -80,14 +146,14 @@ class Task(models.Model):
         super().save(*args, **kwargs)
 
     def is_overdue(self):
-        """Sprawdza czy zadanie jest po terminie"""
-        if self.due_date and self.status not in ['done', 'cancelled']:
+        """Sprawdza czy zadanie jest po terminie (dla list w SQL: TaskQuerySet.overdue())"""
+        if self.due_date and self.status not in self.CLOSED_STATUSES:
             return timezone.now() > self.due_date
         return False
 
     def is_due_soon(self):
-        """Sprawdza czy zadanie jest do wykonania wkrótce (w ciągu 24h)"""
-        if self.due_date and self.status not in ['done', 'cancelled']:
+        """Sprawdza czy zadanie jest do wykonania wkrótce (w ciągu 24h, w SQL: TaskQuerySet.due_soon())"""
+        if self.due_date and self.status not in self.CLOSED_STATUSES:
             time_diff = self.due_date - timezone.now()
             return timezone.timedelta(0) < time_diff <= timezone.timedelta(hours=24)
         return False
@@ -113,3 +179,84 @@ class Task(models.Model):
             'urgent': 'bg-danger',
         }
         return priority_classes.get(self.priority, 'bg-secondary')
+
+
+class TaskRecurrence(models.Model):
+    """
+    Reguła powtarzania zadania (podzbiór RRULE - tasks/rrule.py)
+
+    Zadanie wzorcowe jest pierwszym wystąpieniem serii. Kolejne wystąpienia
+    to zwykłe zadania tworzone z wyprzedzeniem TASK_RECURRENCE_HORIZON_DAYS
+    (tasks/recurrence.py); next_occurrence_at to pierwsze jeszcze
+    nieutworzone wystąpienie, NULL - seria zakończona.
+    """
+
+    task = models.OneToOneField(
+        Task, on_delete=models.CASCADE, verbose_name='Zadanie wzorcowe', related_name='recurrence_rule'
+    )
+    rule = models.CharField('Reguła (RRULE)', max_length=200)
+    dtstart = models.DateTimeField('Pierwsze wystąpienie')
+    next_occurrence_at = models.DateTimeField('Następne wystąpienie do utworzenia', null=True, blank=True)
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Reguła powtarzania'
+        verbose_name_plural = 'Reguły powtarzania'
+        indexes = [
+            # Serie do uzupełnienia: WHERE next_occurrence_at <= ? ORDER BY next_occurrence_at
+            models.Index(fields=['next_occurrence_at'], name='recurrence_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task.title}: {self.get_rule_display()}"
+
+    def get_rule_display(self):
+        """Opis reguły po polsku"""
+        return describe(parse_rrule(self.rule))
+
+
+class ReminderMessage(models.Model):
+    """
+    Przypomnienie o zadaniu do wysłania (outbox)
+
+    Wiersz powstaje w tej samej transakcji, w której worker przejmuje
+    przypomnienie zadania, a wysyłka odbywa się po jej zatwierdzeniu - patrz
+    tasks/reminders.py. Nieudane wysyłki są ponawiane z rosnącym odstępem.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Oczekuje'),
+        (STATUS_SENT, 'Wysłane'),
+        (STATUS_FAILED, 'Błąd'),
+    ]
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, verbose_name='Zadanie', related_name='reminder_messages'
+    )
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Odbiorca', related_name='+')
+    # Data przypomnienia w chwili przejęcia - ta sama data nie jest wysyłana dwa razy
+    reminder_date = models.DateTimeField('Data przypomnienia')
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField('Liczba prób', default=0)
+    next_attempt_at = models.DateTimeField('Następna próba')
+    last_error = models.TextField('Ostatni błąd', blank=True)
+    created_at = models.DateTimeField('Data utworzenia', auto_now_add=True)
+    sent_at = models.DateTimeField('Data wysłania', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Przypomnienie'
+        verbose_name_plural = 'Przypomnienia'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'reminder_date'], name='reminder_task_date_uniq'),
+        ]
+        indexes = [
+            # WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at
+            models.Index(fields=['status', 'next_attempt_at'], name='reminder_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task.title} ({self.get_status_display()})"
@@ -0,0 +1,85 @@
+"""
+Wysyłka przypomnień o zadaniach
+
+Worker przypomnień (tasks/reminders.py) przekazuje paczkę wiadomości
+z outboksu do notyfikatora wskazanego w TASK_REMINDER_NOTIFIER:
+
+    TASK_REMINDER_NOTIFIER = 'tasks.notifiers.EmailNotifier'
+
+Własny kanał (SMS, Slack, push) to klasa dziedzicząca po BaseNotifier.
+Notyfikator nie zapisuje niczego w bazie - zwraca tylko błędy, a o ponowieniu
+decyduje worker.
+"""
+
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class BaseNotifier(ABC):
+    """Kanał wysyłki przypomnień"""
+
+    @abstractmethod
+    def send(self, messages):
+        """
+        Wysyła paczkę przypomnień
+
+        Args:
+            messages: lista ReminderMessage z wczytanymi task i recipient
+
+        Returns:
+            {pk wiadomości: opis błędu} dla wiadomości, których nie wysłano
+        """
+
+
+class EmailNotifier(BaseNotifier):
+    """Przypomnienia e-mailem - jedno połączenie z serwerem poczty na paczkę"""
+
+    def send(self, messages):
+        failed = {}
+        emails = []
+        for message in messages:
+            if message.recipient.email:
+                emails.append((message, self.build_email(message)))
+            else:
+                failed[message.pk] = 'Odbiorca nie ma adresu e-mail'
+        if not emails:
+            return failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            failed.update((message.pk, f'Połączenie z serwerem poczty: {exc}') for message, _email in emails)
+            return failed
+        try:
+            for message, email in emails:
+                email.connection = connection
+                try:
+                    email.send()
+                except Exception as exc:
+                    failed[message.pk] = str(exc) or exc.__class__.__name__
+        finally:
+            connection.close()
+        return failed
+
+    def build_email(self, message):
+        task = message.task
+        lines = [f'Przypomnienie o zadaniu: {task.title}']
+        if task.due_date:
+            lines.append(f'Termin: {timezone.localtime(task.due_date):%Y-%m-%d %H:%M}')
+        if task.description:
+            lines.extend(['', task.description])
+        return EmailMessage(
+            subject=f'Przypomnienie: {task.title}',
+            body='\n'.join(lines),
+            to=[message.recipient.email],
+        )
+
+
+def get_notifier():
+    """Notyfikator z ustawienia TASK_REMINDER_NOTIFIER"""
+    return import_string(settings.TASK_REMINDER_NOTIFIER)()
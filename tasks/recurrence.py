@@ -0,0 +1,148 @@
+"""
+Zadania cykliczne - tworzenie wystąpień w kroczącym horyzoncie
+
+Seria to zadanie wzorcowe z regułą TaskRecurrence (np. FREQ=WEEKLY;BYDAY=MO).
+Wystąpienia są zwykłymi zadaniami (Task.recurrence = seria), tworzonymi
+tylko na TASK_RECURRENCE_HORIZON_DAYS do przodu - reguła bez końca nie
+zapełnia bazy latami przyszłych wierszy. Listy zadań (task_list, my_tasks)
+pokazują więc nadchodzące wystąpienia zwykłym zapytaniem po indeksie
+(owner, status, due_date), bez rozwijania reguł przy każdym żądaniu.
+
+Horyzont przesuwa komenda `materialize_recurring_tasks` (cron): paczkami
+przejmuje serie z next_occurrence_at w horyzoncie (indeks
+recurrence_next_idx, SELECT ... FOR UPDATE SKIP LOCKED), tworzy brakujące
+wystąpienia i przesuwa next_occurrence_at za horyzont. Nowa lub zmieniona
+reguła jest rozwijana od razu przy zapisie formularza.
+
+Wystąpienie kopiuje z zadania wzorcowego tytuł, opis, priorytet,
+powiązania i osobę przypisaną; przypomnienie ma ten sam odstęp od terminu
+co we wzorcu.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Task, TaskRecurrence
+from .rrule import iter_occurrences, parse_rrule
+
+
+def horizon_end(now=None, horizon_days=None):
+    horizon_days = settings.TASK_RECURRENCE_HORIZON_DAYS if horizon_days is None else horizon_days
+    return (now or timezone.now()) + timedelta(days=horizon_days)
+
+
+def _occurrence(template, recurrence, due_date):
+    reminder_date = None
+    if template.reminder_date and template.due_date:
+        reminder_date = due_date - (template.due_date - template.reminder_date)
+    return Task(
+        title=template.title, description=template.description, priority=template.priority,
+        due_date=due_date, reminder_date=reminder_date,
+        contact_id=template.contact_id, company_id=template.company_id,
+        owner_id=template.owner_id, assigned_to_id=template.assigned_to_id,
+        recurrence=recurrence,
+    )
+
+
+def materialize(recurrence, until, template=None):
+    """
+    Tworzy wystąpienia serii od next_occurrence_at do `until` włącznie
+
+    Wywołujący trzyma blokadę wiersza serii (albo właśnie ją utworzył).
+
+    Returns:
+        Liczba utworzonych zadań
+    """
+    if recurrence.next_occurrence_at is None or recurrence.next_occurrence_at > until:
+        return 0
+    template = template or recurrence.task
+    created = 0
+    next_occurrence_at = None
+    tz = timezone.get_current_timezone()
+    for due_date in iter_occurrences(parse_rrule(recurrence.rule), recurrence.dtstart, tz):
+        if due_date < recurrence.next_occurrence_at:
+            continue
+        if due_date > until:
+            next_occurrence_at = due_date
+            break
+        # Zwykły zapis - sygnały liczników, aktywności i wyszukiwania działają jak dla zadania z formularza
+        _occurrence(template, recurrence, due_date).save()
+        created += 1
+    recurrence.next_occurrence_at = next_occurrence_at
+    TaskRecurrence.objects.filter(pk=recurrence.pk).update(next_occurrence_at=next_occurrence_at)
+    return created
+
+
+def set_recurrence(task, rule):
+    """
+    Ustawia, zmienia albo (rule='') usuwa regułę powtarzania zadania wzorcowego
+
+    Przy zmianie lub usunięciu reguły przyszłe, nierozpoczęte wystąpienia
+    starej reguły są usuwane; wykonane i rozpoczęte zostają w serii.
+    Zadanie musi mieć termin (due_date) - to pierwsze wystąpienie serii.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Blokada serii - komenda materialize_recurring_tasks mogłaby ją właśnie uzupełniać
+        current = TaskRecurrence.objects.select_for_update().filter(task=task).first()
+        if current and current.rule == rule and current.dtstart == task.due_date:
+            return current
+        if current is None and not rule:
+            return None
+        if current:
+            current.occurrences.exclude(pk=task.pk).filter(status='todo', due_date__gt=now).delete()
+            if not rule:
+                current.delete()
+                return None
+            current.rule, current.dtstart = rule, task.due_date
+            recurrence = current
+        else:
+            recurrence = TaskRecurrence(task=task, rule=rule, dtstart=task.due_date)
+
+        # Następne wystąpienie: po wzorcu, po teraz i po wystąpieniach, które zostały w serii
+        after = max(task.due_date, now)
+        if current:
+            kept = current.occurrences.exclude(pk=task.pk).aggregate(latest=Max('due_date'))['latest']
+            after = max(after, kept or after)
+        occurrences = iter_occurrences(parse_rrule(rule), task.due_date, timezone.get_current_timezone())
+        recurrence.next_occurrence_at = next((due_date for due_date in occurrences if due_date > after), None)
+        recurrence.save()
+        if task.recurrence_id != recurrence.pk:
+            Task.objects.filter(pk=task.pk).update(recurrence=recurrence)
+            task.recurrence = recurrence
+        materialize(recurrence, horizon_end(now), template=task)
+    return recurrence
+
+
+def materialize_due(horizon_days=None, batch_size=None, now=None):
+    """
+    Uzupełnia wszystkie serie do końca horyzontu (komenda materialize_recurring_tasks)
+
+    Każda paczka serii to osobna transakcja; serie zablokowane przez
+    równolegle działającą komendę są pomijane.
+
+    Returns:
+        (liczba uzupełnionych serii, liczba utworzonych zadań)
+    """
+    batch_size = batch_size or settings.TASK_RECURRENCE_BATCH_SIZE
+    until = horizon_end(now, horizon_days)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+
+    series = tasks = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                TaskRecurrence.objects.select_for_update(skip_locked=skip_locked)
+                .filter(next_occurrence_at__lte=until).order_by('next_occurrence_at')[:batch_size]
+            )
+            if not batch:
+                break
+            templates = Task.objects.in_bulk([recurrence.task_id for recurrence in batch])
+            for recurrence in batch:
+                tasks += materialize(recurrence, until, template=templates[recurrence.task_id])
+        series += len(batch)
+    return series, tasks
@@ -0,0 +1,200 @@
+"""
+Worker przypomnień o zadaniach (`python manage.py run_reminders`)
+
+Cykl pracy:
+
+1. Co TASK_REMINDER_POLL_SECONDS worker czyta z indeksu
+   task_pending_reminder_idx przypomnienia nieobsłużone, przypadające
+   najpóźniej na koniec następnego okna, i odkłada je na kopiec (heapq)
+   uporządkowany po reminder_date.
+2. Między odczytami śpi do najbliższego przypomnienia z kopca, więc
+   przypomnienie wychodzi o swojej godzinie, a nie przy następnym odczycie.
+3. Przypomnienia, których czas minął, są przejmowane w jednej transakcji:
+   SELECT ... FOR UPDATE SKIP LOCKED (gdzie baza to obsługuje) na zadaniach,
+   ustawienie reminder_sent_at i zapis wiadomości w outboksie
+   (ReminderMessage). Kilka workerów może działać równolegle - każde
+   przypomnienie przejmuje dokładnie jeden z nich, a ograniczenie
+   unikalności (zadanie, data przypomnienia) w outboksie chroni przed
+   duplikatem także tam, gdzie SKIP LOCKED nie ma (SQLite).
+4. Wiadomości z outboksu są wysyłane paczkami przez notyfikator
+   (tasks/notifiers.py) poza transakcją. Przed wysyłką worker
+   "dzierżawi" paczkę, przesuwając next_attempt_at - jeśli padnie
+   w trakcie wysyłki, inny worker ponowi ją po upływie dzierżawy. Nieudane
+   wysyłki są ponawiane z podwajanym odstępem, po
+   TASK_REMINDER_MAX_ATTEMPTS próbach wiadomość dostaje status 'failed'.
+
+Przypomnienia zamkniętych zadań są oznaczane jako obsłużone bez wysyłki.
+Odbiorcą jest osoba, do której przypisano zadanie, a bez przypisania - właściciel.
+"""
+
+import heapq
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ReminderMessage, Task
+from .notifiers import get_notifier
+
+
+def _skip_locked():
+    return connection.features.has_select_for_update_skip_locked
+
+
+class ReminderWorker:
+    """
+    Pętla wysyłki przypomnień
+
+        worker = ReminderWorker()
+        worker.run_once()   # jeden przebieg (testy, cron)
+        worker.run()        # do wywołania stop()
+    """
+
+    def __init__(self, notifier=None, poll_seconds=None, batch_size=None):
+        self.notifier = notifier or get_notifier()
+        self.poll_seconds = poll_seconds or settings.TASK_REMINDER_POLL_SECONDS
+        self.batch_size = batch_size or settings.TASK_REMINDER_BATCH_SIZE
+        self.max_attempts = settings.TASK_REMINDER_MAX_ATTEMPTS
+        self.retry_seconds = settings.TASK_REMINDER_RETRY_SECONDS
+        # Kopiec (reminder_date, pk zadania) i data, pod którą zadanie na nim leży
+        self.heap = []
+        self.scheduled = {}
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self, now):
+        """Odkłada na kopiec przypomnienia przypadające do końca następnego okna"""
+        horizon = now + timedelta(seconds=self.poll_seconds)
+        pending = (
+            Task.objects.filter(reminder_sent_at__isnull=True, reminder_date__lte=horizon)
+            .order_by('reminder_date').values_list('pk', 'reminder_date')[:self.batch_size]
+        )
+        for pk, reminder_date in pending:
+            if self.scheduled.get(pk) != reminder_date:
+                self.scheduled[pk] = reminder_date
+                heapq.heappush(self.heap, (reminder_date, pk))
+
+    def due(self, now):
+        """Zdejmuje z kopca pk zadań, których przypomnienie już minęło"""
+        task_ids = []
+        while self.heap and self.heap[0][0] <= now and len(task_ids) < self.batch_size:
+            reminder_date, pk = heapq.heappop(self.heap)
+            # Starszy wpis zadania, któremu zmieniono datę przypomnienia
+            if self.scheduled.get(pk) == reminder_date:
+                del self.scheduled[pk]
+                task_ids.append(pk)
+        return task_ids
+
+    def claim(self, task_ids, now):
+        """
+        Przejmuje przypomnienia zadań i zapisuje wiadomości w outboksie
+
+        Warunki są sprawdzane ponownie w bazie - kopiec może być nieaktualny
+        (zmieniona data, przypomnienie przejęte przez inny worker).
+
+        Returns:
+            Liczba zapisanych wiadomości
+        """
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.select_for_update(skip_locked=_skip_locked())
+                .filter(pk__in=task_ids, reminder_sent_at__isnull=True, reminder_date__lte=now)
+                .only('pk', 'status', 'reminder_date', 'owner_id', 'assigned_to_id')
+            )
+            if not tasks:
+                return 0
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).update(reminder_sent_at=now)
+            messages = [
+                ReminderMessage(
+                    task=task, recipient_id=task.assigned_to_id or task.owner_id,
+                    reminder_date=task.reminder_date, next_attempt_at=now,
+                )
+                for task in tasks if task.status in Task.OPEN_STATUSES
+            ]
+            ReminderMessage.objects.bulk_create(messages, ignore_conflicts=True)
+        return len(messages)
+
+    def deliver(self, now):
+        """
+        Wysyła jedną paczkę wiadomości z outboksu
+
+        Returns:
+            Counter: sent / retry / failed
+        """
+        with transaction.atomic():
+            leased = list(
+                ReminderMessage.objects.select_for_update(skip_locked=_skip_locked())
+                .filter(status=ReminderMessage.STATUS_PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at').values_list('pk', flat=True)[:self.batch_size]
+            )
+            if not leased:
+                return Counter()
+            ReminderMessage.objects.filter(pk__in=leased).update(
+                attempts=F('attempts') + 1, next_attempt_at=now + timedelta(seconds=self.retry_seconds)
+            )
+
+        messages = list(ReminderMessage.objects.filter(pk__in=leased).select_related('task', 'recipient'))
+        errors = self.notifier.send(messages)
+
+        stats = Counter()
+        sent = [message.pk for message in messages if message.pk not in errors]
+        if sent:
+            ReminderMessage.objects.filter(pk__in=sent).update(
+                status=ReminderMessage.STATUS_SENT, sent_at=timezone.now(), last_error=''
+            )
+            stats['sent'] = len(sent)
+        for message in messages:
+            if message.pk not in errors:
+                continue
+            if message.attempts >= self.max_attempts:
+                update = {'status': ReminderMessage.STATUS_FAILED}
+                stats['failed'] += 1
+            else:
+                delay = self.retry_seconds * 2 ** (message.attempts - 1)
+                update = {'next_attempt_at': now + timedelta(seconds=delay)}
+                stats['retry'] += 1
+            ReminderMessage.objects.filter(pk=message.pk).update(last_error=errors[message.pk], **update)
+        return stats
+
+    def dispatch(self, now):
+        """Przejmuje przypomnienia z kopca, które już minęły, i opróżnia outbox"""
+        stats = Counter()
+        while task_ids := self.due(now):
+            stats['claimed'] += self.claim(task_ids, now)
+        while batch := self.deliver(now):
+            stats.update(batch)
+        # Bez zerowych pozycji - pusty przebieg to pusty Counter
+        return +stats
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.poll(now)
+        return self.dispatch(now)
+
+    def run(self, report=None):
+        """
+        Pracuje do wywołania stop() (np. z obsługi SIGTERM)
+
+        Args:
+            report: funkcja wywoływana ze statystykami niepustego przebiegu
+        """
+        next_poll = timezone.now()
+        while not self._stop.is_set():
+            # Proces działa długo - zerwane lub zbyt stare połączenie z bazą jest otwierane na nowo
+            close_old_connections()
+            now = timezone.now()
+            if now >= next_poll:
+                self.poll(now)
+                next_poll = now + timedelta(seconds=self.poll_seconds)
+            stats = self.dispatch(now)
+            if stats and report:
+                report(stats)
+
+            wake_at = min(next_poll, self.heap[0][0]) if self.heap else next_poll
+            self._stop.wait(max((wake_at - timezone.now()).total_seconds(), 0))
@@ -0,0 +1,195 @@
+"""
+Reguły powtarzania zadań - podzbiór RRULE (RFC 5545)
+
+Obsługiwane części reguły:
+
+    FREQ=DAILY|WEEKLY|MONTHLY|YEARLY   (wymagane)
+    INTERVAL=n                          co n dni / tygodni / miesięcy / lat
+    BYDAY=MO,WE,FR                      tylko z FREQ=WEEKLY - dni tygodnia
+    COUNT=n                             n wystąpień łącznie z pierwszym
+    UNTIL=20261231T235959Z              ostatnia możliwa data (UTC)
+
+    rule = parse_rrule('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+    for due_date in iter_occurrences(rule, dtstart, tz):
+        ...
+
+Pierwszym wystąpieniem jest zawsze dtstart. Kolejne są liczone w czasie
+lokalnym (tz), więc zadanie "co poniedziałek o 9:00" zostaje o 9:00 także
+po zmianie czasu na letni. Jak w RFC, miesiące bez danego dnia (31., 29.
+lutego) są pomijane, a nie przesuwane na koniec miesiąca.
+
+Moduł nie zależy od Django.
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+FREQUENCIES = ['DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY']
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+_UNITS = {
+    # (co 1, co 2-4, co 5+) - do opisu reguły
+    'DAILY': ('codziennie', 'dni', 'dni'),
+    'WEEKLY': ('co tydzień', 'tygodnie', 'tygodni'),
+    'MONTHLY': ('co miesiąc', 'miesiące', 'miesięcy'),
+    'YEARLY': ('co rok', 'lata', 'lat'),
+}
+_WEEKDAY_NAMES = ['pon', 'wt', 'śr', 'czw', 'pt', 'sob', 'niedz']
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    freq: str
+    interval: int = 1
+    byday: tuple = ()
+    count: int = None
+    until: datetime = None
+
+    def __str__(self):
+        """Postać kanoniczna (zapisywana w bazie)"""
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(WEEKDAYS[day] for day in self.byday))
+        if self.count:
+            parts.append(f'COUNT={self.count}')
+        if self.until:
+            parts.append(f'UNTIL={self.until:%Y%m%dT%H%M%SZ}')
+        return ';'.join(parts)
+
+
+def _positive_int(name, value):
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f'{name} musi być liczbą całkowitą większą od zera')
+    return int(value)
+
+
+def _parse_until(value):
+    for pattern in ('%Y%m%dT%H%M%SZ', '%Y%m%d'):
+        try:
+            until = datetime.strptime(value, pattern)
+        except ValueError:
+            continue
+        if pattern == '%Y%m%d':
+            until = until.replace(hour=23, minute=59, second=59)
+        return until.replace(tzinfo=timezone.utc)
+    raise ValueError('UNTIL musi mieć postać RRRRMMDD lub RRRRMMDDTGGMMSSZ')
+
+
+def parse_rrule(text):
+    """
+    Reguła z tekstu RRULE (z prefiksem "RRULE:" lub bez)
+
+    Raises:
+        ValueError: z opisem błędu do pokazania w formularzu
+    """
+    text = (text or '').strip().upper()
+    if text.startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    parts = {}
+    for part in filter(None, text.split(';')):
+        name, sep, value = part.partition('=')
+        if not sep or not value:
+            raise ValueError(f'Nieprawidłowa część reguły: {part}')
+        if name in parts:
+            raise ValueError(f'{name} występuje w regule więcej niż raz')
+        parts[name] = value.strip()
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'COUNT', 'UNTIL'}
+    if unknown:
+        raise ValueError(f'Nieobsługiwane części reguły: {", ".join(sorted(unknown))}')
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f'FREQ musi być jedną z wartości: {", ".join(FREQUENCIES)}')
+    if 'COUNT' in parts and 'UNTIL' in parts:
+        raise ValueError('COUNT i UNTIL nie mogą występować razem')
+
+    byday = ()
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY jest obsługiwane tylko z FREQ=WEEKLY')
+        days = parts['BYDAY'].split(',')
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError(f'BYDAY: dozwolone dni to {",".join(WEEKDAYS)}')
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+
+    return RecurrenceRule(
+        freq=freq,
+        interval=_positive_int('INTERVAL', parts['INTERVAL']) if 'INTERVAL' in parts else 1,
+        byday=byday,
+        count=_positive_int('COUNT', parts['COUNT']) if 'COUNT' in parts else None,
+        until=_parse_until(parts['UNTIL']) if 'UNTIL' in parts else None,
+    )
+
+
+def describe(rule):
+    """Opis reguły po polsku, np. 'co 2 tygodnie (pon, czw), 10 razy'"""
+    once, few, many = _UNITS[rule.freq]
+    n = rule.interval
+    if n == 1:
+        text = once
+    else:
+        text = f'co {n} {few if n % 10 in (2, 3, 4) and n % 100 not in (12, 13, 14) else many}'
+    if rule.byday:
+        text += ' (' + ', '.join(_WEEKDAY_NAMES[day] for day in rule.byday) + ')'
+    if rule.count:
+        text += f', {rule.count} razy'
+    if rule.until:
+        text += f', do {rule.until:%Y-%m-%d}'
+    return text
+
+
+def _add_months(wall, months):
+    """Ta sama data `months` miesięcy później albo None, jeśli takiego dnia nie ma"""
+    month_index = wall.month - 1 + months
+    year, month = wall.year + month_index // 12, month_index % 12 + 1
+    if wall.day > calendar.monthrange(year, month)[1]:
+        return None
+    return wall.replace(year=year, month=month)
+
+
+def _wall_times(rule, start):
+    """Czasy lokalne (bez strefy): `start`, a po nim kolejne zgodne z regułą"""
+    yield start
+    for candidate in _candidates(rule, start):
+        if candidate > start:
+            yield candidate
+
+
+def _candidates(rule, start):
+    step = 0
+    while True:
+        if rule.freq == 'DAILY':
+            yield start + timedelta(days=step * rule.interval)
+        elif rule.freq == 'WEEKLY':
+            if not rule.byday:
+                yield start + timedelta(weeks=step * rule.interval)
+            else:
+                week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=step * rule.interval)
+                for day in rule.byday:
+                    yield week_start + timedelta(days=day)
+        else:
+            months = step * rule.interval * (12 if rule.freq == 'YEARLY' else 1)
+            candidate = _add_months(start, months)
+            if candidate is not None:
+                yield candidate
+        step += 1
+
+
+def iter_occurrences(rule, dtstart, tz):
+    """
+    Kolejne wystąpienia (aware datetime) od dtstart włącznie
+
+    Generator jest nieskończony dla reguł bez COUNT i UNTIL - wywołujący
+    przerywa go po przekroczeniu swojego horyzontu.
+    """
+    local = dtstart.astimezone(tz)
+    for index, wall in enumerate(_wall_times(rule, local.replace(tzinfo=None))):
+        if rule.count and index >= rule.count:
+            return
+        occurrence = wall.replace(tzinfo=tz)
+        if rule.until and occurrence > rule.until:
+            return
+        yield occurrence
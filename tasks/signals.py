@@ -0,0 +1,75 @@
+"""
+Sygnały aplikacji tasks
+
+Utrzymują licznik otwartych zadań kontaktu i firmy (contacts/counters.py)
+i stan przypomnienia (tasks/reminders.py).
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from contacts import counters
+from mini_crm.signals import post_bulk_update
+
+from .models import Task
+
+_TRACKED_FIELDS = ['contact_id', 'company_id', 'status', 'reminder_date', 'reminder_sent_at']
+
+
+def _is_open(status):
+    return status not in Task.CLOSED_STATUSES
+
+
+@receiver(pre_save, sender=Task, dispatch_uid='task_counters_previous')
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._counter_previous = None if raw else counters.previous_values(instance, _TRACKED_FIELDS)
+
+
+@receiver(pre_save, sender=Task, dispatch_uid='task_reminder_reschedule')
+def reschedule_reminder(sender, instance, raw=False, **kwargs):
+    """
+    Nowa data przypomnienia - przypomnienie czeka na ponowne wysłanie
+
+    Bez zmiany daty zostaje stan z bazy: worker ustawia reminder_sent_at
+    przez update(), więc obiekt wczytany wcześniej ma nieaktualną wartość.
+    """
+    previous = getattr(instance, '_counter_previous', None)
+    if raw or previous is None:
+        return
+    if previous['reminder_date'] == instance.reminder_date:
+        instance.reminder_sent_at = previous['reminder_sent_at']
+    else:
+        instance.reminder_sent_at = None
+
+
+@receiver(post_save, sender=Task, dispatch_uid='task_counters_save')
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = counters.counter_values(instance)
+    previous = getattr(instance, '_counter_previous', None) if not created else None
+
+    counters.move_count(
+        'open_task_count',
+        previous if previous is not None and _is_open(previous['status']) else None,
+        current if _is_open(instance.status) else None,
+    )
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='task_counters_delete')
+def update_counters_on_delete(sender, instance, **kwargs):
+    if _is_open(instance.status):
+        counters.change_count('open_task_count', counters.counter_values(instance), -1)
+
+
+@receiver(post_bulk_update, sender=Task, dispatch_uid='task_counters_bulk_update')
+def update_counters_on_bulk_update(sender, changes, **kwargs):
+    """Masowa zmiana statusu (tasks/transitions.py) - jeden UPDATE na kontakt / firmę"""
+    deltas = Counter()
+    for task, previous in changes:
+        if 'status' in previous:
+            deltas[task.contact_id, task.company_id] += _is_open(task.status) - _is_open(previous['status'])
+    for (contact_id, company_id), delta in deltas.items():
+        counters.change_count('open_task_count', {'contact_id': contact_id, 'company_id': company_id}, delta)
@@ -1,3 +1,394 @@
-from django.test import TestCase
+"""
+Testy filtrów dat zadań, widżetów zadań na dashboardzie, przypomnień, zadań
+cyklicznych i zmian statusu
+"""
 
-# Create your tests here.
+import io
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from activities.models import Activity
+from contacts.models import Contact
+from tasks.forms import TaskSearchForm
+from tasks.models import ReminderMessage, Task, TaskRecurrence
+from tasks.notifiers import BaseNotifier
+from tasks.recurrence import materialize_due, set_recurrence
+from tasks.reminders import ReminderWorker
+from tasks.rrule import describe, iter_occurrences, parse_rrule
+
+
+class TestTaskDateWindows(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def create(self, title, due_date, status='todo'):
+        return Task.objects.create(title=title, due_date=due_date, status=status, owner=self.user)
+
+    def test_due_range_filter_uses_local_days(self):
+        self.create('rano', timezone.make_aware(datetime(2026, 5, 4, 0, 30)))
+        self.create('wieczorem', timezone.make_aware(datetime(2026, 5, 4, 23, 30)))
+        self.create('dzien pozniej', timezone.make_aware(datetime(2026, 5, 5, 0, 0)))
+
+        form = TaskSearchForm({'due_from': '2026-05-04', 'due_to': '2026-05-04'}, user=self.user)
+        titles = form.filter_queryset(Task.objects.filter(owner=self.user)).values_list('title', flat=True)
+        self.assertEqual(sorted(titles), ['rano', 'wieczorem'])
+
+    def test_dashboard_overdue_and_due_soon_in_sql(self):
+        now = timezone.now()
+        overdue = self.create('po terminie', now - timedelta(hours=2))
+        soon = self.create('wkrotce', now + timedelta(hours=3))
+        self.create('zamkniete', now - timedelta(hours=2), status='done')
+        self.create('za tydzien', now + timedelta(days=7))
+
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(list(response.context['overdue_tasks']), [overdue])
+        self.assertEqual(list(response.context['due_soon_tasks']), [soon])
+        self.assertEqual(response.context['overdue_count'], 1)
+
+    def test_queryset_filters_match_model_methods(self):
+        now = timezone.now()
+        tasks = [
+            self.create('po terminie', now - timedelta(hours=2)),
+            self.create('w trakcie po terminie', now - timedelta(days=3), status='in_progress'),
+            self.create('wkrotce', now + timedelta(hours=3)),
+            self.create('za 2 dni', now + timedelta(hours=40)),
+            self.create('anulowane', now - timedelta(hours=2), status='cancelled'),
+            self.create('bez terminu', None),
+        ]
+        queryset = Task.objects.filter(owner=self.user)
+
+        self.assertEqual(
+            set(queryset.overdue(now)), {task for task in tasks if task.is_overdue()}
+        )
+        self.assertEqual(
+            set(queryset.due_soon(now=now)), {task for task in tasks if task.is_due_soon()}
+        )
+        self.assertEqual(queryset.due_soon(hours=48, now=now).count(), 2)
+        self.assertEqual(queryset.open().count(), 5)
+
+    def test_my_tasks_and_overdue_filter_in_sql(self):
+        now = timezone.now()
+        overdue = self.create('po terminie', now - timedelta(hours=2), status='in_progress')
+        soon = self.create('wkrotce', now + timedelta(hours=3))
+        self.create('zamkniete', now - timedelta(hours=2), status='done')
+
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('tasks:my_tasks'))
+        self.assertEqual(list(response.context['overdue_tasks']), [overdue])
+        self.assertEqual(list(response.context['due_soon_tasks']), [soon])
+        self.assertEqual((response.context['overdue_count'], response.context['due_soon_count']), (1, 1))
+
+        response = self.client.get(reverse('tasks:task_list'), {'overdue_only': 'on'})
+        self.assertEqual(list(response.context['tasks']), [overdue])
+        self.assertEqual(response.context['total_count'], 1)
+
+
+class BrokenNotifier(BaseNotifier):
+
+    def send(self, messages):
+        return {message.pk: 'serwer poczty niedostępny' for message in messages}
+
+
+@override_settings(
+    TASK_REMINDER_NOTIFIER='tasks.notifiers.EmailNotifier', TASK_REMINDER_POLL_SECONDS=60,
+    TASK_REMINDER_MAX_ATTEMPTS=2, TASK_REMINDER_RETRY_SECONDS=60,
+)
+class TestReminderWorker(TestCase):
+    """Przejmowanie przypomnień, outbox i ponowienia"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123', email='jan@example.com')
+        self.now = timezone.now()
+
+    def create(self, title, reminder_date, **kwargs):
+        return Task.objects.create(title=title, reminder_date=reminder_date, owner=self.user, **kwargs)
+
+    def test_due_reminder_is_claimed_and_sent_once(self):
+        colleague = User.objects.create_user(username='anna', email='anna@example.com')
+        task = self.create('Zadzwonić do klienta', self.now - timedelta(minutes=1), assigned_to=colleague)
+        closed = self.create('Zamknięte', self.now - timedelta(minutes=1), status='done')
+        self.create('Później', self.now + timedelta(hours=2))
+
+        first, second = ReminderWorker(), ReminderWorker()
+        second.poll(self.now)
+        self.assertEqual(first.run_once(self.now), {'claimed': 1, 'sent': 1})
+        # Drugi worker ma zadanie na kopcu, ale baza mówi, że jest już przejęte
+        self.assertEqual(second.dispatch(self.now), {})
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['anna@example.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Przypomnienie: Zadzwonić do klienta')
+        message = ReminderMessage.objects.get()
+        self.assertEqual((message.task, message.status, message.attempts), (task, 'sent', 1))
+        closed.refresh_from_db()
+        self.assertIsNotNone(closed.reminder_sent_at)
+
+    def test_heap_fires_reminder_from_polled_window(self):
+        task = self.create('Spotkanie', self.now + timedelta(seconds=30))
+        worker = ReminderWorker()
+
+        self.assertEqual(worker.run_once(self.now), {})
+        self.assertEqual(worker.heap, [(task.reminder_date, task.pk)])
+
+        # Bez ponownego odczytu - przypomnienie czekało na kopcu
+        self.assertEqual(worker.dispatch(self.now + timedelta(seconds=30)), {'claimed': 1, 'sent': 1})
+        self.assertEqual(worker.heap, [])
+
+    def test_failed_delivery_is_retried_then_marked_failed(self):
+        self.create('Oferta', self.now)
+        worker = ReminderWorker(notifier=BrokenNotifier())
+
+        self.assertEqual(worker.run_once(self.now), {'claimed': 1, 'retry': 1})
+        message = ReminderMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertEqual(message.next_attempt_at, self.now + timedelta(seconds=60))
+        self.assertEqual(message.last_error, 'serwer poczty niedostępny')
+
+        self.assertEqual(worker.run_once(self.now + timedelta(seconds=30)), {})
+        self.assertEqual(worker.run_once(self.now + timedelta(seconds=60)), {'failed': 1})
+        self.assertEqual(ReminderMessage.objects.get().status, 'failed')
+
+    def test_changed_reminder_date_is_sent_again(self):
+        task = self.create('Follow-up', self.now)
+        ReminderWorker().run_once(self.now)
+
+        # Obiekt wczytany przed wysyłką nie cofa jej przy zapisie
+        task.description = 'Notatka'
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(task.reminder_sent_at, self.now)
+
+        task.reminder_date = self.now + timedelta(minutes=5)
+        task.save()
+        task.refresh_from_db()
+        self.assertIsNone(task.reminder_sent_at)
+
+        ReminderWorker().run_once(self.now + timedelta(minutes=5))
+        self.assertEqual(ReminderMessage.objects.filter(task=task, status='sent').count(), 2)
+
+    def test_run_reminders_once_command(self):
+        self.create('Umowa', self.now - timedelta(minutes=1))
+        output = io.StringIO()
+
+        call_command('run_reminders', once=True, stdout=output)
+        self.assertIn('1 przejetych, 1 wyslanych', output.getvalue())
+        self.assertEqual(mail.outbox[0].to, ['jan@example.com'])
+
+
+class TestRecurrenceRules(TestCase):
+    """Podzbiór RRULE - tasks/rrule.py"""
+
+    tz = ZoneInfo('Europe/Warsaw')
+
+    def occurrences(self, rule, dtstart, limit=10):
+        result = []
+        for occurrence in iter_occurrences(parse_rrule(rule), dtstart, self.tz):
+            if len(result) == limit:
+                break
+            result.append(occurrence.strftime('%Y-%m-%d %H:%M'))
+        return result
+
+    def test_weekly_by_day_keeps_local_time_across_dst(self):
+        # Wtorek przed zmianą czasu na letni (29.03.2026)
+        dtstart = datetime(2026, 3, 24, 9, 0, tzinfo=self.tz)
+        self.assertEqual(
+            self.occurrences('RRULE:FREQ=WEEKLY;BYDAY=MO,TH', dtstart, limit=4),
+            ['2026-03-24 09:00', '2026-03-26 09:00', '2026-03-30 09:00', '2026-04-02 09:00'],
+        )
+
+    def test_monthly_skips_missing_days_and_count_ends_series(self):
+        dtstart = datetime(2026, 1, 31, 10, 0, tzinfo=self.tz)
+        self.assertEqual(
+            self.occurrences('FREQ=MONTHLY;COUNT=3', dtstart),
+            ['2026-01-31 10:00', '2026-03-31 10:00', '2026-05-31 10:00'],
+        )
+        self.assertEqual(
+            self.occurrences('FREQ=DAILY;INTERVAL=2;UNTIL=20260204', dtstart),
+            ['2026-01-31 10:00', '2026-02-02 10:00', '2026-02-04 10:00'],
+        )
+
+    def test_canonical_form_description_and_errors(self):
+        rule = parse_rrule('freq=weekly;byday=th,mo;interval=2')
+        self.assertEqual(str(rule), 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+        self.assertEqual(describe(rule), 'co 2 tygodnie (pon, czw)')
+        self.assertEqual(describe(parse_rrule('FREQ=MONTHLY;INTERVAL=5;COUNT=4')), 'co 5 miesięcy, 4 razy')
+
+        for text in ['', 'FREQ=HOURLY', 'FREQ=DAILY;BYDAY=MO', 'FREQ=WEEKLY;INTERVAL=0',
+                     'FREQ=DAILY;BYSETPOS=1', 'FREQ=DAILY;COUNT=2;UNTIL=20270101']:
+            with self.assertRaises(ValueError, msg=text):
+                parse_rrule(text)
+
+
+@override_settings(TASK_RECURRENCE_HORIZON_DAYS=30)
+class TestRecurringTasks(TestCase):
+    """Wystąpienia zadań cyklicznych w kroczącym horyzoncie"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.start = timezone.localtime().replace(second=0, microsecond=0) + timedelta(hours=1)
+
+    def create_series(self, rule='FREQ=WEEKLY', **fields):
+        data = {
+            'title': 'Follow-up', 'status': 'todo', 'priority': 'medium',
+            'due_date': self.start.strftime('%Y-%m-%dT%H:%M'), 'recurrence_rule': rule,
+        }
+        data.update(fields)
+        response = self.client.post(reverse('tasks:task_create'), data)
+        self.assertEqual(response.status_code, 302)
+        return Task.objects.get(recurrence_rule__isnull=False)
+
+    def due_dates(self, template):
+        return list(template.recurrence.occurrences.order_by('due_date').values_list('due_date', flat=True))
+
+    def test_form_creates_occurrences_only_within_horizon(self):
+        template = self.create_series(reminder_date=(self.start - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M'))
+
+        self.assertEqual(self.due_dates(template), [self.start + timedelta(weeks=week) for week in range(5)])
+        recurrence = template.recurrence
+        self.assertEqual(recurrence.next_occurrence_at, self.start + timedelta(weeks=5))
+        occurrence = recurrence.occurrences.exclude(pk=template.pk).first()
+        self.assertEqual(occurrence.reminder_date, occurrence.due_date - timedelta(hours=1))
+        self.assertEqual((occurrence.owner, occurrence.assigned_to), (self.user, self.user))
+
+        response = self.client.get(reverse('tasks:my_tasks'))
+        self.assertEqual(response.context['upcoming_recurring_count'], 5)
+        response = self.client.get(reverse('tasks:task_detail', args=[template.pk]))
+        self.assertContains(response, 'co tydzień')
+        self.assertEqual(len(response.context['upcoming_occurrences']), 4)
+
+        # Wystąpienie edytuje się bez reguły
+        response = self.client.get(reverse('tasks:task_update', args=[occurrence.pk]))
+        self.assertNotIn('recurrence_rule', response.context['form'].fields)
+
+    def test_job_rolls_horizon_forward_idempotently(self):
+        template = self.create_series()
+
+        self.assertEqual(materialize_due(), (0, 0))
+        self.assertEqual(materialize_due(now=timezone.now() + timedelta(days=14)), (1, 2))
+        self.assertEqual(materialize_due(now=timezone.now() + timedelta(days=14)), (0, 0))
+        self.assertEqual(len(self.due_dates(template)), 7)
+
+        output = io.StringIO()
+        call_command('materialize_recurring_tasks', horizon_days=60, stdout=output)
+        self.assertIn('1 serii, 2 nowych zadan', output.getvalue())
+
+    def test_count_ends_series(self):
+        template = self.create_series('FREQ=DAILY;COUNT=3')
+
+        self.assertEqual(len(self.due_dates(template)), 3)
+        self.assertIsNone(template.recurrence.next_occurrence_at)
+        self.assertEqual(materialize_due(now=timezone.now() + timedelta(days=100)), (0, 0))
+
+    def test_changing_and_clearing_rule(self):
+        template = self.create_series()
+        started = template.recurrence.occurrences.exclude(pk=template.pk).order_by('due_date').first()
+        started.status = 'in_progress'
+        started.save()
+
+        set_recurrence(template, 'FREQ=WEEKLY;INTERVAL=2')
+        # Rozpoczęte wystąpienie zostaje, nowa reguła startuje po nim
+        self.assertEqual(
+            self.due_dates(template),
+            [self.start, started.due_date, self.start + timedelta(weeks=2), self.start + timedelta(weeks=4)],
+        )
+
+        set_recurrence(template, '')
+        self.assertFalse(TaskRecurrence.objects.exists())
+        self.assertEqual(list(Task.objects.order_by('due_date')), [template, started])
+
+    def test_invalid_rule_and_missing_due_date(self):
+        url = reverse('tasks:task_create')
+        data = {'title': 'X', 'status': 'todo', 'priority': 'medium', 'recurrence_rule': 'FREQ=HOURLY'}
+        response = self.client.post(url, data)
+        self.assertIn('FREQ musi', str(response.context['form'].errors['recurrence_rule']))
+
+        data['recurrence_rule'] = 'FREQ=DAILY'
+        response = self.client.post(url, data)
+        self.assertIn('due_date', response.context['form'].errors)
+        self.assertFalse(Task.objects.exists())
+
+
+class TestTaskStatusTransitions(TestCase):
+    """Przełącznik i masowa zmiana statusu - jeden warunkowy UPDATE"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Contact.objects.create(first_name='Jan', last_name='Kowalski', owner=self.user)
+
+    def create(self, title, status='todo'):
+        return Task.objects.create(title=title, status=status, contact=self.contact, owner=self.user)
+
+    def test_bulk_status_single_update(self):
+        todo, started = self.create('A'), self.create('B', status='in_progress')
+        done = self.create('C', status='done')
+        completed_at = done.completed_at
+        other = Task.objects.create(
+            title='Cudze', owner=User.objects.create_user(username='otheruser', password='otherpass123')
+        )
+
+        url = reverse('tasks:task_bulk_status')
+        data = {'tasks': [todo.pk, started.pk, done.pk], 'status': 'done', 'query_string': 'priority=high'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data)
+        self.assertRedirects(response, reverse('tasks:task_list') + '?priority=high', fetch_redirect_response=False)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('CASE', updates[0])
+        for task in (todo, started, done):
+            task.refresh_from_db()
+            self.assertEqual(task.status, 'done')
+            self.assertIsNotNone(task.completed_at)
+        self.assertEqual(done.completed_at, completed_at)
+
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.open_task_count, 0)
+        self.assertEqual(Activity.objects.filter(verb=Activity.TASK_STATUS_CHANGED).count(), 2)
+
+        # Cudze zadanie - formularz odrzuca całą paczkę
+        self.client.post(url, {'tasks': [todo.pk, other.pk], 'status': 'todo'})
+        todo.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((todo.status, other.status), ('done', 'todo'))
+
+    def test_toggle_is_atomic_and_idempotent(self):
+        task = self.create('Telefon')
+        url = reverse('tasks:task_toggle_status', args=[task.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        # Podwójne kliknięcie - oba żądania widziały status 'todo'
+        self.client.post(url, {'status': 'todo'})
+        self.client.post(url, {'status': 'todo'})
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'in_progress')
+
+        self.client.post(url, {'status': 'in_progress'})
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'done')
+        self.assertIsNotNone(task.completed_at)
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.open_task_count, 0)
+
+        self.client.post(url, {'status': 'done'})
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.completed_at), ('todo', None))
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.open_task_count, 1)
+
+    def test_database_rejects_inconsistent_completed_at(self):
+        task = self.create('Oferta')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.filter(pk=task.pk).update(status='done')
@@ -0,0 +1,77 @@
+"""
+Zmiana statusu zadań jednym warunkowym UPDATE
+
+    change_status(Task.objects.filter(owner=user, pk__in=ids), 'done')
+    change_status(Task.objects.filter(owner=user, pk=pk), expected='todo')
+
+Nowy status liczy baza - CASE po bieżącym statusie - a w tym samym
+UPDATE ustawia completed_at: NOW() przy przejściu na 'done', NULL przy
+wyjściu z 'done' (spójność pilnuje też ograniczenie
+task_completed_at_consistent). Nie ma odczytu, zmiany w Pythonie i zapisu
+po kolei dla każdego zadania, więc podwójne kliknięcie z `expected`
+(status widziany przez użytkownika) zmienia zadanie tylko raz.
+
+Zmieniane wiersze są najpierw blokowane (SELECT ... FOR UPDATE), żeby znać
+ich poprzedni status - po UPDATE idzie sygnał
+mini_crm.signals.post_bulk_update, z którego liczniki otwartych zadań
+i strumień aktywności biorą zmiany (QuerySet.update() nie wysyła post_save).
+"""
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Now
+
+from mini_crm.signals import post_bulk_update
+
+from .models import Task
+
+# Przełącznik statusu na liście: do zrobienia -> w trakcie -> wykonane -> do zrobienia
+STATUS_CYCLE = {
+    'todo': 'in_progress',
+    'in_progress': 'done',
+    'done': 'todo',
+    'cancelled': 'todo',
+}
+
+
+def change_status(queryset, status=None, expected=None):
+    """
+    Zmienia status zadań z querysetu
+
+    Args:
+        status: nowy status; None - następny w cyklu (STATUS_CYCLE)
+        expected: zmieniaj tylko zadania, które mają ten status
+
+    Returns:
+        Liczba zmienionych zadań
+    """
+    transitions = {old: status or new for old, new in STATUS_CYCLE.items()}
+    changing = [old for old, new in transitions.items() if old != new and expected in (None, old)]
+    if not changing:
+        return 0
+    to_done = [old for old in changing if transitions[old] == 'done']
+
+    with transaction.atomic():
+        tasks = list(
+            queryset.select_for_update().filter(status__in=changing).order_by('pk')
+            .only('pk', 'status', 'title', 'owner_id', 'contact_id', 'company_id')
+        )
+        if not tasks:
+            return 0
+        Task.objects.filter(pk__in=[task.pk for task in tasks], status__in=changing).update(
+            # completed_at przed status - MySQL wykonuje przypisania SET od lewej,
+            # a kolejne widzą już nowe wartości kolumn
+            completed_at=Case(
+                When(status__in=to_done, then=Now()), default=Value(None), output_field=models.DateTimeField()
+            ) if to_done else None,
+            status=Case(*(When(status=old, then=Value(transitions[old])) for old in changing), default=F('status')),
+            updated_at=Now(),
+        )
+
+        changes = []
+        for task in tasks:
+            previous = task.status
+            task.status = transitions[previous]
+            changes.append((task, {'status': previous}))
+        post_bulk_update.send(sender=Task, changes=changes)
+    return len(tasks)
@@ -6,6 +6,7 @@ app_name = 'tasks'
 urlpatterns = [
     path('', views.task_list, name='task_list'),
     path('my-tasks/', views.my_tasks, name='my_tasks'),
+    path('bulk-status/', views.task_bulk_status, name='task_bulk_status'),
     path('<int:pk>/', views.task_detail, name='task_detail'),
     path('create/', views.task_create, name='task_create'),
     path('<int:pk>/update/', views.task_update, name='task_update'),
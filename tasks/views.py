@@ -1,10 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.urls import reverse
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 from .models import Task
-from .forms import TaskForm, TaskSearchForm
+from .forms import TaskBulkStatusForm, TaskForm, TaskSearchForm
+from .transitions import STATUS_CYCLE, change_status
+
+# Liczba najbliższych wystąpień serii na stronie zadania
+UPCOMING_OCCURRENCES_LIMIT = 5
 
 
 @login_required
@@ -13,40 +18,13 @@ def task_list(request):
     tasks = Task.objects.filter(owner=request.user).select_related('contact', 'company', 'assigned_to')
 
     search_form = TaskSearchForm(request.GET, user=request.user)
-
-    if search_form.is_valid():
-        query = search_form.cleaned_data.get('query')
-        status = search_form.cleaned_data.get('status')
-        priority = search_form.cleaned_data.get('priority')
-        contact = search_form.cleaned_data.get('contact')
-        company = search_form.cleaned_data.get('company')
-        overdue_only = search_form.cleaned_data.get('overdue_only')
-
-        if query:
-            tasks = tasks.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query)
-            )
-
-        if status:
-            tasks = tasks.filter(status=status)
-
-        if priority:
-            tasks = tasks.filter(priority=priority)
-
-        if contact:
-            tasks = tasks.filter(contact=contact)
-
-        if company:
-            tasks = tasks.filter(company=company)
-
-        if overdue_only:
-            tasks = [task for task in tasks if task.is_overdue()]
+    tasks = search_form.filter_queryset(tasks)
 
     context = {
         'tasks': tasks,
         'search_form': search_form,
-        'total_count': len(tasks) if isinstance(tasks, list) else tasks.count(),
+        'bulk_status_form': TaskBulkStatusForm(user=request.user),
+        'total_count': tasks.count(),
     }
     return render(request, 'tasks/task_list.html', context)
 
@@ -54,10 +32,20 @@ def task_list(request):
 @login_required
 def task_detail(request, pk):
     """Szczegóły zadania"""
-    task = get_object_or_404(Task, pk=pk, owner=request.user)
+    task = get_object_or_404(Task.objects.select_related('recurrence'), pk=pk, owner=request.user)
+
+    # Zadanie cykliczne - najbliższe utworzone wystąpienia serii (poza bieżącym)
+    upcoming_occurrences = []
+    if task.recurrence:
+        upcoming_occurrences = (
+            task.recurrence.occurrences.open().exclude(pk=task.pk)
+            .filter(due_date__gte=timezone.now()).order_by('due_date')[:UPCOMING_OCCURRENCES_LIMIT]
+        )
 
     context = {
         'task': task,
+        'recurrence': task.recurrence,
+        'upcoming_occurrences': upcoming_occurrences,
     }
     return render(request, 'tasks/task_detail.html', context)
 
@@ -140,22 +128,18 @@ def task_delete(request, pk):
 
 
 @login_required
+@require_POST
 def task_toggle_status(request, pk):
-    """Szybka zmiana statusu zadania"""
+    """Szybka zmiana statusu zadania (todo -> in_progress -> done -> todo)"""
     task = get_object_or_404(Task, pk=pk, owner=request.user)
 
-    # Cykl statusów: todo -> in_progress -> done -> todo
-    status_cycle = {
-        'todo': 'in_progress',
-        'in_progress': 'done',
-        'done': 'todo',
-        'cancelled': 'todo'
-    }
-
-    task.status = status_cycle.get(task.status, 'todo')
-    task.save()
-
-    messages.success(request, f'Status zadania zmieniony na: {task.get_status_display()}')
+    # Zmiana tylko ze statusu widzianego przez użytkownika - drugie kliknięcie niczego nie zmienia
+    expected = request.POST.get('status') or task.status
+    if change_status(Task.objects.filter(pk=task.pk), expected=expected):
+        next_status = dict(Task.STATUS_CHOICES)[STATUS_CYCLE[expected]]
+        messages.success(request, f'Status zadania zmieniony na: {next_status}')
+    else:
+        messages.info(request, 'Status zadania został już zmieniony.')
 
     # Przekieruj z powrotem lub do listy
     referer = request.META.get('HTTP_REFERER')
@@ -164,25 +148,48 @@ def task_toggle_status(request, pk):
     return redirect('tasks:task_list')
 
 
+@login_required
+@require_POST
+def task_bulk_status(request):
+    """Zmiana statusu zaznaczonych zadań jednym UPDATE"""
+    form = TaskBulkStatusForm(request.POST, user=request.user)
+    if form.is_valid():
+        status = form.cleaned_data['status']
+        changed = change_status(form.cleaned_data['tasks'], status)
+        messages.success(request, f'Zmieniono status {changed} zadań na: {dict(Task.STATUS_CHOICES)[status]}.')
+    else:
+        messages.error(request, ' '.join(error for errors in form.errors.values() for error in errors))
+
+    # Powrót na listę z tymi samymi filtrami
+    query = request.POST.get('query_string', '')
+    return redirect(f"{reverse('tasks:task_list')}?{query}" if query else reverse('tasks:task_list'))
+
+
 @login_required
 def my_tasks(request):
     """Moje zadania - widok skrótowy"""
-    now = timezone.now()
-
-    # Zadania pogrupowane według statusu
-    todo_tasks = Task.objects.filter(owner=request.user, status='todo').select_related('contact', 'company')
-    in_progress_tasks = Task.objects.filter(owner=request.user, status='in_progress').select_related('contact', 'company')
-    overdue_tasks = [task for task in todo_tasks.union(in_progress_tasks) if task.is_overdue()]
-    due_soon_tasks = [task for task in todo_tasks.union(in_progress_tasks) if task.is_due_soon()]
+    tasks = Task.objects.filter(owner=request.user).select_related('contact', 'company')
+
+    # Zadania pogrupowane według statusu i terminów - filtry i liczniki w SQL
+    todo_tasks = tasks.filter(status='todo')
+    in_progress_tasks = tasks.filter(status='in_progress')
+    overdue_tasks = tasks.overdue().order_by('due_date')
+    due_soon_tasks = tasks.due_soon().order_by('due_date')
+    # Wystąpienia zadań cyklicznych są zwykłymi zadaniami (tasks/recurrence.py) - bez rozwijania reguł
+    upcoming_recurring_tasks = tasks.open().filter(
+        recurrence__isnull=False, due_date__gte=timezone.now()
+    ).order_by('due_date')
 
     context = {
         'todo_tasks': todo_tasks[:10],
         'in_progress_tasks': in_progress_tasks[:10],
         'overdue_tasks': overdue_tasks[:10],
         'due_soon_tasks': due_soon_tasks[:10],
+        'upcoming_recurring_tasks': upcoming_recurring_tasks[:10],
         'todo_count': todo_tasks.count(),
         'in_progress_count': in_progress_tasks.count(),
-        'overdue_count': len(overdue_tasks),
-        'due_soon_count': len(due_soon_tasks),
+        'overdue_count': overdue_tasks.count(),
+        'due_soon_count': due_soon_tasks.count(),
+        'upcoming_recurring_count': upcoming_recurring_tasks.count(),
     }
     return render(request, 'tasks/my_tasks.html', context)